@@ -0,0 +1,58 @@
+"""
+Benchmarks driver re-assignment at 100, 1k and 10k drivers.
+
+    python benchmarks/bench_assignment.py [--sizes 100 1000 10000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.tools.assignment import HUNGARIAN_MAX, auction_assignment, candidate_greedy_assignment, hungarian
+from src.tools.eta import eta_matrix
+
+LOW = (2.95, 101.45)
+HIGH = (3.35, 101.85)
+
+
+def run(sizes=(100, 1000, 10_000), seed=42):
+    rng = np.random.default_rng(seed)
+    results = []
+    for n in sizes:
+        orders = rng.uniform(LOW, HIGH, (n, 2))
+        drivers = rng.uniform(LOW, HIGH, (n, 2))
+        row = {"drivers": n, "orders": n}
+
+        for name, solver in (("auction", auction_assignment), ("greedy", candidate_greedy_assignment)):
+            start = time.perf_counter()
+            _, _, etas = solver(orders, drivers)
+            row[f"{name}_s"] = round(time.perf_counter() - start, 4)
+            row[f"{name}_total_eta_min"] = round(float(etas.sum()), 1)
+
+        # The exact solver is cubic; run it where it finishes in seconds.
+        if n <= max(HUNGARIAN_MAX, 1000):
+            start = time.perf_counter()
+            cost = eta_matrix(orders, drivers)
+            rows, cols = hungarian(cost)
+            row["hungarian_s"] = round(time.perf_counter() - start, 4)
+            row["optimal_total_eta_min"] = round(float(cost[rows, cols].sum()), 1)
+            for name in ("auction", "greedy"):
+                row[f"{name}_gap_pct"] = round((row[f"{name}_total_eta_min"] / row["optimal_total_eta_min"] - 1) * 100, 2)
+        results.append(row)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10_000])
+    args = parser.parse_args()
+    for row in run(args.sizes):
+        print(", ".join(f"{k}={v}" for k, v in row.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Throughput and latency of the Coordinator (mock LLM) in single, batch and
+concurrent modes, on generated scenarios from every disruption family.
+
+By default the tools run in virtual time: their simulated latencies cost no
+wall-clock time, so "virtual" figures are the simulated end-to-end latency
+and "wall" figures are the orchestration's own CPU cost.
+
+    python benchmarks/bench_coordinator.py [--count 200] [--workers 8] [--concurrency 50] [--real-time]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.harness import percentiles, quiet
+from benchmarks.scenarios import generate
+from src.agent.coordinator import Coordinator
+from src.tools import runtime
+from src.tools.cache import clear_caches
+
+
+def _summary(latencies, elapsed):
+    row = {f"{k}_ms": round(v * 1000, 3) for k, v in percentiles(latencies).items()}
+    row["throughput_per_s"] = round(len(latencies) / elapsed, 3) if elapsed else None
+    return row
+
+
+def run_single(coordinator, scenarios, virtual=True):
+    """
+    Resolves scenarios one after another; latencies are reported per family.
+    """
+    async def sequential():
+        loop = asyncio.get_running_loop()
+        by_family, virtual_start, wall_start = {}, loop.time(), time.perf_counter()
+        for family, scenario in scenarios:
+            started, wall = loop.time(), time.perf_counter()
+            await coordinator.handle_disruption_async(scenario)
+            by_family.setdefault(family, []).append((loop.time() - started, time.perf_counter() - wall))
+        return by_family, loop.time() - virtual_start, time.perf_counter() - wall_start
+
+    by_family, virtual_s, wall_s = runtime.run(sequential(), virtual=virtual)
+    results = {"scenarios": len(scenarios), "virtual_s": round(virtual_s, 3), "wall_s": round(wall_s, 3)}
+    for family, samples in by_family.items():
+        results[family] = {
+            "virtual": _summary([v for v, _ in samples], sum(v for v, _ in samples)),
+            "wall": _summary([w for _, w in samples], sum(w for _, w in samples)),
+        }
+    return results
+
+
+def run_concurrent(coordinator, scenarios, concurrency=50, virtual=True):
+    """
+    Resolves scenarios on one event loop with up to `concurrency` in flight.
+    """
+    async def concurrent():
+        loop = asyncio.get_running_loop()
+        limit = asyncio.Semaphore(concurrency)
+        latencies = []
+
+        async def one(scenario):
+            async with limit:
+                started = loop.time()
+                await coordinator.handle_disruption_async(scenario)
+                latencies.append(loop.time() - started)
+
+        virtual_start, wall_start = loop.time(), time.perf_counter()
+        await asyncio.gather(*(one(scenario) for _, scenario in scenarios))
+        return latencies, loop.time() - virtual_start, time.perf_counter() - wall_start
+
+    latencies, virtual_s, wall_s = runtime.run(concurrent(), virtual=virtual)
+    return {
+        "scenarios": len(scenarios),
+        "concurrency": concurrency,
+        "virtual": _summary(latencies, virtual_s),
+        "wall_s": round(wall_s, 3),
+        "wall_throughput_per_s": round(len(scenarios) / wall_s, 3),
+    }
+
+
+def run_batch(coordinator, scenarios, workers=8, virtual=True):
+    """
+    Resolves scenarios through the batch engine's worker pool.
+    Each worker thread has its own (virtual) clock, so only wall time is comparable.
+    """
+    previous = runtime._virtual_time
+    runtime.use_virtual_time(virtual)
+    try:
+        start = time.perf_counter()
+        records = list(coordinator.handle_many([scenario for _, scenario in scenarios], max_workers=workers))
+        wall_s = time.perf_counter() - start
+    finally:
+        runtime.use_virtual_time(previous)
+    return {
+        "scenarios": len(scenarios),
+        "workers": workers,
+        "errors": sum(record["error"] is not None for record in records),
+        "wall": _summary([record["duration_ms"] / 1000 for record in records], wall_s),
+    }
+
+
+def run(count=200, workers=8, concurrency=50, virtual=True, fast_path=True, seed=42):
+    random.seed(seed)
+    scenarios = list(generate(count, seed=seed))
+    with quiet():
+        coordinator = Coordinator(use_mock_llm=True, use_fast_path=fast_path)
+        results = {}
+        for mode, bench in (
+            ("single", lambda: run_single(coordinator, scenarios, virtual)),
+            ("concurrent", lambda: run_concurrent(coordinator, scenarios, concurrency, virtual)),
+            ("batch", lambda: run_batch(coordinator, scenarios, workers, virtual)),
+        ):
+            # Every mode starts cold, so cached lookups do not favour later ones.
+            clear_caches()
+            results[mode] = bench()
+    results["virtual_time"] = virtual
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--real-time", action="store_true", help="Let the tools really sleep.")
+    parser.add_argument("--no-fast-path", action="store_true", help="Resolve every scenario with the mock agent.")
+    args = parser.parse_args()
+    results = run(args.count, args.workers, args.concurrency, not args.real_time, not args.no_fast_path)
+    for mode, values in results.items():
+        print(f"{mode:>12}: {values}")
+
+
+if __name__ == "__main__":
+    main()
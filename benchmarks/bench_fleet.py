@@ -0,0 +1,112 @@
+"""
+Memory and query latency of the columnar FleetStore against the same fleet
+kept as per-driver dicts.
+
+    python benchmarks/bench_fleet.py [--drivers 50000] [--orders 200000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.memory.fleet import DRIVER_STATUSES, FleetStore
+from src.tools.spatial import haversine_km
+
+# A ~30 km square around Kuala Lumpur.
+CENTER = (3.14, 101.69)
+SPREAD_DEG = 0.15
+
+
+def _position(rng):
+    return CENTER[0] + rng.uniform(-SPREAD_DEG, SPREAD_DEG), CENTER[1] + rng.uniform(-SPREAD_DEG, SPREAD_DEG)
+
+
+def _dict_fleet(drivers, rng):
+    return {
+        f"driver-{i}": {
+            "driver_id": f"driver-{i}",
+            "location": dict(zip(("latitude", "longitude"), _position(rng))),
+            "status": rng.choice(DRIVER_STATUSES),
+            "order_id": None,
+            "eta_min": None,
+        }
+        for i in range(drivers)
+    }
+
+
+def _dict_idle_near(fleet, latitude, longitude, radius_km):
+    found = []
+    for driver in fleet.values():
+        if driver["status"] == "idle":
+            distance = haversine_km(latitude, longitude, driver["location"]["latitude"], driver["location"]["longitude"])
+            if distance <= radius_km:
+                found.append((driver["driver_id"], distance))
+    return sorted(found, key=lambda item: item[1])
+
+
+def run(drivers=50_000, orders=200_000, queries=50, radius_km=3.0, seed=42):
+    rng = random.Random(seed)
+    results = {"drivers": drivers, "orders": orders}
+
+    # Both sides include the driver id strings; the store's also holds the
+    # id -> row index.
+    tracemalloc.start()
+    start = time.perf_counter()
+    store = FleetStore()
+    for i in range(drivers):
+        store.update_driver(f"driver-{i}", *_position(rng), status=rng.choice(DRIVER_STATUSES))
+    results["store_drivers_bytes"] = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    for i in range(orders):
+        store.update_order(f"order-{i}", pickup=_position(rng), dropoff=_position(rng))
+    results["store_build_s"] = round(time.perf_counter() - start, 3)
+
+    tracemalloc.start()
+    fleet = _dict_fleet(drivers, random.Random(seed))
+    results["dict_drivers_bytes"] = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    results["store_bytes_per_driver"] = round(results["store_drivers_bytes"] / drivers, 1)
+    results["dict_bytes_per_driver"] = round(results["dict_drivers_bytes"] / drivers, 1)
+
+    points = [_position(rng) for _ in range(queries)]
+    start = time.perf_counter()
+    for latitude, longitude in points:
+        store.drivers_near(latitude, longitude, radius_km)
+    results["store_idle_near_ms"] = round((time.perf_counter() - start) / queries * 1000, 3)
+    start = time.perf_counter()
+    for latitude, longitude in points[:5]:
+        _dict_idle_near(fleet, latitude, longitude, radius_km)
+    results["dict_idle_near_ms"] = round((time.perf_counter() - start) / 5 * 1000, 3)
+
+    ids = [f"driver-{rng.randrange(drivers)}" for _ in range(10_000)]
+    start = time.perf_counter()
+    for driver_id in ids:
+        store.update_driver(driver_id, 3.15, 101.7)
+    results["update_us"] = round((time.perf_counter() - start) / len(ids) * 1e6, 3)
+
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        store.snapshot(directory)
+        results["snapshot_s"] = round(time.perf_counter() - start, 3)
+        start = time.perf_counter()
+        FleetStore.restore(directory)
+        results["restore_s"] = round(time.perf_counter() - start, 3)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--drivers", type=int, default=50_000)
+    parser.add_argument("--orders", type=int, default=200_000)
+    args = parser.parse_args()
+    for name, value in run(args.drivers, args.orders).items():
+        print(f"{name:>24}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Memory and latency profile of ContextMemory at 1M entries.
+
+    python benchmarks/bench_memory.py [--entries 1000000] [--backend lru|sqlite]
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.harness import quiet, rss_bytes
+from src.memory.backends import LRUBackend, SQLiteBackend
+from src.memory.context import ContextMemory
+
+CHUNK = 10_000
+
+
+def _value(i):
+    return {"order_id": f"order-{i}", "driver_id": f"driver-{i % 5000}", "status": "delivered", "eta_minutes": i % 60}
+
+
+def _profile(memory, entries, lookups, rng):
+    results = {}
+    gc.collect()
+    before = rss_bytes()
+    start = time.perf_counter()
+    for first in range(0, entries, CHUNK):
+        memory.add_many((f"order-{i}", _value(i)) for i in range(first, min(first + CHUNK, entries)))
+    results["insert_s"] = round(time.perf_counter() - start, 3)
+    results["insert_per_s"] = round(entries / (time.perf_counter() - start))
+    gc.collect()
+    if before is not None:
+        results["rss_delta_bytes"] = rss_bytes() - before
+        results["rss_bytes_per_entry"] = round(results["rss_delta_bytes"] / entries, 1)
+
+    keys = [f"order-{rng.randrange(entries)}" for _ in range(lookups)]
+    start = time.perf_counter()
+    for key in keys:
+        memory.get_context(key)
+    results["get_us"] = round((time.perf_counter() - start) / lookups * 1e6, 3)
+
+    start = time.perf_counter()
+    memory.get_many(keys)
+    results["get_many_per_key_us"] = round((time.perf_counter() - start) / lookups * 1e6, 3)
+
+    drivers = [f"driver-{rng.randrange(5000)}" for _ in range(min(lookups, 1000))]
+    start = time.perf_counter()
+    for driver in drivers:
+        memory.get_history("driver_id", driver, limit=20)
+    results["history_us"] = round((time.perf_counter() - start) / len(drivers) * 1e6, 3)
+    return results
+
+
+def run(entries=1_000_000, backend="lru", lookups=10_000, seed=42):
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as directory, quiet():
+        if backend == "sqlite":
+            store = SQLiteBackend(os.path.join(directory, "context.db"))
+        else:
+            store = LRUBackend(max_entries=entries)
+        memory = ContextMemory(backend=store)
+        try:
+            results = {"backend": backend, "entries": entries, **_profile(memory, entries, lookups, rng)}
+        finally:
+            memory.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--backend", choices=["lru", "sqlite"], default="lru")
+    args = parser.parse_args()
+    for name, value in run(args.entries, args.backend).items():
+        print(f"{name:>22}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmarks Router re-routing on a synthetic city-sized road grid.
+
+    python benchmarks/bench_routing.py [--size 300] [--queries 50]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.tools.routing import RoadGraph, Router
+
+# About 100 m between intersections.
+STEP_DEG = 0.0009
+
+
+def grid_graph(size, seed=42):
+    """
+    A size x size street grid (two-way roads) with random per-road speeds.
+    """
+    rng = np.random.default_rng(seed)
+    rows, cols = np.divmod(np.arange(size * size), size)
+    lat = 3.0 + rows * STEP_DEG
+    lon = 101.5 + cols * STEP_DEG
+    right = np.flatnonzero(cols < size - 1)
+    down = np.flatnonzero(rows < size - 1)
+    sources = np.concatenate([right, right + 1, down, down + size])
+    targets = np.concatenate([right + 1, right, down + size, down])
+    speeds = rng.choice([20.0, 30.0, 50.0, 70.0], size=len(right) + len(down))
+    road_seconds = 100 / 1000 / speeds * 3600
+    horizontal, vertical = road_seconds[:len(right)], road_seconds[len(right):]
+    seconds = np.concatenate([horizontal, horizontal, vertical, vertical])
+    return RoadGraph.from_edges(sources, targets, seconds, lat, lon)
+
+
+def run(size=300, queries=50, trip_nodes=40, seed=42):
+    rng = random.Random(seed)
+    results = {"nodes": size * size}
+    with tempfile.TemporaryDirectory() as directory:
+        graph = grid_graph(size, seed)
+        results["edges"] = graph.num_edges
+        graph.save(directory)
+
+        start = time.perf_counter()
+        graph = RoadGraph.load(directory, mmap=True)
+        results["mmap_load_ms"] = (time.perf_counter() - start) * 1000
+        router = Router(graph)
+        start = time.perf_counter()
+        graph.min_seconds_per_km()
+        results["first_use_prepare_ms"] = (time.perf_counter() - start) * 1000
+
+        trips = []
+        for _ in range(queries):
+            r, c = rng.randrange(size - trip_nodes), rng.randrange(size - trip_nodes)
+            trips.append((r * size + c, (r + rng.randrange(trip_nodes)) * size + c + rng.randrange(trip_nodes)))
+
+        start = time.perf_counter()
+        paths = [router.route(s, t)[1] for s, t in trips]
+        results["route_ms"] = (time.perf_counter() - start) / queries * 1000
+
+        # Close one road on every route, then re-query: each route is searched again.
+        start = time.perf_counter()
+        for (s, t), path in zip(trips, paths):
+            if len(path) > 2:
+                mid = len(path) // 2
+                router.close_edge(path[mid], path[mid + 1])
+            router.route(s, t)
+        results["reroute_after_closure_ms"] = (time.perf_counter() - start) / queries * 1000
+
+        # A closure far from the routes leaves them valid: re-queries are reused.
+        router.close_edge(size * size - 1, size * size - 2)
+        start = time.perf_counter()
+        for s, t in trips:
+            router.route(s, t)
+        results["reroute_unaffected_ms"] = (time.perf_counter() - start) / queries * 1000
+    return {k: round(v, 3) if isinstance(v, float) else v for k, v in results.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=300)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+    for name, value in run(args.size, args.queries).items():
+        print(f"{name:>26}: {value}")
+
+
+if __name__ == "__main__":
+    main()
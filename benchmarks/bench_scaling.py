@@ -0,0 +1,37 @@
+"""
+Scaling curves for nearby-merchant search and driver assignment.
+
+    python benchmarks/bench_scaling.py [--merchants 1000 10000 100000] [--drivers 100 300 1000 3000]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks import bench_assignment, bench_spatial
+
+SPATIAL_METRICS = ("build_s", "radius_2km_category_us", "knn_5_us", "knn_5_category_us")
+
+
+def run(merchants=(1000, 10_000, 100_000), drivers=(100, 300, 1000, 3000), queries=500, seed=42):
+    spatial = []
+    for n in merchants:
+        result = bench_spatial.run(points=n, queries=queries, seed=seed)
+        spatial.append({"merchants": n, **{name: result[name] for name in SPATIAL_METRICS}})
+    return {"nearby_merchants": spatial, "assignment": bench_assignment.run(sizes=drivers, seed=seed)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--merchants", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    parser.add_argument("--drivers", type=int, nargs="+", default=[100, 300, 1000, 3000])
+    args = parser.parse_args()
+    for curve, rows in run(args.merchants, args.drivers).items():
+        print(curve)
+        for row in rows:
+            print("  " + ", ".join(f"{k}={v}" for k, v in row.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Wall-clock cost of simulating a city day with the fleet simulator, and the
+coordinator load it produces.
+
+    python benchmarks/bench_sim.py [--drivers 10000] [--hours 24] [--zones 1]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.sim.simulator import SimConfig, simulate
+
+
+def run(drivers=10_000, hours=24.0, zones=1, processes=None, seed=42):
+    config = SimConfig(drivers=drivers, merchants=max(1, drivers // 5), hours=hours, zones=zones, seed=seed)
+    report = simulate(config, processes)
+    orders, disruptions = report["orders"], report["disruptions"]
+    return {
+        "drivers": drivers,
+        "hours": hours,
+        "zones": zones,
+        "orders": orders["delivered"],
+        "disruptions": disruptions["resolved"],
+        "wall_s": report["wall_s"],
+        "orders_per_s": round(orders["delivered"] / report["wall_s"], 1),
+        "disruptions_per_min": disruptions["per_min"],
+        "peak_disruptions_per_min": disruptions["peak_per_min"],
+        "queue_wait_p95_s": disruptions["queue_wait_s"]["p95"],
+        "resolution_p95_s": disruptions["resolution_s"]["p95"],
+        "sustainable_per_min": report["coordinator"]["sustainable_per_min"],
+        "driver_utilization": report["driver_utilization"]["mean"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--drivers", type=int, default=10_000)
+    parser.add_argument("--hours", type=float, default=24.0)
+    parser.add_argument("--zones", type=int, default=1)
+    parser.add_argument("--processes", type=int, default=None, help="Processes for the zones (default: one per zone, up to the cores).")
+    args = parser.parse_args()
+    for name, value in run(args.drivers, args.hours, args.zones, args.processes).items():
+        print(f"{name:>26}: {value}")
+
+
+if __name__ == "__main__":
+    main()
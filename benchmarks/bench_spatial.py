@@ -0,0 +1,76 @@
+"""
+Benchmarks SpatialIndex radius and k-nearest queries over 100k points.
+
+    python benchmarks/bench_spatial.py [--points 100000] [--queries 2000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.tools.spatial import SpatialIndex
+
+# Roughly the Klang Valley: ~45 km x 45 km around Kuala Lumpur.
+LAT_RANGE = (2.95, 3.35)
+LON_RANGE = (101.45, 101.85)
+CATEGORIES = ["pizza", "burger", "noodles", "rice", "coffee", "dessert"]
+
+
+def random_point(rng):
+    return rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE)
+
+
+def run(points=100_000, queries=2000, seed=42):
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    index = SpatialIndex()
+    for i in range(points):
+        lat, lon = random_point(rng)
+        index.insert(f"merchant-{i}", lat, lon, {"category": rng.choice(CATEGORIES)})
+    build_s = time.perf_counter() - start
+
+    targets = [random_point(rng) for _ in range(queries)]
+
+    def per_query_us(fn):
+        # Warm up the per-cell arrays before timing.
+        for lat, lon in targets[:50]:
+            fn(lat, lon)
+        start = time.perf_counter()
+        for lat, lon in targets:
+            fn(lat, lon)
+        return (time.perf_counter() - start) / len(targets) * 1e6
+
+    results = {
+        "points": points,
+        "build_s": round(build_s, 3),
+        "radius_1km_ids_us": per_query_us(lambda lat, lon: index.query_radius_ids(lat, lon, 1.0)),
+        "radius_2km_ids_us": per_query_us(lambda lat, lon: index.query_radius_ids(lat, lon, 2.0)),
+        "radius_1km_us": per_query_us(lambda lat, lon: index.query_radius(lat, lon, 1.0)),
+        "radius_2km_category_us": per_query_us(lambda lat, lon: index.query_radius(lat, lon, 2.0, category="pizza")),
+        "knn_5_us": per_query_us(lambda lat, lon: index.nearest(lat, lon, k=5)),
+        "knn_5_category_us": per_query_us(lambda lat, lon: index.nearest(lat, lon, k=5, category="coffee")),
+    }
+
+    start = time.perf_counter()
+    for i in range(queries):
+        lat, lon = random_point(rng)
+        index.insert(f"new-{i}", lat, lon, {"category": "pizza"})
+        index.remove(f"merchant-{i}")
+    results["insert_remove_us"] = (time.perf_counter() - start) / queries * 1e6
+    return {k: round(v, 2) if isinstance(v, float) else v for k, v in results.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--points", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+    for name, value in run(args.points, args.queries).items():
+        print(f"{name:>24}: {value}")
+
+
+if __name__ == "__main__":
+    main()
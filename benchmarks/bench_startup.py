@@ -0,0 +1,72 @@
+"""
+Startup cost of the coordinator in each mode, from `python -X importtime`.
+
+    python benchmarks/bench_startup.py [--repeats 3]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# mode -> arguments after `python -X importtime`
+MODES = {
+    "import": ["-c", "import src.agent.coordinator"],
+    "mock": ["-c", "from src.agent.coordinator import Coordinator; Coordinator(use_mock_llm=True)"],
+    "real": ["-c", "from src.agent.coordinator import Coordinator; Coordinator()"],
+    "cli_help": [os.path.join("src", "main.py"), "--help"],
+}
+
+
+def parse_importtime(stderr):
+    """
+    Returns the total import time and the top-level imports by cumulative
+    time, both in microseconds, from `-X importtime` output.
+    """
+    top_level = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name[1:].startswith(" "):
+            top_level[name.strip()] = top_level.get(name.strip(), 0) + int(cumulative)
+    return sum(top_level.values()), top_level
+
+
+def measure(mode, repeats=3):
+    env = {**os.environ, "PYTHONPATH": ROOT}
+    # The real mode builds the agent but never calls the API.
+    env.setdefault("OPENAI_API_KEY", "sk-startup-benchmark")
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        done = subprocess.run([sys.executable, "-X", "importtime", *MODES[mode]], cwd=ROOT, env=env,
+                              capture_output=True, text=True)
+        wall_s = time.perf_counter() - start
+        if done.returncode != 0:
+            raise RuntimeError(f"{mode} failed: {done.stderr.strip().splitlines()[-1]}")
+        total_us, top_level = parse_importtime(done.stderr)
+        if best is None or wall_s < best["wall_s"]:
+            slowest = sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:5]
+            best = {"wall_s": round(wall_s, 3), "import_ms": round(total_us / 1000, 1),
+                    "slowest_imports_ms": {name: round(us / 1000, 1) for name, us in slowest}}
+    return best
+
+
+def run(repeats=3, modes=tuple(MODES)):
+    return {mode: measure(mode, repeats) for mode in modes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    args = parser.parse_args()
+    for mode, result in run(args.repeats, args.modes).items():
+        print(f"{mode:>9}: {result}")
+
+
+if __name__ == "__main__":
+    main()
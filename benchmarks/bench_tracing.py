@@ -0,0 +1,58 @@
+"""
+Measures the overhead of the tracing layer on the cheapest tool call there is,
+a cache hit on get_merchant_status.
+
+    python benchmarks/bench_tracing.py [--calls 20000]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.harness import quiet
+from src.telemetry import tracing
+from src.tools.logistics import get_merchant_status_async
+
+# The same tool without the tracing wrapper.
+untraced = get_merchant_status_async.__wrapped__
+
+
+async def _calls(fn, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        await fn("merchant-1")
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def run(calls=20000, repeats=5):
+    async def measure():
+        with quiet():
+            await untraced("merchant-1")  # fill the cache
+        results = {}
+        for label, fn, enabled in (("untraced_us", untraced, False), ("disabled_us", get_merchant_status_async, False),
+                                   ("enabled_us", get_merchant_status_async, True)):
+            (tracing.enable if enabled else tracing.disable)()
+            results[label] = min([await _calls(fn, calls) for _ in range(repeats)])
+        tracing.disable()
+        tracing.tracer.clear()
+        return results
+
+    results = asyncio.run(measure())
+    results["disabled_overhead_pct"] = (results["disabled_us"] / results["untraced_us"] - 1) * 100
+    results["enabled_overhead_pct"] = (results["enabled_us"] / results["untraced_us"] - 1) * 100
+    return {k: round(v, 3) for k, v in results.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+    for name, value in run(args.calls).items():
+        print(f"{name:>22}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmarks TrafficModel training on a synthetic trip log and its ETA queries.
+
+    python benchmarks/bench_traffic.py [--trips 1000000] [--places 300] [--workers N]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.tools.traffic_model import TrafficModel, hour_of_week
+
+# Monday 2024-01-01 00:00 UTC; trips span four weeks from here.
+START = 1704067200
+
+
+def trip_log(trips, places, seed=42):
+    """
+    Trips between `places` random places, slower at the morning and evening peaks.
+    """
+    rng = np.random.default_rng(seed)
+    names = np.array([f"Place {i}" for i in range(places)])
+    starts, ends = rng.choice(names, trips), rng.choice(names, trips)
+    started_at = START + rng.uniform(0, 28 * 86400, trips)
+    hour = hour_of_week(started_at) % 24
+    peak = ((hour >= 7) & (hour < 10)) | ((hour >= 17) & (hour < 20))
+    minutes = rng.uniform(10, 40, trips) * np.where(peak, 1.6, 1.0)
+    return starts, ends, started_at, minutes
+
+
+def run(trips=1_000_000, places=300, workers=None, queries=100_000, seed=42):
+    results = {"trips": trips}
+    starts, ends, started_at, minutes = trip_log(trips, places, seed)
+
+    start = time.perf_counter()
+    model = TrafficModel().fit(starts, ends, started_at, minutes)
+    results["fit_s"] = time.perf_counter() - start
+    results["segments"] = model.stats()["segments"]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "trips.csv")
+        with open(path, "w") as f:
+            f.write("start_point,end_point,started_at,duration_min\n")
+            f.writelines(f"{s},{e},{t:.0f},{m:.2f}\n" for s, e, t, m in zip(starts, ends, started_at, minutes))
+        results["csv_mb"] = os.path.getsize(path) / 1e6
+        start = time.perf_counter()
+        TrafficModel.from_csv(path, workers=workers, chunk_bytes=4 << 20)
+        results["csv_train_s"] = time.perf_counter() - start
+        results["csv_trips_per_s"] = trips / results["csv_train_s"]
+
+    pairs = list(zip(starts[:queries].tolist(), ends[:queries].tolist()))
+    start = time.perf_counter()
+    for s, e in pairs:
+        model.eta(s, e, at=START)
+    results["point_eta_us"] = (time.perf_counter() - start) / len(pairs) * 1e6
+    start = time.perf_counter()
+    model.etas(starts[:queries], ends[:queries], at=started_at[:queries])
+    results["batch_eta_us"] = (time.perf_counter() - start) / len(pairs) * 1e6
+
+    start = time.perf_counter()
+    for s, e in pairs[:10_000]:
+        model.report_incident(s, e, 1.5, duration_s=600)
+    results["incident_update_us"] = (time.perf_counter() - start) / min(len(pairs), 10_000) * 1e6
+    return {k: round(v, 3) if isinstance(v, float) else v for k, v in results.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--trips", type=int, default=1_000_000)
+    parser.add_argument("--places", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=None, help="Training processes (default: one per core).")
+    args = parser.parse_args()
+    for name, value in run(args.trips, args.places, args.workers).items():
+        print(f"{name:>20}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Shared helpers for the benchmark scripts.
+"""
+import contextlib
+import os
+import platform
+import subprocess
+import sys
+
+
+def percentiles(values, quantiles=(50, 95, 99)):
+    """
+    Nearest-rank percentiles of a list of numbers, as {"p50": ..., ...}.
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return {f"p{q}": None for q in quantiles}
+    return {f"p{q}": ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))] for q in quantiles}
+
+
+@contextlib.contextmanager
+def quiet():
+    """
+    Silences the tools' progress printing while a benchmark runs.
+    """
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def environment():
+    """
+    Identifies the code and machine a result was measured on.
+    """
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=root, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def rss_bytes():
+    """
+    The current resident set size of this process (Linux), or None.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
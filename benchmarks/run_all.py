@@ -0,0 +1,120 @@
+"""
+Runs the benchmark suite and saves the results as JSON, optionally
+comparing them with an earlier run to flag regressions.
+
+    python benchmarks/run_all.py [--quick] [--only coordinator memory] [--output results.json] [--compare baseline.json]
+
+Without --output, results go to benchmarks/results/<commit>-<timestamp>.json.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks import bench_coordinator, bench_fleet, bench_memory, bench_routing, bench_scaling, bench_sim, bench_startup, bench_tracing, bench_traffic
+from benchmarks.harness import environment
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# name -> (full run, quick run)
+SUITES = {
+    "coordinator": (lambda: bench_coordinator.run(count=400), lambda: bench_coordinator.run(count=80)),
+    "memory": (lambda: bench_memory.run(entries=1_000_000), lambda: bench_memory.run(entries=100_000)),
+    "scaling": (lambda: bench_scaling.run(), lambda: bench_scaling.run(merchants=(1000, 10_000), drivers=(100, 300))),
+    "routing": (lambda: bench_routing.run(), lambda: bench_routing.run(size=100, queries=20)),
+    "tracing": (lambda: bench_tracing.run(), lambda: bench_tracing.run(calls=2000)),
+    "startup": (lambda: bench_startup.run(), lambda: bench_startup.run(repeats=1)),
+    "fleet": (lambda: bench_fleet.run(), lambda: bench_fleet.run(drivers=5000, orders=20_000)),
+    "traffic": (lambda: bench_traffic.run(), lambda: bench_traffic.run(trips=100_000, queries=20_000)),
+    "sim": (lambda: bench_sim.run(), lambda: bench_sim.run(drivers=1000)),
+}
+# Metric-name endings, and whether a larger value is better.
+LOWER_IS_BETTER = ("_ms", "_us", "_s", "_bytes", "_per_entry")
+HIGHER_IS_BETTER = ("_per_s",)
+
+
+def flatten(value, prefix=""):
+    """
+    Flattens nested results into {"suite.section.metric": number}.
+    Rows of a curve are keyed by their first column (e.g. "drivers=1000").
+    """
+    flat = {}
+    if isinstance(value, dict):
+        for key, item in value.items():
+            flat.update(flatten(item, f"{prefix}{key}."))
+    elif isinstance(value, list):
+        for i, item in enumerate(value):
+            label = f"{next(iter(item))}={next(iter(item.values()))}" if isinstance(item, dict) and item else str(i)
+            flat.update(flatten(item, f"{prefix}{label}."))
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        flat[prefix.rstrip(".")] = value
+    return flat
+
+
+def compare(baseline, current, threshold_pct=10.0):
+    """
+    Lists the metrics that got worse by more than `threshold_pct`, as
+    (metric, baseline, current, change_pct) tuples.
+    """
+    old, new = flatten(baseline["results"]), flatten(current["results"])
+    regressions = []
+    for metric, value in new.items():
+        before = old.get(metric)
+        if not before or before <= 0:
+            continue
+        change = (value / before - 1) * 100
+        if metric.endswith(HIGHER_IS_BETTER):
+            worse = -change > threshold_pct
+        elif metric.endswith(LOWER_IS_BETTER):
+            worse = change > threshold_pct
+        else:
+            continue
+        if worse:
+            regressions.append((metric, before, value, round(change, 1)))
+    return regressions
+
+
+def run(suites=None, quick=False):
+    report = {**environment(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "quick": quick, "results": {}}
+    for name in suites or SUITES:
+        print(f"Running {name}...", file=sys.stderr)
+        start = time.perf_counter()
+        report["results"][name] = SUITES[name][1 if quick else 0]()
+        print(f"  done in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="Smaller sizes, for a fast smoke run.")
+    parser.add_argument("--only", nargs="+", choices=list(SUITES), help="Run only these suites.")
+    parser.add_argument("--output", metavar="FILE", help="Where to write the results JSON.")
+    parser.add_argument("--compare", metavar="FILE", help="A previous results JSON to check for regressions.")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Regression threshold in percent (default: 10).")
+    args = parser.parse_args()
+
+    report = run(args.only, args.quick)
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{report['commit'] or 'unknown'}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.threshold)
+        print(f"Compared with {baseline.get('commit')}: {len(regressions)} regression(s) above {args.threshold}%.")
+        for metric, before, after, change in regressions:
+            print(f"  {metric}: {before} -> {after} ({change:+}%)")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
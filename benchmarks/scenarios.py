@@ -0,0 +1,65 @@
+"""
+Generates synthetic disruption scenarios for each disruption family, with
+random ids and numbers, as JSONL suitable for `src/main.py --batch`.
+
+    python benchmarks/scenarios.py [--count 100] [--families dispute traffic] [--seed 42] > scenarios.jsonl
+"""
+import argparse
+import json
+import random
+import string
+
+FAMILIES = ("dispute", "recipient_unavailable", "traffic", "merchant")
+
+
+def _id(rng, prefix):
+    return f"{prefix}-{rng.randrange(100, 100_000)}"
+
+
+def dispute(rng):
+    problem = rng.choice(["Damaged packaging dispute", "Spilled drink dispute", "Customer disputes a crushed package"])
+    return (f"{problem} on {_id(rng, 'order')} between {_id(rng, 'customer')} and {_id(rng, 'driver')} "
+            f"({_id(rng, 'merchant')}), order value ${rng.uniform(5, 80):.2f}.")
+
+
+def recipient_unavailable(rng):
+    situation = rng.choice(["is not home", "is unavailable", "is not answering the door"])
+    return f"Recipient {_id(rng, 'recip')} {situation}; {_id(rng, 'driver')} is waiting at the address."
+
+
+def traffic(rng):
+    flight = "".join(rng.choices(string.ascii_uppercase, k=2)) + str(rng.randrange(10, 1000))
+    cause = rng.choice(["Major traffic obstruction", "Accident and road closure", "Sudden traffic jam"])
+    return (f"{cause}: {_id(rng, 'driver')} is taking {_id(rng, 'pass')} to the airport for flight {flight}, "
+            f"ETA {rng.randrange(15, 60)} min.")
+
+
+def merchant(rng):
+    return f"{_id(rng, 'merchant')} is overloaded, {rng.randrange(20, 60)} min wait for {_id(rng, 'customer')}."
+
+
+GENERATORS = {"dispute": dispute, "recipient_unavailable": recipient_unavailable, "traffic": traffic, "merchant": merchant}
+
+
+def generate(count, families=FAMILIES, seed=42):
+    """
+    Yields (family, scenario) pairs, cycling through `families` in order.
+    """
+    rng = random.Random(seed)
+    for i in range(count):
+        family = families[i % len(families)]
+        yield family, GENERATORS[family](rng)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--families", nargs="+", choices=FAMILIES, default=list(FAMILIES))
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    for family, scenario in generate(args.count, args.families, args.seed):
+        print(json.dumps({"scenario": scenario, "family": family}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import json
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+def _run_one(handler, index, scenario):
+    """
+    Resolves one scenario and wraps the outcome in a result record.
+    Failures are captured in the record so one bad item does not stop the batch.
+    """
+    started_at = time.time()
+    start = time.perf_counter()
+    record = {"index": index, "input": scenario, "output": None, "error": None}
+    try:
+        result = handler(scenario)
+        record["output"] = result.get("output") if isinstance(result, dict) else result
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    record["started_at"] = started_at
+    record["duration_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return record
+
+
+def process_batch(handler, scenarios, max_workers=8, ordered=True, max_pending=None):
+    """
+    Streams scenarios through a pool of `max_workers` threads and yields one
+    result record per scenario.
+
+    At most `max_pending` scenarios (default: twice the worker count) are in
+    flight at once; the input iterable is only advanced when a slot frees up,
+    so large or unbounded inputs are never read ahead of the workers.
+    With `ordered=True` records are yielded in input order, otherwise as soon
+    as each one completes.
+    """
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1.")
+    max_pending = max_pending or max_workers * 2
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="batch") as pool:
+        for index, scenario in enumerate(scenarios):
+            pending.append(pool.submit(_run_one, handler, index, scenario))
+            while len(pending) >= max_pending:
+                yield from _drain(pending, ordered)
+        while pending:
+            yield from _drain(pending, ordered)
+
+
+def _drain(pending, ordered):
+    """
+    Waits for at least one in-flight item and yields what can be emitted.
+    """
+    if ordered:
+        yield pending.popleft().result()
+        while pending and pending[0].done():
+            yield pending.popleft().result()
+        return
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in list(pending):
+        if future in done:
+            pending.remove(future)
+            yield future.result()
+
+
+def read_scenarios(lines):
+    """
+    Parses JSONL input into scenario strings.
+    Each non-blank line is either a JSON string or an object with a "scenario" key.
+    """
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        item = json.loads(line)
+        if isinstance(item, dict):
+            item = item.get("scenario")
+        if not isinstance(item, str):
+            raise ValueError(f"Line {line_number}: expected a scenario string or an object with a 'scenario' key.")
+        yield item
@@ -1,25 +1,191 @@
+import asyncio
 import os
-from langchain_openai import ChatOpenAI
-from langchain.agents import AgentExecutor, create_react_agent
-from langchain_core.prompts import PromptTemplate
-from langchain.tools import Tool
+import threading
+import time
 
 # Import the tool functions from our logistics module
 from src.tools.logistics import (
     get_merchant_status, get_driver_location, check_traffic, notify_customer,
     re_route_driver, get_nearby_merchants, initiate_mediation_flow,
-    collect_evidence, analyze_evidence, issue_instant_refund, exonerate_driver,
-    log_merchant_packaging_feedback, notify_resolution, contact_recipient_via_chat,
-    suggest_safe_drop_off, find_nearby_locker, calculate_alternative_route,
-    notify_passenger_and_driver, check_flight_status
+    collect_evidence, analyze_evidence, mediate_dispute, issue_instant_refund, exonerate_driver,
+    log_merchant_packaging_feedback, notify_resolution,
+    contact_recipient_via_chat, suggest_safe_drop_off, find_nearby_locker,
+    calculate_alternative_route, notify_passenger_and_driver,
+    check_flight_status,
+    get_merchant_status_async, get_driver_location_async, check_traffic_async,
+    notify_customer_async, re_route_driver_async, get_nearby_merchants_async,
+    initiate_mediation_flow_async, collect_evidence_async,
+    analyze_evidence_async, mediate_dispute_async, issue_instant_refund_async, exonerate_driver_async,
+    log_merchant_packaging_feedback_async, notify_resolution_async,
+    contact_recipient_via_chat_async, suggest_safe_drop_off_async,
+    find_nearby_locker_async, calculate_alternative_route_async,
+    notify_passenger_and_driver_async, check_flight_status_async,
 )
+from src.tools.replay import record_disruption
+from src.tools.resilience import resilient
+from src.tools.runtime import run_sync
+from src.agent.batch import process_batch
+from src.agent.fastpath import FastPath
+from src.agent.plan_cache import PlanCache
+from src.telemetry.tracing import annotate, traced
+
+# The agent's tools as (name, func, coroutine, description). LangChain Tool
+# objects are built from these once, on first real use, by shared_tools(),
+# with each tool wrapped in its resilience policy (src/tools/resilience.py).
+TOOL_SPECS = [
+    ("Get Merchant Status", get_merchant_status, get_merchant_status_async, "Gets the status of a merchant (e.g., 'open', 'busy'). Input: merchant_id."),
+    ("Get Driver Location", get_driver_location, get_driver_location_async, "Gets the current GPS location of a driver. Input: driver_id."),
+    ("Check Traffic", check_traffic, check_traffic_async, "Checks traffic between two points. Input: {'start_point': str, 'end_point': str}."),
+    ("Notify Customer", notify_customer, notify_customer_async, "Sends a notification to a customer. Input: {'customer_id': str, 'message': str}."),
+    ("Re-route Driver", re_route_driver, re_route_driver_async, "Re-routes a driver to a new destination. Input: {'driver_id': str, 'new_destination': str, 'reason': str}."),
+    ("Get Nearby Merchants", get_nearby_merchants, get_nearby_merchants_async, "Finds nearby merchants. Input: {'latitude': float, 'longitude': float, 'category': str}."),
+    ("Initiate Mediation Flow", initiate_mediation_flow, initiate_mediation_flow_async, "Starts a mediation process for a dispute. Input: {'order_id': str, 'customer_id': str, 'driver_id': str}."),
+    ("Collect Evidence", collect_evidence, collect_evidence_async, "Collects evidence from parties in a dispute. Input: {'mediation_id': str, 'parties': list[str]}."),
+    ("Analyze Evidence", analyze_evidence, analyze_evidence_async, "Analyzes collected evidence to determine fault. Input: evidence dictionary."),
+    ("Mediate Dispute", mediate_dispute, mediate_dispute_async, "Collects evidence from all parties concurrently and analyzes it as it arrives, returning the fault as soon as it is clear. Input: {'mediation_id': str, 'parties': list[str]}."),
+    ("Issue Instant Refund", issue_instant_refund, issue_instant_refund_async, "Issues a refund to a customer. Input: {'customer_id': str, 'order_id': str, 'amount': float}."),
+    ("Exonerate Driver", exonerate_driver, exonerate_driver_async, "Clears a driver of fault. Input: {'driver_id': str, 'order_id': str}."),
+    ("Log Merchant Packaging Feedback", log_merchant_packaging_feedback, log_merchant_packaging_feedback_async, "Logs feedback about merchant packaging. Input: {'merchant_id': str, 'order_id': str, 'feedback_details': str}."),
+    ("Notify Resolution", notify_resolution, notify_resolution_async, "Notifies all parties of a dispute resolution. Input: {'parties': list[str], 'order_id': str, 'resolution_summary': str}."),
+    ("Contact Recipient via Chat", contact_recipient_via_chat, contact_recipient_via_chat_async, "Contacts a recipient via chat to get instructions. Input: {'recipient_id': str, 'initial_message': str}."),
+    ("Suggest Safe Drop-off", suggest_safe_drop_off, suggest_safe_drop_off_async, "Suggests and confirms a safe drop-off location with a recipient. Input: {'recipient_id': str, 'suggestion': str}."),
+    ("Find Nearby Locker", find_nearby_locker, find_nearby_locker_async, "Finds a secure parcel locker near a location. Input: {'latitude': float, 'longitude': float}."),
+    ("Calculate Alternative Route", calculate_alternative_route, calculate_alternative_route_async, "Calculates an alternative route to avoid an obstruction. Input: {'current_route': dict, 'obstruction': str}."),
+    ("Notify Passenger and Driver", notify_passenger_and_driver, notify_passenger_and_driver_async, "Sends a synchronized notification to a passenger and a driver. Input: {'passenger_id': str, 'driver_id': str, 'message': str}."),
+    ("Check Flight Status", check_flight_status, check_flight_status_async, "Checks the status of a flight. Input: flight_number."),
+]
+
+# The agent's protocol for each disruption type (see fastpath.classify());
+# the ReAct prompt includes all of them.
+PROTOCOLS = {
+    "dispute": """**Dispute Resolution:**
+When handling a dispute between a customer and a driver, your primary goal is to be a fair and impartial mediator. Follow these steps:
+1. Initiate a mediation flow to open a communication channel.
+2. Collect evidence from all parties involved.
+3. Analyze the evidence to determine the most likely cause of the issue. ('Mediate Dispute' does steps 2 and 3 together and is faster.)
+4. Based on your analysis, form a resolution plan.
+5. Clearly communicate the final resolution to all parties.""",
+    "recipient_unavailable": """**Unavailable Recipient:**
+When a recipient is unavailable at the delivery location, follow this protocol:
+1. First, try to contact the recipient via chat to get instructions.
+2. Based on their response, evaluate the options. If they give permission for a safe drop-off, use the 'Suggest Safe Drop-off' tool to confirm.
+3. If no safe drop-off is possible, use the 'Find Nearby Locker' tool to see if a secure parcel locker is a viable alternative.
+4. Communicate the final plan clearly.""",
+    "traffic": """**Traffic Obstruction:**
+When a major traffic obstruction is detected on a passenger's route, especially for an urgent trip like to an airport, your response must be swift and informative.
+1. Immediately check for alternative routes to understand the potential delay.
+2. If the passenger is heading to the airport, it may be useful to check their flight status to see if it is also delayed. This provides helpful context.
+3. Proactively notify both the passenger and the driver of the obstruction, the new route, and the updated ETA. Reassure them that you are handling the situation.""",
+}
+
+PROMPT_INTRODUCTION = """
+You are an intelligent logistics coordinator for a last-mile delivery service.
+Your goal is to resolve disruptions efficiently and communicate clearly.
+
+### Your Protocols ###
+
+"""
+
+PROMPT_TEMPLATE = PROMPT_INTRODUCTION + "\n\n".join(PROTOCOLS.values()) + """
+
+You have access to the following tools:
+{tools}
+
+To use a tool, you must use the following format:
+```
+Thought: Do I need to use a tool? Yes
+Action: The name of the tool to use, one of [{tool_names}].
+Action Input: The input to the tool, as a dictionary if required.
+Observation: The result of the tool.
+```
+
+When you have a final answer or a complete plan, you must use the format:
+```
+Thought: Do I need to use a tool? No
+Final Answer: The final plan or resolution statement.
+```
+
+Begin!
+
+Disruption: {input}
+Thought: {agent_scratchpad}
+"""
+
+_specs = None
+_tools = None
+_tools_lock = threading.Lock()
+
+
+def resilient_specs():
+    """
+    Returns TOOL_SPECS with every tool's func and coroutine wrapped in its
+    deadline, retry and circuit-breaker policy, so that a slow or failing
+    dependency cannot stall the agent loop.
+    """
+    global _specs
+    with _tools_lock:
+        if _specs is None:
+            _specs = []
+            for name, func, coroutine, description in TOOL_SPECS:
+                wrapper, blocking = resilient(coroutine)
+                _specs.append((name, blocking, wrapper, description))
+        return _specs
+
+
+def shared_tools():
+    """
+    Returns the LangChain Tool objects for resilient_specs(), building them
+    on the first call. The list is shared by every Coordinator; do not modify it.
+    """
+    global _tools
+    specs = resilient_specs()
+    with _tools_lock:
+        if _tools is None:
+            from langchain.tools import Tool
+
+            _tools = [
+                Tool(name=name, func=func, coroutine=coroutine, description=description)
+                for name, func, coroutine, description in specs
+            ]
+        return _tools
+
 
 class Coordinator:
     """
     The Coordinator agent that uses LangChain to resolve disruptions.
+
+    Known disruption types are first offered to a deterministic fast path
+    (see src/agent/fastpath.py), which runs their tool plans without the LLM.
+    It is on by default with a real LLM; pass `use_fast_path` to override.
+    Plans the LLM produces are kept in a PlanCache (src/agent/plan_cache.py)
+    and replayed for scenarios that differ only in ids and numbers; pass
+    `plan_cache=False` to turn that off, or a configured PlanCache.
+    With `agent_mode="tool_calling"` the LLM uses native tool calling
+    (src/agent/tool_calling.py) instead of the ReAct text loop: several
+    concurrent tool calls per turn and a prompt holding only the relevant
+    protocol.
+    With `specialists` (True, or a configured SpecialistPool from
+    src/agent/specialist.py) the domain specialists are consulted in
+    parallel before the LLM, and their findings are added to its input.
     """
-    def __init__(self, use_mock_llm=False):
+    AGENT_MODES = ("react", "tool_calling")
+
+    def __init__(self, use_mock_llm=False, use_fast_path=None, plan_cache=None, agent_mode="react", specialists=None):
+        if agent_mode not in self.AGENT_MODES:
+            raise ValueError(f"agent_mode must be one of {', '.join(self.AGENT_MODES)}.")
         self.use_mock_llm = use_mock_llm
+        self.agent_mode = agent_mode
+        if use_fast_path is None:
+            use_fast_path = not use_mock_llm
+        self.fast_path = FastPath() if use_fast_path else None
+        if plan_cache is None:
+            plan_cache = PlanCache() if not use_mock_llm else False
+        self.plan_cache = plan_cache or None
+        if specialists is True:
+            from src.agent.specialist import SpecialistPool
+
+            specialists = SpecialistPool()
+        self.specialists = specialists or None
         if self.use_mock_llm:
             print("Coordinator agent initialized in MOCK mode.")
             return
@@ -27,103 +193,81 @@ class Coordinator:
         # 1. Initialize the LLM
         if not os.environ.get("OPENAI_API_KEY"):
             raise ValueError("OPENAI_API_KEY environment variable not set.")
+        # The LLM stack is imported here, so mock runs never load it.
+        from langchain.agents import AgentExecutor, create_react_agent
+        from langchain_core.prompts import PromptTemplate
+        from langchain_openai import ChatOpenAI
+
+        from src.telemetry.callbacks import TracingCallbackHandler
+
         self.llm = ChatOpenAI(temperature=0, model_name="gpt-4")
 
-        # 2. Define the tools
-        self.tools = [
-            Tool(name="Get Merchant Status", func=get_merchant_status, description="Gets the status of a merchant (e.g., 'open', 'busy'). Input: merchant_id."),
-            Tool(name="Get Driver Location", func=get_driver_location, description="Gets the current GPS location of a driver. Input: driver_id."),
-            Tool(name="Check Traffic", func=check_traffic, description="Checks traffic between two points. Input: {'start_point': str, 'end_point': str}."),
-            Tool(name="Notify Customer", func=notify_customer, description="Sends a notification to a customer. Input: {'customer_id': str, 'message': str}."),
-            Tool(name="Re-route Driver", func=re_route_driver, description="Re-routes a driver to a new destination. Input: {'driver_id': str, 'new_destination': str, 'reason': str}."),
-            Tool(name="Get Nearby Merchants", func=get_nearby_merchants, description="Finds nearby merchants. Input: {'latitude': float, 'longitude': float, 'category': str}."),
-            Tool(name="Initiate Mediation Flow", func=initiate_mediation_flow, description="Starts a mediation process for a dispute. Input: {'order_id': str, 'customer_id': str, 'driver_id': str}."),
-            Tool(name="Collect Evidence", func=collect_evidence, description="Collects evidence from parties in a dispute. Input: {'mediation_id': str, 'parties': list[str]}."),
-            Tool(name="Analyze Evidence", func=analyze_evidence, description="Analyzes collected evidence to determine fault. Input: evidence dictionary."),
-            Tool(name="Issue Instant Refund", func=issue_instant_refund, description="Issues a refund to a customer. Input: {'customer_id': str, 'order_id': str, 'amount': float}."),
-            Tool(name="Exonerate Driver", func=exonerate_driver, description="Clears a driver of fault. Input: {'driver_id': str, 'order_id': str}."),
-            Tool(name="Log Merchant Packaging Feedback", func=log_merchant_packaging_feedback, description="Logs feedback about merchant packaging. Input: {'merchant_id': str, 'order_id': str, 'feedback_details': str}."),
-            Tool(name="Notify Resolution", func=notify_resolution, description="Notifies all parties of a dispute resolution. Input: {'parties': list[str], 'order_id': str, 'resolution_summary': str}."),
-            Tool(name="Contact Recipient via Chat", func=contact_recipient_via_chat, description="Contacts a recipient via chat to get instructions. Input: {'recipient_id': str, 'initial_message': str}."),
-            Tool(name="Suggest Safe Drop-off", func=suggest_safe_drop_off, description="Suggests and confirms a safe drop-off location with a recipient. Input: {'recipient_id': str, 'suggestion': str}."),
-            Tool(name="Find Nearby Locker", func=find_nearby_locker, description="Finds a secure parcel locker near a location. Input: {'latitude': float, 'longitude': float}."),
-            Tool(name="Calculate Alternative Route", func=calculate_alternative_route, description="Calculates an alternative route to avoid an obstruction. Input: {'current_route': dict, 'obstruction': str}."),
-            Tool(name="Notify Passenger and Driver", func=notify_passenger_and_driver, description="Sends a synchronized notification to a passenger and a driver. Input: {'passenger_id': str, 'driver_id': str, 'message': str}."),
-            Tool(name="Check Flight Status", func=check_flight_status, description="Checks the status of a flight. Input: flight_number."),
-        ]
-
-        # 3. Create the prompt template
-        template = """
-        You are an intelligent logistics coordinator for a last-mile delivery service.
-        Your goal is to resolve disruptions efficiently and communicate clearly.
-
-        ### Your Protocols ###
-
-        **Dispute Resolution:**
-        When handling a dispute between a customer and a driver, your primary goal is to be a fair and impartial mediator. Follow these steps:
-        1. Initiate a mediation flow to open a communication channel.
-        2. Collect evidence from all parties involved.
-        3. Analyze the evidence to determine the most likely cause of the issue.
-        4. Based on your analysis, form a resolution plan.
-        5. Clearly communicate the final resolution to all parties.
-
-        **Unavailable Recipient:**
-        When a recipient is unavailable at the delivery location, follow this protocol:
-        1. First, try to contact the recipient via chat to get instructions.
-        2. Based on their response, evaluate the options. If they give permission for a safe drop-off, use the 'Suggest Safe Drop-off' tool to confirm.
-        3. If no safe drop-off is possible, use the 'Find Nearby Locker' tool to see if a secure parcel locker is a viable alternative.
-        4. Communicate the final plan clearly.
-
-        **Traffic Obstruction:**
-        When a major traffic obstruction is detected on a passenger's route, especially for an urgent trip like to an airport, your response must be swift and informative.
-        1. Immediately check for alternative routes to understand the potential delay.
-        2. If the passenger is heading to the airport, it may be useful to check their flight status to see if it is also delayed. This provides helpful context.
-        3. Proactively notify both the passenger and the driver of the obstruction, the new route, and the updated ETA. Reassure them that you are handling the situation.
-
-        You have access to the following tools:
-        {tools}
-
-        To use a tool, you must use the following format:
-        ```
-        Thought: Do I need to use a tool? Yes
-        Action: The name of the tool to use.
-        Action Input: The input to the tool, as a dictionary if required.
-        Observation: The result of the tool.
-        ```
-
-        When you have a final answer or a complete plan, you must use the format:
-        ```
-        Thought: Do I need to use a tool? No
-        Final Answer: The final plan or resolution statement.
-        ```
-
-        Begin!
-
-        Disruption: {input}
-        Thought: {agent_scratchpad}
-        """
-        self.prompt = PromptTemplate.from_template(template)
+        # 2. The tools are shared by every Coordinator (see shared_tools()).
+        self.tools = shared_tools()
 
-        # 4. Create the agent
-        agent = create_react_agent(llm=self.llm, tools=self.tools, prompt=self.prompt)
+        if agent_mode == "tool_calling":
+            from src.agent.tool_calling import ToolCallingAgent
 
-        # 5. Create the Agent Executor
-        self.agent_executor = AgentExecutor(
-            agent=agent,
-            tools=self.tools,
-            verbose=True,
-            handle_parsing_errors=True,
-        )
+            self.agent_executor = ToolCallingAgent(self.llm, resilient_specs(), PROTOCOLS, PROMPT_INTRODUCTION)
+        else:
+            # 3. Create the prompt template
+            self.prompt = PromptTemplate.from_template(PROMPT_TEMPLATE)
+
+            # 4. Create the agent
+            agent = create_react_agent(llm=self.llm, tools=self.tools, prompt=self.prompt)
+
+            # 5. Create the Agent Executor
+            self.agent_executor = AgentExecutor(
+                agent=agent,
+                tools=self.tools,
+                verbose=True,
+                handle_parsing_errors=True,
+                return_intermediate_steps=True,
+            )
+        self._tools_by_name = {tool.name: tool for tool in self.tools}
+        # Records LLM calls and parse retries as spans when tracing is enabled.
+        self._callbacks = [TracingCallbackHandler()]
 
         print("Coordinator agent initialized with LangChain.")
 
     def handle_disruption(self, disruption_scenario: str):
         """
         Handles a disruption event using the LangChain agent.
+        Blocking wrapper around handle_disruption_async().
+        """
+        return run_sync(self.handle_disruption_async(disruption_scenario))
+
+    def handle_many(self, scenarios, max_workers=8, ordered=True):
+        """
+        Resolves a stream of disruption scenarios with this (already built) agent.
+        Yields one result record per scenario with its index, output or error,
+        and timing; see process_batch() for ordering and backpressure.
+        """
+        return process_batch(self.handle_disruption, scenarios, max_workers=max_workers, ordered=ordered)
+
+    @traced("handle_disruption", kind="disruption")
+    async def handle_disruption_async(self, disruption_scenario: str):
         """
+        Handles a disruption event, running independent tool calls concurrently
+        so the wall-clock time follows the critical path of the plan.
+        While tool calls are being recorded (src/tools/replay.py), the
+        disruption and its output are recorded too.
+        """
+        response = await self._resolve(disruption_scenario)
+        record_disruption(disruption_scenario, response)
+        return response
+
+    async def _resolve(self, disruption_scenario):
         print(f"Coordinator handling disruption: {disruption_scenario}")
 
+        if self.fast_path is not None:
+            response = await self.fast_path.resolve(disruption_scenario)
+            if response is not None:
+                annotate(path="fast_path", disruption_type=response["fast_path"])
+                return response
+
         if self.use_mock_llm:
+            annotate(path="mock")
             print("\n> Entering new AgentExecutor chain...")
             # Simple routing for different mock scenarios based on keywords
             if "dispute" in disruption_scenario.lower() or "damaged" in disruption_scenario.lower():
@@ -141,7 +285,7 @@ class Coordinator:
                 print("Action: Contact Recipient via Chat")
                 action_input = {'recipient_id': 'recip-789', 'initial_message': "Our driver has arrived with your package, but you don't seem to be available. What should we do?"}
                 print(f"Action Input: {action_input}")
-                observation = contact_recipient_via_chat(**action_input)
+                observation = await contact_recipient_via_chat_async(**action_input)
                 print(f"Observation: {observation}")
 
                 # Step 2: Evaluate Response and Suggest Solution
@@ -150,7 +294,7 @@ class Coordinator:
                 print("Action: Suggest Safe Drop-off")
                 action_input = {'recipient_id': 'recip-789', 'suggestion': "leave the package with your neighbour at Unit 102"}
                 print(f"Action Input: {action_input}")
-                observation = suggest_safe_drop_off(**action_input)
+                observation = await suggest_safe_drop_off_async(**action_input)
                 print(f"Observation: {observation}")
 
                 # Step 3: Final Plan
@@ -164,31 +308,32 @@ class Coordinator:
                 # Mock logic for "Sudden Major Traffic Obstruction"
                 print("Thought: A major traffic obstruction has been reported for an urgent trip. I must act quickly.")
 
-                # Step 1: Calculate Alternative Route
+                # Steps 1 and 2 do not depend on each other, so they run together:
+                # the alternative route and, since the passenger is going to the
+                # airport, their flight status for context.
                 print("Action: Calculate Alternative Route")
-                action_input = {'current_route': {'start': 'Location A', 'end': 'Airport', 'original_eta': 30}, 'obstruction': 'major accident'}
-                print(f"Action Input: {action_input}")
-                observation = calculate_alternative_route(**action_input)
-                print(f"Observation: {observation}")
-                new_route_summary = observation['new_route']['summary']
-                new_eta = observation['new_route']['updated_eta_minutes']
-
-                # Step 2: Check Flight Status
-                print("Thought: The new route adds time. Since the passenger is going to the airport, I should check their flight status for context.")
+                route_input = {'current_route': {'start': 'Location A', 'end': 'Airport', 'original_eta': 30}, 'obstruction': 'major accident'}
+                print(f"Action Input: {route_input}")
                 print("Action: Check Flight Status")
-                action_input = "SQ123"
-                print(f"Action Input: {action_input}")
-                observation = check_flight_status(action_input)
-                print(f"Observation: {observation}")
-                flight_status = observation['flight_status']
+                flight_number = "SQ123"
+                print(f"Action Input: {flight_number}")
+                route_observation, flight_observation = await asyncio.gather(
+                    calculate_alternative_route_async(**route_input),
+                    check_flight_status_async(flight_number),
+                )
+                print(f"Observation: {route_observation}")
+                print(f"Observation: {flight_observation}")
+                new_route_summary = route_observation['new_route']['summary']
+                new_eta = route_observation['new_route']['updated_eta_minutes']
+                flight_status = flight_observation['flight_status']
 
                 # Step 3: Notify Parties
-                print("Thought: The flight is also delayed, which is helpful context. I will now inform both parties of the new plan.")
+                print("Thought: I have the new route and the flight status. I will now inform both parties of the new plan.")
                 print("Action: Notify Passenger and Driver")
-                message = f"Major accident detected on your route. We've found an alternative: {new_route_summary}. New ETA is {new_eta} minutes. Good news: your flight {action_input} is also {flight_status.lower()}, so you should still have plenty of time."
+                message = f"Major accident detected on your route. We've found an alternative: {new_route_summary}. New ETA is {new_eta} minutes. Good news: your flight {flight_number} is also {flight_status.lower()}, so you should still have plenty of time."
                 action_input = {'passenger_id': 'pass-123', 'driver_id': 'driver-456', 'message': message}
                 print(f"Action Input: {action_input}")
-                notify_passenger_and_driver(**action_input)
+                await notify_passenger_and_driver_async(**action_input)
 
                 summary = f"Successfully re-routed trip to avoid traffic. New ETA is {new_eta} minutes. Both passenger and driver have been notified."
                 print(f"Thought: The situation is handled. The driver has a new route and the passenger is informed.")
@@ -200,7 +345,7 @@ class Coordinator:
                 # Fallback mock logic for "Overloaded Restaurant"
                 print("Thought: This seems to be a merchant-related issue. I will check the merchant's status.")
                 print("Action: Get Merchant Status...")
-                observation = get_merchant_status("merchant-456")
+                observation = await get_merchant_status_async("merchant-456")
                 print(f"Observation: {observation}")
                 print("Final Answer: The original merchant is busy. I have notified the customer about the delay and have suggested alternative nearby restaurants.")
                 return {
@@ -208,5 +353,51 @@ class Coordinator:
                     "output": "The original merchant is busy. I have notified the customer about the delay and have suggested alternative nearby restaurants."
                 }
 
-        response = self.agent_executor.invoke({"input": disruption_scenario})
+        if self.plan_cache is not None:
+            response = await self.plan_cache.resolve(disruption_scenario, self._run_tool, self._is_write)
+            if response is not None:
+                annotate(path="plan_cache", similarity=response["plan_cache"])
+                return response
+
+        annotate(path="llm")
+        start = time.perf_counter()
+        agent_input, consultation = disruption_scenario, None
+        if self.specialists is not None:
+            consultation = await self.specialists.consult(disruption_scenario)
+            agent_input = f"{disruption_scenario}\n\nSpecialist findings:\n{consultation['summary']}"
+        response = await self.agent_executor.ainvoke({"input": agent_input}, config={"callbacks": self._callbacks})
+        if consultation is not None:
+            response["specialist_findings"] = consultation
+        if self.fast_path is not None:
+            self.fast_path.record_llm_resolution(time.perf_counter() - start)
+        if self.plan_cache is not None:
+            steps = [
+                (action.tool, action.tool_input, observation)
+                for action, observation in response.get("intermediate_steps", [])
+                if action.tool in self._tools_by_name
+            ]
+            self.plan_cache.store(disruption_scenario, steps, response.get("output"))
         return response
+
+    async def _run_tool(self, tool_name, tool_input):
+        return await self._tools_by_name[tool_name].ainvoke(tool_input)
+
+    def _is_write(self, tool_name):
+        """
+        Whether a tool may have side effects: anything not marked idempotent by its resilience policy.
+        """
+        tool = getattr(getattr(self._tools_by_name.get(tool_name), "coroutine", None), "tool", None)
+        return tool is None or not tool.policy.idempotent
+
+    def agent_stats(self):
+        """
+        Reports turns and tokens per LLM resolution in tool-calling mode, or None otherwise.
+        """
+        stats = getattr(getattr(self, "agent_executor", None), "stats", None)
+        return stats() if stats is not None else None
+
+    def fast_path_stats(self):
+        """
+        Reports the fast path's hit rate and estimated latency savings, or None when it is off.
+        """
+        return self.fast_path.stats() if self.fast_path is not None else None
@@ -0,0 +1,316 @@
+import asyncio
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+
+from src.tools.logistics import (
+    calculate_alternative_route_async, check_flight_status_async,
+    check_traffic_async, contact_recipient_via_chat_async,
+    exonerate_driver_async, find_nearby_locker_async, get_driver_location_async,
+    initiate_mediation_flow_async, issue_instant_refund_async,
+    log_merchant_packaging_feedback_async, mediate_dispute_async, notify_passenger_and_driver_async,
+    notify_resolution_async, suggest_safe_drop_off_async,
+)
+
+# Disruption types, with weighted keyword patterns. A type's score is the sum
+# of the weights of its matching patterns, capped at 1.
+DISRUPTION_PATTERNS = {
+    "dispute": [
+        (r"\bdisput\w*", 0.8), (r"\bdamaged?\b", 0.6), (r"\bspill\w*", 0.6),
+        (r"\bbroken\b|\bleak\w*|\bcrushed\b", 0.5), (r"\bpackag\w*", 0.2), (r"\bcomplain\w*", 0.2),
+    ],
+    "recipient_unavailable": [
+        (r"\bunavailable\b", 0.8), (r"\bnot (at )?home\b", 0.8), (r"\bno one (is )?(home|there)\b", 0.8),
+        (r"\bnot answering\b|\bno answer\b", 0.5), (r"\brecipient\b", 0.3), (r"\bdoor\b|\baddress\b", 0.1),
+    ],
+    "traffic": [
+        (r"\btraffic\b", 0.6), (r"\bobstruct\w*", 0.6), (r"\baccident\b|\broad ?block\w*|\bclosure\b|\bjam\b", 0.5),
+        (r"\bairport\b|\bflight\b", 0.3), (r"\broute\b", 0.1),
+    ],
+    "merchant": [
+        (r"\bmerchant\b(?!-)|\brestaurant\b", 0.4), (r"\boverload\w*|\bbusy\b|\bbacklog\w*", 0.5),
+        (r"\bclosed\b", 0.4), (r"\b(long|taking a long) (time|wait)\b|\bwait\w*\b", 0.3),
+    ],
+}
+
+ENTITY_PATTERNS = {
+    "order_id": r"\border-[\w-]+",
+    "driver_id": r"\bdriver-[\w-]+",
+    "customer_id": r"\bcustomer-[\w-]+",
+    "merchant_id": r"\bmerchant-[\w-]+",
+    "recipient_id": r"\brecip(?:ient)?-[\w-]+",
+    "passenger_id": r"\b(?:pass|passenger)-[\w-]+",
+    # Not an amount in ringgit such as RM50.
+    "flight_number": r"\b(?!RM\d)[A-Z]{2}\d{2,4}\b",
+}
+_AMOUNT = re.compile(r"(?:\$|RM|USD\s?)(\d+(?:\.\d{1,2})?)")
+_MINUTES = re.compile(r"\b(\d{1,3})\s*(?:min|mins|minutes)\b", re.I)
+_COORDINATES = re.compile(r"\(?\s*(-?\d{1,2}\.\d+)\s*,\s*(-?\d{1,3}\.\d+)\s*\)?")
+
+# The largest refund the fast path issues on its own. The amount comes from
+# the scenario's free text, so larger claims go to the LLM agent.
+MAX_AUTO_REFUND = 100.0
+
+# Entities a plan cannot run without; anything missing sends the case to the LLM.
+REQUIRED_ENTITIES = {
+    "dispute": ("order_id", "customer_id", "driver_id", "amount"),
+    "recipient_unavailable": ("recipient_id",),
+    "traffic": ("passenger_id", "driver_id"),
+}
+
+
+@dataclass
+class Classification:
+    """
+    The disruption type matched for a scenario, with its confidence and the entities found.
+    """
+    kind: str
+    confidence: float
+    entities: dict
+    scores: dict = field(default_factory=dict)
+
+    @property
+    def missing(self):
+        return [name for name in REQUIRED_ENTITIES.get(self.kind, ()) if name not in self.entities]
+
+
+def extract_entities(text):
+    """
+    Pulls ids, flight numbers, amounts, durations and coordinates out of a scenario.
+    Only the first match of each kind is kept, except that an amount is left
+    out when the scenario names several different ones.
+    """
+    entities = {}
+    for name, pattern in ENTITY_PATTERNS.items():
+        match = re.search(pattern, text, 0 if name == "flight_number" else re.I)
+        if match:
+            entities[name] = match.group(0)
+    amounts = {float(amount) for amount in _AMOUNT.findall(text)}
+    if len(amounts) == 1:
+        entities["amount"] = amounts.pop()
+    match = _MINUTES.search(text)
+    if match:
+        entities["eta_minutes"] = int(match.group(1))
+    match = _COORDINATES.search(text)
+    if match:
+        entities["latitude"], entities["longitude"] = float(match.group(1)), float(match.group(2))
+    return entities
+
+
+def classify(scenario):
+    """
+    Scores a scenario against every known disruption type.
+    Confidence is the best score, discounted by how much the runner-up competes with it.
+    """
+    text = scenario.lower()
+    scores = {
+        kind: min(1.0, sum(weight for pattern, weight in patterns if re.search(pattern, text)))
+        for kind, patterns in DISRUPTION_PATTERNS.items()
+    }
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    (kind, best), (_, runner_up) = ranked[0], ranked[1]
+    if best == 0:
+        return Classification("unknown", 0.0, extract_entities(scenario), scores)
+    confidence = best * (1 - runner_up / (best + runner_up))
+    return Classification(kind, round(confidence, 3), extract_entities(scenario), scores)
+
+
+class _Trace:
+    """
+    Runs tools and records each call as an intermediate step, in the order
+    the calls were issued (concurrent calls may finish in any order).
+    """
+    def __init__(self):
+        self.steps = []
+
+    async def call(self, tool_name, tool, **tool_input):
+        step = {"tool": tool_name, "tool_input": tool_input, "observation": None}
+        self.steps.append(step)
+        step["observation"] = await tool(**tool_input)
+        return step["observation"]
+
+
+async def _dispute_plan(scenario, entities, trace):
+    order_id, customer_id, driver_id = entities["order_id"], entities["customer_id"], entities["driver_id"]
+    mediation = await trace.call("Initiate Mediation Flow", initiate_mediation_flow_async,
+                                 order_id=order_id, customer_id=customer_id, driver_id=driver_id)
+    parties = [customer_id, driver_id]
+    analysis = await trace.call("Mediate Dispute", mediate_dispute_async,
+                                mediation_id=mediation["mediation_id"], parties=parties)
+    if analysis["fault"] == "merchant":
+        actions = [
+            trace.call("Issue Instant Refund", issue_instant_refund_async,
+                       customer_id=customer_id, order_id=order_id, amount=entities["amount"]),
+            trace.call("Exonerate Driver", exonerate_driver_async, driver_id=driver_id, order_id=order_id),
+        ]
+        if "merchant_id" in entities:
+            actions.append(trace.call("Log Merchant Packaging Feedback", log_merchant_packaging_feedback_async,
+                                      merchant_id=entities["merchant_id"], order_id=order_id,
+                                      feedback_details=analysis["reason"]))
+        await asyncio.gather(*actions)
+        summary = (f"Dispute for {order_id} resolved: the merchant was found at fault. "
+                   f"{customer_id} has been refunded ${entities['amount']:.2f} and {driver_id} exonerated.")
+    else:
+        summary = f"Dispute for {order_id} is under review: {analysis['reason']} A support agent will follow up."
+    await trace.call("Notify Resolution", notify_resolution_async,
+                     parties=parties, order_id=order_id, resolution_summary=summary)
+    return summary
+
+
+def _drop_off_suggestion(response):
+    """
+    Turns a recipient's chat reply into a safe drop-off suggestion, or None.
+    """
+    text = response.lower()
+    neighbour = re.search(r"neighbou?r(?: at ([\w ]+?))?[?.!,]", text)
+    if neighbour:
+        where = f" at {neighbour.group(1).title()}" if neighbour.group(1) else ""
+        return f"leave the package with your neighbour{where}"
+    if "door" in text:
+        return "leave the package at your door"
+    return None
+
+
+async def _recipient_plan(scenario, entities, trace):
+    recipient_id = entities["recipient_id"]
+    reply = await trace.call("Contact Recipient via Chat", contact_recipient_via_chat_async, recipient_id=recipient_id,
+                             initial_message="Our driver has arrived with your package, but you don't seem to be available. What should we do?")
+    response = reply["response"]
+    if re.search(r"\b\d+\s*minutes?\b", response) and "tomorrow" not in response.lower():
+        return f"{recipient_id} is on their way ({response!r}). The driver should wait briefly before re-attempting delivery."
+    suggestion = _drop_off_suggestion(response)
+    if suggestion:
+        confirmation = await trace.call("Suggest Safe Drop-off", suggest_safe_drop_off_async,
+                                        recipient_id=recipient_id, suggestion=suggestion)
+        if confirmation["status"] == "approved":
+            return f"{recipient_id} approved a safe drop-off. The driver should {suggestion}."
+    if "latitude" in entities:
+        latitude, longitude = entities["latitude"], entities["longitude"]
+    elif "driver_id" in entities:
+        location = await trace.call("Get Driver Location", get_driver_location_async, driver_id=entities["driver_id"])
+        latitude, longitude = location["location"]["latitude"], location["location"]["longitude"]
+    else:
+        return f"No safe drop-off was agreed with {recipient_id}. Delivery will be re-attempted at the next available slot."
+    lockers = await trace.call("Find Nearby Locker", find_nearby_locker_async, latitude=latitude, longitude=longitude)
+    available = [locker for locker in lockers["lockers"] if locker.get("availability") != "none"]
+    if not available:
+        return f"No safe drop-off or locker is available for {recipient_id}. Delivery will be re-attempted at the next available slot."
+    locker = available[0]
+    return f"No safe drop-off was agreed with {recipient_id}. The driver should deliver to locker {locker['locker_id']} ({locker.get('address', 'nearby')})."
+
+
+async def _traffic_plan(scenario, entities, trace):
+    airport = "airport" in scenario.lower() or "flight_number" in entities
+    route = {"start": "Current location", "end": "Airport" if airport else "Destination"}
+    if "eta_minutes" in entities:
+        route["original_eta"] = entities["eta_minutes"]
+    else:
+        traffic = await trace.call("Check Traffic", check_traffic_async, start_point=route["start"], end_point=route["end"])
+        route["original_eta"] = traffic["travel_time_minutes"]
+    # The new route and the flight status do not depend on each other.
+    lookups = [trace.call("Calculate Alternative Route", calculate_alternative_route_async,
+                          current_route=route, obstruction="reported obstruction")]
+    if airport and "flight_number" in entities:
+        lookups.append(trace.call("Check Flight Status", check_flight_status_async, flight_number=entities["flight_number"]))
+    results = await asyncio.gather(*lookups)
+    new_route = results[0]["new_route"]
+    if new_route is None:
+        message = "An obstruction was reported on your route and no alternative is currently available. We are monitoring the situation."
+        await trace.call("Notify Passenger and Driver", notify_passenger_and_driver_async,
+                         passenger_id=entities["passenger_id"], driver_id=entities["driver_id"], message=message)
+        return f"No alternative route is available for {entities['driver_id']}; passenger and driver have been notified."
+    message = (f"An obstruction was reported on your route. We've found an alternative: {new_route['summary']} "
+               f"New ETA is {new_route['updated_eta_minutes']} minutes.")
+    if len(results) > 1:
+        message += f" Your flight {entities['flight_number']} is currently {results[1]['flight_status'].lower()}."
+    await trace.call("Notify Passenger and Driver", notify_passenger_and_driver_async,
+                     passenger_id=entities["passenger_id"], driver_id=entities["driver_id"], message=message)
+    return (f"Re-routed {entities['driver_id']} around the obstruction. New ETA is "
+            f"{new_route['updated_eta_minutes']} minutes; passenger and driver have been notified.")
+
+
+class FastPath:
+    """
+    A deterministic planner that resolves high-confidence, known disruption
+    types (disputes, unavailable recipients, traffic) by running their
+    protocol's tool plan directly, without the LLM.
+
+    resolve() returns None for anything it should not handle (unknown or
+    ambiguous types, missing entities, disputes over more than
+    `max_refund`), leaving the case to the LLM agent.
+    """
+    PLANS = {"dispute": _dispute_plan, "recipient_unavailable": _recipient_plan, "traffic": _traffic_plan}
+
+    def __init__(self, min_confidence=0.65, max_refund=MAX_AUTO_REFUND):
+        self.min_confidence = min_confidence
+        self.max_refund = max_refund
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.hits_by_kind = {}
+        self.fast_seconds = 0.0
+        self.llm_resolutions = 0
+        self.llm_seconds = 0.0
+
+    def accepts(self, classification):
+        return (
+            classification.kind in self.PLANS
+            and classification.confidence >= self.min_confidence
+            and not classification.missing
+            and classification.entities.get("amount", 0) <= self.max_refund
+        )
+
+    async def resolve(self, scenario):
+        """
+        Resolves a scenario on the fast path, or returns None to fall back.
+        """
+        classification = classify(scenario)
+        if not self.accepts(classification):
+            with self._lock:
+                self.misses += 1
+            return None
+        start = time.perf_counter()
+        trace = _Trace()
+        summary = await self.PLANS[classification.kind](scenario, classification.entities, trace)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.hits += 1
+            self.hits_by_kind[classification.kind] = self.hits_by_kind.get(classification.kind, 0) + 1
+            self.fast_seconds += elapsed
+        print(f"Fast path resolved '{classification.kind}' disruption in {elapsed:.2f}s.")
+        return {
+            "input": scenario,
+            "output": summary,
+            "fast_path": classification.kind,
+            "confidence": classification.confidence,
+            "intermediate_steps": trace.steps,
+        }
+
+    def record_llm_resolution(self, seconds):
+        """
+        Records how long a fallback LLM resolution took, for the savings estimate.
+        """
+        with self._lock:
+            self.llm_resolutions += 1
+            self.llm_seconds += seconds
+
+    def stats(self):
+        """
+        Reports the hit rate, mean latencies and the estimated time saved.
+        The saving is only estimated once at least one LLM resolution was timed.
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            mean_fast = self.fast_seconds / self.hits if self.hits else None
+            mean_llm = self.llm_seconds / self.llm_resolutions if self.llm_resolutions else None
+            saved = self.hits * (mean_llm - mean_fast) if mean_fast is not None and mean_llm is not None else None
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "hits_by_kind": dict(self.hits_by_kind),
+                "mean_fast_path_seconds": mean_fast,
+                "mean_llm_seconds": mean_llm,
+                "estimated_seconds_saved": saved,
+            }
@@ -0,0 +1,282 @@
+import asyncio
+import json
+import re
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from src.agent.fastpath import classify
+
+# Road names ("on Jalan Ampang", "near Federal Highway") and how finely
+# coordinates are bucketed (0.01 degrees, about 1 km) when no road is named.
+_ROAD = re.compile(
+    r"\b(?i:on|at|near|along|off)\s+((?i:jalan|jln\.?|lebuhraya)(?:\s+[A-Z][\w'-]*){1,2}"
+    r"|(?:[A-Z][\w'-]*\s+){1,3}(?i:road|rd|street|st|avenue|ave|highway|hwy|expressway|bridge|boulevard|blvd|lane))\b"
+)
+GRID_DEGREES = 0.01
+
+
+@dataclass
+class Event:
+    """
+    One disruption report, e.g. from a driver or customer app.
+    """
+    id: object
+    scenario: str
+    order_id: str = None
+    segment: str = None
+    received_at: float = 0.0
+
+
+@dataclass
+class Incident:
+    """
+    A group of reports about the same disruption, resolved once.
+    """
+    key: tuple
+    number: int
+    opened_at: float
+    future: asyncio.Future
+    order_ids: list = field(default_factory=list)
+    reports: int = 0
+
+
+def road_segment(scenario, entities=None):
+    """
+    The road segment a scenario is about: a named road, or else the grid
+    cell of its coordinates. None when neither is given.
+    """
+    match = _ROAD.search(scenario)
+    if match:
+        return " ".join(match.group(1).lower().replace(".", "").split())
+    entities = entities if entities is not None else {}
+    if "latitude" in entities:
+        return f"cell:{int(entities['latitude'] // GRID_DEGREES)}:{int(entities['longitude'] // GRID_DEGREES)}"
+    return None
+
+
+def incident_key(event):
+    """
+    The key reports about one incident share.
+
+    An overloaded or closed merchant is one incident per merchant; a traffic
+    obstruction is one per road segment. Disputes and unavailable recipients
+    are per order (or recipient), so only repeated reports of the same case
+    merge. Anything else merges only with an identical report.
+    """
+    classification = classify(event.scenario)
+    entities = classification.entities
+    kind = classification.kind
+    if kind == "merchant" and "merchant_id" in entities:
+        return (kind, entities["merchant_id"].lower())
+    if kind == "traffic":
+        segment = event.segment or road_segment(event.scenario, entities)
+        if segment:
+            return (kind, segment)
+    for name in ("order_id", "recipient_id", "passenger_id"):
+        if kind != "unknown" and name in entities:
+            return (kind, entities[name].lower())
+    return ("report", " ".join(event.scenario.lower().split()))
+
+
+def parse_event(item, index=0, received_at=0.0):
+    """
+    Reads an event from a JSON value: a scenario string, or an object with
+    `scenario` and optional `id`, `order_id` and `segment`.
+    """
+    if isinstance(item, str):
+        item = {"scenario": item}
+    if not isinstance(item, dict) or not isinstance(item.get("scenario"), str):
+        raise ValueError("expected a scenario string or an object with a 'scenario' string")
+    order_id = item.get("order_id")
+    if order_id is None:
+        order_id = classify(item["scenario"]).entities.get("order_id")
+    return Event(item.get("id", index), item["scenario"], order_id, item.get("segment"), received_at)
+
+
+async def read_events(source):
+    """
+    Yields events from JSONL lines. `source` may be an async iterable of
+    lines (such as an asyncio.StreamReader from a socket), a file read in a
+    worker thread so the loop is not blocked, or any iterable of lines.
+    Malformed lines are reported on stderr and skipped.
+    """
+    loop = asyncio.get_running_loop()
+
+    async def lines():
+        if hasattr(source, "__aiter__"):
+            async for line in source:
+                yield line
+        elif hasattr(source, "readline"):
+            while line := await loop.run_in_executor(None, source.readline):
+                yield line
+        else:
+            for line in source:
+                yield line
+
+    index = 0
+    async for line in lines():
+        if isinstance(line, bytes):
+            line = line.decode()
+        if not line.strip():
+            continue
+        try:
+            yield parse_event(json.loads(line), index, loop.time())
+        except ValueError as e:
+            print(f"Skipping event {index}: {e}", file=sys.stderr)
+        index += 1
+
+
+class IngestPipeline:
+    """
+    Coalesces a stream of disruption reports into incidents and resolves
+    each incident once.
+
+    The first report of an incident opens it and is handed to the
+    coordinator; reports with the same incident_key() arriving within
+    `window_s` of it share that resolution, whether it is still running or
+    already done, and each gets its own result record. At most
+    `concurrency` incidents are resolved at a time. A failed resolution
+    closes its incident, so the next report opens a fresh one.
+    """
+    def __init__(self, coordinator, window_s=60.0, concurrency=8, key=incident_key):
+        self.coordinator = coordinator
+        self.window_s = window_s
+        self.key = key
+        self._limit = asyncio.Semaphore(concurrency)
+        self._incidents = OrderedDict()
+        self._numbers = 0
+        self._tasks = set()
+        self.counts = {"events": 0, "incidents": 0, "coalesced": 0, "errors": 0}
+
+    def _expire(self, now):
+        while self._incidents:
+            incident = next(iter(self._incidents.values()))
+            if now - incident.opened_at < self.window_s:
+                break
+            self._incidents.popitem(last=False)
+
+    def _open(self, key, now):
+        incident = Incident(key, self._numbers, now, asyncio.get_running_loop().create_future())
+        self._numbers += 1
+        self._incidents[key] = incident
+        self.counts["incidents"] += 1
+        return incident
+
+    async def _resolve(self, incident, scenario):
+        try:
+            async with self._limit:
+                result = await self.coordinator.handle_disruption_async(scenario)
+            incident.future.set_result(result)
+        except Exception as e:
+            self.counts["errors"] += 1
+            if self._incidents.get(incident.key) is incident:
+                del self._incidents[incident.key]
+            incident.future.set_exception(e)
+            # Every attached report sees the failure; mark it retrieved for the loop.
+            incident.future.exception()
+
+    def attach(self, event):
+        """
+        Adds an event to its open incident, or opens a new one and starts
+        resolving it. Returns (incident, whether the event opened it).
+        """
+        loop = asyncio.get_running_loop()
+        now = event.received_at or loop.time()
+        self._expire(now)
+        self.counts["events"] += 1
+        key = self.key(event)
+        incident = self._incidents.get(key)
+        leader = incident is None
+        if leader:
+            incident = self._open(key, now)
+            task = loop.create_task(self._resolve(incident, event.scenario))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        else:
+            self.counts["coalesced"] += 1
+        incident.reports += 1
+        if event.order_id and event.order_id not in incident.order_ids:
+            incident.order_ids.append(event.order_id)
+        return incident, leader
+
+    async def _record(self, event, incident, leader):
+        record = {
+            "id": event.id, "order_id": event.order_id, "incident": incident.number,
+            "incident_key": list(incident.key), "leader": leader, "status": "ok", "output": None, "error": None,
+        }
+        try:
+            result = await incident.future
+            record["output"] = result.get("output") if isinstance(result, dict) else result
+        except Exception as e:
+            record["status"] = "error"
+            record["error"] = f"{type(e).__name__}: {e}"
+        record["incident_orders"] = list(incident.order_ids)
+        return record
+
+    async def run(self, events):
+        """
+        Consumes an async iterable of events and yields one result record
+        per event, as its incident's resolution becomes available.
+        """
+        done = asyncio.Queue()
+        pending = set()
+
+        def finished(task):
+            pending.discard(task)
+            done.put_nowait(task)
+
+        async def consume():
+            async for event in events:
+                task = asyncio.create_task(self._record(event, *self.attach(event)))
+                pending.add(task)
+                task.add_done_callback(finished)
+
+        reader = asyncio.create_task(consume())
+        while not (reader.done() and not pending and done.empty()):
+            waiter = asyncio.create_task(done.get())
+            await asyncio.wait({waiter} if reader.done() else {waiter, reader}, return_when=asyncio.FIRST_COMPLETED)
+            if waiter.done():
+                yield waiter.result().result()
+            else:
+                waiter.cancel()
+        await reader
+
+    def stats(self):
+        events, incidents = self.counts["events"], self.counts["incidents"]
+        return {**self.counts, "open": len(self._incidents),
+                "coalescing_ratio": round(events / incidents, 3) if incidents else None}
+
+
+async def ingest(coordinator, source, output=None, window_s=60.0, concurrency=8):
+    """
+    Streams JSONL events from `source` through an IngestPipeline and writes
+    one JSON result record per event to `output` (stdout).
+    """
+    output = output or sys.stdout
+    pipeline = IngestPipeline(coordinator, window_s=window_s, concurrency=concurrency)
+    async for record in pipeline.run(read_events(source)):
+        output.write(json.dumps(record) + "\n")
+        output.flush()
+    return pipeline.stats()
+
+
+async def start_socket(pipeline, host="127.0.0.1", port=9000, unix_path=None):
+    """
+    Accepts JSONL event streams over TCP (or a Unix socket with
+    `unix_path`); every connection feeds the same pipeline, so reports from
+    different reporters coalesce, and gets its records back on the socket.
+    """
+    async def handler(reader, writer):
+        try:
+            async for record in pipeline.run(read_events(reader)):
+                writer.write((json.dumps(record) + "\n").encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    if unix_path is not None:
+        return await asyncio.start_unix_server(handler, path=unix_path)
+    return await asyncio.start_server(handler, host, port)
@@ -0,0 +1,467 @@
+import json
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+
+from src.agent.fastpath import MAX_AUTO_REFUND
+
+# Entities lifted out of a scenario: prefixed ids (merchant-456, recip-789),
+# flight numbers (SQ123) and bare numbers (40, 12.50).
+_ENTITY = re.compile(
+    r"(?P<id>\b[A-Za-z]+-[A-Za-z]*\d[\w-]*)"
+    r"|(?P<flight>\b[A-Z]{2}\d{2,4}\b)"
+    r"|(?P<num>(?<![\w.])\d+(?:\.\d+)?(?!\w))"
+)
+_TOKEN = re.compile(r"<\w+>|[a-z]+")
+_SLOT = re.compile(r"\{\{(@?)(\w+)\}\}")
+# Observation strings shorter than this are too generic to treat as data flow.
+_MIN_REF_LENGTH = 4
+# Observation fields the agent branches on (a merchant's status, a verdict,
+# an approval). A replay stops where a step's value differs from the
+# recorded one, because the recorded plan followed the other branch.
+DECISION_FIELDS = ("status", "fault", "flight_status", "availability")
+
+
+def _number(text):
+    return float(text) if "." in text else int(text)
+
+
+def normalize(scenario):
+    """
+    Replaces the entities of a scenario with placeholders.
+    Returns the lower-cased template and the placeholder -> value mapping,
+    e.g. "merchant-456 is overloaded, 40 min wait" becomes
+    ("<merchant_0> is overloaded, <num_0> min wait", {"merchant_0": "merchant-456", "num_0": 40}).
+    """
+    entities, names, counts = {}, {}, Counter()
+
+    def placeholder(match):
+        value = match.group(0)
+        if value not in names:
+            if match.group("id"):
+                kind = match.group("id").split("-", 1)[0].lower()
+            else:
+                kind = match.lastgroup
+            names[value] = f"{kind}_{counts[kind]}"
+            counts[kind] += 1
+            entities[names[value]] = _number(value) if match.lastgroup == "num" else value
+        return f"<{names[value]}>"
+
+    template = _ENTITY.sub(placeholder, scenario)
+    return " ".join(template.lower().split()), entities
+
+
+def _subtrees(value, path):
+    """
+    Yields (path, value) for a value and everything nested inside it.
+    """
+    yield path, value
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from _subtrees(item, path + [key])
+    elif isinstance(value, list):
+        for i, item in enumerate(value):
+            yield from _subtrees(item, path + [i])
+
+
+def _key(value):
+    try:
+        return json.dumps(value, sort_keys=True, default=str)
+    except (TypeError, ValueError):
+        return None
+
+
+def _referable(value):
+    if isinstance(value, bool) or value is None:
+        return False
+    if isinstance(value, str):
+        return len(value) >= _MIN_REF_LENGTH
+    return isinstance(value, (int, float, dict, list)) and value not in ({}, [])
+
+
+class _Abstractor:
+    """
+    Turns the concrete inputs of a recorded plan into templates: scenario
+    entities become {"$entity": name} and values that came out of an earlier
+    observation become {"$ref": n}, so a replay picks up the new values.
+    Inside free text the same values become {{name}} and {{@n}} slots.
+    """
+    def __init__(self, entities):
+        self.by_value = {_key(value): name for name, value in entities.items()}
+        for name, value in entities.items():
+            # 20 in the scenario is the same entity as an amount of 20.0.
+            if isinstance(value, (int, float)) and float(value).is_integer():
+                self.by_value.setdefault(_key(float(value)), name)
+        self.literals = {str(value): "{{" + name + "}}" for name, value in entities.items()}
+        self.observed = {}
+        self.refs = []
+
+    def observe(self, step, observation):
+        for path, value in _subtrees(observation, [step]):
+            if _referable(value):
+                key = _key(value)
+                if key is not None:
+                    self.observed[key] = path
+
+    def _ref(self, path):
+        if path not in self.refs:
+            self.refs.append(path)
+        return self.refs.index(path)
+
+    def abstract(self, value):
+        key = _key(value)
+        if key in self.by_value and not isinstance(value, bool):
+            return {"$entity": self.by_value[key]}
+        if key in self.observed:
+            return {"$ref": self._ref(self.observed[key])}
+        if isinstance(value, dict):
+            return {k: self.abstract(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self.abstract(v) for v in value]
+        if isinstance(value, str):
+            return self.abstract_text(value)
+        return value
+
+    def abstract_text(self, text):
+        literals = {literal: slot for literal, slot in self.literals.items() if literal in text}
+        for key, path in self.observed.items():
+            value = json.loads(key)
+            if isinstance(value, (str, int, float)) and str(value) in text and str(value) not in literals:
+                literals[str(value)] = path
+        if not literals:
+            return text
+        pattern = "|".join(re.escape(literal) for literal in sorted(literals, key=len, reverse=True))
+
+        def slot(match):
+            target = literals[match.group(0)]
+            return target if isinstance(target, str) else "{{@" + str(self._ref(target)) + "}}"
+
+        return re.sub(rf"(?<![\w.-])(?:{pattern})(?![\w-])", slot, text)
+
+
+def _resolve_path(observations, path):
+    value = observations[path[0]]
+    for key in path[1:]:
+        value = value[key]
+    return value
+
+
+def _concrete(template, entities, observations, refs):
+    if isinstance(template, dict):
+        if template.keys() == {"$entity"}:
+            return entities[template["$entity"]]
+        if template.keys() == {"$ref"}:
+            return _resolve_path(observations, refs[template["$ref"]])
+        return {k: _concrete(v, entities, observations, refs) for k, v in template.items()}
+    if isinstance(template, list):
+        return [_concrete(v, entities, observations, refs) for v in template]
+    if isinstance(template, str):
+        def fill(match):
+            if match.group(1):
+                return str(_resolve_path(observations, refs[int(match.group(2))]))
+            return str(entities[match.group(2)])
+        return _SLOT.sub(fill, template)
+    return template
+
+
+def _guard(observation):
+    if not isinstance(observation, dict):
+        return {}
+    return {field: observation[field] for field in DECISION_FIELDS
+            if isinstance(observation.get(field), (str, bool))}
+
+
+def _numbers(template, entities, found):
+    """
+    Collects the numeric entities a template passes on as values of their
+    own (an amount), rather than inside free text.
+    """
+    if isinstance(template, dict):
+        if template.keys() == {"$entity"}:
+            if isinstance(entities.get(template["$entity"]), (int, float)):
+                found.add(template["$entity"])
+        else:
+            for value in template.values():
+                _numbers(value, entities, found)
+    elif isinstance(template, list):
+        for value in template:
+            _numbers(value, entities, found)
+    return found
+
+
+def _amounts(tool_input):
+    """
+    The amounts in a concrete tool input, however deeply nested.
+    """
+    return [value for path, value in _subtrees(tool_input, []) if path and path[-1] == "amount"
+            and isinstance(value, (int, float)) and not isinstance(value, bool)]
+
+
+def _slots(template, found):
+    """
+    Collects the entity names a template depends on.
+    """
+    if isinstance(template, dict):
+        if template.keys() == {"$entity"}:
+            found.add(template["$entity"])
+        else:
+            for value in template.values():
+                _slots(value, found)
+    elif isinstance(template, list):
+        for value in template:
+            _slots(value, found)
+    elif isinstance(template, str):
+        found.update(name for at, name in _SLOT.findall(template) if not at)
+    return found
+
+
+@dataclass
+class CachedPlan:
+    """
+    A recorded tool-call plan with its inputs and final answer as templates.
+    """
+    template: str
+    steps: list
+    output: str
+    refs: list
+    required: set
+    tokens: Counter
+    embedding: list = None
+    hits: int = 0
+    # Per step, the DECISION_FIELDS values its observation had when recorded.
+    guards: list = None
+    # The recorded scenario's entities.
+    entities: dict = None
+
+
+class PlanCache:
+    """
+    Caches the tool-call plans the LLM agent produced, keyed on the
+    normalized scenario (see normalize()), and replays them for scenarios
+    that differ only in their ids and numbers.
+
+    A lookup first tries the exact template, then the most similar stored
+    template by TF-IDF cosine similarity, or by the vectors of `embedder`
+    when one is given (any callable mapping a list of texts to vectors,
+    e.g. a local sentence-transformers model's `encode`). Matches below
+    `min_similarity`, or whose plan needs an entity the new scenario does
+    not have, are misses. At most `maxsize` plans are kept, least recently
+    used first out.
+
+    Writes are only replayed with the numbers they were recorded with: a
+    scenario whose numbers feeding a write's input differ (say a larger
+    refund) goes to the LLM, and no replayed write may move an amount
+    above `max_refund`.
+    """
+    def __init__(self, maxsize=512, min_similarity=0.85, embedder=None, max_refund=MAX_AUTO_REFUND):
+        self.maxsize = maxsize
+        self.max_refund = max_refund
+        self.min_similarity = min_similarity
+        self.embedder = embedder
+        self._plans = OrderedDict()
+        self._df = Counter()
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.uncacheable = 0
+        self.evictions = 0
+        self.replay_failures = 0
+        self.diverged = 0
+        self.partial_replays = 0
+        self.changed_amounts = 0
+
+    def store(self, scenario, steps, output):
+        """
+        Records the plan behind a resolved scenario.
+        `steps` are (tool_name, tool_input, observation) triples in call order.
+        Returns the stored plan, or None when the plan cannot be replayed.
+        """
+        template, entities = normalize(scenario)
+        abstractor = _Abstractor(entities)
+        plan_steps, guards = [], []
+        for i, (tool_name, tool_input, observation) in enumerate(steps):
+            plan_steps.append((tool_name, abstractor.abstract(tool_input)))
+            guards.append(_guard(observation))
+            abstractor.observe(i, observation)
+        if not plan_steps or not isinstance(output, str):
+            with self._lock:
+                self.uncacheable += 1
+            return None
+        output_template = abstractor.abstract_text(output)
+        required = set()
+        for _, tool_input in plan_steps:
+            _slots(tool_input, required)
+        _slots(output_template, required)
+        tokens = Counter(_TOKEN.findall(template))
+        embedding = list(self.embedder([template])[0]) if self.embedder is not None else None
+        plan = CachedPlan(template, plan_steps, output_template, abstractor.refs, required, tokens, embedding,
+                          guards=guards, entities=entities)
+        with self._lock:
+            if template in self._plans:
+                self._forget(template)
+            self._plans[template] = plan
+            self._df.update(tokens.keys())
+            self.stores += 1
+            while len(self._plans) > self.maxsize:
+                self._forget(next(iter(self._plans)))
+                self.evictions += 1
+        return plan
+
+    def _forget(self, template):
+        plan = self._plans.pop(template)
+        self._df.subtract(plan.tokens.keys())
+        self._df += Counter()
+
+    def _tfidf(self, tokens):
+        n = len(self._plans)
+        vector = {token: count * (math.log((1 + n) / (1 + self._df[token])) + 1) for token, count in tokens.items()}
+        norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+        return {token: w / norm for token, w in vector.items()}
+
+    def _similarity(self, query, plan, query_embedding):
+        if query_embedding is not None:
+            dot = sum(a * b for a, b in zip(query_embedding, plan.embedding))
+            norm = math.sqrt(sum(a * a for a in query_embedding)) * math.sqrt(sum(b * b for b in plan.embedding))
+            return dot / norm if norm else 0.0
+        document = self._tfidf(plan.tokens)
+        return sum(w * document.get(token, 0.0) for token, w in query.items())
+
+    def lookup(self, scenario):
+        """
+        Finds the plan for a scenario.
+        Returns (plan, entities, confidence) or None.
+        """
+        template, entities = normalize(scenario)
+        query_embedding = list(self.embedder([template])[0]) if self.embedder is not None else None
+        with self._lock:
+            plan = self._plans.get(template)
+            confidence = 1.0
+            if plan is None:
+                query = self._tfidf(Counter(_TOKEN.findall(template)))
+                candidates = [p for p in self._plans.values() if p.required <= entities.keys()]
+                scored = [(self._similarity(query, p, query_embedding), p) for p in candidates]
+                confidence, plan = max(scored, key=lambda item: item[0], default=(0.0, None))
+                if plan is None or confidence < self.min_similarity:
+                    self.misses += 1
+                    return None
+                self.similar_hits += 1
+            elif not plan.required <= entities.keys():
+                self.misses += 1
+                return None
+            else:
+                self.exact_hits += 1
+            plan.hits += 1
+            self._plans.move_to_end(plan.template)
+            return plan, entities, round(confidence, 3)
+
+    def invalidate(self, plan):
+        with self._lock:
+            if self._plans.get(plan.template) is plan:
+                self._forget(plan.template)
+
+    async def resolve(self, scenario, run_tool, is_write=None):
+        """
+        Replays the cached plan for a scenario, or returns None on a miss.
+        `run_tool(tool_name, tool_input)` is a coroutine function running one
+        tool; `is_write(tool_name)` tells tools with side effects apart (by
+        default every tool is assumed to have them).
+
+        A replay stops at a step that fails, or whose decision fields (see
+        DECISION_FIELDS) differ from the recording. Before any write has
+        run it returns None, so the caller can fall back to the LLM; a
+        failing plan is dropped. After a write it never does, since the
+        agent would repeat the writes: it returns the steps taken so far
+        with `partial` and `error` instead.
+        """
+        match = self.lookup(scenario)
+        if match is None:
+            return None
+        plan, entities, confidence = match
+        writes = [is_write is None or is_write(tool_name) for tool_name, _ in plan.steps]
+        recorded = plan.entities or {}
+        numbers = set()
+        for (_, input_template), write in zip(plan.steps, writes):
+            if write:
+                _numbers(input_template, recorded, numbers)
+        changed = sorted(name for name in numbers if entities.get(name) != recorded.get(name))
+        if changed:
+            with self._lock:
+                self.changed_amounts += 1
+            print(f"Cached plan not replayed: {', '.join(changed)} would change what its writes do; falling back to the agent.")
+            return None
+        guards = plan.guards or [{}] * len(plan.steps)
+        observations, steps = [], []
+        wrote, error, failed = False, None, False
+        for (tool_name, input_template), guard, write in zip(plan.steps, guards, writes):
+            try:
+                tool_input = _concrete(input_template, entities, observations, plan.refs)
+                if write:
+                    over = [amount for amount in _amounts(tool_input) if amount > self.max_refund]
+                    if over:
+                        error = f"{tool_name} would move {over[0]}, over the {self.max_refund} limit for replays"
+                        break
+                    wrote = True
+                observation = await run_tool(tool_name, tool_input)
+            except Exception as e:
+                error, failed = f"{tool_name} failed: {type(e).__name__}: {e}", True
+                break
+            observations.append(observation)
+            steps.append({"tool": tool_name, "tool_input": tool_input, "observation": observation})
+            changed = {field: value for field, value in guard.items() if _guard(observation).get(field) != value}
+            if changed:
+                field, value = next(iter(changed.items()))
+                error = f"{tool_name} returned {field}={_guard(observation).get(field)!r} where the cached plan saw {value!r}"
+                break
+        if error is None:
+            try:
+                output = _concrete(plan.output, entities, observations, plan.refs)
+            except Exception as e:
+                error, failed = f"Filling in the answer failed: {type(e).__name__}: {e}", True
+        if error is None:
+            print(f"Replayed cached plan (similarity {confidence}).")
+            return {"input": scenario, "output": output, "plan_cache": confidence, "intermediate_steps": steps}
+        with self._lock:
+            if failed:
+                self.replay_failures += 1
+            else:
+                self.diverged += 1
+            if wrote:
+                self.partial_replays += 1
+        if failed:
+            self.invalidate(plan)
+        if not wrote:
+            print(f"Plan replay stopped ({error}); falling back to the agent.")
+            return None
+        print(f"Plan replay stopped after a write ({error}); not falling back to the agent.")
+        done = ", ".join(step["tool"] for step in steps) or "none"
+        return {
+            "input": scenario,
+            "output": f"A cached plan was stopped partway: {error}. Steps completed: {done}. The rest needs review.",
+            "plan_cache": confidence,
+            "intermediate_steps": steps,
+            "partial": True,
+            "error": error,
+        }
+
+    def stats(self):
+        with self._lock:
+            hits = self.exact_hits + self.similar_hits
+            total = hits + self.misses
+            return {
+                "size": len(self._plans),
+                "exact_hits": self.exact_hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+                "hit_rate": hits / total if total else 0.0,
+                "stores": self.stores,
+                "uncacheable": self.uncacheable,
+                "evictions": self.evictions,
+                "replay_failures": self.replay_failures,
+                "diverged": self.diverged,
+                "partial_replays": self.partial_replays,
+                "changed_amounts": self.changed_amounts,
+            }
@@ -0,0 +1,359 @@
+import asyncio
+import itertools
+import json
+import math
+import signal
+import sys
+import threading
+
+from src.agent.fastpath import classify
+
+# Queue priority per disruption type (lower runs first). Time-critical trips
+# jump ahead; merchant issues, which mostly end in feedback logging, wait.
+PRIORITIES = {"traffic": 0, "recipient_unavailable": 1, "dispute": 2, "unknown": 2, "merchant": 3}
+_URGENT = ("airport", "flight")
+
+
+def priority_for(scenario):
+    """
+    The queue priority of a scenario; airport trips always come first.
+    """
+    if any(word in scenario.lower() for word in _URGENT):
+        return 0
+    return PRIORITIES.get(classify(scenario).kind, PRIORITIES["unknown"])
+
+
+class ServiceClosed(Exception):
+    """
+    Raised when submitting to a service that is draining or stopped.
+    """
+
+
+class _Job:
+    __slots__ = ("id", "scenario", "priority", "deadline", "future", "queued_at")
+
+    def __init__(self, job_id, scenario, priority, deadline, future, queued_at):
+        self.id = job_id
+        self.scenario = scenario
+        self.priority = priority
+        self.deadline = deadline
+        self.future = future
+        self.queued_at = queued_at
+
+
+class CoordinatorService:
+    """
+    Keeps one warm Coordinator and resolves submitted disruptions from a
+    priority queue with up to `concurrency` in flight.
+
+    Each request may carry a deadline (seconds from submission, defaulting
+    to `default_deadline_s`): requests still queued at their deadline are
+    reported as "expired", and ones still running are cancelled and
+    reported as "timeout". drain() stops intake and lets queued work finish.
+    Must be used from a single event loop.
+    """
+    def __init__(self, coordinator, concurrency=8, default_deadline_s=None, max_queue=10_000):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1.")
+        self.coordinator = coordinator
+        self.concurrency = concurrency
+        self.default_deadline_s = default_deadline_s
+        self._queue = asyncio.PriorityQueue(maxsize=max_queue)
+        self._sequence = itertools.count()
+        self._workers = []
+        self._accepting = False
+        self.in_flight = 0
+        self.counts = {"submitted": 0, "ok": 0, "error": 0, "timeout": 0, "expired": 0, "rejected": 0, "cancelled": 0}
+
+    def start(self):
+        if not self._workers:
+            self._accepting = True
+            self._workers = [asyncio.create_task(self._worker(), name=f"coordinator-{i}") for i in range(self.concurrency)]
+        return self
+
+    def submit(self, scenario, priority=None, deadline_s=None, request_id=None):
+        """
+        Queues a disruption and returns a future for its result record.
+        Raises ServiceClosed while draining and asyncio.QueueFull when the queue is full.
+        """
+        if not self._accepting:
+            self.counts["rejected"] += 1
+            raise ServiceClosed("The service is not accepting requests.")
+        loop = asyncio.get_running_loop()
+        sequence = next(self._sequence)
+        deadline_s = deadline_s if deadline_s is not None else self.default_deadline_s
+        job = _Job(
+            request_id if request_id is not None else sequence,
+            scenario,
+            priority if priority is not None else priority_for(scenario),
+            loop.time() + deadline_s if deadline_s is not None else None,
+            loop.create_future(),
+            loop.time(),
+        )
+        try:
+            self._queue.put_nowait((job.priority, sequence, job))
+        except asyncio.QueueFull:
+            self.counts["rejected"] += 1
+            raise
+        self.counts["submitted"] += 1
+        return job.future
+
+    async def resolve(self, scenario, priority=None, deadline_s=None, request_id=None):
+        return await self.submit(scenario, priority, deadline_s, request_id)
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            _, _, job = await self._queue.get()
+            self.in_flight += 1
+            started = loop.time()
+            record = {"id": job.id, "status": None, "priority": job.priority, "output": None, "error": None,
+                      "queued_ms": round((started - job.queued_at) * 1000, 3)}
+            try:
+                remaining = job.deadline - started if job.deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    record["status"] = "expired"
+                else:
+                    result = await asyncio.wait_for(self.coordinator.handle_disruption_async(job.scenario), remaining)
+                    record["status"] = "ok"
+                    record["output"] = result.get("output") if isinstance(result, dict) else result
+            except asyncio.TimeoutError:
+                record["status"] = "timeout"
+            except asyncio.CancelledError:
+                record["status"] = "cancelled"
+                raise
+            except Exception as e:
+                record["status"] = "error"
+                record["error"] = f"{type(e).__name__}: {e}"
+            finally:
+                record["duration_ms"] = round((loop.time() - started) * 1000, 3)
+                self.counts[record["status"]] += 1
+                if not job.future.done():
+                    job.future.set_result(record)
+                self.in_flight -= 1
+                self._queue.task_done()
+
+    async def drain(self, timeout=None):
+        """
+        Stops accepting requests, waits (up to `timeout` seconds) for queued
+        and running ones to finish, then stops the workers. Requests left
+        over after the timeout are reported as "cancelled".
+        """
+        self._accepting = False
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        while not self._queue.empty():
+            _, _, job = self._queue.get_nowait()
+            self.counts["cancelled"] += 1
+            job.future.set_result({"id": job.id, "priority": job.priority, "status": "cancelled", "output": None, "error": None})
+
+    def stats(self):
+        return {**self.counts, "queued": self._queue.qsize(), "in_flight": self.in_flight, "accepting": self._accepting}
+
+
+def _request(item):
+    """
+    Reads a request from a JSON value: a scenario string, or an object with
+    `scenario` and optional `id`, `priority` (an integer) and `deadline_s`
+    (seconds, above zero). Raises ValueError for anything else, so a bad
+    request gets an error reply instead of reaching the queue.
+    """
+    if isinstance(item, str):
+        item = {"scenario": item}
+    if not isinstance(item, dict) or not isinstance(item.get("scenario"), str):
+        raise ValueError("expected a scenario string or an object with a 'scenario' string")
+    priority, deadline_s = item.get("priority"), item.get("deadline_s")
+    if priority is not None:
+        if isinstance(priority, bool) or not isinstance(priority, (int, float)) or priority != int(priority):
+            raise ValueError("'priority' must be an integer")
+        priority = int(priority)
+    if deadline_s is not None:
+        if isinstance(deadline_s, bool) or not isinstance(deadline_s, (int, float)) \
+                or not math.isfinite(deadline_s) or deadline_s <= 0:
+            raise ValueError("'deadline_s' must be a number of seconds above zero")
+        deadline_s = float(deadline_s)
+    return {
+        "scenario": item["scenario"],
+        "priority": priority,
+        "deadline_s": deadline_s,
+        "request_id": item.get("id"),
+    }
+
+
+def _settle(future, line, error):
+    if not future.done():
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(line)
+
+
+def _readline(loop, input):
+    """
+    Reads one line on a daemon thread, so that a read still blocked at
+    shutdown does not keep the process alive.
+    """
+    future = loop.create_future()
+
+    def read():
+        try:
+            line, error = input.readline(), None
+        except Exception as e:
+            line, error = None, e
+        try:
+            loop.call_soon_threadsafe(_settle, future, line, error)
+        except RuntimeError:
+            pass  # the loop has closed after a stop: the line is not served
+
+    threading.Thread(target=read, daemon=True).start()
+    return future
+
+
+async def serve_stdin(service, input=None, output=None, stop=None, drain_timeout=None):
+    """
+    Reads JSONL requests from `input` (stdin) and writes one JSON result
+    record per request to `output` (stdout) as each completes. Drains
+    and returns at end of input, or once the `stop` event is set.
+    """
+    input = input or sys.stdin
+    output = output or sys.stdout
+    loop = asyncio.get_running_loop()
+    pending = set()
+    stopping = asyncio.ensure_future(stop.wait()) if stop is not None else None
+
+    async def respond(future):
+        record = await future
+        output.write(json.dumps(record) + "\n")
+        output.flush()
+
+    while True:
+        reading = _readline(loop, input)
+        if stopping is not None:
+            await asyncio.wait([reading, stopping], return_when=asyncio.FIRST_COMPLETED)
+            if stopping.done():
+                print("Shutting down: draining queued disruptions...", file=sys.stderr)
+                break
+        line = await reading
+        if not line:
+            break
+        if not line.strip():
+            continue
+        try:
+            request = _request(json.loads(line))
+            future = service.submit(**request)
+        except (ValueError, ServiceClosed, asyncio.QueueFull) as e:
+            output.write(json.dumps({"id": None, "status": "rejected", "error": f"{type(e).__name__}: {e}"}) + "\n")
+            output.flush()
+            continue
+        task = asyncio.create_task(respond(future))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+    if stopping is not None:
+        stopping.cancel()
+    await service.drain(drain_timeout)
+    await asyncio.gather(*pending)
+
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large", 429: "Too Many Requests", 503: "Service Unavailable"}
+MAX_BODY_BYTES = 1 << 20
+
+
+async def _handle_http(service, reader, writer):
+    """
+    A minimal HTTP/1.1 handler: POST /disruptions resolves a request and
+    answers with its result record; GET /health and GET /stats report status.
+    """
+    status, body = 200, {}
+    try:
+        request_line = (await reader.readline()).decode("latin-1").split()
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        method, path = (request_line + ["", ""])[:2]
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            status, body = 400, {"error": "invalid Content-Length header"}
+        elif length > MAX_BODY_BYTES:
+            status, body = 413, {"error": "request body too large"}
+        elif method == "GET" and path == "/health":
+            body = {"status": "ok" if service.stats()["accepting"] else "draining"}
+        elif method == "GET" and path == "/stats":
+            body = service.stats()
+        elif method == "POST" and path == "/disruptions":
+            try:
+                request = _request(json.loads(await reader.readexactly(length)))
+                body = await service.submit(**request)
+            except ValueError as e:
+                status, body = 400, {"error": str(e)}
+            except ServiceClosed as e:
+                status, body = 503, {"error": str(e)}
+            except asyncio.QueueFull:
+                status, body = 429, {"error": "queue is full"}
+        else:
+            status, body = 404, {"error": f"no route for {method} {path}"}
+    except (asyncio.IncompleteReadError, ConnectionError):
+        writer.close()
+        return
+    payload = json.dumps(body).encode()
+    writer.write(
+        f"HTTP/1.1 {status} {_REASONS[status]}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode() + payload
+    )
+    try:
+        await writer.drain()
+    finally:
+        writer.close()
+
+
+async def start_http(service, host="127.0.0.1", port=8080, unix_path=None):
+    """
+    Starts the HTTP front end on a TCP port, or on a Unix socket with `unix_path`.
+    """
+    def handler(reader, writer):
+        return _handle_http(service, reader, writer)
+
+    if unix_path is not None:
+        return await asyncio.start_unix_server(handler, path=unix_path)
+    return await asyncio.start_server(handler, host, port)
+
+
+async def run_service(coordinator, mode="stdin", concurrency=8, deadline_s=None, host="127.0.0.1", port=8080,
+                      unix_path=None, drain_timeout=30.0, output=None):
+    """
+    Runs the service until end of input (stdin mode) or SIGINT/SIGTERM,
+    then drains gracefully.
+    """
+    service = CoordinatorService(coordinator, concurrency=concurrency, default_deadline_s=deadline_s).start()
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+    if mode == "stdin":
+        await serve_stdin(service, output=output, stop=stop, drain_timeout=drain_timeout)
+        return service.stats()
+
+    server = await start_http(service, host, port, unix_path)
+    where = unix_path or f"http://{host}:{port}"
+    print(f"Coordinator service listening on {where} (concurrency {concurrency}).", file=sys.stderr)
+    await stop.wait()
+    print("Shutting down: draining queued disruptions...", file=sys.stderr)
+    server.close()
+    await service.drain(drain_timeout)
+    await server.wait_closed()
+    return service.stats()
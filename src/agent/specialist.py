@@ -1,10 +1,182 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from src.agent.fastpath import classify
+from src.tools import mediation
+from src.tools.eta import eta_matrix
+from src.tools.logistics import (
+    calculate_alternative_route_async, check_flight_status_async, check_traffic_async,
+    analyze_evidence_async, find_nearby_locker_async,
+    get_driver_location_async, get_merchant_status_async, get_nearby_merchants_async,
+)
+from src.tools.runtime import monotonic, run_sync
+
+# Classified disruption types (see fastpath.classify()) and the domain of the
+# specialist that knows about them.
+DOMAIN_OF_KIND = {"traffic": "traffic", "merchant": "merchant", "dispute": "dispute", "recipient_unavailable": "recipient"}
+DEFAULT_DEADLINE_S = 3.0
+
+
+@dataclass
+class Findings:
+    """
+    What a specialist found about a scenario. `status` is "complete", or
+    "partial" when the deadline passed first (`facts` then holds whatever
+    its tools had returned by then), or "error".
+    """
+    specialist: str
+    domain: str
+    status: str = "partial"
+    facts: dict = field(default_factory=dict)
+    summary: str = ""
+    elapsed_s: float = 0.0
+
+    def as_dict(self):
+        return {"specialist": self.specialist, "domain": self.domain, "status": self.status,
+                "facts": dict(self.facts), "summary": self.summary, "elapsed_s": round(self.elapsed_s, 3)}
+
+
+def _location_of(result):
+    location = result.get("location", result)
+    return float(location["latitude"]), float(location["longitude"])
+
+
+# Domain analyses. Each runs read-only tools of its domain, concurrently where
+# they are independent, and writes every result into `facts` as soon as it
+# arrives so a deadline keeps what is already known. They never act
+# (notify, refund, re-route) or contact anyone: that is left to the
+# Coordinator. An entity the scenario does not name is reported as unknown,
+# never filled in with a placeholder.
+async def _traffic_analysis(scenario, entities, facts, run_cpu):
+    airport = "airport" in scenario.lower() or "flight_number" in entities
+    route = {"start": "Current location", "end": "Airport" if airport else "Destination"}
+
+    async def traffic():
+        facts["travel_time_minutes"] = (await check_traffic_async(route["start"], route["end"]))["travel_time_minutes"]
+
+    async def alternative():
+        if "eta_minutes" not in entities:
+            facts["alternative_route"] = "unknown"
+            return
+        result = await calculate_alternative_route_async({**route, "original_eta": entities["eta_minutes"]}, "reported obstruction")
+        facts["alternative_route"] = result["new_route"]
+
+    async def flight():
+        facts["flight_status"] = (await check_flight_status_async(entities["flight_number"]))["flight_status"]
+
+    await asyncio.gather(traffic(), alternative(), *([flight()] if "flight_number" in entities else []))
+    summary = f"Current travel time is {facts['travel_time_minutes']} minutes."
+    if facts["alternative_route"] == "unknown":
+        summary += " No ETA was given, so no alternative route was priced."
+    elif facts["alternative_route"]:
+        summary += f" Alternative: {facts['alternative_route']['summary']} ETA {facts['alternative_route']['updated_eta_minutes']} minutes."
+    if "flight_status" in facts:
+        summary += f" Flight {entities['flight_number']} is {facts['flight_status'].lower()}."
+    return summary
+
+
+async def _merchant_analysis(scenario, entities, facts, run_cpu):
+    merchant_id = entities.get("merchant_id")
+
+    async def status():
+        if merchant_id is None:
+            facts["merchant_status"] = {"status": "unknown"}
+            return
+        facts["merchant_status"] = await get_merchant_status_async(merchant_id)
+
+    async def alternatives():
+        if "latitude" in entities:
+            point = (entities["latitude"], entities["longitude"])
+        elif "driver_id" in entities:
+            point = _location_of(await get_driver_location_async(entities["driver_id"]))
+        else:
+            return
+        facts["driver_point"] = point
+        merchants = (await get_nearby_merchants_async(point[0], point[1], "restaurant"))["merchants"]
+        located = [m for m in merchants if "latitude" in m]
+        if located:
+            # The ETA matrix is CPU work: it runs on the pool's process workers.
+            etas = await run_cpu(eta_matrix, [point], [(m["latitude"], m["longitude"]) for m in located])
+            for merchant, eta in zip(located, etas[0].tolist()):
+                merchant["driver_eta_minutes"] = round(eta, 1)
+            merchants = sorted(located, key=lambda m: m["driver_eta_minutes"] + m.get("wait_time_minutes", 0))
+        else:
+            merchants = sorted(merchants, key=lambda m: m.get("wait_time_minutes", 0))
+        facts["alternatives"] = merchants
+
+    await asyncio.gather(status(), alternatives())
+    if merchant_id is None:
+        summary = "No merchant was named, so its status is unknown."
+    else:
+        summary = f"{merchant_id} is {facts['merchant_status']['status']}."
+    if facts.get("alternatives"):
+        best = facts["alternatives"][0]
+        summary += f" Best alternative: {best.get('name', best['merchant_id'])} ({best['merchant_id']})."
+    return summary
+
+
+async def _dispute_analysis(scenario, entities, facts, run_cpu):
+    order_id = entities.get("order_id")
+    if order_id is None:
+        facts["verdict"] = "unknown"
+        return "No order was named, so the dispute could not be looked up."
+    # Asking the parties for evidence is the Coordinator's call: the
+    # specialist reads an open mediation's estimate, or else weighs the report.
+    facts["parties"] = [entities[name] for name in ("customer_id", "driver_id") if name in entities]
+    mediation_id = f"med-{order_id}"
+    if mediation_id in mediation.mediations:
+        verdict = mediation.mediations.verdict(mediation_id)
+        facts["source"] = "mediation"
+    else:
+        verdict = await analyze_evidence_async({"report": scenario})
+        facts["source"] = "report"
+    facts["verdict"] = verdict
+    return f"Likely fault for {order_id}: {verdict['fault']} (confidence {verdict['confidence']:.2f}). {verdict['reason']}"
+
+
+async def _recipient_analysis(scenario, entities, facts, run_cpu):
+    if "latitude" in entities:
+        point = (entities["latitude"], entities["longitude"])
+    elif "driver_id" in entities:
+        point = _location_of(await get_driver_location_async(entities["driver_id"]))
+    else:
+        return "No location is known, so no locker could be looked up."
+    facts["location"] = point
+    lockers = (await find_nearby_locker_async(*point))["lockers"]
+    facts["lockers"] = [locker for locker in lockers if locker.get("availability") != "none"]
+    if not facts["lockers"]:
+        return "No locker with free space is nearby."
+    locker = facts["lockers"][0]
+    return f"Nearest locker with space: {locker['locker_id']} ({locker.get('address', 'nearby')})."
+
+
+ANALYSES = {
+    "traffic": _traffic_analysis,
+    "merchant": _merchant_analysis,
+    "dispute": _dispute_analysis,
+    "recipient": _recipient_analysis,
+}
+
+
+async def _run_in_thread(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+
 class Specialist:
     """
     The Specialist agent provides expert knowledge in a specific domain.
     For example, a traffic specialist or a merchant relations specialist.
+
+    A specialist whose name names a domain in ANALYSES ("Traffic",
+    "Merchant Relations", "Dispute", "Recipient") can analyze a scenario
+    with that domain's tools and return structured Findings.
     """
-    def __init__(self, name):
+    def __init__(self, name, domain=None):
         self.name = name
+        self.domain = domain or next((d for d in ANALYSES if d in name.lower()), None)
         print(f"Specialist agent '{self.name}' initialized.")
 
     def provide_analysis(self, topic):
@@ -12,5 +184,128 @@ class Specialist:
         Provides analysis on a specific topic.
         """
         print(f"Specialist '{self.name}' providing analysis on: {topic}")
-        # In the future, this will involve specialized knowledge and tools.
         return f"Analysis for {topic}."
+
+    async def analyze_async(self, scenario, findings=None, run_cpu=_run_in_thread):
+        """
+        Analyzes a scenario in this specialist's domain. Pass `findings` to
+        keep the partial results if the call is cancelled.
+        """
+        if self.domain not in ANALYSES:
+            raise ValueError(f"Specialist '{self.name}' has no domain analysis.")
+        findings = findings if findings is not None else Findings(self.name, self.domain)
+        start = monotonic()
+        try:
+            findings.summary = await ANALYSES[self.domain](scenario, classify(scenario).entities, findings.facts, run_cpu)
+            findings.status = "complete"
+        except asyncio.CancelledError:
+            findings.status = "partial"
+            raise
+        except Exception as e:
+            findings.status = "error"
+            findings.summary = f"{type(e).__name__}: {e}"
+        finally:
+            findings.elapsed_s = monotonic() - start
+        return findings
+
+
+class SpecialistPool:
+    """
+    Consults several specialists about a scenario in parallel and
+    aggregates their findings.
+
+    The specialists are coroutines on the caller's event loop, not
+    processes: their tool calls are I/O and overlap there. Only CPU-heavy
+    steps (ETA matrices, routing, assignment) leave the loop. They go to a
+    pool of `processes` worker processes, or with the default of 0 to the
+    loop's thread pool, which the GIL limits to one core. After
+    `deadline_s` the specialists still working are cancelled and their
+    partial findings are aggregated with the rest, so one slow domain does
+    not hold up the resolution.
+    """
+    def __init__(self, specialists=None, deadline_s=DEFAULT_DEADLINE_S, processes=0):
+        if specialists is None:
+            specialists = [Specialist(name) for name in ("Traffic", "Merchant Relations", "Dispute", "Recipient")]
+        self.specialists = {specialist.domain: specialist for specialist in specialists}
+        self.deadline_s = deadline_s
+        self.processes = processes if processes is not None else os.cpu_count()
+        self._executor = None
+        self._lock = threading.Lock()
+        self.counts = {"consultations": 0, "complete": 0, "partial": 0, "error": 0}
+
+    def _cpu_executor(self):
+        with self._lock:
+            if self._executor is None and self.processes:
+                self._executor = ProcessPoolExecutor(max_workers=self.processes)
+            return self._executor
+
+    async def run_cpu(self, fn, *args):
+        """
+        Runs a CPU-bound, picklable function on the worker processes (or a thread).
+        """
+        return await asyncio.get_running_loop().run_in_executor(self._cpu_executor(), fn, *args)
+
+    def domains_for(self, scenario):
+        """
+        The domains a scenario touches: every one whose disruption type scores
+        above zero, or all of them when none does.
+        """
+        scores = classify(scenario).scores
+        domains = [DOMAIN_OF_KIND[kind] for kind, score in sorted(scores.items(), key=lambda item: -item[1])
+                   if score > 0 and DOMAIN_OF_KIND.get(kind) in self.specialists]
+        return domains or list(self.specialists)
+
+    async def consult(self, scenario, domains=None, deadline_s=None):
+        """
+        Asks the specialists for `domains` (default: domains_for(scenario))
+        in parallel and returns their findings, finished or not by the deadline.
+        """
+        deadline_s = self.deadline_s if deadline_s is None else deadline_s
+        domains = domains or self.domains_for(scenario)
+        start = monotonic()
+        findings = [Findings(self.specialists[domain].name, domain) for domain in domains]
+        tasks = [
+            asyncio.create_task(self.specialists[domain].analyze_async(scenario, found, self.run_cpu))
+            for domain, found in zip(domains, findings)
+        ]
+        _, pending = await asyncio.wait(tasks, timeout=deadline_s)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        for found in findings:
+            if found.status == "partial" and not found.summary:
+                found.summary = f"No conclusion within {deadline_s:.1f}s; facts gathered so far: {', '.join(found.facts) or 'none'}."
+        with self._lock:
+            self.counts["consultations"] += 1
+            for found in findings:
+                self.counts[found.status] += 1
+        return aggregate(findings, monotonic() - start)
+
+    def consult_sync(self, scenario, domains=None, deadline_s=None):
+        """
+        Blocking wrapper around consult().
+        """
+        return run_sync(self.consult(scenario, domains, deadline_s))
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counts)
+
+
+def aggregate(findings, elapsed_s):
+    """
+    Combines specialists' findings into one report, with a summary line per domain.
+    """
+    return {
+        "findings": [found.as_dict() for found in findings],
+        "complete": [found.domain for found in findings if found.status == "complete"],
+        "partial": [found.domain for found in findings if found.status != "complete"],
+        "summary": "\n".join(f"[{found.domain}] {found.summary}" for found in findings),
+        "elapsed_s": round(elapsed_s, 3),
+    }
@@ -0,0 +1,152 @@
+import asyncio
+import json
+import threading
+
+from langchain_core.agents import AgentAction
+from langchain_core.messages import HumanMessage, SystemMessage, ToolMessage
+from langchain_core.tools import StructuredTool
+
+from src.agent.fastpath import classify
+
+# The tools offered for each disruption type, by their agent-facing names.
+# Unclassified disruptions get every tool and every protocol.
+TOOLS_BY_KIND = {
+    "dispute": (
+        "Initiate Mediation Flow", "Mediate Dispute", "Collect Evidence", "Analyze Evidence", "Issue Instant Refund",
+        "Exonerate Driver", "Log Merchant Packaging Feedback", "Notify Resolution",
+    ),
+    "recipient_unavailable": (
+        "Contact Recipient via Chat", "Suggest Safe Drop-off", "Find Nearby Locker", "Get Driver Location", "Notify Customer",
+    ),
+    "traffic": (
+        "Calculate Alternative Route", "Check Flight Status", "Check Traffic", "Notify Passenger and Driver",
+        "Re-route Driver", "Get Driver Location",
+    ),
+    "merchant": (
+        "Get Merchant Status", "Get Nearby Merchants", "Notify Customer", "Re-route Driver", "Get Driver Location",
+    ),
+}
+TOOL_CALLING_INSTRUCTIONS = (
+    "Call tools to gather information and act. When several calls do not depend on each other, "
+    "request them together in one turn; they run concurrently. When the disruption is handled, "
+    "reply without tool calls, giving the final plan or resolution statement."
+)
+
+
+def build_tools(tool_specs):
+    """
+    Builds structured tools from (name, func, coroutine, description) specs.
+    Function-calling APIs only accept identifier-like names, so each tool is
+    named after its function (get_merchant_status); returns the tools and a
+    map from those names back to the agent-facing ones.
+    """
+    tools, names = [], {}
+    for name, func, coroutine, description in tool_specs:
+        tool = StructuredTool.from_function(func=func, coroutine=coroutine, name=func.__name__, description=description)
+        tools.append(tool)
+        names[tool.name] = name
+    return tools, names
+
+
+class ToolCallingAgent:
+    """
+    Resolves a disruption with a chat model's native tool calling.
+
+    Each turn the model may request several tool calls, which run
+    concurrently; the loop ends when it answers without tool calls (or
+    after `max_turns`). The system prompt holds only the protocol for the
+    classified disruption type, and only that type's tools are bound.
+    Exposes the AgentExecutor interface the Coordinator uses:
+    ainvoke({"input": ...}, config) returns input, output and
+    intermediate_steps (with agent-facing tool names).
+    """
+    def __init__(self, llm, tool_specs, protocols, introduction, max_turns=8):
+        self.llm = llm
+        self.max_turns = max_turns
+        self.protocols = protocols
+        self.introduction = introduction.strip()
+        self.tools, self._names = build_tools(tool_specs)
+        self._by_name = {tool.name: tool for tool in self.tools}
+        by_label = {label: tool for tool, label in zip(self.tools, (spec[0] for spec in tool_specs))}
+        self._tools_by_kind = {
+            kind: [by_label[label] for label in labels if label in by_label] for kind, labels in TOOLS_BY_KIND.items()
+        }
+        self._bound = {}
+        self._lock = threading.Lock()
+        self.counts = {"resolutions": 0, "turns": 0, "tool_calls": 0, "input_tokens": 0, "output_tokens": 0,
+                       "total_tokens": 0, "turn_limit": 0}
+
+    def system_prompt(self, kind):
+        if kind in self.protocols:
+            protocols = self.protocols[kind]
+        elif kind in self._tools_by_kind:
+            protocols = ""
+        else:
+            protocols = "\n\n".join(self.protocols.values())
+        return "\n\n".join(part for part in (self.introduction, protocols, TOOL_CALLING_INSTRUCTIONS) if part)
+
+    def _model_for(self, kind):
+        with self._lock:
+            if kind not in self._bound:
+                self._bound[kind] = self.llm.bind_tools(self._tools_by_kind.get(kind, self.tools))
+            return self._bound[kind]
+
+    async def _call(self, call):
+        tool = self._by_name.get(call["name"])
+        if tool is None:
+            return f"Error: there is no tool named {call['name']}."
+        try:
+            return await tool.ainvoke(call["args"])
+        except Exception as e:
+            return f"Error: {type(e).__name__}: {e}"
+
+    async def ainvoke(self, inputs, config=None):
+        scenario = inputs["input"]
+        kind = classify(scenario).kind
+        model = self._model_for(kind)
+        messages = [SystemMessage(self.system_prompt(kind)), HumanMessage(scenario)]
+        steps = []
+        usage = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+        output = None
+        turns = 0
+        for turns in range(1, self.max_turns + 1):
+            message = await model.ainvoke(messages, config=config)
+            messages.append(message)
+            for key, value in (getattr(message, "usage_metadata", None) or {}).items():
+                if key in usage:
+                    usage[key] += value
+            if not message.tool_calls:
+                output = message.content
+                break
+            observations = await asyncio.gather(*(self._call(call) for call in message.tool_calls))
+            for call, observation in zip(message.tool_calls, observations):
+                label = self._names.get(call["name"], call["name"])
+                steps.append((AgentAction(label, call["args"], ""), observation))
+                content = observation if isinstance(observation, str) else json.dumps(observation, default=str)
+                messages.append(ToolMessage(content, tool_call_id=call["id"]))
+        with self._lock:
+            self.counts["resolutions"] += 1
+            self.counts["turns"] += turns
+            self.counts["tool_calls"] += len(steps)
+            for key, value in usage.items():
+                self.counts[key] += value
+            if output is None:
+                self.counts["turn_limit"] += 1
+        if output is None:
+            output = f"Agent stopped after {self.max_turns} turns."
+        return {"input": scenario, "output": output, "intermediate_steps": steps, "turns": turns,
+                "disruption_type": kind, "usage": usage}
+
+    def stats(self):
+        """
+        Totals and per-resolution averages of turns, tool calls and tokens.
+        """
+        with self._lock:
+            counts = dict(self.counts)
+        resolutions, turns = counts["resolutions"], counts["turns"]
+        return {
+            **counts,
+            "turns_per_resolution": round(turns / resolutions, 3) if resolutions else None,
+            "tokens_per_resolution": round(counts["total_tokens"] / resolutions, 1) if resolutions else None,
+            "tool_calls_per_turn": round(counts["tool_calls"] / turns, 3) if turns else None,
+        }
@@ -1,4 +1,5 @@
 import argparse
+import json
 import sys
 import os
 
@@ -6,6 +7,12 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.agent.coordinator import Coordinator
+from src.agent.batch import read_scenarios
+from src.agent.ingest import ingest
+from src.agent.service import run_service
+from src.tools import replay, runtime
+from src.tools.runtime import run as run_async
+from src.telemetry import tracing
 
 def main():
     """
@@ -16,6 +23,7 @@ def main():
     parser.add_argument(
         "scenario",
         type=str,
+        nargs="?",
         help="A natural language description of the disruption scenario to resolve.",
     )
     parser.add_argument(
@@ -23,8 +31,128 @@ def main():
         action="store_true",
         help="Use a mock LLM for testing without an API key.",
     )
+    parser.add_argument(
+        "--agent",
+        choices=Coordinator.AGENT_MODES,
+        default="react",
+        help="LLM agent: the ReAct text loop, or native tool calling with concurrent calls (default: react).",
+    )
+    parser.add_argument(
+        "--specialists",
+        action="store_true",
+        help="Consult the domain specialists in parallel before the LLM agent and give it their findings.",
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="Resolve every scenario in a JSONL file (one string or {\"scenario\": ...} object per line).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="Number of concurrent workers in batch and service mode (default: 8).",
+    )
+    parser.add_argument(
+        "--order",
+        choices=["input", "completion"],
+        default="input",
+        help="Write batch results in input order or as they complete (default: input).",
+    )
+    parser.add_argument(
+        "--output",
+        metavar="FILE",
+        help="Write batch results as JSONL to this file instead of stdout.",
+    )
+    parser.add_argument(
+        "--serve",
+        choices=["stdin", "http"],
+        help="Run as a resident service: read JSONL requests from stdin, or accept them over HTTP.",
+    )
+    parser.add_argument(
+        "--ingest",
+        metavar="FILE",
+        help="Stream JSONL disruption reports from FILE ('-' for stdin), resolving each incident once.",
+    )
+    parser.add_argument(
+        "--window",
+        type=float,
+        default=60.0,
+        metavar="SECONDS",
+        help="How long an incident keeps absorbing duplicate reports in ingest mode (default: 60).",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="HTTP service host (default: 127.0.0.1).")
+    parser.add_argument("--port", type=int, default=8080, help="HTTP service port (default: 8080).")
+    parser.add_argument("--unix", metavar="PATH", help="Serve HTTP on this Unix socket instead of a TCP port.")
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        metavar="SECONDS",
+        help="Default per-request deadline in service mode.",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="Record spans for the agent, LLM and tool calls and write them to FILE as OTLP JSON.",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        metavar="PORT",
+        help="Record spans and serve Prometheus metrics on http://127.0.0.1:PORT/metrics.",
+    )
+    parser.add_argument(
+        "--record",
+        metavar="FILE",
+        help="Record every tool call, its result and each disruption's output to FILE (gzipped if it ends in .gz).",
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="FILE",
+        help="Re-resolve the disruptions recorded in FILE, serving tool calls from it in virtual time, and report changed outputs.",
+    )
+    parser.add_argument("--seed", type=int, help="Seed the simulated tools' randomness, for repeatable runs.")
     args = parser.parse_args()
+    modes = sum(x is not None for x in (args.scenario, args.batch, args.serve, args.ingest, args.replay))
+    if modes == 0:
+        parser.error("a scenario, --batch FILE, --serve, --ingest FILE or --replay FILE is required.")
+    if modes > 1:
+        parser.error("a scenario, --batch, --serve, --ingest and --replay cannot be combined.")
+    if args.record and args.replay:
+        parser.error("--record and --replay cannot be combined.")
+
+    if args.trace or args.metrics_port is not None:
+        tracing.enable()
+    if args.metrics_port is not None:
+        tracing.serve_metrics(args.metrics_port)
+    if args.seed is not None:
+        runtime.seed(args.seed)
+    if args.record:
+        replay.set_session(replay.Recorder(args.record))
+    try:
+        if args.batch:
+            run_batch(args)
+        elif args.serve:
+            serve(args)
+        elif args.ingest:
+            run_ingest(args)
+        elif args.replay:
+            run_replay(args)
+        else:
+            run_scenario(args)
+    finally:
+        if args.record:
+            recorder = replay.set_session(None)
+            recorder.close()
+            print(f"Recorded {recorder.calls} tool calls and {recorder.disruptions} disruptions to {args.record}.", file=sys.stderr)
+        if args.trace:
+            tracing.write_otlp(args.trace)
+            print(f"Wrote {len(tracing.tracer.spans)} spans to {args.trace}.", file=sys.stderr)
 
+def run_scenario(args):
+    """
+    Resolves a single scenario and prints the agent's final output.
+    """
     print("--- Starting Project Synapse ---")
     print(f"Received disruption scenario: '{args.scenario}'")
     if args.mock_llm:
@@ -33,7 +161,7 @@ def main():
 
     try:
         # Initialize the coordinator agent
-        coordinator = Coordinator(use_mock_llm=args.mock_llm)
+        coordinator = Coordinator(use_mock_llm=args.mock_llm, agent_mode=args.agent, specialists=args.specialists)
 
         # Handle the disruption
         result = coordinator.handle_disruption(args.scenario)
@@ -49,5 +177,94 @@ def main():
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
 
+def run_batch(args):
+    """
+    Builds the coordinator once and streams every scenario in the batch file through it.
+    """
+    stdout = sys.stdout
+    if args.output:
+        output = open(args.output, "w")
+    else:
+        # Tool and agent logging goes to stderr so stdout stays valid JSONL.
+        output, sys.stdout = stdout, sys.stderr
+    try:
+        coordinator = Coordinator(use_mock_llm=args.mock_llm, agent_mode=args.agent, specialists=args.specialists)
+        with open(args.batch) as batch_file:
+            records = coordinator.handle_many(
+                read_scenarios(batch_file),
+                max_workers=args.workers,
+                ordered=args.order == "input",
+            )
+            for record in records:
+                output.write(json.dumps(record) + "\n")
+                output.flush()
+    except ValueError as e:
+        print(f"Error: {e}")
+    finally:
+        sys.stdout = stdout
+        if output is not stdout:
+            output.close()
+
+def serve(args):
+    """
+    Keeps one warm coordinator and resolves requests until input ends or a signal arrives.
+    """
+    stdout = sys.stdout
+    if args.serve == "stdin":
+        # Tool and agent logging goes to stderr so stdout stays valid JSONL.
+        sys.stdout = sys.stderr
+    try:
+        coordinator = Coordinator(use_mock_llm=args.mock_llm, agent_mode=args.agent, specialists=args.specialists)
+        stats = run_async(run_service(
+            coordinator,
+            mode=args.serve,
+            concurrency=args.workers,
+            deadline_s=args.deadline,
+            host=args.host,
+            port=args.port,
+            unix_path=args.unix,
+            output=stdout,
+        ))
+        print(f"Service stopped: {stats}", file=sys.stderr)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+    finally:
+        sys.stdout = stdout
+
+def run_ingest(args):
+    """
+    Streams reports through the ingestion pipeline, one result record per report.
+    """
+    stdout = sys.stdout
+    # Tool and agent logging goes to stderr so stdout stays valid JSONL.
+    sys.stdout = sys.stderr
+    source = sys.stdin if args.ingest == "-" else open(args.ingest)
+    try:
+        coordinator = Coordinator(use_mock_llm=args.mock_llm, agent_mode=args.agent, specialists=args.specialists)
+        stats = run_async(ingest(coordinator, source, output=stdout, window_s=args.window, concurrency=args.workers))
+        print(f"Ingestion finished: {stats}", file=sys.stderr)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+    finally:
+        sys.stdout = stdout
+        if source is not sys.stdin:
+            source.close()
+
+def run_replay(args):
+    """
+    Replays a recorded run through a fresh coordinator and prints the comparison as JSON.
+    """
+    stdout = sys.stdout
+    # Tool and agent logging goes to stderr so stdout holds only the report.
+    sys.stdout = sys.stderr
+    try:
+        coordinator = Coordinator(use_mock_llm=args.mock_llm, agent_mode=args.agent, specialists=args.specialists)
+        report = replay.replay_disruptions(coordinator, args.replay)
+        stdout.write(json.dumps(report, indent=2) + "\n")
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+    finally:
+        sys.stdout = stdout
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,243 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Entity fields of a context value that get a secondary index.
+INDEXED_FIELDS = ("order_id", "driver_id", "customer_id", "merchant_id")
+# Version of the SQLite schema: 1 stores keys JSON-encoded.
+SCHEMA_VERSION = 1
+
+
+def _entities(value):
+    """
+    Returns the indexed entity ids carried by a context value (top-level keys of a dict).
+    """
+    if not isinstance(value, dict):
+        return {}
+    return {field: str(value[field]) for field in INDEXED_FIELDS if value.get(field) is not None}
+
+
+def _encode_key(key):
+    return json.dumps(key, separators=(",", ":"))
+
+
+def _decode_key(text):
+    """
+    The key stored as `text`; JSON arrays come back as tuples, the only
+    hashable keys they can have been.
+    """
+    def tuples(value):
+        return tuple(tuples(item) for item in value) if isinstance(value, list) else value
+
+    return tuples(json.loads(text))
+
+
+def _check_field(field):
+    if field not in INDEXED_FIELDS:
+        raise ValueError(f"'{field}' is not an indexed field; expected one of {', '.join(INDEXED_FIELDS)}.")
+
+
+class LRUBackend:
+    """
+    A bounded in-memory store. Once `max_entries` is reached the least
+    recently used entry is evicted. Entries may carry a TTL in seconds.
+    """
+    def __init__(self, max_entries=100_000, clock=time.monotonic):
+        if max_entries is not None and max_entries < 1:
+            raise ValueError("max_entries must be at least 1.")
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries = OrderedDict()
+        # field -> entity id -> keys (a dict used as an insertion-ordered set)
+        self._index = {field: {} for field in INDEXED_FIELDS}
+        self._lock = threading.RLock()
+        self.evictions = 0
+
+    def _unindex(self, key, entities):
+        for field, entity in entities.items():
+            keys = self._index[field].get(entity)
+            if keys is not None:
+                keys.pop(key, None)
+                if not keys:
+                    del self._index[field][entity]
+
+    def _pop(self, key):
+        _, _, entities = self._entries.pop(key)
+        self._unindex(key, entities)
+
+    def _live(self, key):
+        """
+        Returns the entry for `key`, dropping it if it has expired.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= self._clock():
+            self._pop(key)
+            return None
+        return entry
+
+    def put_many(self, items, ttl=None):
+        expires_at = self._clock() + ttl if ttl is not None else None
+        with self._lock:
+            for key, value in items:
+                if key in self._entries:
+                    self._pop(key)
+                entities = _entities(value)
+                self._entries[key] = (value, expires_at, entities)
+                for field, entity in entities.items():
+                    self._index[field].setdefault(entity, {})[key] = None
+                if self.max_entries is not None and len(self._entries) > self.max_entries:
+                    self._pop(next(iter(self._entries)))
+                    self.evictions += 1
+
+    def get_many(self, keys):
+        result = {}
+        with self._lock:
+            for key in keys:
+                entry = self._live(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    result[key] = entry[0]
+        return result
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+
+    def find(self, field, entity, limit=None):
+        _check_field(field)
+        with self._lock:
+            keys = list(self._index[field].get(str(entity), ()))
+            result = {}
+            for key in keys:
+                entry = self._live(key)
+                if entry is not None:
+                    result[key] = entry[0]
+        if limit is not None:
+            result = dict(list(result.items())[-limit:])
+        return result
+
+    def items(self):
+        with self._lock:
+            self.purge_expired()
+            return {key: entry[0] for key, entry in self._entries.items()}
+
+    def purge_expired(self):
+        with self._lock:
+            now = self._clock()
+            expired = [key for key, entry in self._entries.items() if entry[1] is not None and entry[1] <= now]
+            for key in expired:
+                self._pop(key)
+            return len(expired)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def close(self):
+        pass
+
+
+class SQLiteBackend:
+    """
+    A persistent store in a SQLite database running in WAL mode.
+
+    Keys and values are stored as JSON, so they must be JSON-serialisable;
+    keys read back with their type (1 and "1" are different keys, and tuple
+    keys stay tuples), as in the in-memory backend. The entity
+    fields of dict values (see INDEXED_FIELDS) are copied into indexed
+    columns, which makes fetching an entity's history an index lookup.
+    Entries may carry a TTL in seconds; expired rows are hidden from reads
+    and removed by purge_expired().
+    """
+    def __init__(self, path="context.db", clock=time.time):
+        self.path = str(path)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        columns = ", ".join(f"{field} TEXT" for field in INDEXED_FIELDS)
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS context (key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            f"created_at REAL NOT NULL, expires_at REAL, {columns})"
+        )
+        for field in INDEXED_FIELDS:
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS context_{field} ON context ({field}, created_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS context_expires_at ON context (expires_at) WHERE expires_at IS NOT NULL")
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            # Databases written before keys were JSON-encoded hold them as plain strings.
+            self._conn.execute("UPDATE context SET key = json_quote(key)")
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def put_many(self, items, ttl=None):
+        now = self._clock()
+        expires_at = now + ttl if ttl is not None else None
+        rows = []
+        for key, value in items:
+            entities = _entities(value)
+            rows.append((_encode_key(key), json.dumps(value), now, expires_at, *(entities.get(field) for field in INDEXED_FIELDS)))
+        placeholders = ", ".join("?" * (4 + len(INDEXED_FIELDS)))
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    f"INSERT OR REPLACE INTO context (key, value, created_at, expires_at, {', '.join(INDEXED_FIELDS)}) "
+                    f"VALUES ({placeholders})",
+                    rows,
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _select(self, where, params):
+        sql = f"SELECT key, value FROM context WHERE ({where}) AND (expires_at IS NULL OR expires_at > ?)"
+        with self._lock:
+            rows = self._conn.execute(sql, (*params, self._clock())).fetchall()
+        return {_decode_key(key): json.loads(value) for key, value in rows}
+
+    def get_many(self, keys):
+        keys = list(keys)
+        encoded = [_encode_key(key) for key in keys]
+        result = {}
+        # Stay well below SQLite's limit on bound parameters.
+        for start in range(0, len(encoded), 500):
+            chunk = encoded[start:start + 500]
+            result.update(self._select(f"key IN ({', '.join('?' * len(chunk))})", chunk))
+        return {key: result[key] for key in keys if key in result}
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM context WHERE key = ?", (_encode_key(key),))
+
+    def find(self, field, entity, limit=None):
+        _check_field(field)
+        sql = (
+            f"SELECT key, value FROM context WHERE {field} = ? AND (expires_at IS NULL OR expires_at > ?) "
+            f"ORDER BY created_at DESC, rowid DESC"
+        )
+        params = [str(entity), self._clock()]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return {_decode_key(key): json.loads(value) for key, value in reversed(rows)}
+
+    def items(self):
+        return self._select("1", ())
+
+    def purge_expired(self):
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM context WHERE expires_at IS NOT NULL AND expires_at <= ?", (self._clock(),))
+            return cursor.rowcount
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM context").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,28 +1,69 @@
+from src.memory.backends import LRUBackend
+
+
 class ContextMemory:
     """
-    A simple in-memory store for the agent's context.
-    This can be replaced with a more sophisticated database or vector store in the future.
+    A store for the agent's context, backed by a pluggable backend.
+    The default is a bounded in-memory LRU (see src/memory/backends.py); pass
+    a SQLiteBackend for a persistent store that survives restarts.
     """
-    def __init__(self):
-        self._memory = {}
-        print("Context memory initialized.")
+    def __init__(self, backend=None):
+        self.backend = backend if backend is not None else LRUBackend()
+        print(f"Context memory initialized ({type(self.backend).__name__}).")
 
-    def add_context(self, key, value):
+    def add_context(self, key, value, ttl=None):
         """
         Adds a piece of context to the memory.
+        With `ttl` (seconds) the entry expires after that long.
+        """
+        self.backend.put_many([(key, value)], ttl=ttl)
+
+    def add_many(self, items, ttl=None):
+        """
+        Adds many pieces of context at once, from a dict or (key, value) pairs.
         """
-        print(f"Adding context for key '{key}': {value}")
-        self._memory[key] = value
+        if isinstance(items, dict):
+            items = items.items()
+        self.backend.put_many(items, ttl=ttl)
 
     def get_context(self, key):
         """
         Retrieves a piece of context from the memory.
         """
-        print(f"Retrieving context for key '{key}'...")
-        return self._memory.get(key)
+        return self.backend.get_many([key]).get(key)
+
+    def get_many(self, keys):
+        """
+        Retrieves many pieces of context at once. Missing keys are left out.
+        """
+        return self.backend.get_many(keys)
+
+    def remove_context(self, key):
+        """
+        Removes a piece of context, if present.
+        """
+        self.backend.delete(key)
+
+    def get_history(self, field, entity_id, limit=None):
+        """
+        Retrieves the context stored for one entity, oldest first.
+        `field` is one of "order_id", "driver_id", "customer_id" or
+        "merchant_id" and matches dict values carrying that field.
+        With `limit`, only the most recent entries are returned.
+        """
+        return self.backend.find(field, entity_id, limit=limit)
 
     def get_all_context(self):
         """
         Retrieves all context from the memory.
         """
-        return self._memory
+        return self.backend.items()
+
+    def purge_expired(self):
+        """
+        Drops expired entries and returns how many were removed.
+        """
+        return self.backend.purge_expired()
+
+    def close(self):
+        self.backend.close()
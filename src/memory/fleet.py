@@ -0,0 +1,315 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+from src.tools.spatial import EARTH_RADIUS_KM, KM_PER_DEGREE
+
+DRIVER_STATUSES = ("offline", "idle", "to_pickup", "delivering")
+ORDER_STATUSES = ("open", "assigned", "picked_up", "delivered", "cancelled")
+ID_BYTES = 32
+NO_ROW = -1
+
+# One row per driver / order. Ids are stored fixed-width so a snapshot is a
+# single flat array; `driver` and `order` link the tables by row number.
+DRIVER_DTYPE = np.dtype([
+    ("id", f"S{ID_BYTES}"), ("live", "?"), ("status", "i1"), ("latitude", "f8"), ("longitude", "f8"),
+    ("order", "i4"), ("eta_min", "f4"), ("updated_at", "f8"),
+])
+ORDER_DTYPE = np.dtype([
+    ("id", f"S{ID_BYTES}"), ("live", "?"), ("status", "i1"), ("pickup_latitude", "f8"), ("pickup_longitude", "f8"),
+    ("dropoff_latitude", "f8"), ("dropoff_longitude", "f8"), ("driver", "i4"), ("eta_min", "f4"), ("updated_at", "f8"),
+])
+
+
+def _code(statuses, status):
+    try:
+        return statuses.index(status)
+    except ValueError:
+        raise ValueError(f"Unknown status '{status}'; expected one of {', '.join(statuses)}.") from None
+
+
+class _Table:
+    """
+    A growable structured array with an id -> row index. Deleted rows are
+    marked dead and reused; new rows are appended up to `size`, and the
+    array doubles when full.
+    """
+    def __init__(self, dtype, capacity=1024, data=None):
+        self.data = data if data is not None else np.zeros(capacity, dtype)
+        live = np.flatnonzero(self.data["live"])
+        self.size = int(live[-1]) + 1 if len(live) else 0
+        self.index = {key.decode(): int(row) for key, row in zip(self.data["id"][live], live)}
+        self._free = [int(row) for row in np.flatnonzero(~self.data["live"][:self.size])]
+
+    def __len__(self):
+        return len(self.index)
+
+    def add(self, key):
+        encoded = key.encode()
+        if len(encoded) > ID_BYTES:
+            raise ValueError(f"Id '{key}' is longer than {ID_BYTES} bytes.")
+        if self._free:
+            row = self._free.pop()
+        else:
+            if self.size == len(self.data):
+                grown = np.zeros(max(2 * len(self.data), 1024), self.data.dtype)
+                grown[:self.size] = self.data[:self.size]
+                self.data = grown
+            row = self.size
+            self.size += 1
+        self.data[row] = np.zeros((), self.data.dtype)
+        self.data[row]["id"] = encoded
+        self.data[row]["live"] = True
+        self.index[key] = row
+        return row
+
+    def remove(self, key):
+        row = self.index.pop(key)
+        self.data[row]["live"] = False
+        self._free.append(row)
+        return row
+
+    def view(self):
+        """
+        The rows in use (live or reusable); filter them on the `live` column.
+        """
+        return self.data[:self.size]
+
+
+class FleetStore:
+    """
+    Live state of every driver (position, status, current order, ETA) and
+    open order, kept in NumPy columns instead of per-entity dicts.
+
+    Updates by id are O(1) through an id -> row index; fleet-wide filters,
+    such as idle drivers within a radius, are single vectorized passes.
+    snapshot() writes both tables as .npy files, and restore() maps them
+    back into memory without reading them up front. Thread-safe.
+    """
+    def __init__(self, driver_capacity=1024, order_capacity=1024, clock=time.time):
+        self.drivers = _Table(DRIVER_DTYPE, driver_capacity)
+        self.orders = _Table(ORDER_DTYPE, order_capacity)
+        self._clock = clock
+        self._lock = threading.RLock()
+
+    # Drivers
+
+    def update_driver(self, driver_id, latitude=None, longitude=None, status=None, eta_min=None):
+        """
+        Creates or updates a driver; only the given fields change.
+        New drivers start "offline" with no position or order.
+        """
+        with self._lock:
+            row = self.drivers.index.get(driver_id)
+            created = row is None
+            if created:
+                row = self.drivers.add(driver_id)
+            data = self.drivers.data
+            if created:
+                data[row]["latitude"] = data[row]["longitude"] = np.nan
+                data[row]["order"] = NO_ROW
+                data[row]["eta_min"] = np.nan
+            if latitude is not None:
+                data[row]["latitude"], data[row]["longitude"] = latitude, longitude
+            if status is not None:
+                data[row]["status"] = _code(DRIVER_STATUSES, status)
+            if eta_min is not None:
+                data[row]["eta_min"] = eta_min
+            data[row]["updated_at"] = self._clock()
+
+    def update_drivers(self, driver_ids, latitudes, longitudes):
+        """
+        Moves many known drivers at once (e.g. a GPS batch).
+        """
+        with self._lock:
+            rows = np.fromiter((self.drivers.index[driver_id] for driver_id in driver_ids), np.int64)
+            data = self.drivers.data
+            data["latitude"][rows] = latitudes
+            data["longitude"][rows] = longitudes
+            data["updated_at"][rows] = self._clock()
+
+    def remove_driver(self, driver_id):
+        with self._lock:
+            row = self.drivers.remove(driver_id)
+            order = self.drivers.data[row]["order"]
+            if order != NO_ROW:
+                self.orders.data[order]["driver"] = NO_ROW
+
+    def driver(self, driver_id):
+        """
+        A driver's state as a dict, or None if unknown.
+        """
+        with self._lock:
+            row = self.drivers.index.get(driver_id)
+            if row is None:
+                return None
+            record = self.drivers.data[row]
+            order = int(record["order"])
+            return {
+                "driver_id": driver_id,
+                "status": DRIVER_STATUSES[record["status"]],
+                "location": {"latitude": float(record["latitude"]), "longitude": float(record["longitude"])},
+                "order_id": self.orders.data[order]["id"].decode() if order != NO_ROW else None,
+                "eta_min": None if np.isnan(record["eta_min"]) else float(record["eta_min"]),
+                "updated_at": float(record["updated_at"]),
+            }
+
+    # Orders
+
+    def update_order(self, order_id, pickup=None, dropoff=None, status=None, eta_min=None):
+        """
+        Creates or updates an order; `pickup` and `dropoff` are (lat, lon) pairs.
+        """
+        with self._lock:
+            row = self.orders.index.get(order_id)
+            created = row is None
+            if created:
+                row = self.orders.add(order_id)
+            data = self.orders.data
+            if created:
+                data[row]["driver"] = NO_ROW
+                data[row]["eta_min"] = np.nan
+            if pickup is not None:
+                data[row]["pickup_latitude"], data[row]["pickup_longitude"] = pickup
+            if dropoff is not None:
+                data[row]["dropoff_latitude"], data[row]["dropoff_longitude"] = dropoff
+            if status is not None:
+                data[row]["status"] = _code(ORDER_STATUSES, status)
+                if status in ("delivered", "cancelled"):
+                    self._unassign(row)
+            if eta_min is not None:
+                data[row]["eta_min"] = eta_min
+            data[row]["updated_at"] = self._clock()
+
+    def _unassign(self, order_row):
+        driver = self.orders.data[order_row]["driver"]
+        if driver != NO_ROW:
+            self.drivers.data[driver]["order"] = NO_ROW
+            self.drivers.data[driver]["status"] = DRIVER_STATUSES.index("idle")
+            self.orders.data[order_row]["driver"] = NO_ROW
+
+    def remove_order(self, order_id):
+        with self._lock:
+            self._unassign(self.orders.index[order_id])
+            self.orders.remove(order_id)
+
+    def assign(self, order_id, driver_id, eta_min=None):
+        """
+        Gives an order to a driver, releasing any order the driver had and
+        any driver the order had.
+        """
+        with self._lock:
+            order = self.orders.index[order_id]
+            driver = self.drivers.index[driver_id]
+            previous = self.drivers.data[driver]["order"]
+            if previous != NO_ROW:
+                self._unassign(previous)
+            self._unassign(order)
+            self.orders.data[order]["driver"] = driver
+            self.orders.data[order]["status"] = ORDER_STATUSES.index("assigned")
+            self.drivers.data[driver]["order"] = order
+            self.drivers.data[driver]["status"] = DRIVER_STATUSES.index("to_pickup")
+            if eta_min is not None:
+                self.orders.data[order]["eta_min"] = self.drivers.data[driver]["eta_min"] = eta_min
+            self.orders.data[order]["updated_at"] = self.drivers.data[driver]["updated_at"] = self._clock()
+
+    def order(self, order_id):
+        with self._lock:
+            row = self.orders.index.get(order_id)
+            if row is None:
+                return None
+            record = self.orders.data[row]
+            driver = int(record["driver"])
+            return {
+                "order_id": order_id,
+                "status": ORDER_STATUSES[record["status"]],
+                "pickup": (float(record["pickup_latitude"]), float(record["pickup_longitude"])),
+                "dropoff": (float(record["dropoff_latitude"]), float(record["dropoff_longitude"])),
+                "driver_id": self.drivers.data[driver]["id"].decode() if driver != NO_ROW else None,
+                "eta_min": None if np.isnan(record["eta_min"]) else float(record["eta_min"]),
+            }
+
+    # Fleet-wide queries
+
+    def drivers_near(self, latitude, longitude, radius_km, status="idle", limit=None):
+        """
+        Drivers with `status` (any status with None) within `radius_km` of a
+        point, nearest first, as (driver_id, distance_km) pairs.
+        """
+        with self._lock:
+            data = self.drivers.view()
+            mask = data["live"].copy()
+            if status is not None:
+                mask &= data["status"] == _code(DRIVER_STATUSES, status)
+            # A bounding box first, so only nearby rows pay for the haversine.
+            lat_span = radius_km / KM_PER_DEGREE
+            lon_span = radius_km / (KM_PER_DEGREE * max(np.cos(np.radians(latitude)), 1e-6))
+            mask &= np.abs(data["latitude"] - latitude) <= lat_span
+            mask &= np.abs(data["longitude"] - longitude) <= lon_span
+            rows = np.flatnonzero(mask)
+            lats, lons, ids = data["latitude"][rows], data["longitude"][rows], data["id"][rows]
+        phi1, phi2 = np.radians(latitude), np.radians(lats)
+        a = np.sin((phi2 - phi1) / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(np.radians(lons - longitude) / 2) ** 2
+        distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+        inside = np.flatnonzero(distances <= radius_km)
+        order = inside[np.argsort(distances[inside], kind="stable")][:limit]
+        return [(ids[i].decode(), float(distances[i])) for i in order]
+
+    def count_by_status(self):
+        with self._lock:
+            drivers, orders = self.drivers.view(), self.orders.view()
+            driver_counts = np.bincount(drivers["status"][drivers["live"]], minlength=len(DRIVER_STATUSES))
+            order_counts = np.bincount(orders["status"][orders["live"]], minlength=len(ORDER_STATUSES))
+        return {
+            "drivers": dict(zip(DRIVER_STATUSES, driver_counts.tolist())),
+            "orders": dict(zip(ORDER_STATUSES, order_counts.tolist())),
+        }
+
+    def unassigned_orders(self):
+        """
+        Ids of open orders that have no driver.
+        """
+        with self._lock:
+            data = self.orders.view()
+            mask = data["live"] & (data["status"] == ORDER_STATUSES.index("open")) & (data["driver"] == NO_ROW)
+            return [key.decode() for key in data["id"][mask]]
+
+    def stats(self):
+        return {
+            "drivers": len(self.drivers),
+            "orders": len(self.orders),
+            "bytes": self.drivers.data.nbytes + self.orders.data.nbytes,
+        }
+
+    # Snapshots
+
+    def snapshot(self, directory):
+        """
+        Writes both tables to `directory` as drivers.npy and orders.npy.
+        """
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            for name, table in (("drivers", self.drivers), ("orders", self.orders)):
+                path = os.path.join(directory, f"{name}.npy")
+                mapped = np.lib.format.open_memmap(path + ".tmp", mode="w+", dtype=table.data.dtype, shape=(table.size,))
+                mapped[:] = table.view()
+                mapped.flush()
+                del mapped
+                os.replace(path + ".tmp", path)
+
+    @classmethod
+    def restore(cls, directory, mmap=True, clock=time.time):
+        """
+        Loads a snapshot. With `mmap` the tables stay memory-mapped
+        copy-on-write: pages are read on first access and updates never
+        touch the files.
+        """
+        store = cls.__new__(cls)
+        store._clock = clock
+        store._lock = threading.RLock()
+        mode = "c" if mmap else None
+        store.drivers = _Table(DRIVER_DTYPE, data=np.load(os.path.join(directory, "drivers.npy"), mmap_mode=mode))
+        store.orders = _Table(ORDER_DTYPE, data=np.load(os.path.join(directory, "orders.npy"), mmap_mode=mode))
+        return store
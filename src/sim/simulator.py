@@ -0,0 +1,444 @@
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import os
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from src.agent.coordinator import Coordinator
+from src.memory.fleet import FleetStore
+from src.tools import logistics, runtime
+from src.tools.cache import clear_caches
+from src.tools.eta import DEFAULT_SPEED_KMH, ROAD_FACTOR
+from src.tools.spatial import KM_PER_DEGREE, haversine_km
+
+# Orders placed in each hour of the day (00:00-01:00 first) relative to the
+# daily mean: a lunch and a dinner peak over a quiet night.
+HOURLY_DEMAND = np.array([
+    0.3, 0.2, 0.1, 0.1, 0.1, 0.2, 0.4, 0.7, 0.9, 0.9, 1.1, 1.8,
+    2.2, 1.8, 1.1, 0.9, 1.1, 1.6, 2.2, 2.4, 1.8, 1.2, 0.7, 0.4,
+])
+HOURLY_DEMAND = HOURLY_DEMAND / HOURLY_DEMAND.mean()
+# Road speed in each hour as a share of the free-flow speed.
+HOURLY_SPEED = (
+    1.0, 1.0, 1.0, 1.0, 1.0, 0.95, 0.85, 0.65, 0.6, 0.75, 0.85, 0.8,
+    0.75, 0.8, 0.85, 0.8, 0.7, 0.6, 0.6, 0.7, 0.8, 0.9, 0.95, 1.0,
+)
+# Chance that an order runs into each kind of disruption, and the minutes it
+# still costs the driver once the coordinator has resolved it. A dispute is
+# raised after delivery, so it only loads the coordinator.
+DISRUPTION_RATES = {"merchant": 0.02, "traffic": 0.02, "recipient_unavailable": 0.03, "dispute": 0.01}
+DISRUPTION_DELAY_MIN = {"merchant": 10.0, "traffic": 6.0, "recipient_unavailable": 4.0, "dispute": 0.0}
+# Radii (km) searched in turn for the nearest idle driver.
+SEARCH_RADII_KM = (3.0, 10.0, 100.0)
+# "fast_path": the Coordinator's rule-based plans, with the mock agent for the
+# rest; "mock": the mock agent for everything.
+MODES = ("fast_path", "mock")
+
+
+@dataclass
+class SimConfig:
+    """
+    A simulated city day. Drivers, merchants and customers are spread over
+    a square of 2 * `radius_km` around `center`; `zones` splits it into
+    strips of longitude, each with its share of the drivers, merchants and
+    coordinator workers, simulated independently.
+    """
+    drivers: int = 10_000
+    merchants: int = 2_000
+    # Orders per driver over a full 24 h day.
+    orders_per_driver: float = 12.0
+    hours: float = 24.0
+    start_hour: int = 0
+    # Disruptions the coordinators resolve at once.
+    coordinators: int = 16
+    mode: str = "fast_path"
+    disruption_rates: dict = field(default_factory=lambda: dict(DISRUPTION_RATES))
+    center: tuple = (3.14, 101.69)
+    radius_km: float = 15.0
+    prep_min: tuple = (5.0, 20.0)
+    delivery_km: tuple = (0.5, 5.0)
+    speed_kmh: float = DEFAULT_SPEED_KMH
+    zones: int = 1
+    seed: int = 0
+
+
+def _share(total, zones, zone):
+    return total // zones + (zone < total % zones)
+
+
+class ZoneSimulation:
+    """
+    One zone's day as a discrete-event simulation on a VirtualTimeLoop.
+
+    Orders arrive as a Poisson process following HOURLY_DEMAND. Each goes to
+    the nearest idle driver in the FleetStore, or waits for the next driver
+    to free up, then runs its timeline: drive to the merchant, wait for the
+    food, drive to the customer. Disruptions along the way are queued for
+    `coordinators` workers that resolve them with a Coordinator and its
+    tools, and a blocked driver waits for the resolution. Every latency is
+    simulated, so the clock only jumps and a day costs just its CPU work.
+    """
+    def __init__(self, config, zone=0, coordinator=None):
+        self.config = config
+        self.zone = zone
+        self.coordinator = coordinator
+        self.rng = np.random.default_rng([config.seed, zone])
+        lat_span = config.radius_km / KM_PER_DEGREE
+        lon_span = config.radius_km / (KM_PER_DEGREE * math.cos(math.radians(config.center[0])))
+        width = 2 * lon_span / config.zones
+        west = config.center[1] - lon_span + zone * width
+        self.bounds = (config.center[0] - lat_span, config.center[0] + lat_span, west, west + width)
+        self.drivers = _share(config.drivers, config.zones, zone)
+        self.workers = max(1, _share(config.coordinators, config.zones, zone))
+        self.merchants = self._points(max(1, _share(config.merchants, config.zones, zone)))
+        self.fleet = FleetStore(driver_capacity=max(self.drivers, 1), clock=runtime.monotonic)
+        for i, (latitude, longitude) in enumerate(self._points(self.drivers)):
+            self.fleet.update_driver(f"driver-{zone}-{i}", latitude, longitude, status="idle")
+        self.idle = self.drivers
+        # Orders waiting for a driver, oldest first, as futures for the driver id.
+        self.waiting = deque()
+        self.samples = {name: [] for name in (
+            "assign_wait_s", "delivery_s", "busy_start", "busy_end",
+            "kind", "path", "raised_at", "queue_wait_s", "resolution_s",
+        )}
+        self.failures = 0
+        self._queue = None
+        self._start = 0.0
+
+    def _points(self, count):
+        south, north, west, east = self.bounds
+        return np.column_stack([self.rng.uniform(south, north, count), self.rng.uniform(west, east, count)])
+
+    def _now(self):
+        return asyncio.get_running_loop().time() - self._start
+
+    def _plan(self):
+        """
+        Draws every order's arrival time, merchant, destination, preparation
+        time and disruptions up front, as columns.
+        """
+        config = self.config
+        per_hour = config.orders_per_driver * self.drivers / 24
+        arrivals = []
+        for slot in range(math.ceil(config.hours)):
+            width = min(1.0, config.hours - slot)
+            count = self.rng.poisson(per_hour * HOURLY_DEMAND[(config.start_hour + slot) % 24] * width)
+            arrivals.append(3600 * (slot + width * self.rng.random(count)))
+        arrivals = np.sort(np.concatenate(arrivals))
+        n = len(arrivals)
+        merchant = self.rng.integers(len(self.merchants), size=n)
+        distance = self.rng.uniform(*config.delivery_km, n)
+        bearing = self.rng.uniform(0, 2 * math.pi, n)
+        pickup = self.merchants[merchant]
+        south, north, west, east = self.bounds
+        dropoff = np.column_stack([
+            np.clip(pickup[:, 0] + distance * np.cos(bearing) / KM_PER_DEGREE, south, north),
+            np.clip(pickup[:, 1] + distance * np.sin(bearing) / (KM_PER_DEGREE * np.cos(np.radians(pickup[:, 0]))), west, east),
+        ])
+        draws = self.rng.random((n, len(DISRUPTION_RATES)))
+        disrupted = {kind: draws[:, i] < config.disruption_rates.get(kind, 0.0) for i, kind in enumerate(DISRUPTION_RATES)}
+        return {
+            "arrival": arrivals.tolist(),
+            "merchant": merchant.tolist(),
+            "pickup": pickup.tolist(),
+            "dropoff": dropoff.tolist(),
+            "prep_s": (60 * self.rng.uniform(*config.prep_min, n)).tolist(),
+            "amount": np.round(self.rng.uniform(5, 80, n), 2).tolist(),
+            "disrupted": {kind: flags.tolist() for kind, flags in disrupted.items()},
+        }
+
+    async def _drive(self, origin, destination):
+        hour = int(self.config.start_hour + self._now() / 3600) % 24
+        km = haversine_km(origin[0], origin[1], destination[0], destination[1]) * ROAD_FACTOR
+        await asyncio.sleep(3600 * km / (self.config.speed_kmh * HOURLY_SPEED[hour]))
+
+    async def _driver_for(self, order_id, pickup):
+        driver_id = None
+        if self.idle:
+            for radius in SEARCH_RADII_KM:
+                near = self.fleet.drivers_near(pickup[0], pickup[1], radius, limit=1)
+                if near:
+                    driver_id = near[0][0]
+                    self.idle -= 1
+                    break
+        if driver_id is None:
+            future = asyncio.get_running_loop().create_future()
+            self.waiting.append(future)
+            driver_id = await future
+        self.fleet.assign(order_id, driver_id)
+        return driver_id
+
+    def _release(self, driver_id):
+        """
+        Hands a driver who just delivered to the oldest waiting order, or leaves them idle.
+        """
+        if self.waiting:
+            # Not idle in between, so no new order can take them first.
+            self.fleet.update_driver(driver_id, status="to_pickup")
+            self.waiting.popleft().set_result(driver_id)
+        else:
+            self.idle += 1
+
+    async def _disrupt(self, kind, scenario):
+        """
+        Queues a disruption for the coordinators, waits for its resolution,
+        then for the time it still costs the driver.
+        """
+        resolved = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((kind, scenario, self._now(), resolved))
+        await resolved
+        await asyncio.sleep(60 * DISRUPTION_DELAY_MIN[kind])
+
+    async def _coordinator_worker(self):
+        samples = self.samples
+        while True:
+            kind, scenario, raised_at, resolved = await self._queue.get()
+            started = self._now()
+            try:
+                response = await self.coordinator.handle_disruption_async(scenario)
+                path = "fast_path" if "fast_path" in response else "agent"
+            except Exception:
+                self.failures += 1
+                path = "error"
+            samples["kind"].append(kind)
+            samples["path"].append(path)
+            samples["raised_at"].append(raised_at)
+            samples["queue_wait_s"].append(started - raised_at)
+            samples["resolution_s"].append(self._now() - started)
+            resolved.set_result(None)
+
+    async def _order(self, plan, n):
+        zone, samples, disrupted = self.zone, self.samples, plan["disrupted"]
+        order_id = f"order-{zone}-{n}"
+        pickup, dropoff = plan["pickup"][n], plan["dropoff"][n]
+        created = self._now()
+        self.fleet.update_order(order_id, pickup=pickup, dropoff=dropoff)
+        driver_id = await self._driver_for(order_id, pickup)
+        assigned = self._now()
+        location = self.fleet.driver(driver_id)["location"]
+        await self._drive((location["latitude"], location["longitude"]), pickup)
+        ready = created + plan["prep_s"][n] - self._now()
+        if ready > 0:
+            await asyncio.sleep(ready)
+        if disrupted["merchant"][n]:
+            merchant_id = f"merchant-{zone}-{plan['merchant'][n]}"
+            await self._disrupt("merchant", f"Merchant {merchant_id} is overloaded with a long backlog; "
+                                            f"{driver_id} is waiting to pick up {order_id}.")
+        self.fleet.update_order(order_id, status="picked_up")
+        self.fleet.update_driver(driver_id, status="delivering")
+        if disrupted["traffic"][n]:
+            # The driver keeps going while the coordinator finds a new route.
+            await asyncio.gather(self._drive(pickup, dropoff), self._disrupt(
+                "traffic", f"Major traffic obstruction: {driver_id} is stuck in a jam delivering {order_id} to pass-{zone}-{n}."))
+        else:
+            await self._drive(pickup, dropoff)
+        if disrupted["recipient_unavailable"][n]:
+            await self._disrupt("recipient_unavailable", f"Recipient recip-{zone}-{n} is not home; {driver_id} is at the door "
+                                                         f"with {order_id} at ({dropoff[0]:.5f}, {dropoff[1]:.5f}).")
+        self.fleet.update_order(order_id, status="delivered")
+        self.fleet.remove_order(order_id)
+        self.fleet.update_driver(driver_id, dropoff[0], dropoff[1])
+        delivered = self._now()
+        samples["assign_wait_s"].append(assigned - created)
+        samples["delivery_s"].append(delivered - created)
+        samples["busy_start"].append(assigned)
+        samples["busy_end"].append(delivered)
+        self._release(driver_id)
+        if disrupted["dispute"][n]:
+            await self._disrupt("dispute", f"Dispute: {order_id} arrived damaged (spilled drink), customer-{zone}-{n} "
+                                           f"wants a refund of ${plan['amount'][n]:.2f} and blames {driver_id}.")
+
+    async def run(self):
+        """
+        Simulates the day, then lets the last orders finish. Returns the raw samples (see merge()).
+        """
+        self._start = asyncio.get_running_loop().time()
+        if self.coordinator is None:
+            self.coordinator = Coordinator(use_mock_llm=True, use_fast_path=self.config.mode == "fast_path")
+        self._queue = asyncio.Queue()
+        workers = [asyncio.create_task(self._coordinator_worker()) for _ in range(self.workers)]
+        plan = self._plan()
+        tasks = set()
+        for n, arrival in enumerate(plan["arrival"]):
+            delay = arrival - self._now()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            task = asyncio.create_task(self._order(plan, n))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        await asyncio.gather(*tasks)
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        return {
+            "orders": len(plan["arrival"]),
+            "drivers": self.drivers,
+            "workers": self.workers,
+            "failures": self.failures,
+            "end_s": self._now(),
+            **{name: np.asarray(values) for name, values in self.samples.items()},
+        }
+
+
+def run_zone(config, zone=0, quiet=True, coordinator=None):
+    """
+    Simulates one zone in this process, with the zone's FleetStore
+    answering the tools' driver lookups, and returns its raw samples.
+    Tool caches start cold and the tools' randomness is seeded per zone, so
+    a zone's result does not depend on where or after what it ran. `quiet`
+    silences the tools' progress printing.
+    """
+    simulation = ZoneSimulation(config, zone, coordinator)
+    clear_caches()
+    runtime.seed(f"{config.seed}-{zone}")
+    previous = logistics._fleet
+    logistics.set_fleet(simulation.fleet)
+    try:
+        with open(os.devnull, "w") as devnull, (contextlib.redirect_stdout(devnull) if quiet else contextlib.nullcontext()):
+            return runtime.run(simulation.run(), virtual=True)
+    finally:
+        logistics.set_fleet(previous)
+
+
+def merge(parts):
+    """
+    Combines zones' raw samples: counts add up, samples are concatenated.
+    """
+    merged = {}
+    for name in parts[0]:
+        values = [part[name] for part in parts]
+        if name == "end_s":
+            merged[name] = max(values)
+        elif isinstance(values[0], np.ndarray):
+            merged[name] = np.concatenate(values)
+        else:
+            merged[name] = sum(values)
+    return merged
+
+
+def _percentiles(values, scale=1.0):
+    if len(values) == 0:
+        return {"p50": None, "p95": None, "p99": None}
+    return {f"p{q}": round(float(v) / scale, 3) for q, v in zip((50, 95, 99), np.percentile(values, [50, 95, 99]))}
+
+
+def summarize(raw, config):
+    """
+    Turns raw samples into the report: order throughput and waits,
+    disruptions resolved per minute with their queue waits and resolution
+    times, how busy the coordinators and drivers were, and the throughput
+    the coordinators could sustain at the measured resolution time.
+    """
+    day_s = config.hours * 3600
+    # Orders and disruptions still in flight at the end of the day finish
+    # after it; rates are over the whole span.
+    span_s = max(day_s, raw["end_s"])
+    slots = math.ceil(config.hours)
+    delivered = len(raw["delivery_s"])
+    start, end = raw["busy_start"], raw["busy_end"]
+    by_hour = []
+    for slot in range(slots):
+        low, high = slot * 3600, min(day_s, (slot + 1) * 3600)
+        busy = np.clip(np.minimum(end, high) - np.maximum(start, low), 0, None).sum()
+        by_hour.append(round(float(busy) / max(raw["drivers"] * (high - low), 1), 3))
+    busy_in_day = np.clip(np.minimum(end, day_s) - start, 0, None).sum()
+    resolution = raw["resolution_s"]
+    resolved_at = raw["raised_at"] + raw["queue_wait_s"] + resolution
+    per_minute = np.bincount((resolved_at // 60).astype(np.int64)) if len(resolved_at) else np.zeros(1)
+    mean_resolution = float(resolution.mean()) if len(resolution) else None
+    return {
+        "drivers": raw["drivers"],
+        "zones": config.zones,
+        "hours": config.hours,
+        "mode": config.mode,
+        "orders": {
+            "created": raw["orders"],
+            "delivered": delivered,
+            "per_hour": round(delivered / (span_s / 3600), 1),
+            "assign_wait_s": _percentiles(raw["assign_wait_s"]),
+            "delivery_min": _percentiles(raw["delivery_s"], 60),
+        },
+        "disruptions": {
+            "resolved": len(resolution),
+            "failed": raw["failures"],
+            "by_kind": dict(Counter(raw["kind"].tolist())),
+            "by_path": dict(Counter(raw["path"].tolist())),
+            "per_min": round(len(resolution) / (span_s / 60), 3),
+            "peak_per_min": int(per_minute.max()),
+            "queue_wait_s": _percentiles(raw["queue_wait_s"]),
+            "resolution_s": _percentiles(resolution),
+        },
+        "coordinator": {
+            "workers": raw["workers"],
+            "utilization": round(float(resolution.sum()) / (raw["workers"] * span_s), 3),
+            "sustainable_per_min": round(raw["workers"] * 60 / mean_resolution, 1) if mean_resolution else None,
+        },
+        "driver_utilization": {
+            "mean": round(float(busy_in_day) / max(raw["drivers"] * day_s, 1), 3),
+            "peak_hour": max(by_hour, default=0.0),
+            "by_hour": by_hour,
+        },
+        "virtual_s": round(raw["end_s"], 1),
+    }
+
+
+def simulate(config=None, processes=None, quiet=True, coordinator=None):
+    """
+    Simulates a city day and returns the summarize() report. With several
+    zones, they run on `processes` worker processes (default: one per zone,
+    up to the number of cores), or one after another in this process with
+    processes=0 or a `coordinator` of your own.
+    """
+    config = config or SimConfig()
+    if config.mode not in MODES:
+        raise ValueError(f"mode must be one of {', '.join(MODES)}.")
+    start = time.perf_counter()
+    zones = range(config.zones)
+    if config.zones > 1 and processes != 0 and coordinator is None:
+        with ProcessPoolExecutor(max_workers=min(config.zones, processes or os.cpu_count() or 1)) as pool:
+            parts = list(pool.map(run_zone, [config] * config.zones, zones, [quiet] * config.zones))
+    else:
+        parts = [run_zone(config, zone, quiet, coordinator) for zone in zones]
+    report = summarize(merge(parts), config)
+    report["wall_s"] = round(time.perf_counter() - start, 3)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulates a city day of deliveries and disruptions through the Coordinator.")
+    parser.add_argument("--drivers", type=int, default=10_000)
+    parser.add_argument("--merchants", type=int, default=None, help="Default: one per five drivers.")
+    parser.add_argument("--orders-per-driver", type=float, default=12.0, help="Orders per driver per 24 h (default: 12).")
+    parser.add_argument("--hours", type=float, default=24.0)
+    parser.add_argument("--start-hour", type=int, default=0)
+    parser.add_argument("--coordinators", type=int, default=16, help="Disruptions resolved at once (default: 16).")
+    parser.add_argument("--mode", choices=MODES, default="fast_path")
+    parser.add_argument("--disruption-scale", type=float, default=1.0, help="Multiplies every disruption rate.")
+    parser.add_argument("--zones", type=int, default=1, help="Zones simulated independently (default: 1).")
+    parser.add_argument("--processes", type=int, default=None, help="Processes for the zones (default: one per zone, up to the cores).")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    config = SimConfig(
+        drivers=args.drivers,
+        merchants=args.merchants or max(1, args.drivers // 5),
+        orders_per_driver=args.orders_per_driver,
+        hours=args.hours,
+        start_hour=args.start_hour,
+        coordinators=args.coordinators,
+        mode=args.mode,
+        disruption_rates={kind: rate * args.disruption_scale for kind, rate in DISRUPTION_RATES.items()},
+        zones=args.zones,
+        seed=args.seed,
+    )
+    print(json.dumps(simulate(config, args.processes), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+from langchain_core.callbacks import BaseCallbackHandler
+
+from src.telemetry import tracing
+
+# The pseudo-tool AgentExecutor runs when the LLM output could not be parsed
+# (with handle_parsing_errors=True), i.e. one parse retry.
+PARSE_ERROR_TOOL = "_Exception"
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """
+    Records LangChain LLM calls and output-parse retries as spans.
+    Real tools are traced by their own decorator, so they are skipped here.
+    """
+    def __init__(self):
+        self._spans = {}
+
+    def _start(self, run_id, name, kind, **attributes):
+        if tracing.is_enabled():
+            self._spans[run_id] = tracing.start_span(name, kind, **attributes)
+
+    def _end(self, run_id, error=None, **attributes):
+        span = self._spans.pop(run_id, None)
+        if span is not None:
+            span.attributes.update(attributes)
+            tracing.end_span(span, error)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._start(run_id, "llm", "llm", model=_model_name(serialized, kwargs))
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._start(run_id, "llm", "llm", model=_model_name(serialized, kwargs))
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        self._end(run_id, **{f"tokens.{key}": value for key, value in usage.items() if isinstance(value, int)})
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        if (serialized or {}).get("name") == PARSE_ERROR_TOOL:
+            self._start(run_id, "parse_retry", "parse_retry")
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+
+def _model_name(serialized, kwargs):
+    params = kwargs.get("invocation_params") or {}
+    return params.get("model_name") or params.get("model") or (serialized or {}).get("name", "unknown")
@@ -0,0 +1,380 @@
+import bisect
+import contextvars
+import functools
+import hashlib
+import inspect
+import json
+import os
+import secrets
+import threading
+import time
+from collections import deque
+
+SERVICE_NAME = "last-mile-coordinator"
+# Histogram bucket upper bounds, in seconds.
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+QUANTILES = (0.5, 0.95, 0.99)
+# Recent durations kept per span name for the quantiles.
+RESERVOIR_SIZE = 4096
+
+# Checked once per call by every traced function; while False the layer does
+# nothing but this check.
+_enabled = os.environ.get("COORDINATOR_TRACING", "").lower() in ("1", "true", "yes")
+_current = contextvars.ContextVar("current_span", default=None)
+_registry = {}
+# Extra metric sources for /metrics: functions returning Prometheus text lines.
+_collectors = []
+
+
+class Span:
+    """
+    One timed operation (a tool call, an LLM call, a disruption, ...).
+    """
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name, kind, parent=None, attributes=None):
+        self.name = name
+        self.kind = kind
+        self.trace_id = parent.trace_id if parent is not None else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes or {})
+        self.error = None
+
+    @property
+    def duration_s(self):
+        return (self.end_ns - self.start_ns) / 1e9 if self.end_ns is not None else None
+
+    def to_otlp(self):
+        status = {"code": 2, "message": self.error} if self.error else {"code": 1}
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 3 if self.kind in ("tool", "llm") else 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(key, value) for key, value in {"span.kind": self.kind, **self.attributes}.items()],
+            "status": status,
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+def _otlp_attribute(key, value):
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class _Series:
+    """
+    Latency statistics for one span name: cumulative histogram buckets for
+    Prometheus and a reservoir of recent durations for the quantiles.
+    """
+    __slots__ = ("kind", "buckets", "count", "sum", "errors", "recent")
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.errors = 0
+        self.recent = deque(maxlen=RESERVOIR_SIZE)
+
+    def add(self, seconds, error):
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.errors += error
+        self.recent.append(seconds)
+
+    def quantiles(self):
+        ordered = sorted(self.recent)
+        if not ordered:
+            return {q: None for q in QUANTILES}
+        return {q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] for q in QUANTILES}
+
+
+class Tracer:
+    """
+    Collects finished spans (the most recent `max_spans`) and per-name latency series.
+    """
+    def __init__(self, max_spans=10_000):
+        self.spans = deque(maxlen=max_spans)
+        self.series = {}
+        self._lock = threading.Lock()
+
+    def record(self, span):
+        with self._lock:
+            self.spans.append(span)
+            series = self.series.get(span.name)
+            if series is None:
+                series = self.series[span.name] = _Series(span.kind)
+            series.add(span.duration_s, span.error is not None)
+
+    def clear(self):
+        with self._lock:
+            self.spans.clear()
+            self.series.clear()
+
+
+tracer = Tracer()
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def digest(*args, **kwargs):
+    """
+    A short, stable fingerprint of call arguments, so spans can be grouped
+    by input without recording the (possibly personal) values themselves.
+    """
+    text = json.dumps([args, kwargs], sort_keys=True, default=repr)
+    return hashlib.blake2b(text.encode(), digest_size=6).hexdigest()
+
+
+def start_span(name, kind="internal", **attributes):
+    """
+    Starts a span under the current one. Pair with end_span().
+    """
+    return Span(name, kind, _current.get(), attributes)
+
+
+def end_span(span, error=None):
+    span.end_ns = time.time_ns()
+    if error is not None:
+        span.error = f"{type(error).__name__}: {error}" if isinstance(error, BaseException) else str(error)
+    tracer.record(span)
+
+
+def annotate(**attributes):
+    """
+    Adds attributes to the current span, if tracing is on and there is one.
+    """
+    if _enabled:
+        span = _current.get()
+        if span is not None:
+            span.attributes.update(attributes)
+
+
+class _SpanContext:
+    __slots__ = ("name", "kind", "attributes", "span", "token")
+
+    def __init__(self, name, kind, attributes):
+        self.name, self.kind, self.attributes = name, kind, attributes
+
+    def __enter__(self):
+        self.span = start_span(self.name, self.kind, **self.attributes)
+        self.token = _current.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        _current.reset(self.token)
+        end_span(self.span, exc)
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name, kind="internal", **attributes):
+    """
+    A context manager timing a block as a span; a shared no-op while tracing is off.
+    """
+    return _SpanContext(name, kind, attributes) if _enabled else _NO_SPAN
+
+
+def traced(name, kind="tool"):
+    """
+    Records a span around every call of a (sync or async) function, with
+    the call's argument digest and outcome, and registers it by `name`.
+
+    While tracing is disabled the wrapper only checks a global flag and
+    calls straight through; for coroutine functions it returns the original
+    coroutine, so no extra frame is added.
+    """
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            async def run(args, kwargs):
+                current = start_span(name, kind, args_digest=digest(*args, **kwargs))
+                token = _current.set(current)
+                error = None
+                try:
+                    return await fn(*args, **kwargs)
+                except BaseException as e:
+                    error = e
+                    raise
+                finally:
+                    _current.reset(token)
+                    end_span(current, error)
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not _enabled:
+                    return fn(*args, **kwargs)
+                return run(args, kwargs)
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not _enabled:
+                    return fn(*args, **kwargs)
+                with _SpanContext(name, kind, {"args_digest": digest(*args, **kwargs)}):
+                    return fn(*args, **kwargs)
+
+        if hasattr(inspect, "markcoroutinefunction") and inspect.iscoroutinefunction(fn):
+            inspect.markcoroutinefunction(wrapper)
+        wrapper.traced_name = name
+        _registry[name] = wrapper
+        return wrapper
+    return decorator
+
+
+def registered():
+    """
+    The names of every traced function, in registration order.
+    """
+    return list(_registry)
+
+
+def percentiles(name):
+    """
+    Returns {"p50", "p95", "p99", "count"} for a span name (durations in seconds).
+    """
+    with tracer._lock:
+        series = tracer.series.get(name)
+        if series is None:
+            return None
+        quantiles = series.quantiles()
+        return {**{f"p{int(q * 100)}": value for q, value in quantiles.items()}, "count": series.count}
+
+
+def export_otlp(spans=None):
+    """
+    Exports spans in the OpenTelemetry OTLP/JSON trace format.
+    """
+    if spans is None:
+        with tracer._lock:
+            spans = list(tracer.spans)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [_otlp_attribute("service.name", SERVICE_NAME)]},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": [span.to_otlp() for span in spans]}],
+        }]
+    }
+
+
+def write_otlp(path):
+    with open(path, "w") as f:
+        json.dump(export_otlp(), f)
+
+
+def add_collector(collect):
+    """
+    Registers a function whose Prometheus text lines are appended to /metrics.
+    """
+    _collectors.append(collect)
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text():
+    """
+    Renders the latency series in the Prometheus text exposition format:
+    a histogram, a summary with p50/p95/p99, and an error counter per span name.
+    """
+    with tracer._lock:
+        series = {name: (s.kind, list(s.buckets), s.count, s.sum, s.errors, s.quantiles()) for name, s in tracer.series.items()}
+    lines = [
+        "# HELP coordinator_span_duration_seconds Span durations.",
+        "# TYPE coordinator_span_duration_seconds histogram",
+    ]
+    for name, (kind, buckets, count, total, _, _) in series.items():
+        labels = f'name="{_label(name)}",kind="{kind}"'
+        cumulative = 0
+        for bound, n in zip(BUCKETS + ("+Inf",), buckets):
+            cumulative += n
+            lines.append(f'coordinator_span_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f"coordinator_span_duration_seconds_sum{{{labels}}} {total}")
+        lines.append(f"coordinator_span_duration_seconds_count{{{labels}}} {count}")
+    lines += [
+        "# HELP coordinator_span_latency_seconds Recent span latency quantiles.",
+        "# TYPE coordinator_span_latency_seconds summary",
+    ]
+    for name, (kind, _, count, total, _, quantiles) in series.items():
+        labels = f'name="{_label(name)}",kind="{kind}"'
+        for q, value in quantiles.items():
+            lines.append(f'coordinator_span_latency_seconds{{{labels},quantile="{q}"}} {value if value is not None else "NaN"}')
+        lines.append(f"coordinator_span_latency_seconds_sum{{{labels}}} {total}")
+        lines.append(f"coordinator_span_latency_seconds_count{{{labels}}} {count}")
+    lines += [
+        "# HELP coordinator_span_errors_total Spans that ended with an error.",
+        "# TYPE coordinator_span_errors_total counter",
+    ]
+    for name, (kind, _, _, _, errors, _) in series.items():
+        lines.append(f'coordinator_span_errors_total{{name="{_label(name)}",kind="{kind}"}} {errors}')
+    for collect in _collectors:
+        lines += collect()
+    return "\n".join(lines) + "\n"
+
+
+def serve_metrics(port=9464, host="127.0.0.1"):
+    """
+    Serves /metrics (Prometheus text) and /spans (OTLP JSON) from a
+    background thread. Returns the server; call shutdown() to stop it.
+    """
+    # Imported here so that importing this module stays cheap.
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body, content_type = prometheus_text().encode(), "text/plain; version=0.0.4"
+            elif self.path == "/spans":
+                body, content_type = json.dumps(export_otlp()).encode(), "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    print(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
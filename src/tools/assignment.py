@@ -0,0 +1,363 @@
+import numpy as np
+
+from src.tools.eta import as_points, eta_matrix
+from src.tools.logistics import get_driver_locations_async, re_route_drivers_async
+from src.tools.runtime import run_sync
+
+# Largest problem (max of orders, drivers) solved exactly; above this the
+# sparse auction heuristic is used.
+HUNGARIAN_MAX = 600
+
+
+def hungarian(cost):
+    """
+    Solves the rectangular assignment problem exactly (minimum total cost).
+    Returns (rows, cols) index arrays; every row is assigned when there are
+    at least as many columns as rows, and vice versa.
+
+    This is the O(n^2 m) shortest augmenting path form of the Hungarian
+    algorithm, with the inner column scan vectorized.
+    """
+    cost = np.asarray(cost, dtype=float)
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+    if n == 0:
+        return np.empty(0, dtype=int), np.empty(0, dtype=int)
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    # p[j]: 1-based row matched to column j (0 = free); column 0 is a sentinel.
+    p = np.zeros(m + 1, dtype=int)
+    way = np.zeros(m + 1, dtype=int)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used[1:]
+            reduced = cost[i0 - 1] - u[i0] - v[1:]
+            better = free & (reduced < minv[1:])
+            minv[1:][better] = reduced[better]
+            way[1:][better] = j0
+            candidates = np.where(free, minv[1:], np.inf)
+            j1 = int(np.argmin(candidates)) + 1
+            delta = candidates[j1 - 1]
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[~used] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+    cols = np.flatnonzero(p[1:])
+    rows = p[1:][cols] - 1
+    if transposed:
+        rows, cols = cols, rows
+    order = np.argsort(rows)
+    return rows[order], cols[order]
+
+
+def _greedy_edges(rows, cols, costs, n_rows, n_cols):
+    """
+    Picks edges cheapest-first, skipping any whose row or column is taken.
+    """
+    order = np.argsort(costs, kind="stable")
+    row_taken = [False] * n_rows
+    col_taken = [False] * n_cols
+    limit = min(n_rows, n_cols)
+    picked_rows, picked_cols = [], []
+    for r, c in zip(rows[order].tolist(), cols[order].tolist()):
+        if row_taken[r] or col_taken[c]:
+            continue
+        row_taken[r] = col_taken[c] = True
+        picked_rows.append(r)
+        picked_cols.append(c)
+        if len(picked_rows) == limit:
+            break
+    return picked_rows, picked_cols
+
+
+def greedy_assignment(cost):
+    """
+    Assigns cheapest pairs first over a dense cost matrix. Returns (rows, cols).
+    """
+    cost = np.asarray(cost, dtype=float)
+    n, m = cost.shape
+    rows, cols = np.divmod(np.arange(n * m), m)
+    picked_rows, picked_cols = _greedy_edges(rows, cols, cost.ravel(), n, m)
+    order = np.argsort(picked_rows)
+    return np.asarray(picked_rows, dtype=int)[order], np.asarray(picked_cols, dtype=int)[order]
+
+
+def _nearest_candidates(order_points, driver_points, k, chunk_size=1024, **eta_options):
+    """
+    Returns (drivers, etas), two (orders x k) arrays holding each order's `k`
+    fastest drivers and their ETAs, computed chunk by chunk.
+    """
+    k = min(k, len(driver_points))
+    candidates, etas = [], []
+    for start in range(0, len(order_points), chunk_size):
+        block_eta = eta_matrix(order_points[start:start + chunk_size], driver_points, **eta_options)
+        nearest = np.argpartition(block_eta, k - 1, axis=1)[:, :k]
+        candidates.append(nearest)
+        etas.append(np.take_along_axis(block_eta, nearest, axis=1))
+    return np.vstack(candidates), np.vstack(etas)
+
+
+def candidate_greedy_assignment(order_points, driver_points, k=8, chunk_size=1024, **eta_options):
+    """
+    Fast heuristic for large fleets that never builds the full matrix.
+
+    Each order keeps only its `k` fastest drivers and the candidate edges are
+    matched cheapest-first. Orders left without a free candidate are retried
+    against the remaining drivers with a larger k until every order or every
+    driver is matched. Returns (rows, cols, etas).
+    """
+    order_points = as_points(order_points)
+    driver_points = as_points(driver_points)
+    free_orders = np.arange(len(order_points))
+    free_drivers = np.arange(len(driver_points))
+    rows, cols, etas = [], [], []
+    while len(free_orders) and len(free_drivers):
+        candidates, candidate_etas = _nearest_candidates(
+            order_points[free_orders], driver_points[free_drivers], k, chunk_size, **eta_options
+        )
+        edge_rows = np.repeat(free_orders, candidates.shape[1])
+        edge_cols = free_drivers[candidates].ravel()
+        edge_costs = candidate_etas.ravel()
+        picked_rows, picked_cols = _greedy_edges(edge_rows, edge_cols, edge_costs, len(order_points), len(driver_points))
+        lookup = {(r, c): cost for r, c, cost in zip(edge_rows.tolist(), edge_cols.tolist(), edge_costs.tolist())}
+        rows.extend(picked_rows)
+        cols.extend(picked_cols)
+        etas.extend(lookup[(r, c)] for r, c in zip(picked_rows, picked_cols))
+        free_orders = np.setdiff1d(free_orders, picked_rows, assume_unique=True)
+        free_drivers = np.setdiff1d(free_drivers, picked_cols, assume_unique=True)
+        k *= 2
+    order = np.argsort(rows)
+    return np.asarray(rows, dtype=int)[order], np.asarray(cols, dtype=int)[order], np.asarray(etas)[order]
+
+
+def _auction(candidates, costs, n_objects, eps_final, scale, unmatched_cost):
+    """
+    Forward auction with epsilon scaling over a sparse candidate graph
+    (Bertsekas). All unassigned bidders bid at once each round. A bidder whose
+    candidates all become dearer than `unmatched_cost` gives up and is
+    returned as -1. Returns the object index chosen by each bidder.
+    """
+    n, k = candidates.shape
+    prices = np.zeros(n_objects)
+    eps = max(costs.max() / scale, eps_final)
+    while True:
+        assigned = np.full(n, -1)
+        owner = np.full(n_objects, -1)
+        while True:
+            bidders = np.flatnonzero(assigned == -1)
+            if not len(bidders):
+                break
+            values = -costs[bidders] - prices[candidates[bidders]]
+            rows = np.arange(len(bidders))
+            best = np.argmax(values, axis=1)
+            best_value = values[rows, best]
+            values[rows, best] = -np.inf
+            second_value = np.maximum(values.max(axis=1), -unmatched_cost) if k > 1 else np.full(len(bidders), -unmatched_cost)
+            gave_up = best_value <= -unmatched_cost
+            assigned[bidders[gave_up]] = -2
+            keep = ~gave_up
+            bidders, best, best_value, second_value = bidders[keep], best[keep], best_value[keep], second_value[keep]
+            if not len(bidders):
+                continue
+            targets = candidates[bidders, best]
+            bids = prices[targets] + (best_value - second_value) + eps
+            # Each object goes to its highest bidder; the previous owner bids again.
+            order = np.lexsort((-bids, targets))
+            sorted_targets = targets[order]
+            first = np.r_[True, sorted_targets[1:] != sorted_targets[:-1]]
+            winners, won, winning_bids = bidders[order][first], sorted_targets[first], bids[order][first]
+            outbid = owner[won]
+            assigned[outbid[outbid >= 0]] = -1
+            owner[won] = winners
+            assigned[winners] = won
+            prices[won] = winning_bids
+        if eps <= eps_final:
+            break
+        eps = max(eps / scale, eps_final)
+    assigned[assigned == -2] = -1
+    return assigned
+
+
+def _auction_match(n_orders, n_drivers, nearest, residual, eps_final, scale, unmatched_cost):
+    """
+    The sparse auction shared by auction_assignment() and
+    auction_matrix_assignment(). `nearest(drivers_bid)` returns the bidders'
+    (candidates, etas) arrays and `residual(free_orders, free_drivers)`
+    matches what the auction left over. Returns (rows, cols, etas).
+    """
+    # The larger side bids, so the side that ends up partly unassigned is the
+    # bidders (which is exact) rather than the priced objects (which is not).
+    # ETAs are symmetric, so drivers can bid on their nearest orders.
+    drivers_bid = n_drivers > n_orders
+    candidates, candidate_etas = nearest(drivers_bid)
+    chosen = _auction(candidates, candidate_etas, n_orders if drivers_bid else n_drivers, eps_final, scale, unmatched_cost)
+    bidders = np.flatnonzero(chosen >= 0)
+    etas = candidate_etas[bidders, np.argmax(candidates[bidders] == chosen[bidders][:, None], axis=1)]
+    if drivers_bid:
+        rows, cols = chosen[bidders], bidders
+        assigned = np.full(n_orders, -1)
+        assigned[rows] = cols
+    else:
+        rows, cols, assigned = bidders, chosen[bidders], chosen
+
+    free_orders = np.flatnonzero(assigned < 0)
+    free_drivers = np.setdiff1d(np.arange(n_drivers), cols, assume_unique=True)
+    if len(free_orders) and len(free_drivers):
+        extra_rows, extra_cols, extra_etas = residual(free_orders, free_drivers)
+        rows = np.concatenate([rows, free_orders[extra_rows]])
+        cols = np.concatenate([cols, free_drivers[extra_cols]])
+        etas = np.concatenate([etas, extra_etas])
+    order = np.argsort(rows)
+    return rows[order], cols[order], etas[order]
+
+
+def auction_assignment(order_points, driver_points, k=32, eps_final=0.02, scale=5.0, unmatched_cost=200.0, chunk_size=1024, **eta_options):
+    """
+    Scalable near-optimal heuristic for large fleets.
+
+    Runs an epsilon-scaling auction on the graph linking each order to its `k`
+    fastest drivers (or each driver to its `k` nearest orders when drivers
+    outnumber orders); the total ETA is within n * eps_final minutes of the best
+    assignment on that graph. Orders the sparse graph cannot serve are then
+    matched against the leftover drivers, exactly when few remain and with
+    candidate_greedy_assignment() otherwise. Returns (rows, cols, etas).
+    """
+    order_points = as_points(order_points)
+    driver_points = as_points(driver_points)
+    if not len(order_points) or not len(driver_points):
+        return np.empty(0, dtype=int), np.empty(0, dtype=int), np.empty(0)
+
+    def nearest(drivers_bid):
+        bidder_points, object_points = (driver_points, order_points) if drivers_bid else (order_points, driver_points)
+        return _nearest_candidates(bidder_points, object_points, k, chunk_size, **eta_options)
+
+    def residual(free_orders, free_drivers):
+        if max(len(free_orders), len(free_drivers)) <= HUNGARIAN_MAX:
+            cost = eta_matrix(order_points[free_orders], driver_points[free_drivers], **eta_options)
+            rows, cols = hungarian(cost)
+            return rows, cols, cost[rows, cols]
+        return candidate_greedy_assignment(order_points[free_orders], driver_points[free_drivers], chunk_size=chunk_size, **eta_options)
+
+    return _auction_match(len(order_points), len(driver_points), nearest, residual, eps_final, scale, unmatched_cost)
+
+
+def auction_matrix_assignment(cost, k=32, eps_final=0.02, scale=5.0, unmatched_cost=200.0):
+    """
+    auction_assignment() on a precomputed (orders x drivers) ETA matrix:
+    each bidder's candidates are its `k` cheapest entries, and the leftovers
+    are matched with solve_assignment(). Returns (rows, cols, etas).
+    """
+    cost = np.asarray(cost, dtype=float)
+    if not cost.size:
+        return np.empty(0, dtype=int), np.empty(0, dtype=int), np.empty(0)
+
+    def nearest(drivers_bid):
+        bids = cost.T if drivers_bid else cost
+        top = min(k, bids.shape[1])
+        candidates = np.argpartition(bids, top - 1, axis=1)[:, :top]
+        return candidates, np.take_along_axis(bids, candidates, axis=1)
+
+    def residual(free_orders, free_drivers):
+        sub = cost[np.ix_(free_orders, free_drivers)]
+        rows, cols = solve_assignment(sub)
+        return rows, cols, sub[rows, cols]
+
+    return _auction_match(cost.shape[0], cost.shape[1], nearest, residual, eps_final, scale, unmatched_cost)
+
+
+def solve_assignment(cost, method="auto", k=32):
+    """
+    Minimises the total cost of a dense (orders x drivers) matrix.
+    `method` is "hungarian", "greedy", "auction" (on each row's `k` cheapest
+    entries) or "auto" (exact up to HUNGARIAN_MAX). Returns (rows, cols).
+    """
+    cost = np.asarray(cost, dtype=float)
+    if method == "auto":
+        method = "hungarian" if max(cost.shape) <= HUNGARIAN_MAX else "greedy"
+    if method == "hungarian":
+        return hungarian(cost)
+    if method == "greedy":
+        return greedy_assignment(cost)
+    if method == "auction":
+        return auction_matrix_assignment(cost, k=k)[:2]
+    raise ValueError(f"Unknown assignment method: {method}")
+
+
+def assign_orders(orders, drivers, eta=None, method="auto", k=32, **eta_options):
+    """
+    Matches open orders to available drivers for minimum total ETA.
+
+    `orders` are dicts with `order_id`, `latitude` and `longitude` (the pickup
+    point); `drivers` are get_driver_location() results. `eta`, if given, is a
+    precomputed (orders x drivers) ETA matrix in minutes. Without one, small
+    problems are solved exactly on a full eta_matrix() and large ones with
+    auction_assignment() (`method` may also force "hungarian", "auction" or
+    "greedy"). Each driver gets at most one order.
+    """
+    orders = list(orders)
+    drivers = list(drivers)
+    if eta is not None:
+        eta = np.asarray(eta, dtype=float)
+        rows, cols = solve_assignment(eta, method, k=k)
+        etas = eta[rows, cols]
+    else:
+        large = max(len(orders), len(drivers)) > HUNGARIAN_MAX
+        if method == "auto":
+            method = "auction" if large else "hungarian"
+        if method == "auction":
+            rows, cols, etas = auction_assignment(orders, drivers, k=k, **eta_options)
+        elif method == "greedy" and large:
+            rows, cols, etas = candidate_greedy_assignment(orders, drivers, **eta_options)
+        else:
+            eta = eta_matrix(orders, drivers, **eta_options)
+            rows, cols = solve_assignment(eta, method)
+            etas = eta[rows, cols]
+    assignments = [
+        {"order_id": orders[r]["order_id"], "driver_id": drivers[c]["driver_id"], "eta_minutes": round(float(e), 2)}
+        for r, c, e in zip(rows.tolist(), cols.tolist(), np.asarray(etas).tolist())
+    ]
+    assigned = {a["order_id"] for a in assignments}
+    return {
+        "assignments": assignments,
+        "unassigned_orders": [o["order_id"] for o in orders if o["order_id"] not in assigned],
+        "total_eta_minutes": round(float(np.sum(etas)), 2),
+    }
+
+
+async def reassign_orders_async(orders, driver_ids, reason, method="auto", **eta_options):
+    """
+    Re-assigns many orders at once: fetches driver locations in bulk, solves
+    the assignment and issues every re-route in one bulk call.
+    """
+    orders = list(orders)
+    drivers = (await get_driver_locations_async(driver_ids))["drivers"]
+    plan = assign_orders(orders, drivers, method=method, **eta_options)
+    destinations = {o["order_id"]: o.get("destination", o["order_id"]) for o in orders}
+    if plan["assignments"]:
+        routes = [
+            {"driver_id": a["driver_id"], "new_destination": destinations[a["order_id"]], "reason": reason}
+            for a in plan["assignments"]
+        ]
+        plan["dispatch"] = await re_route_drivers_async(routes)
+    return plan
+
+
+def reassign_orders(orders, driver_ids, reason, method="auto", **eta_options):
+    """
+    Blocking wrapper around reassign_orders_async().
+    """
+    return run_sync(reassign_orders_async(orders, driver_ids, reason, method=method, **eta_options))
@@ -0,0 +1,162 @@
+import copy
+import functools
+import inspect
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from src.tools.runtime import monotonic
+
+# Metres per degree of latitude (and of longitude at the equator).
+METRES_PER_DEGREE = 111_320
+
+_MISSING = object()
+_caches = {}
+
+
+def coordinate_cell(latitude, longitude, cell_m=100):
+    """
+    Quantises a coordinate to a grid cell roughly `cell_m` metres on a side,
+    so that nearby lat/lon queries share a cache entry.
+    """
+    lat_step = cell_m / METRES_PER_DEGREE
+    lon_step = cell_m / (METRES_PER_DEGREE * max(math.cos(math.radians(latitude)), 1e-6))
+    return (math.floor(latitude / lat_step), math.floor(longitude / lon_step))
+
+
+class TTLCache:
+    """
+    A thread-safe LRU cache whose entries also expire after `ttl` seconds.
+    """
+    def __init__(self, maxsize=1024, ttl=60.0, clock=time.monotonic):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1.")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        """
+        Returns the cached value for `key`, or `default` if it is absent or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        """
+        Stores a value, evicting the least recently used entry when full.
+        """
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """
+        Returns the hit/miss/eviction counters and current size.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def cached(name, ttl, maxsize=1024, cell_m=100):
+    """
+    Caches the results of a read-only async tool under `name`.
+
+    Keys are built from the bound call arguments; `latitude`/`longitude`
+    arguments are replaced by their ~`cell_m` metre grid cell. Only apply this
+    to pure lookups: mutating tools (re-routing, refunds, notifications)
+    must never be cached.
+    """
+    def decorator(async_fn):
+        signature = inspect.signature(async_fn)
+        # TTLs follow the runtime clock, so they also expire in virtual time.
+        cache = TTLCache(maxsize=maxsize, ttl=ttl, clock=monotonic)
+        _caches[name] = cache
+
+        def make_key(args, kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            if "latitude" in arguments and "longitude" in arguments:
+                arguments["latitude"], arguments["longitude"] = coordinate_cell(
+                    float(arguments["latitude"]), float(arguments["longitude"]), cell_m
+                )
+            return tuple((k, freeze(v)) for k, v in arguments.items())
+
+        @functools.wraps(async_fn)
+        async def wrapper(*args, **kwargs):
+            key = make_key(args, kwargs)
+            value = cache.get(key, _MISSING)
+            if value is _MISSING:
+                value = await async_fn(*args, **kwargs)
+                cache.set(key, value)
+            # Callers get their own copy so they cannot mutate the cached entry.
+            return copy.deepcopy(value)
+
+        wrapper.cache = cache
+        wrapper.cache_key = lambda *args, **kwargs: make_key(args, kwargs)
+        return wrapper
+    return decorator
+
+
+def freeze(value):
+    """
+    Converts lists and dicts into hashable equivalents for use in cache keys.
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def cache_stats():
+    """
+    Returns the counters of every tool cache, keyed by tool name.
+    """
+    return {name: cache.stats() for name, cache in _caches.items()}
+
+
+def clear_caches():
+    """
+    Empties every tool cache (the counters are kept).
+    """
+    for cache in _caches.values():
+        cache.clear()
@@ -0,0 +1,118 @@
+import math
+
+import numpy as np
+
+from src.tools.spatial import EARTH_RADIUS_KM, KM_PER_DEGREE
+
+# Average urban driving speed and the ratio of road distance to great-circle
+# distance used when no better estimate is available.
+DEFAULT_SPEED_KMH = 25.0
+ROAD_FACTOR = 1.3
+
+
+def as_points(points):
+    """
+    Converts coordinates to an (N, 2) float array of (latitude, longitude).
+    Accepts an array-like of pairs or a sequence of location dicts, either
+    `{"latitude": ..., "longitude": ...}` or a get_driver_location() result.
+    """
+    if isinstance(points, np.ndarray):
+        array = points.astype(float, copy=False)
+    else:
+        points = list(points)
+        if points and isinstance(points[0], dict):
+            points = [p.get("location", p) for p in points]
+            points = [(p["latitude"], p["longitude"]) for p in points]
+        array = np.asarray(points, dtype=float)
+    return array.reshape(-1, 2)
+
+
+def _unit_vectors(points):
+    lat = np.radians(points[:, 0])
+    lon = np.radians(points[:, 1])
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+
+def haversine_matrix(origins, destinations):
+    """
+    Returns the (N, M) matrix of great-circle distances in kilometres
+    between every origin and every destination, in one vectorized pass.
+
+    Points are mapped to unit vectors so the pairwise work is a single matrix
+    product; the chord length c then gives the haversine distance as
+    2R·asin(c/2). This is exact to well under a metre at city scale.
+    """
+    dot = _unit_vectors(as_points(origins)) @ _unit_vectors(as_points(destinations)).T
+    half_chord = np.sqrt(np.clip(2.0 - 2.0 * dot, 0.0, 4.0))
+    half_chord *= 0.5
+    np.minimum(half_chord, 1.0, out=half_chord)
+    return np.arcsin(half_chord, out=half_chord) * (2 * EARTH_RADIUS_KM)
+
+
+class ZoneTraffic:
+    """
+    Per-zone traffic multipliers on a square grid of about `cell_km` kilometres.
+    A multiplier of 1.5 means trips through that zone take 50% longer.
+    """
+    def __init__(self, cell_km=2.0, default=1.0):
+        self.cell_deg = cell_km / KM_PER_DEGREE
+        self.default = default
+        self._zones = {}
+        self._lookup = None
+
+    def zone_of(self, latitude, longitude):
+        return (math.floor(latitude / self.cell_deg), math.floor(longitude / self.cell_deg))
+
+    def set(self, latitude, longitude, multiplier):
+        """
+        Sets the multiplier of the zone containing a coordinate.
+        """
+        self._zones[self.zone_of(latitude, longitude)] = float(multiplier)
+        self._lookup = None
+
+    def clear(self, latitude, longitude):
+        self._zones.pop(self.zone_of(latitude, longitude), None)
+        self._lookup = None
+
+    def multipliers(self, points):
+        """
+        Returns the multiplier for each point as a float array.
+        """
+        points = as_points(points)
+        result = np.full(len(points), self.default, dtype=float)
+        if not self._zones:
+            return result
+        if self._lookup is None:
+            codes = np.array([_zone_code(r, c) for r, c in self._zones], dtype=np.int64)
+            values = np.array(list(self._zones.values()), dtype=float)
+            order = np.argsort(codes)
+            self._lookup = (codes[order], values[order])
+        codes, values = self._lookup
+        query = _zone_code(np.floor(points[:, 0] / self.cell_deg).astype(np.int64),
+                           np.floor(points[:, 1] / self.cell_deg).astype(np.int64))
+        slots = np.minimum(np.searchsorted(codes, query), len(codes) - 1)
+        known = codes[slots] == query
+        result[known] = values[slots[known]]
+        return result
+
+
+def _zone_code(row, col):
+    # Packs a (row, col) zone into one int64; zones are far smaller than 2**31.
+    return row * (1 << 32) + col
+
+
+def eta_matrix(origins, destinations, speed_kmh=DEFAULT_SPEED_KMH, road_factor=ROAD_FACTOR, traffic=None):
+    """
+    Returns the (N, M) matrix of estimated travel times in minutes.
+
+    Distances are great-circle distances scaled by `road_factor` and driven at
+    `speed_kmh`. With a ZoneTraffic, each cell is further scaled by the mean of
+    the origin and destination zone multipliers.
+    """
+    origins = as_points(origins)
+    destinations = as_points(destinations)
+    minutes = haversine_matrix(origins, destinations) * (road_factor * 60.0 / speed_kmh)
+    if traffic is not None:
+        minutes *= (traffic.multipliers(origins)[:, None] + traffic.multipliers(destinations)[None, :]) / 2
+    return minutes
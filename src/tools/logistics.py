@@ -1,76 +1,308 @@
-import random
-import time
+import asyncio
+import functools
+import math
 
-def check_traffic(start_point, end_point):
+from src.telemetry.tracing import traced
+from src.tools import mediation
+from src.tools.cache import cached
+from src.tools.notifications import dispatcher
+from src.tools.replay import replayable
+from src.tools.singleflight import single_flight
+from src.tools.runtime import rng, run_sync
+
+
+def _blocking(async_fn):
+    """
+    Builds the synchronous variant of an async tool.
+    The returned function blocks until the coroutine finishes and keeps the
+    tool's public name (e.g. `check_traffic` for `check_traffic_async`).
+    """
+    @functools.wraps(async_fn)
+    def wrapper(*args, **kwargs):
+        return run_sync(async_fn(*args, **kwargs))
+
+    wrapper.__name__ = async_fn.__name__.removesuffix("_async")
+    wrapper.__qualname__ = wrapper.__name__
+    return wrapper
+
+
+# Optional in-process spatial indexes (see src/tools/spatial.py). When loaded,
+# the nearby-merchant and locker lookups answer from them instead of the stub data.
+_merchant_index = None
+_locker_index = None
+
+
+def set_merchant_index(index):
+    """
+    Installs (or, with None, removes) the merchant SpatialIndex used by get_nearby_merchants.
+    Merchant records are expected to carry a `category` field.
+    """
+    global _merchant_index
+    _merchant_index = index
+    get_nearby_merchants_async.cache.clear()
+
+
+def set_locker_index(index):
+    """
+    Installs (or, with None, removes) the locker SpatialIndex used by find_nearby_locker.
+    Lockers whose `availability` is "none" are skipped.
+    """
+    global _locker_index
+    _locker_index = index
+    find_nearby_locker_async.cache.clear()
+
+
+# Optional FleetStore (see src/memory/fleet.py). When loaded, driver locations
+# are answered from it for the drivers it knows.
+_fleet = None
+
+
+def set_fleet(store):
+    """
+    Installs (or, with None, removes) the FleetStore used by get_driver_location(s).
+    """
+    global _fleet
+    _fleet = store
+
+
+def _fleet_location(driver_id):
+    record = _fleet.driver(driver_id) if _fleet is not None else None
+    if record is None or math.isnan(record["location"]["latitude"]):
+        return None
+    return {"driver_id": driver_id, "location": record["location"]}
+
+
+def _sent(results):
+    """
+    Sums up the dispatcher results of one notification to several recipients,
+    listing those the dispatcher did not send to because the same message was just sent.
+    """
+    skipped = [result["recipient"] for result in results if result.get("status") == "deduplicated"]
+    if not skipped:
+        return {"status": "success"}
+    return {"status": "deduplicated" if len(skipped) == len(results) else "success", "deduplicated": skipped}
+
+
+# Optional road-graph Router (see src/tools/routing.py) used by
+# calculate_alternative_route, and how long an obstruction stays closed.
+_router = None
+OBSTRUCTION_CLOSURE_S = 1800
+
+
+def set_router(router):
+    """
+    Installs (or, with None, removes) the Router used by calculate_alternative_route.
+    """
+    global _router
+    _router = router
+
+
+def _route_endpoint(route, name):
+    """
+    Resolves a route endpoint to a graph node: `<name>_node` is a source node
+    id, `<name>_location` a {"latitude", "longitude"} dict.
+    """
+    if f"{name}_node" in route:
+        return _router.graph.index_of(route[f"{name}_node"])
+    location = route[f"{name}_location"]
+    return _router.nearest_node(float(location["latitude"]), float(location["longitude"]))
+
+
+# Optional TrafficModel (see src/tools/traffic_model.py) answering check_traffic
+# from learned per-segment, per-hour travel times instead of the simulation.
+_traffic_model = None
+
+
+def set_traffic_model(model):
+    """
+    Installs (or, with None, removes) the TrafficModel used by check_traffic.
+    """
+    global _traffic_model
+    _traffic_model = model
+
+
+# Every tool is traced (see src/telemetry/tracing.py); read-only lookups are
+# also cached with per-tool TTLs (in seconds) chosen from how quickly the
+# underlying data changes; see src/tools/cache.py. Concurrent identical
+# lookups that miss the cache share one request (src/tools/singleflight.py).
+@traced("check_traffic")
+@replayable("check_traffic")
+async def check_traffic_async(start_point, end_point):
+    """
+    Checks the traffic between two points. Returns a travel time in
+    minutes, from the TrafficModel if one is installed (see set_traffic_model()).
+    """
+    if _traffic_model is not None:
+        minutes = _traffic_model.eta(start_point, end_point)
+        if minutes is not None:
+            return {"travel_time_minutes": round(minutes, 1), "source": "traffic_model"}
+    return await _simulated_traffic_async(start_point, end_point)
+
+
+@cached("check_traffic", ttl=60)
+@single_flight("check_traffic")
+async def _simulated_traffic_async(start_point, end_point):
     """
     Simulates checking the traffic between two points.
     Returns a simulated travel time in minutes.
     """
     print(f"Checking traffic from {start_point} to {end_point}...")
     # Simulate API call delay
-    time.sleep(1)
-    travel_time = random.randint(15, 60)
+    await asyncio.sleep(1)
+    travel_time = rng().randint(15, 60)
     print(f"Simulated travel time: {travel_time} minutes.")
     return {"travel_time_minutes": travel_time}
 
-def get_merchant_status(merchant_id):
+@traced("get_merchant_status")
+@replayable("get_merchant_status")
+@cached("get_merchant_status", ttl=30)
+@single_flight("get_merchant_status")
+async def get_merchant_status_async(merchant_id):
     """
     Simulates getting the status of a merchant.
     Returns a simulated status.
     """
     print(f"Getting status for merchant {merchant_id}...")
     # Simulate API call delay
-    time.sleep(0.5)
+    await asyncio.sleep(0.5)
     statuses = ["open", "closed", "busy"]
-    status = random.choice(statuses)
+    status = rng().choice(statuses)
     print(f"Simulated merchant status: {status}.")
     return {"merchant_id": merchant_id, "status": status}
 
-def get_driver_location(driver_id):
+@traced("get_driver_location")
+@replayable("get_driver_location")
+async def get_driver_location_async(driver_id):
+    """
+    Gets the location of a driver: live from the installed FleetStore (see
+    set_fleet()) when it knows the driver, so updates show at once, and
+    from the cached simulation otherwise.
+    """
+    known = _fleet_location(driver_id)
+    if known is not None:
+        return known
+    return await _simulated_driver_location_async(driver_id)
+
+
+@cached("get_driver_location", ttl=5)
+@single_flight("get_driver_location")
+async def _simulated_driver_location_async(driver_id):
     """
     Simulates getting the location of a driver.
     Returns a simulated GPS coordinate.
     """
     print(f"Getting location for driver {driver_id}...")
     # Simulate API call delay
-    time.sleep(0.5)
+    await asyncio.sleep(0.5)
     location = {
-        "latitude": round(random.uniform(3.0, 4.0), 6),
-        "longitude": round(random.uniform(101.0, 102.0), 6)
+        "latitude": round(rng().uniform(3.0, 4.0), 6),
+        "longitude": round(rng().uniform(101.0, 102.0), 6)
     }
     print(f"Simulated driver location: {location}.")
     return {"driver_id": driver_id, "location": location}
 
 
-def notify_customer(customer_id, message):
+@traced("get_driver_locations")
+@replayable("get_driver_locations")
+async def get_driver_locations_async(driver_ids):
+    """
+    Simulates getting the locations of many drivers in a single bulk call.
+    Drivers known to the installed FleetStore or already in the
+    get_driver_location cache are not fetched again, and freshly fetched
+    ones are added to the cache. Each driver is fetched once, however often
+    it is listed.
+    """
+    cache = _simulated_driver_location_async.cache
+    cache_key = _simulated_driver_location_async.cache_key
+    driver_ids = list(driver_ids)
+    found = {}
+    missing = []
+    for driver_id in dict.fromkeys(driver_ids):
+        cached_result = _fleet_location(driver_id) or cache.get(cache_key(driver_id))
+        if cached_result is None:
+            missing.append(driver_id)
+        else:
+            found[driver_id] = cached_result
+    if missing:
+        print(f"Getting locations for {len(missing)} drivers...")
+        # Simulate one API round-trip for the whole batch
+        await asyncio.sleep(0.5)
+        for driver_id in missing:
+            location = {
+                "latitude": round(rng().uniform(3.0, 4.0), 6),
+                "longitude": round(rng().uniform(101.0, 102.0), 6)
+            }
+            found[driver_id] = {"driver_id": driver_id, "location": location}
+            cache.set(cache_key(driver_id), found[driver_id])
+    drivers = [{"driver_id": driver_id, "location": dict(found[driver_id]["location"])} for driver_id in driver_ids]
+    return {"drivers": drivers}
+
+
+@traced("notify_customer")
+@replayable("notify_customer")
+async def notify_customer_async(customer_id, message):
     """
     Simulates notifying a customer with a message.
     """
     print(f"Notifying customer {customer_id}: '{message}'")
-    # Simulate API call delay
-    time.sleep(0.5)
+    # Queued and delivered in bulk with other notifications (see src/tools/notifications.py)
+    result = await dispatcher().send(customer_id, message)
+    if result.get("status") == "deduplicated":
+        print("The same notification was just sent; not sending it again.")
+        return {"status": "deduplicated", "customer_id": customer_id}
     print("Notification sent successfully.")
     return {"status": "success", "customer_id": customer_id}
 
 
-def re_route_driver(driver_id, new_destination, reason):
+@traced("re_route_driver")
+@replayable("re_route_driver")
+async def re_route_driver_async(driver_id, new_destination, reason):
     """
     Simulates re-routing a driver to a new destination for a given reason.
     """
     print(f"Re-routing driver {driver_id} to {new_destination} because: {reason}")
     # Simulate API call delay
-    time.sleep(1)
+    await asyncio.sleep(1)
     print(f"Driver {driver_id} successfully re-routed.")
     return {"status": "success", "driver_id": driver_id, "new_destination": new_destination}
 
 
-def get_nearby_merchants(latitude, longitude, category, radius_km=2):
+@traced("re_route_drivers")
+@replayable("re_route_drivers")
+async def re_route_drivers_async(routes):
+    """
+    Simulates re-routing many drivers in a single bulk call.
+    Each route is a dict with `driver_id`, `new_destination` and `reason`.
+    """
+    routes = list(routes)
+    print(f"Re-routing {len(routes)} drivers in bulk...")
+    # Simulate one API round-trip for the whole batch
+    await asyncio.sleep(1)
+    results = [
+        {"status": "success", "driver_id": route["driver_id"], "new_destination": route["new_destination"]}
+        for route in routes
+    ]
+    print(f"{len(results)} drivers successfully re-routed.")
+    return {"status": "success", "results": results}
+
+
+@traced("get_nearby_merchants")
+@replayable("get_nearby_merchants")
+@cached("get_nearby_merchants", ttl=300)
+@single_flight("get_nearby_merchants")
+async def get_nearby_merchants_async(latitude, longitude, category, radius_km=2):
     """
     Simulates finding nearby merchants of a specific category.
     """
     print(f"Finding nearby '{category}' merchants near ({latitude}, {longitude})...")
+    if _merchant_index is not None:
+        merchants = _merchant_index.query_radius(float(latitude), float(longitude), float(radius_km), category=category)
+        for merchant in merchants:
+            merchant["merchant_id"] = merchant.pop("id")
+        print(f"Found {len(merchants)} nearby merchants.")
+        return {"merchants": merchants}
     # Simulate API call delay
-    time.sleep(1)
+    await asyncio.sleep(1)
     merchants = [
         {"merchant_id": "merchant-888", "name": "Speedy Pizza", "wait_time_minutes": 15},
         {"merchant_id": "merchant-999", "name": "Quick Burger", "wait_time_minutes": 10},
@@ -79,109 +311,156 @@ def get_nearby_merchants(latitude, longitude, category, radius_km=2):
     return {"merchants": merchants}
 
 
-def initiate_mediation_flow(order_id, customer_id, driver_id):
+@traced("initiate_mediation_flow")
+@replayable("initiate_mediation_flow")
+async def initiate_mediation_flow_async(order_id, customer_id, driver_id):
     """
     Simulates initiating a real-time mediation flow for a dispute.
     """
     print(f"Initiating mediation for order {order_id} between customer {customer_id} and driver {driver_id}.")
-    time.sleep(1)
-    return {"status": "success", "mediation_id": f"med-{order_id}"}
+    await asyncio.sleep(1)
+    mediation_id = f"med-{order_id}"
+    mediation.mediations.open(mediation_id)
+    return {"status": "success", "mediation_id": mediation_id}
 
 
-def collect_evidence(mediation_id, parties):
+@traced("collect_evidence")
+@replayable("collect_evidence")
+async def collect_evidence_async(mediation_id, parties, timeout_s=mediation.PARTY_TIMEOUT_S):
     """
-    Simulates collecting evidence from parties in a dispute.
+    Simulates collecting evidence from parties in a dispute. Every party is
+    asked concurrently and has `timeout_s` to answer; parties that do not
+    are listed under "missing" and the status is "partial".
     """
     print(f"Collecting evidence for mediation {mediation_id} from {', '.join(parties)}.")
-    time.sleep(2) # Simulate time for parties to respond
-    evidence = {
-        "customer_photo_url": "https://example.com/spilled_drink.jpg",
-        "driver_statement": "The bag was sealed by the merchant.",
-        "customer_statement": "The seal was intact upon handover, but the drink was spilled inside the sealed bag."
-    }
-    print("Evidence collected.")
-    return {"status": "success", "evidence": evidence}
+    if mediation_id in mediation.mediations:
+        mediation.mediations.set_status(mediation_id, mediation.MediationTable.COLLECTING)
+    collector = mediation.EvidenceCollector(mediation_id, parties, timeout_s)
+    evidence = {key: value async for _, key, value in collector}
+    if collector.missing:
+        print(f"Evidence collected; no answer from {', '.join(collector.missing)}.")
+    else:
+        print("Evidence collected.")
+    return {"status": "partial" if collector.missing else "success", "evidence": evidence, "missing": collector.missing}
 
 
-def analyze_evidence(evidence):
+@traced("analyze_evidence")
+@replayable("analyze_evidence")
+async def analyze_evidence_async(evidence):
     """
-    Simulates analyzing the collected evidence to determine fault.
+    Simulates analyzing the collected evidence to determine fault. Items are
+    analyzed one at a time, cheapest first, and analysis stops as soon as
+    the fault estimate is decisive.
     """
     print("Analyzing evidence...")
-    time.sleep(1.5)
-    if "sealed" in evidence.get("driver_statement", "") and "intact" in evidence.get("customer_statement", ""):
-        fault = "merchant"
-        reason = "The damage occurred inside a sealed bag, indicating poor packaging by the merchant."
-    else:
-        fault = "unclear"
-        reason = "The evidence is not sufficient to determine clear fault."
-
-    print(f"Analysis complete. Determined fault: {fault}.")
-    return {"fault": fault, "reason": reason}
-
-
-def issue_instant_refund(customer_id, order_id, amount):
+    verdict = await mediation.analyze_evidence(evidence)
+    print(f"Analysis complete. Determined fault: {verdict['fault']}.")
+    return {"fault": verdict["fault"], "reason": verdict["reason"],
+            "confidence": verdict["confidence"], "items_analyzed": verdict["items_analyzed"]}
+
+
+@traced("mediate_dispute")
+@replayable("mediate_dispute")
+async def mediate_dispute_async(mediation_id, parties, timeout_s=mediation.PARTY_TIMEOUT_S):
+    """
+    Collects evidence from every party concurrently and analyzes each item
+    as it arrives, finishing as soon as the fault is clear instead of
+    waiting for every party.
+    """
+    print(f"Mediating {mediation_id}: collecting and analyzing evidence from {', '.join(parties)}.")
+    table = mediation.mediations
+    if mediation_id not in table:
+        table.open(mediation_id)
+    table.set_status(mediation_id, mediation.MediationTable.COLLECTING)
+    collector = mediation.EvidenceCollector(mediation_id, parties, timeout_s)
+    evidence, early = await mediation.analyze_items(mediation_id, collector)
+    verdict = table.verdict(mediation_id)
+    table.set_status(mediation_id, mediation.MediationTable.DECIDED)
+    print(f"Mediation {mediation_id}: fault {verdict['fault']} ({verdict['confidence']:.0%})"
+          f"{' before every party answered' if early else ''}.")
+    return {"fault": verdict["fault"], "reason": verdict["reason"],
+            "confidence": verdict["confidence"], "evidence": evidence, "early_exit": early,
+            "missing": collector.missing}
+
+
+@traced("issue_instant_refund")
+@replayable("issue_instant_refund")
+async def issue_instant_refund_async(customer_id, order_id, amount):
     """
     Simulates issuing an instant refund to a customer.
     """
     print(f"Issuing refund of ${amount} to customer {customer_id} for order {order_id}.")
-    time.sleep(0.5)
+    await asyncio.sleep(0.5)
     return {"status": "success", "refund_id": f"ref-{order_id}"}
 
 
-def exonerate_driver(driver_id, order_id):
+@traced("exonerate_driver")
+@replayable("exonerate_driver")
+async def exonerate_driver_async(driver_id, order_id):
     """
     Simulates clearing a driver of fault for a delivery issue.
     """
     print(f"Exonerating driver {driver_id} from fault for order {order_id}.")
-    time.sleep(0.5)
+    await asyncio.sleep(0.5)
     return {"status": "success", "driver_id": driver_id}
 
 
-def log_merchant_packaging_feedback(merchant_id, order_id, feedback_details):
+@traced("log_merchant_packaging_feedback")
+@replayable("log_merchant_packaging_feedback")
+async def log_merchant_packaging_feedback_async(merchant_id, order_id, feedback_details):
     """
     Simulates logging feedback about a merchant's packaging.
     """
     print(f"Logging packaging feedback for merchant {merchant_id} regarding order {order_id}.")
     print(f"Feedback: {feedback_details}")
-    time.sleep(0.5)
+    await asyncio.sleep(0.5)
     return {"status": "success", "log_id": f"log-{order_id}"}
 
 
-def notify_resolution(parties, order_id, resolution_summary):
+@traced("notify_resolution")
+@replayable("notify_resolution")
+async def notify_resolution_async(parties, order_id, resolution_summary):
     """
     Simulates notifying all parties of the final resolution.
     """
     print(f"Notifying parties ({', '.join(parties)}) for order {order_id} of the resolution.")
     print(f"Resolution: {resolution_summary}")
-    time.sleep(0.5)
-    return {"status": "success"}
+    # The resolution closes the order's mediation, if one was opened.
+    mediation.mediations.close(f"med-{order_id}")
+    notifications = dispatcher()
+    message = f"Resolution for order {order_id}: {resolution_summary}"
+    results = await asyncio.gather(*(notifications.send(party, message) for party in parties))
+    return _sent(results)
 
 
-def contact_recipient_via_chat(recipient_id, initial_message):
+@traced("contact_recipient_via_chat")
+@replayable("contact_recipient_via_chat")
+async def contact_recipient_via_chat_async(recipient_id, initial_message):
     """
     Simulates contacting a recipient via chat and getting a response.
     """
     print(f"Contacting recipient {recipient_id} with message: '{initial_message}'")
-    time.sleep(1.5) # Simulate sending message and waiting for reply
+    await asyncio.sleep(1.5) # Simulate sending message and waiting for reply
     responses = [
         "I'm not home right now, can you leave it with my neighbour at Unit 102?",
         "Just leave it at the door, please.",
         "I'm stuck in traffic, I'll be there in 15 minutes!",
         "Sorry, I'm out of town. Can you deliver it tomorrow?",
     ]
-    simulated_response = random.choice(responses)
+    simulated_response = rng().choice(responses)
     print(f"Received response from {recipient_id}: '{simulated_response}'")
     return {"status": "success", "response": simulated_response}
 
 
-def suggest_safe_drop_off(recipient_id, suggestion):
+@traced("suggest_safe_drop_off")
+@replayable("suggest_safe_drop_off")
+async def suggest_safe_drop_off_async(recipient_id, suggestion):
     """
     Simulates suggesting a safe drop-off location and getting confirmation.
     """
     print(f"Suggesting to {recipient_id}: 'Is it okay if I {suggestion}?'")
-    time.sleep(1)
-    confirmation = random.choice([True, False])
+    await asyncio.sleep(1)
+    confirmation = rng().choice([True, False])
     if confirmation:
         print(f"Recipient {recipient_id} approved the suggestion.")
         return {"status": "approved", "suggestion": suggestion}
@@ -190,12 +469,25 @@ def suggest_safe_drop_off(recipient_id, suggestion):
         return {"status": "rejected", "suggestion": suggestion}
 
 
-def find_nearby_locker(latitude, longitude):
+@traced("find_nearby_locker")
+@replayable("find_nearby_locker")
+@cached("find_nearby_locker", ttl=300)
+@single_flight("find_nearby_locker")
+async def find_nearby_locker_async(latitude, longitude):
     """
     Simulates finding a nearby secure parcel locker.
     """
     print(f"Searching for secure parcel lockers near ({latitude}, {longitude})...")
-    time.sleep(1)
+    if _locker_index is not None:
+        lockers = _locker_index.nearest(
+            float(latitude), float(longitude), k=3,
+            predicate=lambda locker: locker.get("availability") != "none",
+        )
+        for locker in lockers:
+            locker["locker_id"] = locker.pop("id")
+        print(f"Found {len(lockers)} nearby lockers.")
+        return {"status": "success", "lockers": lockers}
+    await asyncio.sleep(1)
     lockers = [
         {"locker_id": "locker-a1", "address": "123 Main St, Lobby", "availability": "high"},
         {"locker_id": "locker-b2", "address": "456 Oak Ave, Supermarket", "availability": "low"},
@@ -204,15 +496,36 @@ def find_nearby_locker(latitude, longitude):
     return {"status": "success", "lockers": lockers}
 
 
-def calculate_alternative_route(current_route, obstruction):
+@traced("calculate_alternative_route")
+@replayable("calculate_alternative_route")
+@single_flight("calculate_alternative_route")
+async def calculate_alternative_route_async(current_route, obstruction):
     """
     Simulates calculating an alternative route to avoid an obstruction.
     """
     print(f"Calculating alternative route for trip from {current_route['start']} to {current_route['end']} to avoid '{obstruction}'.")
-    time.sleep(1.5)
-    new_eta_minutes = current_route['original_eta'] + random.randint(5, 15) # New route is a bit longer
+    if _router is not None and ("start_node" in current_route or "start_location" in current_route):
+        # Obstructed road segments are given as pairs of source node ids.
+        graph = _router.graph
+        for u, v in current_route.get("obstructed_edges", []):
+            _router.close_edge(graph.index_of(u), graph.index_of(v), duration_s=OBSTRUCTION_CLOSURE_S)
+        seconds, path = _router.route(_route_endpoint(current_route, "start"), _route_endpoint(current_route, "end"))
+        if not path:
+            print("No alternative route available.")
+            return {"status": "no_route", "new_route": None}
+        node_ids = [int(graph.node_ids[node]) for node in path]
+        new_route = {
+            "new_route_id": f"route-{node_ids[0]}-{node_ids[-1]}-{len(node_ids)}",
+            "updated_eta_minutes": round(seconds / 60, 1),
+            "summary": f"Re-routed over {len(node_ids) - 1} road segments to avoid {obstruction}.",
+            "path": node_ids,
+        }
+        print("Alternative route calculated.")
+        return {"status": "success", "new_route": new_route}
+    await asyncio.sleep(1.5)
+    new_eta_minutes = current_route['original_eta'] + rng().randint(5, 15) # New route is a bit longer
     new_route = {
-        "new_route_id": f"route-{random.randint(1000, 9999)}",
+        "new_route_id": f"route-{rng().randint(1000, 9999)}",
         "updated_eta_minutes": new_eta_minutes,
         "summary": "Take Oak Street instead of Main Street to avoid accident."
     }
@@ -220,23 +533,55 @@ def calculate_alternative_route(current_route, obstruction):
     return {"status": "success", "new_route": new_route}
 
 
-def notify_passenger_and_driver(passenger_id, driver_id, message):
+@traced("notify_passenger_and_driver")
+@replayable("notify_passenger_and_driver")
+async def notify_passenger_and_driver_async(passenger_id, driver_id, message):
     """
     Simulates sending a synchronized notification to both passenger and driver.
     """
     print(f"Sending notification to passenger {passenger_id} and driver {driver_id}: '{message}'")
-    time.sleep(0.5)
+    notifications = dispatcher()
+    results = await asyncio.gather(notifications.send(passenger_id, message), notifications.send(driver_id, message))
     print("Notifications sent successfully.")
-    return {"status": "success"}
+    return _sent(results)
 
 
-def check_flight_status(flight_number):
+@traced("check_flight_status")
+@replayable("check_flight_status")
+@cached("check_flight_status", ttl=120)
+@single_flight("check_flight_status")
+async def check_flight_status_async(flight_number):
     """
     Simulates checking the status of a flight.
     """
     print(f"Checking status for flight {flight_number}...")
-    time.sleep(1)
+    await asyncio.sleep(1)
     statuses = ["On Time", "Delayed", "Cancelled"]
-    flight_status = random.choice(statuses)
+    flight_status = rng().choice(statuses)
     print(f"Flight {flight_number} status: {flight_status}.")
     return {"status": "success", "flight_number": flight_number, "flight_status": flight_status}
+
+
+# Blocking variants, kept for callers that are not running an event loop.
+check_traffic = _blocking(check_traffic_async)
+get_merchant_status = _blocking(get_merchant_status_async)
+get_driver_location = _blocking(get_driver_location_async)
+get_driver_locations = _blocking(get_driver_locations_async)
+notify_customer = _blocking(notify_customer_async)
+re_route_driver = _blocking(re_route_driver_async)
+re_route_drivers = _blocking(re_route_drivers_async)
+get_nearby_merchants = _blocking(get_nearby_merchants_async)
+initiate_mediation_flow = _blocking(initiate_mediation_flow_async)
+collect_evidence = _blocking(collect_evidence_async)
+analyze_evidence = _blocking(analyze_evidence_async)
+mediate_dispute = _blocking(mediate_dispute_async)
+issue_instant_refund = _blocking(issue_instant_refund_async)
+exonerate_driver = _blocking(exonerate_driver_async)
+log_merchant_packaging_feedback = _blocking(log_merchant_packaging_feedback_async)
+notify_resolution = _blocking(notify_resolution_async)
+contact_recipient_via_chat = _blocking(contact_recipient_via_chat_async)
+suggest_safe_drop_off = _blocking(suggest_safe_drop_off_async)
+find_nearby_locker = _blocking(find_nearby_locker_async)
+calculate_alternative_route = _blocking(calculate_alternative_route_async)
+notify_passenger_and_driver = _blocking(notify_passenger_and_driver_async)
+check_flight_status = _blocking(check_flight_status_async)
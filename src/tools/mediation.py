@@ -0,0 +1,344 @@
+import asyncio
+import itertools
+import math
+import re
+import threading
+import time
+from array import array
+
+# Fault classes, and evidence cues with their log-odds weight per class and
+# what they show. A mediation's estimate is a softmax over the summed
+# weights of every cue found in the evidence so far; its reason lists what
+# the cues backing the leading fault show.
+FAULTS = ("merchant", "driver", "customer")
+CUES = [
+    (r"\bsealed\b", {"merchant": 1.5, "driver": -1.0}, "the bag was sealed"),
+    (r"\bintact\b", {"merchant": 1.5, "driver": -1.0}, "the seal was intact"),
+    (r"\binside the (sealed )?(bag|box)\b|\bleak\w* (in|from) the (cup|container)\b", {"merchant": 1.0},
+     "the damage was inside the packaging"),
+    (r"\bwrong (item|order)\b|\bmissing items?\b|\bpoorly packed\b", {"merchant": 1.5},
+     "items were wrong, missing or poorly packed"),
+    (r"\b(seal|bag|box) was (broken|open(ed)?|torn)\b|\btamper\w*", {"driver": 1.5, "merchant": -1.0},
+     "the packaging was opened or tampered with"),
+    (r"\bdropp(ed|ing)\b|\bthrown\b|\brough(ly)?\b|\btipped over\b", {"driver": 1.5},
+     "the order was dropped or handled roughly"),
+    (r"\bno (visible )?damage\b|\bwas fine (on|at) (handover|delivery)\b|\bafter (handover|delivery)\b", {"customer": 1.5},
+     "the order was undamaged at handover"),
+]
+_CUES = [(re.compile(pattern, re.I), [weights.get(fault, 0.0) for fault in FAULTS]) for pattern, weights, _ in CUES]
+
+# An estimate is decisive, and analysis stops, once the leading fault is this
+# likely; when the evidence runs out first, the leader needs MIN_CONFIDENCE.
+DECISIVE = 0.9
+MIN_CONFIDENCE = 0.8
+REASONS = {
+    "merchant": "The evidence points to the merchant's packing or preparation",
+    "driver": "The evidence points to the order being mishandled in transit",
+    "customer": "The evidence indicates the order was handed over undamaged",
+    "unclear": "The evidence is not sufficient to determine clear fault.",
+}
+# Mediations still open this long after opening are abandoned, and their rows freed.
+MEDIATION_TTL_S = 24 * 3600.0
+
+# Simulated time to analyze one item, by kind (the key's suffix).
+ANALYSIS_COST_S = {"statement": 0.3, "photo_url": 0.6}
+DEFAULT_ANALYSIS_COST_S = 0.3
+PARTY_TIMEOUT_S = 3.0
+
+# What each kind of party sends, as (evidence suffix, delay in seconds, content).
+# Parties are identified by their id prefix (customer-1 is a customer).
+PARTY_EVIDENCE = {
+    "customer": [
+        ("statement", 1.2, "The seal was intact upon handover, but the drink was spilled inside the sealed bag."),
+        ("photo_url", 1.8, "https://example.com/spilled_drink.jpg"),
+    ],
+    "driver": [("statement", 0.8, "The bag was sealed by the merchant.")],
+    "merchant": [("statement", 1.0, "The order left the kitchen on time.")],
+}
+
+
+def analysis_cost(key):
+    return next((cost for suffix, cost in ANALYSIS_COST_S.items() if key.endswith(suffix)), DEFAULT_ANALYSIS_COST_S)
+
+
+def matched_cues(text):
+    """
+    The indexes in CUES of the cues found in one evidence item.
+    """
+    return [i for i, (pattern, _) in enumerate(_CUES) if pattern.search(text)]
+
+
+def cue_weights(text):
+    """
+    The summed per-fault weights of the cues found in one evidence item.
+    """
+    total = [0.0] * len(FAULTS)
+    for i in matched_cues(text):
+        total = [t + w for t, w in zip(total, _CUES[i][1])]
+    return total
+
+
+def reason_for(fault, cues):
+    """
+    Explains a fault from the cues (indexes in CUES) seen in the evidence:
+    what those backing it show, or REASONS alone when none does.
+    """
+    if fault not in FAULTS:
+        return REASONS[fault]
+    column = FAULTS.index(fault)
+    shown = [CUES[i][2] for i in sorted(cues) if _CUES[i][1][column] > 0]
+    return f"{REASONS[fault]}: {'; '.join(shown)}." if shown else f"{REASONS[fault]}."
+
+
+def _softmax(scores):
+    top = max(scores)
+    exps = [math.exp(score - top) for score in scores]
+    total = sum(exps)
+    return [e / total for e in exps]
+
+
+def role_of(party):
+    return party.split("-", 1)[0].lower()
+
+
+async def party_evidence(mediation_id, party):
+    """
+    Yields (key, value) evidence items from one party as they arrive.
+    """
+    role = role_of(party)
+    elapsed = 0.0
+    for suffix, delay, content in PARTY_EVIDENCE.get(role, [("statement", 1.0, "No statement provided.")]):
+        await asyncio.sleep(delay - elapsed)
+        elapsed = delay
+        yield f"{role}_{suffix}", content
+
+
+class EvidenceCollector:
+    """
+    Collects evidence from every party of a mediation concurrently.
+
+    Iterating yields (party, key, value) items in arrival order. Each party
+    has `timeout_s` to send everything; what it sent by then is kept and it
+    is listed in `missing`. Closing the iteration early cancels the
+    parties still outstanding.
+    """
+    def __init__(self, mediation_id, parties, timeout_s=PARTY_TIMEOUT_S):
+        self.mediation_id = mediation_id
+        self.parties = list(parties)
+        self.timeout_s = timeout_s
+        self.missing = []
+
+    async def _collect(self, party, queue):
+        try:
+            async with asyncio.timeout(self.timeout_s):
+                async for key, value in party_evidence(self.mediation_id, party):
+                    queue.put_nowait((party, key, value))
+        except TimeoutError:
+            self.missing.append(party)
+        finally:
+            queue.put_nowait(None)
+
+    async def __aiter__(self):
+        queue = asyncio.Queue()
+        tasks = [asyncio.create_task(self._collect(party, queue)) for party in self.parties]
+        remaining = len(tasks)
+        try:
+            while remaining:
+                item = await queue.get()
+                if item is None:
+                    remaining -= 1
+                else:
+                    yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+class MediationTable:
+    """
+    The state of every open mediation, in typed columns (status, evidence
+    count, opened time and one score per fault class) indexed by row, so
+    thousands of mediations cost a few dozen bytes each. Each evidence item
+    is scored once per mediation, however often it is resubmitted. Rows are
+    freed by close(), or once a mediation has been open `ttl_s`, and are
+    reused. Thread-safe.
+    """
+    OPEN, COLLECTING, DECIDED = 1, 2, 3
+
+    def __init__(self, capacity=1024, ttl_s=MEDIATION_TTL_S, clock=time.monotonic):
+        self._rows = {}
+        self._free = []
+        self._lock = threading.Lock()
+        self.ttl_s = ttl_s
+        self._clock = clock
+        # Per mediation: digests of the evidence items scored, and the cues seen.
+        self._evidence = {}
+        self.capacity = 0
+        self.status = array("b")
+        self.items = array("H")
+        self.opened_at = array("d")
+        self.scores = array("f")
+        self._grow(capacity)
+
+    def _grow(self, capacity):
+        extra = capacity - self.capacity
+        self.status.extend(bytes(extra))
+        self.items.extend([0] * extra)
+        self.opened_at.extend([0.0] * extra)
+        self.scores.extend([0.0] * (extra * len(FAULTS)))
+        self._free.extend(range(capacity - 1, self.capacity - 1, -1))
+        self.capacity = capacity
+
+    def open(self, mediation_id):
+        """
+        Starts tracking a mediation (or restarts one with the same id).
+        """
+        with self._lock:
+            row = self._rows.get(mediation_id)
+            if row is None:
+                if not self._free:
+                    self._expire()
+                if not self._free:
+                    self._grow(self.capacity * 2)
+                row = self._rows[mediation_id] = self._free.pop()
+            self._evidence.pop(mediation_id, None)
+            self.status[row] = self.OPEN
+            self.items[row] = 0
+            self.opened_at[row] = self._clock()
+            start = row * len(FAULTS)
+            self.scores[start:start + len(FAULTS)] = array("f", [0.0] * len(FAULTS))
+            return row
+
+    def __contains__(self, mediation_id):
+        return mediation_id in self._rows
+
+    def __len__(self):
+        return len(self._rows)
+
+    def set_status(self, mediation_id, status):
+        with self._lock:
+            self.status[self._rows[mediation_id]] = status
+
+    def add_evidence(self, mediation_id, text, key=None):
+        """
+        Folds one evidence item into a mediation's estimate and returns the
+        per-fault probabilities. An item already scored for the mediation
+        (the same `key` and text) leaves the estimate unchanged.
+        """
+        cues = matched_cues(text)
+        digest = hash((key, text))
+        with self._lock:
+            row = self._rows[mediation_id]
+            start = row * len(FAULTS)
+            seen, seen_cues = self._evidence.setdefault(mediation_id, (set(), set()))
+            if digest not in seen:
+                seen.add(digest)
+                seen_cues.update(cues)
+                for cue in cues:
+                    for i, weight in enumerate(_CUES[cue][1]):
+                        self.scores[start + i] += weight
+                self.items[row] = min(self.items[row] + 1, 0xFFFF)
+            return _softmax(self.scores[start:start + len(FAULTS)])
+
+    def verdict(self, mediation_id, min_confidence=MIN_CONFIDENCE):
+        """
+        The leading fault, its probability and the reason for it, with the
+        fault "unclear" when none reaches `min_confidence` (or no cue has
+        been seen).
+        """
+        with self._lock:
+            row = self._rows[mediation_id]
+            start = row * len(FAULTS)
+            scores = self.scores[start:start + len(FAULTS)]
+            items = self.items[row]
+            cues = set(self._evidence.get(mediation_id, ((), ()))[1])
+        probabilities = _softmax(scores)
+        best = max(range(len(FAULTS)), key=probabilities.__getitem__)
+        fault = FAULTS[best] if any(scores) and probabilities[best] >= min_confidence else "unclear"
+        return {"fault": fault, "confidence": round(probabilities[best], 3), "items_analyzed": items,
+                "reason": reason_for(fault, cues)}
+
+    def close(self, mediation_id):
+        """
+        Stops tracking a mediation and frees its row. Unknown ids are ignored.
+        """
+        with self._lock:
+            self._release(mediation_id)
+
+    def expire(self):
+        """
+        Closes every mediation open for `ttl_s` or longer and returns how many.
+        """
+        with self._lock:
+            return self._expire()
+
+    def _expire(self):
+        # Called with the lock held.
+        cutoff = self._clock() - self.ttl_s
+        stale = [mediation_id for mediation_id, row in self._rows.items() if self.opened_at[row] <= cutoff]
+        for mediation_id in stale:
+            self._release(mediation_id)
+        return len(stale)
+
+    def _release(self, mediation_id):
+        row = self._rows.pop(mediation_id, None)
+        self._evidence.pop(mediation_id, None)
+        if row is not None:
+            self.status[row] = 0
+            self._free.append(row)
+
+    def stats(self):
+        with self._lock:
+            statuses = [self.status[row] for row in self._rows.values()]
+        return {
+            "open": len(statuses),
+            "collecting": statuses.count(self.COLLECTING),
+            "decided": statuses.count(self.DECIDED),
+            "capacity": self.capacity,
+            "bytes": sum(column.itemsize * len(column) for column in (self.status, self.items, self.opened_at, self.scores)),
+        }
+
+
+# Every mediation the tools know about.
+mediations = MediationTable()
+_analysis_ids = itertools.count(1)
+
+
+async def analyze_items(mediation_id, items, threshold=DECISIVE):
+    """
+    Analyzes (key, value) evidence items one by one as they are yielded by
+    the async iterable `items`, updating the mediation's estimate, and stops
+    as soon as the estimate is decisive. Returns the evidence analyzed and
+    whether analysis stopped early.
+    """
+    analyzed = {}
+    iterator = aiter(items)
+    try:
+        async for item in iterator:
+            key, value = item[-2:]
+            await asyncio.sleep(analysis_cost(key))
+            analyzed[key] = value
+            if max(mediations.add_evidence(mediation_id, str(value), key)) >= threshold:
+                return analyzed, True
+        return analyzed, False
+    finally:
+        # Stops whatever is still producing evidence (e.g. parties yet to answer).
+        if hasattr(iterator, "aclose"):
+            await iterator.aclose()
+
+
+async def analyze_evidence(evidence, threshold=DECISIVE):
+    """
+    Analyzes an evidence dict, cheapest items first, stopping once decisive.
+    """
+    async def cheapest_first():
+        for key in sorted(evidence, key=analysis_cost):
+            yield key, evidence[key]
+
+    mediation_id = f"analysis-{next(_analysis_ids)}"
+    mediations.open(mediation_id)
+    try:
+        _, early = await analyze_items(mediation_id, cheapest_first(), threshold)
+        return {**mediations.verdict(mediation_id), "early_exit": early}
+    finally:
+        mediations.close(mediation_id)
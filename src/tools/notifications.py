@@ -0,0 +1,229 @@
+import asyncio
+import itertools
+import threading
+import weakref
+from collections import OrderedDict, deque
+
+
+class _Connection:
+    __slots__ = ("id", "requests")
+
+    def __init__(self, connection_id):
+        self.id = connection_id
+        self.requests = 0
+
+
+class ConnectionPool:
+    """
+    Keeps up to `max_idle` open connections for reuse. Opening one costs
+    `connect_s` (a simulated handshake); acquire() reuses an idle
+    connection when there is one. Thread-safe, so one pool can serve the
+    event loops of every worker thread.
+    """
+    def __init__(self, max_idle=4, connect_s=0.05):
+        self.max_idle = max_idle
+        self.connect_s = connect_s
+        self._idle = []
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self.opened = 0
+        self.reused = 0
+
+    async def acquire(self):
+        with self._lock:
+            if self._idle:
+                self.reused += 1
+                return self._idle.pop()
+            self.opened += 1
+            connection = _Connection(next(self._ids))
+        await asyncio.sleep(self.connect_s)
+        return connection
+
+    def release(self, connection):
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(connection)
+
+
+class StubTransport:
+    """
+    A local stand-in for the notification provider's bulk API: one
+    `round_trip_s` call delivers a whole batch over a pooled connection.
+    A transport only needs an async send_bulk(messages) returning one
+    result per message.
+    """
+    def __init__(self, round_trip_s=0.5, pool=None):
+        self.round_trip_s = round_trip_s
+        self.pool = pool or ConnectionPool()
+        self.calls = 0
+
+    async def send_bulk(self, messages):
+        connection = await self.pool.acquire()
+        try:
+            self.calls += 1
+            connection.requests += 1
+            print(f"Sending {len(messages)} notifications in one bulk call...")
+            await asyncio.sleep(self.round_trip_s)
+            return [{"status": "success", "recipient": message["recipient"]} for message in messages]
+        finally:
+            self.pool.release(connection)
+
+
+class NotificationDispatcher:
+    """
+    Collects outgoing messages and delivers them in bulk through a transport.
+
+    A batch is flushed when it reaches `max_batch` messages or `max_delay_s`
+    after its first message, whichever comes first. While a message is
+    queued or in flight, identical copies to the same recipient wait for
+    the same delivery. With `dedupe_window_s` copies sent that long after
+    it was delivered are not sent again either; their result says so with
+    status "deduplicated". Bound to the event loop it is used on.
+    """
+    def __init__(self, transport=None, max_batch=100, max_delay_s=0.02, dedupe_window_s=0.0):
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1.")
+        self.transport = transport or default_transport()
+        self.max_batch = max_batch
+        self.max_delay_s = max_delay_s
+        self.dedupe_window_s = dedupe_window_s
+        self._pending = {}
+        self._in_flight = {}
+        self._delivered = OrderedDict()
+        self._timer = None
+        self._flushes = set()
+        self._latencies = deque(maxlen=1000)
+        self.counts = {"queued": 0, "sent": 0, "deduplicated": 0, "flushes": 0, "errors": 0}
+
+    def _forget_delivered(self, now):
+        while self._delivered:
+            key, delivered_at = next(iter(self._delivered.items()))
+            if now - delivered_at < self.dedupe_window_s:
+                break
+            self._delivered.popitem(last=False)
+
+    def send(self, recipient, message):
+        """
+        Queues a message and returns a future for its delivery result.
+        """
+        loop = asyncio.get_running_loop()
+        key = (recipient, message)
+        self._forget_delivered(loop.time())
+        waiting = self._pending.get(key) or self._in_flight.get(key)
+        if waiting is not None or key in self._delivered:
+            self.counts["deduplicated"] += 1
+            if waiting is not None:
+                return waiting
+            future = loop.create_future()
+            future.set_result({"status": "deduplicated", "recipient": recipient, "deduplicated": True})
+            return future
+        future = self._pending[key] = loop.create_future()
+        self.counts["queued"] += 1
+        if len(self._pending) >= self.max_batch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay_s, self.flush)
+        return future
+
+    def flush(self):
+        """
+        Starts delivering everything queued so far.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        self._in_flight.update(batch)
+        task = asyncio.get_running_loop().create_task(self._deliver(batch))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _deliver(self, batch):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        self.counts["flushes"] += 1
+        try:
+            results = await self.transport.send_bulk(
+                [{"recipient": recipient, "message": message} for recipient, message in batch]
+            )
+        except Exception as e:
+            self.counts["errors"] += len(batch)
+            results = None
+            error = e
+        finished = loop.time()
+        self._latencies.append(finished - started)
+        for index, (key, future) in enumerate(batch.items()):
+            del self._in_flight[key]
+            if results is None:
+                future.set_exception(error)
+                future.exception()  # waiters get the error; do not log it as never retrieved
+                continue
+            self.counts["sent"] += 1
+            if self.dedupe_window_s > 0:
+                self._delivered[key] = finished
+            future.set_result(results[index])
+
+    async def drain(self):
+        """
+        Flushes the queue and waits until everything queued has been delivered.
+        """
+        self.flush()
+        while self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    def stats(self):
+        latencies = sorted(self._latencies)
+
+        def quantile(q):
+            return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 3) if latencies else None
+
+        return {
+            **self.counts,
+            "queue_depth": len(self._pending),
+            "in_flight": len(self._in_flight),
+            "mean_batch": round(self.counts["sent"] / self.counts["flushes"], 3) if self.counts["flushes"] else None,
+            "flush_p50_ms": quantile(0.5),
+            "flush_p95_ms": quantile(0.95),
+        }
+
+
+# The transport every dispatcher uses unless given another, and one
+# dispatcher per event loop (each batch worker thread runs its own loop).
+_transport = None
+_transport_lock = threading.Lock()
+_dispatchers = weakref.WeakKeyDictionary()
+_dispatcher_options = {}
+
+
+def default_transport():
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = StubTransport()
+        return _transport
+
+
+def set_transport(transport, **options):
+    """
+    Installs (or, with None, resets to the stub) the transport the notification
+    tools deliver through. `options` (max_batch, max_delay_s, dedupe_window_s)
+    configure the dispatchers created from now on.
+    """
+    global _transport, _dispatcher_options
+    with _transport_lock:
+        _transport = transport
+        _dispatcher_options = options
+        _dispatchers.clear()
+
+
+def dispatcher():
+    """
+    The dispatcher for the running event loop, created on first use.
+    """
+    loop = asyncio.get_running_loop()
+    found = _dispatchers.get(loop)
+    if found is None:
+        found = _dispatchers[loop] = NotificationDispatcher(**_dispatcher_options)
+    return found
@@ -0,0 +1,227 @@
+import builtins
+import contextlib
+import copy
+import functools
+import gzip
+import inspect
+import json
+import threading
+import time
+from collections import defaultdict, deque
+
+from src.telemetry.tracing import digest
+from src.tools import runtime
+
+FORMAT = "tool-replay/1"
+
+# The installed Recorder or Replayer; None (the default) leaves tools alone.
+_session = None
+
+
+def _open(path, mode):
+    return gzip.open(path, mode + "t") if str(path).endswith(".gz") else open(path, mode)
+
+
+class ReplayMiss(LookupError):
+    """
+    A replayed tool call that the log has no result for.
+    """
+
+
+class Recorder:
+    """
+    Writes every tool call's result (or error) to a JSON lines log, gzipped
+    when the path ends in .gz, along with each resolved disruption and its
+    output. Calls are keyed by tool name and an argument digest.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._file = _open(path, "w")
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.disruptions = 0
+        self._write({"format": FORMAT, "recorded_at": time.time()})
+
+    def _write(self, record):
+        line = json.dumps(record, default=str, separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+
+    async def call(self, name, key, async_fn, args, kwargs):
+        try:
+            result = await async_fn(*args, **kwargs)
+        except Exception as e:
+            self._write({"tool": name, "key": key, "error": type(e).__name__, "message": str(e)})
+            self.calls += 1
+            raise
+        self._write({"tool": name, "key": key, "result": result})
+        self.calls += 1
+        return result
+
+    def disruption(self, scenario, output):
+        self._write({"disruption": scenario, "output": output})
+        self.disruptions += 1
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class Replayer:
+    """
+    Serves tool results from a Recorder log instantly, without running the
+    tools. Repeated calls with the same arguments get the recorded results
+    in order, then the last one again. Calls the log has no result for run
+    the real tool (`on_miss="live"`) or raise ReplayMiss (`on_miss="error"`).
+    """
+    def __init__(self, path, on_miss="live"):
+        if on_miss not in ("live", "error"):
+            raise ValueError("on_miss must be 'live' or 'error'.")
+        self.path = path
+        self.on_miss = on_miss
+        self.disruptions = []
+        self._results = defaultdict(deque)
+        self._last = {}
+        self._lock = threading.Lock()
+        self.served = 0
+        self.misses = 0
+        with _open(path, "r") as f:
+            header = json.loads(f.readline())
+            if header.get("format") != FORMAT:
+                raise ValueError(f"{path} is not a {FORMAT} log.")
+            for line in f:
+                record = json.loads(line)
+                if "disruption" in record:
+                    self.disruptions.append(record)
+                else:
+                    self._results[(record["tool"], record["key"])].append(record)
+
+    def _next(self, name, key):
+        with self._lock:
+            queue = self._results.get((name, key))
+            if queue:
+                record = self._last[(name, key)] = queue.popleft()
+            else:
+                record = self._last.get((name, key))
+            if record is None:
+                self.misses += 1
+            else:
+                self.served += 1
+            return record
+
+    async def call(self, name, key, async_fn, args, kwargs):
+        record = self._next(name, key)
+        if record is None:
+            if self.on_miss == "error":
+                raise ReplayMiss(f"No recorded result for {name}{args or ''}{kwargs or ''}.")
+            return await async_fn(*args, **kwargs)
+        if "error" in record:
+            error = getattr(builtins, record["error"], None)
+            if not (isinstance(error, type) and issubclass(error, Exception)):
+                error = RuntimeError
+            raise error(record["message"])
+        # Callers get their own copy, as they would from the real tool.
+        return copy.deepcopy(record["result"])
+
+    def disruption(self, scenario, output):
+        pass
+
+    def close(self):
+        pass
+
+    def stats(self):
+        with self._lock:
+            return {"served": self.served, "misses": self.misses,
+                    "unused": sum(len(queue) for queue in self._results.values())}
+
+
+def set_session(session):
+    """
+    Installs (or, with None, removes) the Recorder or Replayer used by every
+    replayable tool. Returns the previous one.
+    """
+    global _session
+    previous, _session = _session, session
+    return previous
+
+
+@contextlib.contextmanager
+def recording(path):
+    """
+    Records every tool call made inside the block to `path`.
+    """
+    recorder = Recorder(path)
+    previous = set_session(recorder)
+    try:
+        yield recorder
+    finally:
+        set_session(previous)
+        recorder.close()
+
+
+@contextlib.contextmanager
+def replaying(path, on_miss="live"):
+    """
+    Serves tool calls made inside the block from the log at `path`.
+    """
+    replayer = Replayer(path, on_miss)
+    previous = set_session(replayer)
+    try:
+        yield replayer
+    finally:
+        set_session(previous)
+
+
+def replayable(name):
+    """
+    Lets a Recorder capture an async tool's results and a Replayer serve
+    them. With no session installed the tool is called straight through.
+    """
+    def decorator(async_fn):
+        signature = inspect.signature(async_fn)
+
+        @functools.wraps(async_fn)
+        async def wrapper(*args, **kwargs):
+            session = _session
+            if session is None:
+                return await async_fn(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return await session.call(name, digest(**bound.arguments), async_fn, args, kwargs)
+
+        return wrapper
+    return decorator
+
+
+def record_disruption(scenario, response):
+    """
+    Adds a resolved disruption and its output to the active recording, if any.
+    """
+    session = _session
+    if session is not None:
+        session.disruption(scenario, response.get("output") if isinstance(response, dict) else response)
+
+
+def replay_disruptions(coordinator, path, on_miss="live", virtual=True):
+    """
+    Re-resolves every disruption recorded in `path` with `coordinator`, its
+    tool calls served from the log, on a virtual clock by default. Returns
+    how many outputs matched the recording, the ones that changed, and the
+    replay's wall-clock time.
+    """
+    start = time.perf_counter()
+    changed = []
+    with replaying(path, on_miss) as replayer:
+        for index, record in enumerate(replayer.disruptions):
+            response = runtime.run(coordinator.handle_disruption_async(record["disruption"]), virtual=virtual)
+            if response.get("output") != record["output"]:
+                changed.append({"index": index, "disruption": record["disruption"],
+                                "recorded": record["output"], "replayed": response.get("output")})
+    total = len(replayer.disruptions)
+    return {
+        "disruptions": total,
+        "matched": total - len(changed),
+        "changed": changed,
+        **replayer.stats(),
+        "wall_s": round(time.perf_counter() - start, 3),
+    }
@@ -0,0 +1,301 @@
+import asyncio
+import copy
+import functools
+import inspect
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+
+from src.telemetry import tracing
+from src.tools.cache import freeze
+from src.tools.runtime import monotonic, rng, run_sync
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+_tools = {}
+
+
+@dataclass(frozen=True)
+class Policy:
+    """
+    How one tool is called: each attempt is cut off after `timeout_s`, and
+    all attempts together (with their back-off) after `budget_s`. Only
+    idempotent tools are retried. The breaker opens after
+    `failure_threshold` consecutive failures and lets a probe call through
+    after `reset_s`.
+    """
+    timeout_s: float = 3.0
+    budget_s: float = 3.0
+    idempotent: bool = False
+    retries: int = 0
+    backoff_s: float = 0.1
+    max_backoff_s: float = 1.0
+    failure_threshold: int = 5
+    reset_s: float = 30.0
+
+
+READ = Policy(timeout_s=3.0, budget_s=6.0, idempotent=True, retries=2)
+WRITE = Policy(timeout_s=5.0, budget_s=5.0)
+
+# Per-tool policies, by function name; other tools get WRITE.
+POLICIES = {
+    "get_merchant_status": READ,
+    "get_driver_location": READ,
+    "check_traffic": READ,
+    "get_nearby_merchants": READ,
+    "find_nearby_locker": READ,
+    "check_flight_status": READ,
+    "analyze_evidence": READ,
+    "calculate_alternative_route": Policy(timeout_s=4.0, budget_s=8.0, idempotent=True, retries=1),
+    "contact_recipient_via_chat": Policy(timeout_s=6.0, budget_s=6.0),
+    # Evidence collection waits up to mediation.PARTY_TIMEOUT_S for each party.
+    "collect_evidence": Policy(timeout_s=6.0, budget_s=6.0),
+    "mediate_dispute": Policy(timeout_s=6.0, budget_s=6.0),
+}
+
+
+class CircuitBreaker:
+    """
+    A thread-safe circuit breaker. Closed, it lets every call through and
+    counts consecutive failures; at `failure_threshold` it opens and fails
+    calls fast for `reset_s` seconds. Then it is half-open: one probe call
+    goes through, and its outcome closes or re-opens the breaker.
+    """
+    def __init__(self, failure_threshold=5, reset_s=30.0, clock=monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_s = reset_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.opened = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if self._state == OPEN and self._clock() - self._opened_at >= self.reset_s:
+            self._state = HALF_OPEN
+            self._probing = False
+        return self._state
+
+    def allow(self):
+        """
+        Returns whether a call may go through now.
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def release(self):
+        """
+        Ends a probe call that neither succeeded nor failed (a caller error, a cancellation).
+        """
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self.opened += 1
+                self._state = OPEN
+                self._opened_at = self._clock()
+                self._probing = False
+
+
+class ResilientTool:
+    """
+    Calls one async tool under a Policy: per-attempt timeouts, jittered
+    exponential retries within the latency budget (idempotent tools only)
+    and a circuit breaker. When the call fails or the breaker is open, the
+    caller gets an answer marked `degraded` instead of an exception: for an
+    idempotent tool, the last good result for the same arguments if there
+    is one; otherwise "unavailable" (not called) or, for a write that was
+    called, "failed", with `may_have_applied` set when it timed out.
+
+    Arguments that do not fit the tool's signature raise TypeError before
+    the call; any error raised by the call itself counts as a failure.
+    """
+    def __init__(self, name, async_fn, policy=WRITE, fallback_size=256, window=512):
+        self.name = name
+        self.policy = policy
+        self._fn = async_fn
+        self._signature = inspect.signature(async_fn)
+        self.breaker = CircuitBreaker(policy.failure_threshold, policy.reset_s)
+        self._last_good = OrderedDict()
+        self._fallback_size = fallback_size
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.counts = {"calls": 0, "successes": 0, "failures": 0, "timeouts": 0, "retries": 0,
+                       "short_circuits": 0, "fallbacks": 0, "over_budget": 0}
+
+    def _count(self, key):
+        with self._lock:
+            self.counts[key] += 1
+
+    def _key(self, args, kwargs):
+        bound = self._signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        return tuple((k, freeze(v)) for k, v in bound.arguments.items())
+
+    async def __call__(self, *args, **kwargs):
+        # Raises TypeError for bad arguments, before the breaker is involved.
+        key = self._key(args, kwargs)
+        self._count("calls")
+        if not self.breaker.allow():
+            self._count("short_circuits")
+            return self._fallback(key, f"{self.name} is failing; its circuit breaker is open.")
+        start = monotonic()
+        deadline = start + self.policy.budget_s
+        attempts = 1 + (self.policy.retries if self.policy.idempotent else 0)
+        error, timed_out = None, False
+        for attempt in range(attempts):
+            timeout = min(self.policy.timeout_s, deadline - monotonic())
+            if timeout <= 0:
+                break
+            try:
+                result = await asyncio.wait_for(self._fn(*args, **kwargs), timeout)
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            except asyncio.TimeoutError:
+                self._count("timeouts")
+                timed_out = True
+                error = f"{self.name} timed out after {timeout:.1f}s."
+            except Exception as e:
+                error = f"{self.name} failed: {type(e).__name__}: {e}"
+            else:
+                self.breaker.record_success()
+                self._finish(start, "successes")
+                if self.policy.idempotent:
+                    with self._lock:
+                        self._last_good[key] = result
+                        self._last_good.move_to_end(key)
+                        while len(self._last_good) > self._fallback_size:
+                            self._last_good.popitem(last=False)
+                return result
+            if attempt + 1 < attempts:
+                # Full jitter, so callers retrying together spread out.
+                delay = rng().uniform(0, min(self.policy.max_backoff_s, self.policy.backoff_s * 2 ** attempt))
+                if monotonic() + delay >= deadline:
+                    break
+                self._count("retries")
+                await asyncio.sleep(delay)
+        self.breaker.record_failure()
+        self._finish(start, "failures")
+        return self._fallback(key, error or f"{self.name} exceeded its {self.policy.budget_s:.1f}s budget.",
+                              called=True, timed_out=timed_out)
+
+    def _finish(self, start, outcome):
+        elapsed = monotonic() - start
+        with self._lock:
+            self.counts[outcome] += 1
+            self._latencies.append(elapsed)
+            if elapsed > self.policy.budget_s:
+                self.counts["over_budget"] += 1
+
+    def _fallback(self, key, reason, called=False, timed_out=False):
+        tracing.annotate(degraded=self.name)
+        if not self.policy.idempotent:
+            # An earlier result of a write says nothing about this one, and a
+            # write that timed out may still have gone through.
+            return {"status": "failed" if called else "unavailable", "tool": self.name, "degraded": True,
+                    "reason": reason, "may_have_applied": timed_out}
+        with self._lock:
+            result = self._last_good.get(key)
+            if result is not None:
+                self.counts["fallbacks"] += 1
+        if result is None:
+            return {"status": "unavailable", "tool": self.name, "degraded": True, "reason": reason}
+        result = copy.deepcopy(result)
+        if isinstance(result, dict):
+            result.update(degraded=True, reason=reason)
+        return result
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self.counts)
+            latencies = sorted(self._latencies)
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else None
+        return {
+            **counts,
+            "state": self.breaker.state,
+            "breaker_opened": self.breaker.opened,
+            "timeout_s": self.policy.timeout_s,
+            "budget_s": self.policy.budget_s,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+        }
+
+
+def resilient(async_fn, name=None, policy=None):
+    """
+    Wraps an async tool in a ResilientTool (with its POLICIES entry unless
+    `policy` is given) and returns the async wrapper and a blocking variant,
+    both keeping the tool's signature and public name.
+    """
+    name = name or async_fn.__name__.removesuffix("_async")
+    tool = _tools.get(name)
+    if tool is None:
+        tool = _tools[name] = ResilientTool(name, async_fn, policy or POLICIES.get(name, WRITE))
+
+    @functools.wraps(async_fn)
+    async def wrapper(*args, **kwargs):
+        return await tool(*args, **kwargs)
+
+    @functools.wraps(async_fn)
+    def blocking(*args, **kwargs):
+        return run_sync(tool(*args, **kwargs))
+
+    blocking.__name__ = blocking.__qualname__ = name
+    wrapper.tool = blocking.tool = tool
+    return wrapper, blocking
+
+
+def resilience_stats():
+    """
+    Returns the call counters, breaker state and latency budget of every
+    wrapped tool, keyed by tool name.
+    """
+    return {name: tool.stats() for name, tool in _tools.items()}
+
+
+def _prometheus_lines():
+    stats = resilience_stats()
+    lines = [
+        "# HELP coordinator_tool_breaker_state Circuit breaker state (0 closed, 1 half-open, 2 open).",
+        "# TYPE coordinator_tool_breaker_state gauge",
+    ]
+    lines += [f'coordinator_tool_breaker_state{{tool="{name}"}} {STATE_VALUES[s["state"]]}' for name, s in stats.items()]
+    lines += [
+        "# HELP coordinator_tool_latency_budget_seconds Latency budget of a tool call, retries included.",
+        "# TYPE coordinator_tool_latency_budget_seconds gauge",
+    ]
+    lines += [f'coordinator_tool_latency_budget_seconds{{tool="{name}"}} {s["budget_s"]}' for name, s in stats.items()]
+    lines += [
+        "# HELP coordinator_tool_calls_total Resilient tool calls by outcome.",
+        "# TYPE coordinator_tool_calls_total counter",
+    ]
+    for name, s in stats.items():
+        for outcome in ("successes", "failures", "timeouts", "retries", "short_circuits", "fallbacks"):
+            lines.append(f'coordinator_tool_calls_total{{tool="{name}",outcome="{outcome}"}} {s[outcome]}')
+    return lines
+
+
+tracing.add_collector(_prometheus_lines)
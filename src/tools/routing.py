@@ -0,0 +1,411 @@
+import csv
+import heapq
+import json
+import math
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from src.tools.runtime import monotonic
+from src.tools.spatial import EARTH_RADIUS_KM, KM_PER_DEGREE
+
+# Files making up a converted graph directory; each is a plain .npy array so
+# the graph can be memory-mapped instead of parsed at startup.
+_ARRAYS = ("indptr", "indices", "weights", "lat", "lon", "node_ids")
+_GRID_ARRAYS = ("cells", "starts", "order")
+# Cell codes are row * _GRID_STRIDE + col, which keeps them sortable.
+_GRID_STRIDE = 1 << 21
+
+
+class RoadGraph:
+    """
+    A directed road graph in compressed sparse row (CSR) form.
+
+    The out-edges of node `u` are `indices[indptr[u]:indptr[u + 1]]`, with
+    travel times in seconds in the matching slice of `weights`. Nodes are
+    dense integers; `node_ids` maps them back to the source (e.g. OSM) ids.
+    """
+    def __init__(self, indptr, indices, weights, lat, lon, node_ids=None):
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.lat = lat
+        self.lon = lon
+        self.node_ids = node_ids if node_ids is not None else np.arange(len(lat))
+        self._index_of = None
+        self._min_seconds_per_km = None
+        self._grid = None
+
+    @property
+    def num_nodes(self):
+        return len(self.indptr) - 1
+
+    @property
+    def num_edges(self):
+        return len(self.indices)
+
+    @classmethod
+    def from_edges(cls, sources, targets, weights, lat, lon, node_ids=None):
+        """
+        Builds a graph from parallel edge arrays of dense node indices.
+        """
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int32)
+        weights = np.asarray(weights, dtype=np.float32)
+        order = np.argsort(sources, kind="stable")
+        indptr = np.zeros(len(lat) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=len(lat)), out=indptr[1:])
+        return cls(indptr, targets[order], weights[order], np.asarray(lat, dtype=float), np.asarray(lon, dtype=float), node_ids)
+
+    @classmethod
+    def from_csv(cls, nodes_path, edges_path):
+        """
+        Builds a graph from an OSM extract exported as two CSV files:
+        nodes (`node_id,latitude,longitude`) and edges (`source,target,length_m,speed_kmh`,
+        plus an optional `oneway` column; two-way edges are added in both directions).
+        """
+        with open(nodes_path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        node_ids = np.array([int(r["node_id"]) for r in rows], dtype=np.int64)
+        lat = np.array([float(r["latitude"]) for r in rows])
+        lon = np.array([float(r["longitude"]) for r in rows])
+        index_of = {node_id: i for i, node_id in enumerate(node_ids.tolist())}
+        sources, targets, weights = [], [], []
+        with open(edges_path, newline="") as f:
+            for r in csv.DictReader(f):
+                u, v = index_of[int(r["source"])], index_of[int(r["target"])]
+                seconds = float(r["length_m"]) / 1000 / float(r["speed_kmh"]) * 3600
+                sources.append(u)
+                targets.append(v)
+                weights.append(seconds)
+                if r.get("oneway", "0").strip().lower() not in ("1", "true", "yes"):
+                    sources.append(v)
+                    targets.append(u)
+                    weights.append(seconds)
+        return cls.from_edges(sources, targets, weights, lat, lon, node_ids)
+
+    def save(self, directory):
+        """
+        Writes the graph as one .npy file per array, ready for load(mmap=True).
+        Values derived from every edge (the fastest travel rate) go into
+        graph.json, so a loaded graph never has to scan the arrays for them.
+        """
+        os.makedirs(directory, exist_ok=True)
+        for name in _ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), np.asarray(getattr(self, name)))
+        with open(os.path.join(directory, "graph.json"), "w") as f:
+            grid = self.node_grid()
+            for name in _GRID_ARRAYS:
+                np.save(os.path.join(directory, f"grid_{name}.npy"), getattr(grid, name))
+            json.dump({"num_nodes": self.num_nodes, "num_edges": self.num_edges,
+                       "min_seconds_per_km": self.min_seconds_per_km(),
+                       "grid": {"cell_km": grid.cell_km, "bounds": grid.bounds}}, f)
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        """
+        Loads a graph written by save(). With `mmap=True` the arrays are
+        memory-mapped, so startup cost does not grow with the graph size.
+        """
+        mode = "r" if mmap else None
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mode) for name in _ARRAYS}
+        graph = cls(**arrays)
+        with open(os.path.join(directory, "graph.json")) as f:
+            meta = json.load(f)
+        # Graphs saved before these were recorded compute them on first use.
+        graph._min_seconds_per_km = meta.get("min_seconds_per_km")
+        if "grid" in meta:
+            grid = {name: np.load(os.path.join(directory, f"grid_{name}.npy"), mmap_mode=mode) for name in _GRID_ARRAYS}
+            graph._grid = NodeGrid(graph.lat, graph.lon, meta["grid"]["cell_km"], tuple(meta["grid"]["bounds"]), **grid)
+        return graph
+
+    def index_of(self, node_id):
+        """
+        Returns the dense index of a source node id.
+        """
+        if self._index_of is None:
+            self._index_of = {node_id: i for i, node_id in enumerate(np.asarray(self.node_ids).tolist())}
+        return self._index_of[node_id]
+
+    def edge_index(self, u, v):
+        """
+        Returns the position of edge u -> v in the CSR arrays (KeyError if absent).
+        """
+        start, end = int(self.indptr[u]), int(self.indptr[u + 1])
+        hits = np.flatnonzero(np.asarray(self.indices[start:end]) == v)
+        if not len(hits):
+            raise KeyError(f"No edge {u} -> {v}.")
+        return start + int(hits[0])
+
+    def out_edges(self, u):
+        """
+        The (target, weight, edge_index) triples of node u, read straight from
+        the CSR arrays, so a search only touches the pages of the nodes it
+        expands. The slices become plain lists, which keeps the search loop
+        free of NumPy scalar overhead.
+        """
+        start, end = int(self.indptr[u]), int(self.indptr[u + 1])
+        return zip(self.indices[start:end].tolist(), self.weights[start:end].tolist(), range(start, end))
+
+    def node_grid(self):
+        """
+        The NodeGrid over the graph's nodes, built on first use unless loaded.
+        """
+        if self._grid is None:
+            self._grid = NodeGrid.build(self.lat, self.lon)
+        return self._grid
+
+    def min_seconds_per_km(self):
+        """
+        The fastest travel rate on any edge, which keeps the A* heuristic
+        admissible. Computed by a scan over every edge, unless the graph was
+        loaded from a directory that recorded it.
+        """
+        if self._min_seconds_per_km is None:
+            sources = np.repeat(np.arange(self.num_nodes), np.diff(np.asarray(self.indptr)))
+            km = _haversine_km(self.lat[sources], self.lon[sources], self.lat[self.indices], self.lon[self.indices])
+            rates = np.asarray(self.weights, dtype=float)[km > 0] / km[km > 0]
+            self._min_seconds_per_km = float(rates.min()) if len(rates) else 0.0
+        return self._min_seconds_per_km
+
+
+class NodeGrid:
+    """
+    Graph nodes bucketed into square lat/lon cells of about `cell_km`, for
+    nearest-node lookups that only read the coordinates of nearby nodes.
+
+    Like the graph, the grid is in CSR form so it can be saved and
+    memory-mapped: `cells` holds the sorted codes of the non-empty cells,
+    and the nodes of cell `cells[k]` are `order[starts[k]:starts[k + 1]]`.
+    (SpatialIndex answers the same queries, but keeps a dict per point,
+    too much for a million road nodes.)
+    """
+    def __init__(self, lat, lon, cell_km, bounds, cells, starts, order):
+        self.lat = lat
+        self.lon = lon
+        self.cell_km = cell_km
+        self.cell_deg = cell_km / KM_PER_DEGREE
+        self.bounds = bounds
+        self.cells = cells
+        self.starts = starts
+        self.order = order
+
+    @classmethod
+    def build(cls, lat, lon, cell_km=0.5):
+        cell_deg = cell_km / KM_PER_DEGREE
+        rows = np.floor(np.asarray(lat, dtype=float) / cell_deg).astype(np.int64)
+        cols = np.floor(np.asarray(lon, dtype=float) / cell_deg).astype(np.int64)
+        codes = rows * _GRID_STRIDE + cols
+        order = np.argsort(codes, kind="stable")
+        cells, starts = np.unique(codes[order], return_index=True)
+        bounds = (int(rows.min()), int(rows.max()), int(cols.min()), int(cols.max())) if len(rows) else (0, -1, 0, -1)
+        return cls(lat, lon, cell_km, bounds, cells, np.append(starts, len(order)), order)
+
+    def _nodes(self, keys):
+        """
+        The nodes in the given (row, col) cells.
+        """
+        rows, cols = np.asarray(keys, dtype=np.int64).T
+        codes = rows * _GRID_STRIDE + cols
+        found = np.minimum(np.searchsorted(self.cells, codes), len(self.cells) - 1)
+        found = found[self.cells[found] == codes]
+        if not len(found):
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([self.order[self.starts[k]:self.starts[k + 1]] for k in found.tolist()])
+
+    def nearest(self, latitude, longitude):
+        """
+        Returns the index of the node closest to a coordinate, or -1 for an
+        empty grid. Rings of cells are searched outwards until no unscanned
+        cell can hold a closer node.
+        """
+        min_row, max_row, min_col, max_col = self.bounds
+        if max_row < min_row:
+            return -1
+        row, col = math.floor(latitude / self.cell_deg), math.floor(longitude / self.cell_deg)
+        # Distance covered by one ring of cells, in the narrower (longitude) direction.
+        ring_km = self.cell_km * max(math.cos(math.radians(min(abs(latitude) + 1, 89.9))), 1e-6)
+        max_ring = max(abs(row - min_row), abs(row - max_row), abs(col - min_col), abs(col - max_col))
+        # Rings closer than the grid's bounding box are empty.
+        first_ring = max(0, min_row - row, row - max_row, min_col - col, col - max_col)
+        best, best_km = -1, math.inf
+        for ring in range(first_ring, max_ring + 1):
+            if ring == 0:
+                keys = [(row, col)]
+            else:
+                keys = [(r, c) for r in range(row - ring, row + ring + 1) for c in (col - ring, col + ring)]
+                keys += [(r, c) for r in (row - ring, row + ring) for c in range(col - ring + 1, col + ring)]
+            nodes = self._nodes(keys)
+            if len(nodes):
+                km = _haversine_km(latitude, longitude, self.lat[nodes], self.lon[nodes])
+                i = int(np.argmin(km))
+                if km[i] < best_km:
+                    best, best_km = int(nodes[i]), float(km[i])
+            if best >= 0 and best_km <= ring * ring_km:
+                break
+        return best
+
+
+def _haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(a, dtype=float)) for a in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+
+class Router:
+    """
+    A* shortest paths over a RoadGraph with temporary obstructions.
+
+    Obstructions are an overlay of per-edge weight multipliers (infinity for a
+    closure), so the graph itself is never rebuilt. Because obstructions only
+    make edges slower, a cached route that avoids every newly obstructed edge
+    is still optimal; re-queries after a closure therefore only search again
+    for the routes the closure actually touches. At most `max_routes`
+    routes are cached, least recently used first out. Thread-safe: searches
+    run outside the lock on a snapshot of the obstructions, and a route
+    found while the obstructions changed is returned but not cached.
+    """
+    def __init__(self, graph, clock=monotonic, max_routes=4096):
+        if max_routes < 1:
+            raise ValueError("max_routes must be at least 1.")
+        self.graph = graph
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._penalties = {}
+        self._expiry = {}
+        self._routes = OrderedDict()
+        self._generation = 0
+        self.max_routes = max_routes
+        self._lat = np.asarray(graph.lat, dtype=float).tolist()
+        self._lon = np.asarray(graph.lon, dtype=float).tolist()
+        self._cos_lat = [math.cos(math.radians(lat)) for lat in self._lat]
+        self.searches = 0
+        self.reused = 0
+
+    def penalize_edge(self, u, v, factor, duration_s=None):
+        """
+        Multiplies the travel time of edge u -> v by `factor` (>= 1).
+        With `duration_s` the penalty lifts itself after that many seconds.
+        """
+        if factor < 1:
+            raise ValueError("Obstruction factors must be >= 1; use clear_obstructions() to lift them.")
+        edge = self.graph.edge_index(u, v)
+        with self._lock:
+            self._penalties[edge] = factor
+            if duration_s is not None:
+                self._expiry[edge] = self._clock() + duration_s
+            self._generation += 1
+            # Routes through this edge can no longer be trusted.
+            for key in [key for key, (_, _, edges) in self._routes.items() if edge in edges]:
+                del self._routes[key]
+
+    def close_edge(self, u, v, duration_s=None, both_directions=True):
+        """
+        Closes a road segment (in both directions by default).
+        """
+        self.penalize_edge(u, v, math.inf, duration_s)
+        if both_directions:
+            try:
+                self.penalize_edge(v, u, math.inf, duration_s)
+            except KeyError:
+                pass
+
+    def clear_obstructions(self):
+        """
+        Lifts every closure and penalty. Cached routes are dropped, since
+        faster roads may now exist.
+        """
+        with self._lock:
+            self._penalties.clear()
+            self._expiry.clear()
+            self._routes.clear()
+            self._generation += 1
+
+    def _expire(self):
+        # Called with the lock held.
+        if not self._expiry:
+            return
+        now = self._clock()
+        expired = [edge for edge, at in self._expiry.items() if at <= now]
+        for edge in expired:
+            del self._expiry[edge]
+            del self._penalties[edge]
+        if expired:
+            self._routes.clear()
+            self._generation += 1
+
+    def route(self, source, target):
+        """
+        Returns (seconds, path) for the fastest route between two node
+        indices, or (inf, []) when obstructions leave no route.
+        """
+        key = (source, target)
+        with self._lock:
+            self._expire()
+            cached = self._routes.get(key)
+            if cached is not None:
+                self._routes.move_to_end(key)
+                self.reused += 1
+                return cached[0], list(cached[1])
+            self.searches += 1
+            generation, penalties = self._generation, dict(self._penalties)
+        seconds, path, edges = self._astar(source, target, penalties)
+        with self._lock:
+            if generation == self._generation:
+                self._routes[key] = (seconds, path, edges)
+                while len(self._routes) > self.max_routes:
+                    self._routes.popitem(last=False)
+        return seconds, list(path)
+
+    def _astar(self, source, target, penalties):
+        out_edges = self.graph.out_edges
+        lat, lon, cos_lat = self._lat, self._lon, self._cos_lat
+        # Straight-line lower bound: haversine distance at the fastest edge rate.
+        rate = self.graph.min_seconds_per_km() * 2 * EARTH_RADIUS_KM
+        t_phi, t_lmb, t_cos = math.radians(lat[target]), math.radians(lon[target]), cos_lat[target]
+
+        def heuristic(u):
+            a = math.sin((math.radians(lat[u]) - t_phi) / 2) ** 2 + cos_lat[u] * t_cos * math.sin((math.radians(lon[u]) - t_lmb) / 2) ** 2
+            return rate * math.asin(min(1.0, math.sqrt(a)))
+
+        best = {source: 0.0}
+        parent = {source: (-1, -1)}
+        frontier = [(heuristic(source), 0.0, source)]
+        closed = set()
+        while frontier:
+            _, cost, u = heapq.heappop(frontier)
+            if u == target:
+                break
+            if u in closed:
+                continue
+            closed.add(u)
+            for v, weight, edge in out_edges(u):
+                if penalties:
+                    factor = penalties.get(edge)
+                    if factor is not None:
+                        weight *= factor
+                        if weight == math.inf:
+                            continue
+                new_cost = cost + weight
+                if new_cost < best.get(v, math.inf):
+                    best[v] = new_cost
+                    parent[v] = (u, edge)
+                    heapq.heappush(frontier, (new_cost + heuristic(v), new_cost, v))
+        else:
+            return math.inf, [], frozenset()
+        path, edges = [target], set()
+        node = target
+        while node != source:
+            node, edge = parent[node]
+            path.append(node)
+            edges.add(edge)
+        path.reverse()
+        return best[target], path, frozenset(edges)
+
+    def nearest_node(self, latitude, longitude):
+        """
+        Returns the index of the graph node closest to a coordinate.
+        """
+        return self.graph.node_grid().nearest(latitude, longitude)
@@ -0,0 +1,154 @@
+import asyncio
+import os
+import random
+import selectors
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+_local = threading.local()
+_helper_pool = None
+_helper_lock = threading.Lock()
+# When set, the blocking tool wrappers run on VirtualTimeLoops.
+_virtual_time = os.environ.get("COORDINATOR_VIRTUAL_TIME", "").lower() in ("1", "true", "yes")
+# The random source of the simulated tools; COORDINATOR_SEED makes runs repeatable.
+_rng = random.Random(os.environ.get("COORDINATOR_SEED"))
+
+
+class _VirtualSelector:
+    """
+    Wraps a real selector so that a wait for the next timer returns at once
+    and moves the loop's virtual clock forward instead. Real I/O (and thread
+    wake-ups) still arrive, because the real selector is always polled first.
+    """
+    def __init__(self, loop):
+        self._loop = loop
+        self._selector = selectors.DefaultSelector()
+
+    def select(self, timeout=None):
+        events = self._selector.select(0)
+        if events or timeout == 0:
+            return events
+        if timeout is None:
+            # Nothing is scheduled: only I/O or another thread can wake the loop.
+            return self._selector.select(None)
+        self._loop.advance(timeout)
+        return events
+
+    def __getattr__(self, name):
+        return getattr(self._selector, name)
+
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    """
+    An event loop running on virtual time: whenever every task is waiting on
+    a timer (e.g. the simulated latency of a tool's asyncio.sleep), the clock
+    jumps straight to the next one. Concurrency is preserved, so two 1 s
+    tools gathered together still take 1 s of virtual time, but the run
+    finishes as fast as the CPU work allows and is fully deterministic.
+    """
+    def __init__(self, start=0.0):
+        self._now = start
+        super().__init__(selector=_VirtualSelector(self))
+
+    def time(self):
+        return self._now
+
+    def advance(self, seconds):
+        self._now += seconds
+
+
+def use_virtual_time(enabled=True):
+    """
+    Switches the blocking tool wrappers (run_sync) between real and virtual
+    time. Applies to loops created afterwards; each thread gets its own clock.
+    """
+    global _virtual_time
+    _virtual_time = enabled
+
+
+def new_event_loop(virtual=None):
+    """
+    Creates an event loop honouring the virtual-time setting (or `virtual`, if given).
+    """
+    virtual = _virtual_time if virtual is None else virtual
+    return VirtualTimeLoop() if virtual else asyncio.new_event_loop()
+
+
+def run(coro, virtual=None):
+    """
+    Like asyncio.run(), on a fresh loop that honours the virtual-time setting.
+    """
+    loop = new_event_loop(virtual)
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+
+
+def rng():
+    """
+    Returns the random.Random the simulated tools draw from.
+    """
+    return _rng
+
+
+def seed(value):
+    """
+    Reseeds the tools' random source (or, given a random.Random, installs it),
+    so that a simulated run can be repeated exactly.
+    """
+    global _rng
+    if isinstance(value, random.Random):
+        _rng = value
+    else:
+        _rng.seed(value)
+
+
+def monotonic():
+    """
+    The current time for TTLs and timeouts: the running loop's virtual clock
+    inside a VirtualTimeLoop, time.monotonic() otherwise.
+    """
+    loop = asyncio._get_running_loop()
+    if loop is None:
+        loop = getattr(_local, "loop", None)
+    if isinstance(loop, VirtualTimeLoop):
+        return loop.time()
+    return time.monotonic()
+
+
+def _thread_loop():
+    """
+    Returns the event loop owned by the calling thread, creating it on first use.
+    Reusing one loop per thread keeps the blocking wrappers cheap.
+    """
+    loop = getattr(_local, "loop", None)
+    if loop is None or loop.is_closed() or isinstance(loop, VirtualTimeLoop) != _virtual_time:
+        if loop is not None and not loop.is_closed():
+            loop.close()
+        loop = new_event_loop()
+        _local.loop = loop
+    return loop
+
+
+def _helper():
+    global _helper_pool
+    with _helper_lock:
+        if _helper_pool is None:
+            _helper_pool = ThreadPoolExecutor(thread_name_prefix="run-sync")
+        return _helper_pool
+
+
+def run_sync(coro):
+    """
+    Runs a coroutine to completion from synchronous code and returns its result.
+    If the calling thread is already running an event loop (a blocking tool
+    called from async code), the coroutine is run on a helper thread instead.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return _thread_loop().run_until_complete(coro)
+    return _helper().submit(run_sync, coro).result()
@@ -0,0 +1,113 @@
+import asyncio
+import concurrent.futures
+import copy
+import functools
+import inspect
+import threading
+
+from src.tools.cache import freeze
+
+_flights = {}
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time: callers arriving while a call
+    with the same key is in flight wait for it and share its result (or
+    exception) instead of making their own.
+
+    The shared result is a concurrent.futures.Future, so callers on other
+    threads' event loops (the blocking tool variants, batch workers) join
+    the same flight. If the call that is doing the work is cancelled, the
+    callers waiting on it retry on their own.
+    """
+    def __init__(self, name):
+        self.name = name
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.executed = 0
+        self.shared = 0
+        self.errors = 0
+
+    async def do(self, key, call):
+        """
+        Returns the result of `call()` for `key`, sharing an in-flight one.
+        """
+        with self._lock:
+            self.calls += 1
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = concurrent.futures.Future()
+                self.executed += 1
+            else:
+                self.shared += 1
+        if not leader:
+            try:
+                # Followers get their own copy, as with cached results.
+                return copy.deepcopy(await asyncio.wrap_future(future))
+            except asyncio.CancelledError:
+                if future.cancelled() and not asyncio.current_task().cancelling():
+                    return await self.do(key, call)
+                raise
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            self._land(key)
+            future.cancel()
+            raise
+        except BaseException as e:
+            self._land(key)
+            with self._lock:
+                self.errors += 1
+            future.set_exception(e)
+            raise
+        self._land(key)
+        future.set_result(result)
+        return result
+
+    def _land(self, key):
+        with self._lock:
+            del self._in_flight[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executed": self.executed,
+                "saved": self.shared,
+                "errors": self.errors,
+                "in_flight": len(self._in_flight),
+            }
+
+
+def single_flight(name):
+    """
+    Coalesces concurrent identical calls of an async tool, keyed by its
+    bound arguments. Opt-in per tool: only apply this to read-only lookups,
+    never to tools with side effects (refunds, notifications, re-routing),
+    whose every call must happen.
+    """
+    def decorator(async_fn):
+        signature = inspect.signature(async_fn)
+        flight = SingleFlight(name)
+        _flights[name] = flight
+
+        @functools.wraps(async_fn)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = tuple((k, freeze(v)) for k, v in bound.arguments.items())
+            return await flight.do(key, lambda: async_fn(*args, **kwargs))
+
+        wrapper.flight = flight
+        return wrapper
+    return decorator
+
+
+def single_flight_stats():
+    """
+    Returns the counters of every single-flight tool, keyed by tool name.
+    """
+    return {name: flight.stats() for name, flight in _flights.items()}
@@ -0,0 +1,276 @@
+import csv
+import math
+from collections import defaultdict
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """
+    Returns the great-circle distance between two coordinates in kilometres.
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class _Cell:
+    """
+    The points of one grid cell, with lazily rebuilt NumPy coordinate arrays.
+    """
+    __slots__ = ("ids", "lats", "lons", "_arrays")
+
+    def __init__(self):
+        self.ids = []
+        self.lats = []
+        self.lons = []
+        self._arrays = None
+
+    def append(self, item_id, latitude, longitude):
+        self.ids.append(item_id)
+        self.lats.append(latitude)
+        self.lons.append(longitude)
+        self._arrays = None
+        return len(self.ids) - 1
+
+    def pop(self, position):
+        """
+        Removes the point at `position` by swapping in the last one.
+        Returns the id that moved into `position`, if any.
+        """
+        last = len(self.ids) - 1
+        moved = None
+        if position != last:
+            self.ids[position] = self.ids[last]
+            self.lats[position] = self.lats[last]
+            self.lons[position] = self.lons[last]
+            moved = self.ids[position]
+        self.ids.pop()
+        self.lats.pop()
+        self.lons.pop()
+        self._arrays = None
+        return moved
+
+    def arrays(self):
+        if self._arrays is None:
+            self._arrays = (np.radians(self.lats), np.radians(self.lons))
+        return self._arrays
+
+
+class SpatialIndex:
+    """
+    An in-process grid index over points (merchants, lockers, ...) that answers
+    radius and k-nearest queries on haversine distance.
+
+    Points live in square lat/lon cells of about `cell_km` kilometres (1 km by default); a query
+    only computes distances for the cells that can contain a match, in one
+    vectorized pass. Every point carries a record (a dict) that queries can
+    filter on, e.g. `index.query_radius(lat, lon, 2, category="pizza")`.
+    """
+    def __init__(self, cell_km=1.0):
+        self.cell_deg = cell_km / KM_PER_DEGREE
+        self._cells = defaultdict(_Cell)
+        self._records = {}
+        self._positions = {}
+        # Cell-key bounding box of everything ever inserted (never shrinks).
+        self._bounds = None
+
+    def __len__(self):
+        return len(self._records)
+
+    def __contains__(self, item_id):
+        return item_id in self._records
+
+    def _cell_key(self, latitude, longitude):
+        return (math.floor(latitude / self.cell_deg), math.floor(longitude / self.cell_deg))
+
+    def insert(self, item_id, latitude, longitude, record=None):
+        """
+        Adds a point, replacing any existing point with the same id.
+        """
+        if item_id in self._records:
+            self.remove(item_id)
+        latitude, longitude = float(latitude), float(longitude)
+        key = self._cell_key(latitude, longitude)
+        if self._bounds is None:
+            self._bounds = (key[0], key[0], key[1], key[1])
+        else:
+            min_row, max_row, min_col, max_col = self._bounds
+            self._bounds = (min(min_row, key[0]), max(max_row, key[0]), min(min_col, key[1]), max(max_col, key[1]))
+        position = self._cells[key].append(item_id, latitude, longitude)
+        self._positions[item_id] = (key, position)
+        self._records[item_id] = dict(record or {}, latitude=latitude, longitude=longitude)
+
+    def remove(self, item_id):
+        """
+        Deletes a point. Raises KeyError if the id is unknown.
+        """
+        key, position = self._positions.pop(item_id)
+        del self._records[item_id]
+        cell = self._cells[key]
+        moved = cell.pop(position)
+        if moved is not None:
+            self._positions[moved] = (key, position)
+        if not cell.ids:
+            del self._cells[key]
+
+    def get(self, item_id):
+        return self._records.get(item_id)
+
+    def _candidates(self, keys, latitude, longitude):
+        """
+        Returns (ids, distances_km) for every point in the given cells.
+        """
+        ids, lats, lons = [], [], []
+        for key in keys:
+            cell = self._cells.get(key)
+            if cell is None:
+                continue
+            cell_lats, cell_lons = cell.arrays()
+            ids.extend(cell.ids)
+            lats.append(cell_lats)
+            lons.append(cell_lons)
+        if not ids:
+            return ids, np.empty(0)
+        lats = np.concatenate(lats)
+        lons = np.concatenate(lons)
+        phi = math.radians(latitude)
+        a = np.sin((lats - phi) / 2) ** 2 + math.cos(phi) * np.cos(lats) * np.sin((lons - math.radians(longitude)) / 2) ** 2
+        return ids, 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+    def _matches(self, ids, distances, order, predicate, filters, limit=None):
+        records = self._records
+        accept = _record_filter(predicate, filters)
+        results = []
+        for i, distance in zip(order.tolist(), np.round(distances[order], 4).tolist()):
+            item_id = ids[i]
+            record = records[item_id]
+            if accept is not None and not accept(record):
+                continue
+            results.append({**record, "id": item_id, "distance_km": distance})
+            if limit is not None and len(results) == limit:
+                break
+        return results
+
+    def _cell_span(self, latitude, radius_km):
+        """
+        Number of cells to scan in each direction to cover `radius_km`.
+        """
+        lat_span = radius_km / KM_PER_DEGREE / self.cell_deg
+        lon_span = lat_span / max(math.cos(math.radians(min(abs(latitude) + lat_span * self.cell_deg, 89.9))), 1e-6)
+        return math.ceil(lat_span), math.ceil(lon_span)
+
+    def query_radius_ids(self, latitude, longitude, radius_km):
+        """
+        Returns (ids, distances_km) of every point within `radius_km`, nearest
+        first, without materialising records. Use this on hot paths.
+        """
+        row, col = self._cell_key(latitude, longitude)
+        lat_span, lon_span = self._cell_span(latitude, radius_km)
+        keys = [(r, c) for r in range(row - lat_span, row + lat_span + 1) for c in range(col - lon_span, col + lon_span + 1)]
+        ids, distances = self._candidates(keys, latitude, longitude)
+        inside = np.flatnonzero(distances <= radius_km)
+        order = inside[np.argsort(distances[inside], kind="stable")]
+        return [ids[i] for i in order.tolist()], distances[order]
+
+    def query_radius(self, latitude, longitude, radius_km, predicate=None, **filters):
+        """
+        Returns the records within `radius_km` of a point, nearest first.
+        Keyword filters match record fields exactly; `predicate` is an optional
+        callable applied to each record.
+        """
+        ids, distances = self.query_radius_ids(latitude, longitude, radius_km)
+        return self._matches(ids, distances, np.arange(len(ids)), predicate, filters)
+
+    def nearest(self, latitude, longitude, k=1, max_radius_km=None, predicate=None, **filters):
+        """
+        Returns up to `k` matching records nearest to a point, nearest first.
+        The search expands ring by ring and stops once the k-th match is
+        closer than any point in the unscanned cells can be.
+        """
+        if not self._records or k < 1:
+            return []
+        row, col = self._cell_key(latitude, longitude)
+        # Distance covered by one ring of cells, in the narrower (longitude) direction.
+        ring_km = self.cell_deg * KM_PER_DEGREE * max(math.cos(math.radians(min(abs(latitude) + 1, 89.9))), 1e-6)
+        min_row, max_row, min_col, max_col = self._bounds
+        max_ring = max(abs(row - min_row), abs(row - max_row), abs(col - min_col), abs(col - max_col))
+        if max_radius_km is not None:
+            max_ring = min(max_ring, math.ceil(max_radius_km / ring_km))
+
+        found = []
+        for ring in range(max_ring + 1):
+            if ring == 0:
+                keys = [(row, col)]
+            else:
+                keys = [(r, c) for r in range(row - ring, row + ring + 1) for c in (col - ring, col + ring)]
+                keys += [(r, c) for r in (row - ring, row + ring) for c in range(col - ring + 1, col + ring)]
+            ids, distances = self._candidates(keys, latitude, longitude)
+            if ids:
+                order = np.argsort(distances, kind="stable")
+                if max_radius_km is not None:
+                    order = order[distances[order] <= max_radius_km]
+                found.extend(self._matches(ids, distances, order, predicate, filters, limit=k))
+                found.sort(key=lambda match: match["distance_km"])
+                del found[k:]
+            if len(found) == k and found[-1]["distance_km"] <= ring * ring_km:
+                break
+        return found
+
+    @classmethod
+    def from_records(cls, records, id_field, lat_field="latitude", lon_field="longitude", cell_km=1.0):
+        """
+        Builds an index from an iterable of dicts.
+        """
+        index = cls(cell_km=cell_km)
+        for record in records:
+            record = dict(record)
+            item_id = record.pop(id_field)
+            latitude = record.pop(lat_field)
+            longitude = record.pop(lon_field)
+            index.insert(item_id, latitude, longitude, record)
+        return index
+
+    @classmethod
+    def from_csv(cls, path, id_field, lat_field="latitude", lon_field="longitude", cell_km=1.0):
+        """
+        Builds an index from a CSV file with a header row.
+        Only the coordinate columns are parsed (as floats); ids and other fields stay strings.
+        """
+        with open(path, newline="") as f:
+            records = list(csv.DictReader(f))
+        return cls.from_records(records, id_field, lat_field, lon_field, cell_km)
+
+    @classmethod
+    def from_parquet(cls, path, id_field, lat_field="latitude", lon_field="longitude", cell_km=1.0):
+        """
+        Builds an index from a Parquet file (requires pandas with a Parquet engine).
+        """
+        import pandas as pd
+
+        frame = pd.read_parquet(path)
+        return cls.from_records(frame.to_dict("records"), id_field, lat_field, lon_field, cell_km)
+
+
+def _record_filter(predicate, filters):
+    """
+    Combines keyword equality filters and a predicate into one callable (or None).
+    """
+    checks = list(filters.items())
+    if not checks and predicate is None:
+        return None
+    if len(checks) == 1 and predicate is None:
+        field, value = checks[0]
+        return lambda record: record.get(field) == value
+
+    def accept(record):
+        for field, value in checks:
+            if record.get(field) != value:
+                return False
+        return predicate is None or predicate(record)
+    return accept
@@ -0,0 +1,295 @@
+import io
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+HOURS_PER_WEEK = 168
+# Trips a slot needs before its own mean outweighs the segment's all-week mean.
+PRIOR_TRIPS = 5.0
+# Columns of a trip log: where it started and ended, when (ISO 8601 or epoch
+# seconds, UTC), and how long it took.
+COLUMNS = ("start_point", "end_point", "started_at", "duration_min")
+# Bytes of CSV per training task.
+CHUNK_BYTES = 16 << 20
+
+
+def segment_key(start_point, end_point):
+    return f"{str(start_point).strip().lower()}|{str(end_point).strip().lower()}"
+
+
+def hour_of_week(epoch_s, utc_offset_h=0.0):
+    """
+    Monday 00:00-01:00 is slot 0. Works on scalars and arrays of epoch seconds.
+    """
+    hours = np.floor_divide(np.asarray(epoch_s, dtype=float) + utc_offset_h * 3600, 3600).astype(np.int64)
+    # 1970-01-01 was a Thursday, three days after a Monday.
+    return (hours + 72) % HOURS_PER_WEEK
+
+
+def _epoch_seconds(values):
+    import pandas as pd
+
+    values = pd.Series(values)
+    if pd.api.types.is_numeric_dtype(values):
+        return values.to_numpy(dtype=float)
+    stamps = pd.to_datetime(values, utc=True, format="ISO8601")
+    return (stamps - pd.Timestamp(0, tz="UTC")).dt.total_seconds().to_numpy()
+
+
+def _profile(starts, ends, started_at, minutes, utc_offset_h):
+    """
+    Sums and counts trip durations per (segment, hour of week) with one
+    bincount. Returns the segment keys and (segments, 168) sums and counts.
+    """
+    keys = np.char.add(np.char.add(np.char.lower(np.char.strip(np.asarray(starts, dtype=str))), "|"),
+                       np.char.lower(np.char.strip(np.asarray(ends, dtype=str))))
+    names, codes = np.unique(keys, return_inverse=True)
+    minutes = np.asarray(minutes, dtype=float)
+    valid = np.isfinite(minutes) & (minutes > 0)
+    cells = codes[valid] * HOURS_PER_WEEK + hour_of_week(np.asarray(started_at, dtype=float)[valid], utc_offset_h)
+    size = len(names) * HOURS_PER_WEEK
+    sums = np.bincount(cells, weights=minutes[valid], minlength=size).reshape(-1, HOURS_PER_WEEK)
+    counts = np.bincount(cells, minlength=size).reshape(-1, HOURS_PER_WEEK)
+    return names.tolist(), sums, counts
+
+
+def _csv_part(path, start, end, utc_offset_h):
+    """
+    Profiles the lines of a CSV trip log between two byte offsets (the line
+    containing `start` belongs to the previous part).
+    """
+    import pandas as pd
+
+    with open(path, "rb") as f:
+        header = f.readline()
+        if start > 0:
+            f.seek(start - 1)
+            f.readline()
+        position = max(f.tell(), len(header))
+        f.seek(position)
+        data = f.read(max(end - position, 0))
+        if end > position and not data.endswith(b"\n"):
+            data += f.readline()
+    frame = pd.read_csv(io.BytesIO(header + data), usecols=list(COLUMNS), dtype={"start_point": str, "end_point": str})
+    return _profile(frame["start_point"], frame["end_point"], _epoch_seconds(frame["started_at"]),
+                    frame["duration_min"], utc_offset_h)
+
+
+def _parquet_part(path, row_group, utc_offset_h):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Reading Parquet trip logs requires pyarrow.") from e
+    frame = pq.ParquetFile(path).read_row_group(row_group, columns=list(COLUMNS)).to_pandas()
+    return _profile(frame["start_point"], frame["end_point"], _epoch_seconds(frame["started_at"]),
+                    frame["duration_min"], utc_offset_h)
+
+
+class TrafficModel:
+    """
+    Travel-time profiles per road segment (a start/end pair, as passed to
+    check_traffic) and hour of the week, learned from historical trips.
+
+    Training only sums and counts durations (see _profile()), so partial
+    profiles of a large log are built in parallel and added up. The answers
+    are precomputed into a (segments, 168) table: a slot's mean, shrunk
+    towards the segment's all-week mean when it has few trips. Segments
+    never seen use the hourly mean over all segments. Live incidents scale
+    a segment's ETA until they expire, without retraining.
+    """
+    def __init__(self, utc_offset_h=0.0, clock=time.time):
+        self.utc_offset_h = utc_offset_h
+        self._clock = clock
+        self._index = {}
+        self.sums = np.zeros((0, HOURS_PER_WEEK))
+        self.counts = np.zeros((0, HOURS_PER_WEEK), dtype=np.int64)
+        self.minutes = np.zeros((0, HOURS_PER_WEEK), dtype=np.float32)
+        self.hourly = np.full(HOURS_PER_WEEK, np.nan, dtype=np.float32)
+        self._factor = np.ones(0, dtype=np.float32)
+        self._until = np.zeros(0)
+        self._lock = threading.Lock()
+
+    @property
+    def segments(self):
+        return list(self._index)
+
+    @property
+    def trips(self):
+        return int(self.counts.sum())
+
+    def _merge(self, names, sums, counts):
+        codes = np.fromiter((self._segment(name) for name in names), dtype=np.int64, count=len(names))
+        self.sums[codes] += sums
+        self.counts[codes] += counts
+
+    def _segment(self, key):
+        code = self._index.get(key)
+        if code is None:
+            code = self._index[key] = len(self._index)
+            if code >= len(self.sums):
+                grow = max(len(self.sums), 64)
+                self.sums = np.vstack((self.sums, np.zeros((grow, HOURS_PER_WEEK))))
+                self.counts = np.vstack((self.counts, np.zeros((grow, HOURS_PER_WEEK), dtype=np.int64)))
+                self.minutes = np.vstack((self.minutes, np.full((grow, HOURS_PER_WEEK), np.nan, dtype=np.float32)))
+                self._factor = np.concatenate((self._factor, np.ones(grow, dtype=np.float32)))
+                self._until = np.concatenate((self._until, np.zeros(grow)))
+        return code
+
+    def _rebuild(self, rows=None):
+        """
+        Recomputes the lookup table from the sums and counts. With `rows`,
+        only those segments are updated and the hourly fallback is kept.
+        """
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if rows is None or np.isnan(self.hourly).all():
+                rows = None
+                slot_counts = self.counts[:len(self._index)].sum(axis=0)
+                hourly = np.where(slot_counts > 0, self.sums[:len(self._index)].sum(axis=0) / slot_counts, np.nan)
+                if np.isnan(hourly).all():
+                    return
+                hourly[np.isnan(hourly)] = np.nanmean(hourly)
+                self.hourly = hourly.astype(np.float32)
+            rows = np.arange(len(self._index)) if rows is None else np.asarray(rows)
+            sums, counts = self.sums[rows], self.counts[rows]
+            totals = counts.sum(axis=1, keepdims=True)
+            prior = np.where(totals > 0, sums.sum(axis=1, keepdims=True) / totals, self.hourly)
+            self.minutes[rows] = (sums + PRIOR_TRIPS * prior) / (counts + PRIOR_TRIPS)
+
+    def fit(self, start_points, end_points, started_at, duration_min):
+        """
+        Adds trips given as parallel arrays (started_at in epoch seconds) and rebuilds the table.
+        """
+        with self._lock:
+            self._merge(*_profile(start_points, end_points, started_at, duration_min, self.utc_offset_h))
+            self._rebuild()
+        return self
+
+    @classmethod
+    def _train(cls, parts, workers, utc_offset_h, clock):
+        model = cls(utc_offset_h=utc_offset_h, clock=clock)
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(parts) == 1:
+            results = (fn(*args) for fn, *args in parts)
+            for result in results:
+                model._merge(*result)
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(parts))) as pool:
+                futures = [pool.submit(fn, *args) for fn, *args in parts]
+                for future in futures:
+                    model._merge(*future.result())
+        model._rebuild()
+        return model
+
+    @classmethod
+    def from_csv(cls, path, workers=None, chunk_bytes=CHUNK_BYTES, utc_offset_h=0.0, clock=time.time):
+        """
+        Trains on a CSV trip log with the COLUMNS header, parsing chunks of
+        the file in `workers` processes (default: one per core).
+        """
+        size = os.path.getsize(path)
+        bounds = list(range(0, size, chunk_bytes)) + [size]
+        parts = [(_csv_part, path, start, end, utc_offset_h) for start, end in zip(bounds, bounds[1:])]
+        return cls._train(parts or [(_csv_part, path, 0, 0, utc_offset_h)], workers, utc_offset_h, clock)
+
+    @classmethod
+    def from_parquet(cls, path, workers=None, utc_offset_h=0.0, clock=time.time):
+        """
+        Trains on a Parquet trip log with COLUMNS, one row group per task
+        (requires pyarrow).
+        """
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Reading Parquet trip logs requires pyarrow.") from e
+        groups = pq.ParquetFile(path).num_row_groups
+        parts = [(_parquet_part, path, group, utc_offset_h) for group in range(groups)]
+        return cls._train(parts, workers, utc_offset_h, clock)
+
+    def observe(self, start_point, end_point, duration_min, at=None):
+        """
+        Adds one completed trip to the profile, updating only its segment's row.
+        """
+        at = self._clock() if at is None else at
+        with self._lock:
+            code = self._segment(segment_key(start_point, end_point))
+            self.sums[code, hour_of_week(at, self.utc_offset_h)] += duration_min
+            self.counts[code, hour_of_week(at, self.utc_offset_h)] += 1
+            self._rebuild([code])
+
+    def report_incident(self, start_point, end_point, factor, duration_s=1800):
+        """
+        Scales the segment's travel times by `factor` for the next `duration_s` seconds.
+        """
+        with self._lock:
+            code = self._segment(segment_key(start_point, end_point))
+            if np.isnan(self.minutes[code]).all():
+                self._rebuild([code])
+            self._factor[code] = factor
+            self._until[code] = self._clock() + duration_s
+
+    def clear_incident(self, start_point, end_point):
+        code = self._index.get(segment_key(start_point, end_point))
+        if code is not None:
+            self._until[code] = 0.0
+
+    def eta(self, start_point, end_point, at=None):
+        """
+        Predicted travel time in minutes for a trip starting at `at` (epoch
+        seconds, default now), or None if the model has no data at all.
+        """
+        now = self._clock()
+        slot = hour_of_week(now if at is None else at, self.utc_offset_h)
+        code = self._index.get(segment_key(start_point, end_point))
+        if code is None:
+            minutes = self.hourly[slot]
+        else:
+            minutes = self.minutes[code, slot] * (self._factor[code] if self._until[code] > now else 1.0)
+        return None if np.isnan(minutes) else float(minutes)
+
+    def etas(self, start_points, end_points, at=None):
+        """
+        Batch eta(): an array of minutes (NaN where there is no data). `at`
+        may be one time or one per trip.
+        """
+        now = self._clock()
+        slots = hour_of_week(now if at is None else at, self.utc_offset_h)
+        index = self._index
+        codes = np.fromiter((index.get(segment_key(s, e), -1) for s, e in zip(start_points, end_points)), dtype=np.int64)
+        slots = np.broadcast_to(slots, codes.shape)
+        known = codes >= 0
+        result = self.hourly[slots].astype(float)
+        rows = codes[known]
+        factors = np.where(self._until[rows] > now, self._factor[rows], 1.0)
+        result[known] = self.minutes[rows, slots[known]] * factors
+        return result
+
+    def save(self, directory):
+        """
+        Writes the trip sums and counts as .npy files, plus the segment keys.
+        """
+        os.makedirs(directory, exist_ok=True)
+        size = len(self._index)
+        np.save(os.path.join(directory, "sums.npy"), self.sums[:size])
+        np.save(os.path.join(directory, "counts.npy"), self.counts[:size])
+        with open(os.path.join(directory, "traffic.json"), "w") as f:
+            json.dump({"utc_offset_h": self.utc_offset_h, "segments": self.segments}, f)
+
+    @classmethod
+    def load(cls, directory, clock=time.time):
+        with open(os.path.join(directory, "traffic.json")) as f:
+            meta = json.load(f)
+        model = cls(utc_offset_h=meta["utc_offset_h"], clock=clock)
+        model._merge(meta["segments"], np.load(os.path.join(directory, "sums.npy")), np.load(os.path.join(directory, "counts.npy")))
+        model._rebuild()
+        return model
+
+    def stats(self):
+        return {
+            "segments": len(self._index),
+            "trips": self.trips,
+            "incidents": int((self._until[:len(self._index)] > self._clock()).sum()),
+        }
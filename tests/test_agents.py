@@ -1,4 +1,10 @@
-from src.agent.coordinator import Coordinator
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+from src.agent.coordinator import TOOL_SPECS, Coordinator
 from src.agent.specialist import Specialist
 
 def test_coordinator_creation_mock_mode():
@@ -27,3 +33,30 @@ def test_specialist_provide_analysis():
     specialist = Specialist("Traffic")
     result = specialist.provide_analysis("Road closure")
     assert result == "Analysis for Road closure."
+
+def test_coordinator_handle_disruption_async_runs_tools_concurrently():
+    """Tests that the traffic path overlaps its independent tool calls."""
+    coordinator = Coordinator(use_mock_llm=True)
+    start = time.perf_counter()
+    result = asyncio.run(coordinator.handle_disruption_async("Major traffic obstruction on the way to the airport."))
+    elapsed = time.perf_counter() - start
+    assert "Successfully re-routed" in result["output"]
+    # Route (1.5 s) and flight status (1 s) overlap, then notify (0.5 s).
+    assert elapsed < 2.8
+
+def test_mock_mode_does_not_import_langchain():
+    """Tests that the LLM stack is only loaded when a real agent is built."""
+    code = (
+        "import sys; from src.agent.coordinator import Coordinator; Coordinator(use_mock_llm=True); "
+        "print(any(m.startswith(('langchain', 'openai')) for m in sys.modules))"
+    )
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    done = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    assert done.stdout.strip().endswith("False")
+
+def test_tools_are_shared_between_coordinators(monkeypatch):
+    """Tests that the Tool objects are built once and shared."""
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    first, second = Coordinator(), Coordinator()
+    assert first.tools is second.tools
+    assert len(first.tools) == len(TOOL_SPECS)
@@ -0,0 +1,67 @@
+import itertools
+
+import numpy as np
+
+from src.tools.eta import eta_matrix
+from src.tools.assignment import assign_orders, auction_assignment, candidate_greedy_assignment, hungarian, reassign_orders, solve_assignment
+
+def brute_force(cost):
+    n, m = cost.shape
+    return min(sum(cost[i, p[i]] for i in range(n)) for p in itertools.permutations(range(m), n))
+
+def test_hungarian_is_optimal():
+    """Tests the exact solver against brute force, including rectangular problems."""
+    rng = np.random.default_rng(1)
+    for shape in [(4, 4), (3, 5), (5, 3)]:
+        cost = rng.random(shape)
+        rows, cols = hungarian(cost)
+        assert len(rows) == min(shape)
+        assert len(set(cols.tolist())) == len(cols)
+        expected = brute_force(cost) if shape[0] <= shape[1] else brute_force(cost.T)
+        assert np.isclose(cost[rows, cols].sum(), expected)
+
+def test_large_n_heuristics_are_close_to_optimal():
+    """Tests that the large-N heuristics match everyone and stay near the optimum."""
+    rng = np.random.default_rng(2)
+    orders = rng.uniform([3.0, 101.5], [3.3, 101.8], (200, 2))
+    drivers = rng.uniform([3.0, 101.5], [3.3, 101.8], (250, 2))
+    cost = eta_matrix(orders, drivers)
+    optimal = cost[solve_assignment(cost, "hungarian")].sum()
+    for solver, tolerance in ((auction_assignment, 1.05), (candidate_greedy_assignment, 1.6)):
+        rows, cols, etas = solver(orders, drivers)
+        assert len(rows) == 200 and len(set(cols.tolist())) == 200
+        assert np.allclose(cost[rows, cols], etas)
+        assert etas.sum() <= optimal * tolerance
+
+def test_assign_orders_reports_unassigned():
+    """Tests that surplus orders are reported when drivers run out."""
+    orders = [
+        {"order_id": "order-1", "latitude": 3.10, "longitude": 101.60},
+        {"order_id": "order-2", "latitude": 3.20, "longitude": 101.70},
+    ]
+    drivers = [{"driver_id": "driver-1", "location": {"latitude": 3.199, "longitude": 101.699}}]
+    plan = assign_orders(orders, drivers)
+    assert plan["assignments"][0]["order_id"] == "order-2"
+    assert plan["assignments"][0]["driver_id"] == "driver-1"
+    assert plan["unassigned_orders"] == ["order-1"]
+
+def test_assign_orders_auction_on_precomputed_etas():
+    """Tests that method="auction" also works with a precomputed ETA matrix."""
+    rng = np.random.default_rng(3)
+    cost = rng.uniform(1, 60, (40, 50))
+    orders = [{"order_id": f"order-{i}"} for i in range(40)]
+    drivers = [{"driver_id": f"driver-{j}"} for j in range(50)]
+    plan = assign_orders(orders, drivers, eta=cost, method="auction", k=8)
+    assert len(plan["assignments"]) == 40 and len({a["driver_id"] for a in plan["assignments"]}) == 40
+    assert plan["total_eta_minutes"] <= cost[solve_assignment(cost, "hungarian")].sum() * 1.05
+
+def test_reassign_orders_dispatches_in_bulk():
+    """Tests the end-to-end re-assignment with bulk location lookup and re-routing."""
+    orders = [{"order_id": f"order-{i}", "latitude": 3.5, "longitude": 101.5, "destination": f"merchant-{i}"} for i in range(3)]
+    plan = reassign_orders(orders, ["driver-a", "driver-b", "driver-c"], reason="merchant closed")
+    assert len(plan["assignments"]) == 3
+    assert plan["dispatch"]["status"] == "success"
+    assert sorted(r["new_destination"] for r in plan["dispatch"]["results"]) == ["merchant-0", "merchant-1", "merchant-2"]
+    generated = ({"order_id": f"order-{i}", "latitude": 3.5, "longitude": 101.5} for i in range(2))
+    plan = reassign_orders(generated, ["driver-a", "driver-b"], reason="merchant closed")
+    assert len(plan["assignments"]) == 2 and sorted(r["new_destination"] for r in plan["dispatch"]["results"]) == ["order-0", "order-1"]
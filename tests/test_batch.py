@@ -0,0 +1,49 @@
+import time
+
+from src.agent.batch import process_batch, read_scenarios
+
+def slow_echo(scenario):
+    """A handler whose latency depends on the scenario."""
+    time.sleep(scenario["delay"])
+    return {"input": scenario, "output": scenario["name"]}
+
+def test_process_batch_keeps_input_order():
+    """Tests that ordered mode yields records in input order."""
+    scenarios = [{"name": "slow", "delay": 0.2}, {"name": "fast", "delay": 0.0}]
+    records = list(process_batch(slow_echo, scenarios, max_workers=2))
+    assert [r["output"] for r in records] == ["slow", "fast"]
+    assert [r["index"] for r in records] == [0, 1]
+    assert all("duration_ms" in r for r in records)
+
+def test_process_batch_completion_order():
+    """Tests that unordered mode yields records as they finish."""
+    scenarios = [{"name": "slow", "delay": 0.2}, {"name": "fast", "delay": 0.0}]
+    records = list(process_batch(slow_echo, scenarios, max_workers=2, ordered=False))
+    assert [r["output"] for r in records] == ["fast", "slow"]
+
+def test_process_batch_applies_backpressure_and_captures_errors():
+    """Tests that input is read lazily and that a failing item does not stop the batch."""
+    consumed = []
+
+    def scenarios():
+        for i in range(10):
+            consumed.append(i)
+            yield i
+
+    def handler(i):
+        if i == 3:
+            raise RuntimeError("boom")
+        return {"output": i}
+
+    records = process_batch(handler, scenarios(), max_workers=1, max_pending=2)
+    first = next(records)
+    assert first["output"] == 0
+    assert len(consumed) <= 3
+    rest = list(records)
+    assert rest[2]["error"] == "RuntimeError: boom"
+    assert len(rest) == 9
+
+def test_read_scenarios():
+    """Tests parsing of JSONL batch input."""
+    lines = ['"plain string"\n', '\n', '{"scenario": "from object"}\n']
+    assert list(read_scenarios(lines)) == ["plain string", "from object"]
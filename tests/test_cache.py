@@ -0,0 +1,51 @@
+import asyncio
+
+from src.tools.cache import TTLCache, cache_stats, cached, coordinate_cell
+import src.tools.logistics  # registers the tool caches
+
+def test_ttl_cache_expires_entries():
+    """Tests that entries expire after the TTL."""
+    now = [0.0]
+    cache = TTLCache(maxsize=10, ttl=5, clock=lambda: now[0])
+    cache.set("k", 1)
+    assert cache.get("k") == 1
+    now[0] = 6.0
+    assert cache.get("k") is None
+    assert cache.stats()["expirations"] == 1
+
+def test_ttl_cache_evicts_least_recently_used():
+    """Tests LRU eviction once the cache is full."""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 2 and stats["misses"] == 1
+
+def test_cached_tool_shares_nearby_coordinates():
+    """Tests that nearby lat/lon queries hit the same cache entry."""
+    calls = []
+
+    @cached("test_lookup", ttl=60)
+    async def lookup(latitude, longitude, category):
+        calls.append((latitude, longitude))
+        return {"results": [category]}
+
+    first = asyncio.run(lookup(3.139, 101.6869, "pizza"))
+    first["results"].append("mutated")
+    second = asyncio.run(lookup(3.13901, 101.68691, category="pizza"))
+    assert second == {"results": ["pizza"]}
+    assert len(calls) == 1
+    assert coordinate_cell(3.139, 101.6869) != coordinate_cell(3.141, 101.6869)
+
+def test_only_read_only_tools_are_cached():
+    """Tests that mutating tools never get a cache."""
+    stats = cache_stats()
+    assert "get_merchant_status" in stats
+    assert "find_nearby_locker" in stats
+    assert "re_route_driver" not in stats
+    assert "issue_instant_refund" not in stats
@@ -0,0 +1,43 @@
+import time
+
+import numpy as np
+
+from src.tools.eta import ZoneTraffic, as_points, eta_matrix, haversine_matrix
+from src.tools.logistics import get_driver_location, get_driver_locations
+from src.tools.spatial import haversine_km
+
+def test_haversine_matrix_matches_scalar():
+    """Tests the vectorized distance matrix against the scalar haversine."""
+    origins = [(3.139, 101.6869), (3.0738, 101.5183)]
+    destinations = [(3.1579, 101.7123), (2.7456, 101.7072), (3.139, 101.6869)]
+    matrix = haversine_matrix(origins, destinations)
+    assert matrix.shape == (2, 3)
+    for i, (lat1, lon1) in enumerate(origins):
+        for j, (lat2, lon2) in enumerate(destinations):
+            assert abs(matrix[i, j] - haversine_km(lat1, lon1, lat2, lon2)) < 1e-3
+    assert matrix[0, 2] < 1e-3
+
+def test_eta_matrix_applies_zone_traffic():
+    """Tests that zone multipliers scale the ETAs of trips touching the zone."""
+    origins = np.array([[3.10, 101.60], [3.30, 101.80]])
+    destinations = np.array([[3.12, 101.62]])
+    free_flow = eta_matrix(origins, destinations, speed_kmh=30)
+    traffic = ZoneTraffic(cell_km=2.0)
+    traffic.set(3.30, 101.80, 2.0)
+    congested = eta_matrix(origins, destinations, speed_kmh=30, traffic=traffic)
+    assert congested[0, 0] == free_flow[0, 0]
+    assert np.isclose(congested[1, 0], free_flow[1, 0] * 1.5)
+
+def test_get_driver_locations_bulk(capsys):
+    """Tests the bulk driver lookup and that it reuses cached locations."""
+    single = get_driver_location("driver-bulk-0")
+    start = time.perf_counter()
+    result = get_driver_locations(["driver-bulk-0", "driver-bulk-1", "driver-bulk-2"])
+    assert time.perf_counter() - start < 1.0
+    drivers = result["drivers"]
+    assert [d["driver_id"] for d in drivers] == ["driver-bulk-0", "driver-bulk-1", "driver-bulk-2"]
+    assert drivers[0]["location"] == single["location"]
+    assert as_points(drivers).shape == (3, 2)
+    capsys.readouterr()
+    repeated = get_driver_locations(["driver-bulk-3", "driver-bulk-3"])["drivers"]
+    assert repeated[0] == repeated[1] and "Getting locations for 1 drivers" in capsys.readouterr().out
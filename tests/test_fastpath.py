@@ -0,0 +1,48 @@
+import asyncio
+
+from src.agent.coordinator import Coordinator
+from src.agent.fastpath import FastPath, classify, extract_entities
+
+TRAFFIC = "Major traffic obstruction: driver-456 is taking pass-123 to the airport for flight SQ123, ETA 30 min."
+
+def test_classify_known_disruptions():
+    """Tests that known disruption types are recognised with high confidence."""
+    dispute = classify("Damaged packaging dispute on order-789 between customer-1 and driver-2, order value $12.50.")
+    assert dispute.kind == "dispute"
+    assert dispute.confidence >= 0.65
+    assert dispute.missing == []
+    assert classify("Recipient recip-789 is not home.").kind == "recipient_unavailable"
+    assert classify(TRAFFIC).kind == "traffic"
+    assert classify("Something odd happened.").kind == "unknown"
+
+def test_extract_entities():
+    """Tests that ids, flight numbers, amounts and durations are extracted."""
+    entities = extract_entities(TRAFFIC + " Refund $4.20.")
+    assert entities["driver_id"] == "driver-456"
+    assert entities["passenger_id"] == "pass-123"
+    assert entities["flight_number"] == "SQ123"
+    assert entities["eta_minutes"] == 30
+    assert entities["amount"] == 4.2
+    entities = extract_entities("Dispute on order-1: customer-2 paid RM50 (RM 50) but wants $80 back, says AB123.")
+    assert entities["flight_number"] == "AB123" and "amount" not in entities
+    assert "flight_number" not in extract_entities("Refund RM50 to customer-2.")
+
+def test_fast_path_falls_back_without_entities():
+    """Tests that novel or under-specified scenarios are left to the LLM."""
+    fast_path = FastPath()
+    assert asyncio.run(fast_path.resolve("A damaged packaging dispute was reported.")) is None
+    assert asyncio.run(fast_path.resolve("The merchant is overloaded.")) is None
+    assert asyncio.run(fast_path.resolve("Damaged packaging dispute on order-789 between customer-1 and driver-2, "
+                                         "order value $1250.00.")) is None
+    assert fast_path.stats()["misses"] == 3
+    assert fast_path.stats()["hit_rate"] == 0.0
+
+def test_coordinator_fast_path_traffic():
+    """Tests that the Coordinator resolves a traffic obstruction on the fast path."""
+    coordinator = Coordinator(use_mock_llm=True, use_fast_path=True)
+    result = coordinator.handle_disruption(TRAFFIC)
+    assert result["fast_path"] == "traffic"
+    assert [step["tool"] for step in result["intermediate_steps"]] == [
+        "Calculate Alternative Route", "Check Flight Status", "Notify Passenger and Driver",
+    ]
+    assert coordinator.fast_path_stats()["hits"] == 1
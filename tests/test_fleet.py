@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from src.memory.fleet import FleetStore
+from src.tools import logistics, runtime
+
+KLCC = (3.1579, 101.7123)
+
+def small_fleet():
+    store = FleetStore(driver_capacity=2, order_capacity=2)
+    store.update_driver("driver-1", 3.1580, 101.7125, status="idle")
+    store.update_driver("driver-2", 3.1700, 101.7123, status="idle")
+    store.update_driver("driver-3", 3.1581, 101.7124, status="delivering")
+    store.update_driver("driver-4", 3.5000, 101.9000, status="idle")
+    store.update_order("order-1", pickup=KLCC, dropoff=(3.14, 101.69))
+    return store
+
+def test_updates_assignments_and_filters():
+    """Tests O(1) updates, order assignment and the idle-drivers-near filter."""
+    store = small_fleet()
+    assert [driver_id for driver_id, _ in store.drivers_near(*KLCC, radius_km=2)] == ["driver-1", "driver-2"]
+    store.assign("order-1", "driver-1", eta_min=4)
+    assert store.driver("driver-1")["order_id"] == "order-1"
+    assert store.order("order-1")["driver_id"] == "driver-1"
+    assert [driver_id for driver_id, _ in store.drivers_near(*KLCC, radius_km=2)] == ["driver-2"]
+    assert store.unassigned_orders() == []
+    store.update_order("order-1", status="delivered")
+    assert store.driver("driver-1")["status"] == "idle"
+    counts = store.count_by_status()
+    assert counts["drivers"] == {"offline": 0, "idle": 3, "to_pickup": 0, "delivering": 1}
+    assert counts["orders"]["delivered"] == 1
+    with pytest.raises(ValueError):
+        store.update_driver("driver-1", status="asleep")
+
+def test_rows_are_reused_and_bulk_moves():
+    """Tests row reuse after removal, table growth and batched position updates."""
+    store = small_fleet()
+    row = store.drivers.index["driver-2"]
+    store.remove_driver("driver-2")
+    store.update_driver("driver-9", *KLCC, status="idle")
+    assert store.drivers.index["driver-9"] == row
+    store.update_drivers(["driver-1", "driver-9"], [3.0, 3.0], [101.0, 101.0])
+    assert store.driver("driver-1")["location"] == {"latitude": 3.0, "longitude": 101.0}
+    assert len(store.drivers_near(3.0, 101.0, radius_km=0.1)) == 2
+    assert store.stats()["drivers"] == 4
+
+def test_snapshot_restores_memory_mapped(tmp_path):
+    """Tests that a restored snapshot is memory-mapped and answers the same queries."""
+    store = small_fleet()
+    store.assign("order-1", "driver-2")
+    store.snapshot(tmp_path)
+    restored = FleetStore.restore(tmp_path)
+    assert isinstance(restored.drivers.data, np.memmap)
+    assert restored.order("order-1")["driver_id"] == "driver-2"
+    assert restored.drivers_near(*KLCC, radius_km=2) == store.drivers_near(*KLCC, radius_km=2)
+    restored.update_driver("driver-1", status="offline")
+    assert FleetStore.restore(tmp_path).driver("driver-1")["status"] == "idle"
+
+def test_driver_location_tool_reads_the_fleet():
+    """Tests that get_driver_location answers known drivers from the installed store."""
+    logistics.set_fleet(small_fleet())
+    try:
+        result = runtime.run(logistics.get_driver_location_async("driver-3"), virtual=True)
+        assert result["location"] == {"latitude": 3.1581, "longitude": 101.7124}
+        logistics._fleet.update_driver("driver-3", latitude=3.16, longitude=101.72)
+        result = runtime.run(logistics.get_driver_location_async("driver-3"), virtual=True)
+        assert result["location"] == {"latitude": 3.16, "longitude": 101.72}
+    finally:
+        logistics.set_fleet(None)
@@ -0,0 +1,67 @@
+import asyncio
+
+from src.agent.ingest import Event, IngestPipeline, incident_key, read_events
+from src.tools import runtime
+
+class FakeCoordinator:
+    def __init__(self, fail=()):
+        self.calls = []
+        self.fail = fail
+
+    async def handle_disruption_async(self, scenario):
+        self.calls.append(scenario)
+        await asyncio.sleep(1.0)
+        if scenario in self.fail:
+            raise RuntimeError("agent failed")
+        return {"output": f"Resolved: {scenario}"}
+
+async def collect(pipeline, source):
+    return [record async for record in pipeline.run(read_events(source))]
+
+def test_incident_keys():
+    """Tests that reports group by merchant and road segment, but disputes stay per order."""
+    key = lambda text: incident_key(Event(0, text))
+    assert key("merchant-456 is overloaded, 40 min wait for customer-1.") == key("merchant-456 is busy, customer-9 waiting 50 min.")
+    assert key("Accident on Jalan Ampang: driver-1 is stuck.") == key("Road closure on Jalan Ampang, driver-7 rerouting.")
+    assert key("Damaged packaging dispute on order-1.") != key("Damaged packaging dispute on order-2.")
+    assert key("Something odd happened.") == ("report", "something odd happened.")
+
+def test_pipeline_coalesces_reports_into_one_resolution():
+    """Tests that a burst of reports about one incident runs the coordinator once and fans out the result."""
+    coordinator = FakeCoordinator()
+    lines = [f'{{"scenario": "merchant-456 is overloaded, 40 min wait for customer-{i}.", "order_id": "order-{i}"}}' for i in range(10)]
+    lines += ['"Recipient recip-789 is not home."', "not json", ""]
+    pipeline = IngestPipeline(coordinator)
+    records = runtime.run(collect(pipeline, lines), virtual=True)
+    assert len(coordinator.calls) == 2
+    assert len(records) == 11
+    merchant = [record for record in records if record["incident_key"] == ["merchant", "merchant-456"]]
+    assert len(merchant) == 10
+    assert sum(record["leader"] for record in merchant) == 1
+    assert {record["output"] for record in merchant} == {f"Resolved: {coordinator.calls[0]}"}
+    assert merchant[-1]["incident_orders"] == [f"order-{i}" for i in range(10)]
+    assert pipeline.stats()["coalescing_ratio"] == 5.5
+
+def test_window_expiry_and_failures_open_new_incidents():
+    """Tests that reports after the window, or after a failed resolution, are resolved again."""
+    scenario = "merchant-1 is closed."
+    coordinator = FakeCoordinator(fail={scenario})
+
+    async def scenario_run():
+        pipeline = IngestPipeline(coordinator, window_s=5.0)
+        first = pipeline.attach(Event(0, scenario))[0]
+        await asyncio.sleep(2.0)
+        second, leader = pipeline.attach(Event(1, scenario))
+        assert leader and second is not first
+        coordinator.fail = ()
+        await asyncio.sleep(2.0)
+        assert pipeline.attach(Event(2, scenario)) == (second, False)
+        await asyncio.sleep(5.0)
+        assert pipeline.attach(Event(3, scenario))[1]
+        await asyncio.sleep(1.0)
+        return pipeline.stats()
+
+    stats = runtime.run(scenario_run(), virtual=True)
+    assert stats["incidents"] == 3
+    assert stats["errors"] == 1
+    assert len(coordinator.calls) == 3
@@ -1,3 +1,6 @@
+import sqlite3
+
+from src.memory.backends import LRUBackend, SQLiteBackend
 from src.memory.context import ContextMemory
 
 def test_context_memory_creation():
@@ -19,3 +22,64 @@ def test_context_memory_get_nonexistent():
     memory = ContextMemory()
     context = memory.get_context("nonexistent_key")
     assert context is None
+
+def test_lru_backend_evicts_and_indexes():
+    """Tests the size cap and the entity index of the in-memory backend."""
+    memory = ContextMemory(LRUBackend(max_entries=2))
+    memory.add_context("case_1", {"order_id": "order-1", "status": "open"})
+    memory.add_context("case_2", {"order_id": "order-1", "status": "resolved"})
+    memory.get_context("case_1")
+    memory.add_context("case_3", {"order_id": "order-2"})
+    assert memory.get_context("case_2") is None
+    assert memory.get_history("order_id", "order-1") == {"case_1": {"order_id": "order-1", "status": "open"}}
+    assert memory.backend.evictions == 1
+
+def test_ttl_expiry():
+    """Tests that entries expire after their TTL."""
+    now = [0.0]
+    memory = ContextMemory(LRUBackend(clock=lambda: now[0]))
+    memory.add_many({"a": 1, "b": 2}, ttl=10)
+    memory.add_context("c", 3)
+    now[0] = 11.0
+    assert memory.get_many(["a", "b", "c"]) == {"c": 3}
+    assert memory.get_all_context() == {"c": 3}
+
+def test_sqlite_backend_persists_and_indexes(tmp_path):
+    """Tests the SQLite backend: persistence, bulk access, history and expiry."""
+    path = tmp_path / "context.db"
+    memory = ContextMemory(SQLiteBackend(path))
+    memory.add_many([
+        ("case_1", {"driver_id": "driver-1", "note": "late"}),
+        ("case_2", {"driver_id": "driver-1", "note": "re-routed"}),
+        ("case_3", {"driver_id": "driver-2"}),
+    ])
+    memory.add_context("temp", {"driver_id": "driver-1"}, ttl=-1)
+    memory.close()
+
+    reopened = ContextMemory(SQLiteBackend(path))
+    assert reopened.get_many(["case_1", "case_3", "missing"]) == {"case_1": {"driver_id": "driver-1", "note": "late"}, "case_3": {"driver_id": "driver-2"}}
+    assert list(reopened.get_history("driver_id", "driver-1")) == ["case_1", "case_2"]
+    assert list(reopened.get_history("driver_id", "driver-1", limit=1)) == ["case_2"]
+    assert reopened.purge_expired() == 1
+    reopened.close()
+def test_backends_keep_key_types(tmp_path):
+    """Tests that every backend reads non-string keys back as written, and old SQLite keys are migrated."""
+    for backend in (LRUBackend(), SQLiteBackend(tmp_path / "keys.db")):
+        memory = ContextMemory(backend)
+        memory.add_many([(1, {"order_id": "order-1"}), ("1", {"order_id": "order-2"}), (("case", 2), {"order_id": "order-1"})])
+        assert memory.get_context(1) == {"order_id": "order-1"} and memory.get_context("1") == {"order_id": "order-2"}
+        assert memory.get_all_context() == {1: {"order_id": "order-1"}, "1": {"order_id": "order-2"}, ("case", 2): {"order_id": "order-1"}}
+        assert list(memory.get_history("order_id", "order-1")) == [1, ("case", 2)]
+        memory.remove_context(1)
+        assert memory.get_context(1) is None and memory.get_context(("case", 2)) is not None
+        memory.close()
+    legacy = sqlite3.connect(tmp_path / "legacy.db")
+    legacy.execute("CREATE TABLE context (key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, expires_at REAL, "
+                   "order_id TEXT, driver_id TEXT, customer_id TEXT, merchant_id TEXT)")
+    legacy.execute("INSERT INTO context (key, value, created_at) VALUES ('case_1', '{\"status\": \"open\"}', 0)")
+    legacy.commit()
+    legacy.close()
+    migrated = ContextMemory(SQLiteBackend(tmp_path / "legacy.db"))
+    assert migrated.get_context("case_1") == {"status": "open"}
+    migrated.close()
+
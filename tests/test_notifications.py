@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from src.tools import notifications, runtime
+from src.tools.logistics import notify_customer_async, notify_resolution_async
+from src.tools.notifications import NotificationDispatcher, StubTransport
+
+@pytest.fixture
+def transport():
+    stub = StubTransport()
+    notifications.set_transport(stub, max_batch=100)
+    yield stub
+    notifications.set_transport(None)
+
+def test_bulk_delivery_for_many_orders(transport):
+    """Tests that 300 notifications go out in a few bulk calls over one pooled connection."""
+    async def outage():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await asyncio.gather(*(notify_customer_async(f"customer-{i}", "merchant-1 is closed.") for i in range(300)))
+        await notify_resolution_async(["customer-1", "driver-1"], "order-1", "Refunded.")
+        return loop.time() - start, notifications.dispatcher().stats()
+
+    elapsed, stats = runtime.run(outage(), virtual=True)
+    assert transport.calls == 4
+    assert stats["sent"] == 302
+    assert stats["queue_depth"] == 0
+    assert stats["mean_batch"] == 75.5
+    assert stats["flush_p50_ms"] == 550.0  # round trip plus connection handshake
+    assert (transport.pool.opened, transport.pool.reused) == (3, 1)
+    assert elapsed < 1.2
+
+def test_identical_messages_are_sent_once():
+    """Tests deduplication of queued, in-flight and recently delivered messages."""
+    transport = StubTransport()
+
+    async def send():
+        dispatcher = NotificationDispatcher(transport, max_delay_s=0.01, dedupe_window_s=60)
+        first = await asyncio.gather(dispatcher.send("customer-1", "Hi"), dispatcher.send("customer-1", "Hi"))
+        again = await dispatcher.send("customer-1", "Hi")
+        other = await dispatcher.send("customer-2", "Hi")
+        await asyncio.sleep(60)
+        later = await dispatcher.send("customer-1", "Hi")
+        return first, again, other, later, dispatcher.stats()
+
+    first, again, other, later, stats = runtime.run(send(), virtual=True)
+    assert first[0] is first[1]
+    assert again["status"] == "deduplicated" and "deduplicated" not in other and "deduplicated" not in later
+    assert stats["sent"] == 3
+    assert stats["deduplicated"] == 2
+    assert transport.calls == 3
+
+def test_only_in_flight_copies_are_deduplicated_by_default(transport):
+    """Tests that a repeat sent after delivery goes out again, and the tools report any dropped copy."""
+    async def repeat():
+        first = await notify_customer_async("customer-1", "Your order is late.")
+        second = await notify_customer_async("customer-1", "Your order is late.")
+        notifications.set_transport(transport, dedupe_window_s=60)
+        await notify_resolution_async(["customer-1", "driver-1"], "order-1", "Refunded.")
+        again = await notify_resolution_async(["customer-1", "driver-2"], "order-1", "Refunded.")
+        return first, second, again
+
+    first, second, again = runtime.run(repeat(), virtual=True)
+    assert first["status"] == second["status"] == "success" and transport.calls == 4
+    assert again == {"status": "success", "deduplicated": ["customer-1"]}
+
+def test_transport_errors_reach_every_waiter():
+    """Tests that a failed bulk call fails all of its messages and is counted."""
+    class Failing:
+        async def send_bulk(self, messages):
+            raise ConnectionError("provider down")
+
+    async def send():
+        dispatcher = NotificationDispatcher(Failing(), max_batch=2)
+        results = await asyncio.gather(dispatcher.send("a", "x"), dispatcher.send("b", "x"), return_exceptions=True)
+        return results, dispatcher.stats()
+
+    results, stats = runtime.run(send(), virtual=True)
+    assert all(isinstance(result, ConnectionError) for result in results)
+    assert stats["errors"] == 2
+    assert stats["sent"] == 0
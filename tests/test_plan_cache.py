@@ -0,0 +1,119 @@
+import asyncio
+from types import SimpleNamespace
+
+from src.agent.coordinator import Coordinator
+from src.agent.plan_cache import PlanCache, normalize
+
+SCENARIO = "merchant-456 is overloaded, 40 min wait for customer-1."
+STEPS = [
+    ("Get Merchant Status", "merchant-456", {"merchant_id": "merchant-456", "status": "busy"}),
+    ("Notify Customer", {"customer_id": "customer-1", "message": "merchant-456 is busy, expect a 40 minute wait."}, {"status": "success"}),
+]
+OUTPUT = "Told customer-1 that merchant-456 has a 40 minute wait."
+
+async def fake_tool(tool_name, tool_input):
+    if tool_name == "Get Merchant Status":
+        return {"merchant_id": tool_input, "status": "busy"}
+    return {"status": "success"}
+
+def test_normalize_replaces_entities():
+    """Tests that ids and numbers become placeholders."""
+    template, entities = normalize(SCENARIO)
+    assert template == "<merchant_0> is overloaded, <num_0> min wait for <customer_0>."
+    assert entities == {"merchant_0": "merchant-456", "num_0": 40, "customer_0": "customer-1"}
+    assert normalize("merchant-812 is overloaded, 35 min wait for customer-7.")[0] == template
+
+def test_replay_substitutes_entities_and_observations():
+    """Tests that a cached plan is replayed with the new entities and fresh observations."""
+    cache = PlanCache()
+    cache.store(SCENARIO, STEPS, OUTPUT)
+    result = asyncio.run(cache.resolve("merchant-812 is overloaded, 35 min wait for customer-7.", fake_tool))
+    assert result["output"] == "Told customer-7 that merchant-812 has a 35 minute wait."
+    assert result["intermediate_steps"][0]["tool_input"] == "merchant-812"
+    assert result["intermediate_steps"][1]["tool_input"] == {
+        "customer_id": "customer-7", "message": "merchant-812 is busy, expect a 35 minute wait.",
+    }
+    assert cache.stats()["exact_hits"] == 1
+
+def test_replay_falls_back_only_before_a_write():
+    """Tests that a changed decision before any write falls back, and a failure after a write does not."""
+    cache = PlanCache()
+    cache.store(SCENARIO, STEPS, OUTPUT)
+    notified = []
+
+    async def closed(tool_name, tool_input):
+        if tool_name == "Get Merchant Status":
+            return {"merchant_id": tool_input, "status": "closed"}
+        notified.append(tool_input)
+        return {"status": "success"}
+
+    reads = lambda tool_name: tool_name == "Notify Customer"
+    assert asyncio.run(cache.resolve("merchant-812 is overloaded, 35 min wait for customer-7.", closed, reads)) is None
+    assert notified == [] and cache.stats()["diverged"] == 1 and cache.stats()["size"] == 1
+    cache.store("Ask customer-1 about merchant-456.", STEPS[::-1], OUTPUT)
+
+    async def merchant_down(tool_name, tool_input):
+        if tool_name == "Get Merchant Status":
+            raise ConnectionError("merchant API down")
+        notified.append(tool_input)
+        return {"status": "success"}
+
+    result = asyncio.run(cache.resolve("Ask customer-7 about merchant-812.", merchant_down, reads))
+    assert result["partial"] and "ConnectionError" in result["error"]
+    assert [step["tool"] for step in result["intermediate_steps"]] == ["Notify Customer"] and len(notified) == 1
+    assert cache.stats()["partial_replays"] == 1 and cache.stats()["replay_failures"] == 1
+
+def test_writes_are_not_replayed_with_other_amounts():
+    """Tests that a plan recorded for a small refund is not replayed for a large one, nor over the refund cap."""
+    refund = "customer-1 wants a refund of $20 for order-9."
+    steps = [("Issue Instant Refund", {"customer_id": "customer-1", "order_id": "order-9", "amount": 20.0}, {"status": "success"})]
+    cache = PlanCache()
+    cache.store(refund, steps, "Refunded customer-1 $20.")
+    calls = []
+
+    async def run_tool(tool_name, tool_input):
+        calls.append(tool_input)
+        return {"status": "success"}
+
+    assert asyncio.run(cache.resolve("customer-1 wants a refund of $5000 for order-9.", run_tool)) is None
+    assert calls == [] and cache.stats()["changed_amounts"] == 1
+    assert asyncio.run(cache.resolve("customer-2 wants a refund of $20 for order-10.", run_tool))["output"] == "Refunded customer-2 $20."
+    assert calls == [{"customer_id": "customer-2", "order_id": "order-10", "amount": 20}]
+    order = "Look up order-9 and refund customer-1."
+    cache.store(order, [("Get Order", "order-9", {"order_id": "order-9", "total": 4999.5}),
+                        ("Issue Instant Refund", {"customer_id": "customer-1", "amount": 4999.5}, {"status": "success"})], "Done.")
+    calls.clear()
+    assert asyncio.run(cache.resolve("Look up order-10 and refund customer-2.", run_tool, lambda name: name != "Get Order")) is None
+    assert calls == ["order-10"]
+
+def test_similarity_threshold_and_eviction():
+    """Tests near-duplicate matching, rejection of unrelated scenarios and LRU eviction."""
+    cache = PlanCache(maxsize=1)
+    cache.store(SCENARIO, STEPS, OUTPUT)
+    assert cache.lookup("merchant-9 is badly overloaded, 35 min wait for customer-2.") is not None
+    assert cache.lookup("The recipient recip-789 is not home.") is None
+    cache.store("Traffic jam near the airport for pass-1.", [("Check Flight Status", "SQ123", {})], "Checked.")
+    stats = cache.stats()
+    assert stats["size"] == 1
+    assert stats["evictions"] == 1
+    assert stats["similar_hits"] == 1
+    assert stats["misses"] == 1
+
+def test_coordinator_replays_cached_plan(monkeypatch):
+    """Tests that the Coordinator only calls the LLM agent once for repeated disruption shapes."""
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    coordinator = Coordinator(use_fast_path=False)
+    calls = []
+
+    async def ainvoke(inputs, config=None):
+        calls.append(inputs)
+        steps = [(SimpleNamespace(tool=tool, tool_input=tool_input), observation) for tool, tool_input, observation in STEPS]
+        return {"input": inputs["input"], "output": OUTPUT, "intermediate_steps": steps}
+
+    monkeypatch.setattr(coordinator, "agent_executor", SimpleNamespace(ainvoke=ainvoke))
+    monkeypatch.setattr(coordinator, "_run_tool", fake_tool)
+    coordinator.handle_disruption(SCENARIO)
+    result = coordinator.handle_disruption("merchant-812 is overloaded, 35 min wait for customer-7.")
+    assert len(calls) == 1
+    assert result["plan_cache"] == 1.0
+    assert result["output"] == "Told customer-7 that merchant-812 has a 35 minute wait."
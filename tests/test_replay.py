@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from src.agent.coordinator import Coordinator
+from src.tools import replay, runtime
+from src.tools.logistics import calculate_alternative_route_async, get_merchant_status_async
+from src.tools.replay import ReplayMiss, Replayer, recording, replayable, replay_disruptions
+
+SCENARIOS = [
+    "Dispute: order-11 arrived damaged (spilled drink), customer-2 wants a refund of $12.50 and blames driver-3.",
+    "Major traffic obstruction: driver-4 taking pass-9 to the airport for flight MH123.",
+    "Recipient recip-5 is not home; driver-8 is waiting at the door.",
+]
+
+def test_seed_makes_simulated_tools_repeatable():
+    """Tests that reseeding the runtime's random source repeats the tools' simulated results."""
+    async def draw():
+        route = {"start": "A", "end": "B", "original_eta": 20}
+        return await asyncio.gather(calculate_alternative_route_async(route, "accident"),
+                                    calculate_alternative_route_async(route, "flood"))
+
+    runtime.seed(7)
+    first = runtime.run(draw(), virtual=True)
+    runtime.seed(7)
+    assert runtime.run(draw(), virtual=True) == first
+    runtime.seed(None)
+
+def test_recorded_run_replays_instantly(tmp_path):
+    """Tests that a recorded day of disruptions replays with the same outputs, in no virtual time."""
+    path = tmp_path / "day.jsonl.gz"
+    coordinator = Coordinator(use_mock_llm=True, use_fast_path=True)
+    with recording(path) as recorder:
+        outputs = [runtime.run(coordinator.handle_disruption_async(s), virtual=True)["output"] for s in SCENARIOS]
+    assert recorder.disruptions == 3 and recorder.calls >= 8
+
+    async def timed(scenario):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        response = await coordinator.handle_disruption_async(scenario)
+        return response["output"], loop.time() - start
+
+    with replay.replaying(path, on_miss="error") as replayer:
+        replayed = [runtime.run(timed(s), virtual=True) for s in SCENARIOS]
+    assert [output for output, _ in replayed] == outputs
+    assert all(elapsed == 0 for _, elapsed in replayed)
+    assert replayer.stats() == {"served": recorder.calls, "misses": 0, "unused": 0}
+    report = replay_disruptions(coordinator, path, on_miss="error")
+    assert (report["disruptions"], report["matched"], report["changed"]) == (3, 3, [])
+
+def test_replayer_serves_results_in_order_and_errors(tmp_path):
+    """Tests repeated calls, recorded errors, misses, and pass-through without a session."""
+    results = iter(["open", "busy"])
+
+    @replayable("status_probe")
+    async def status(merchant_id, detailed=False):
+        if merchant_id == "bad":
+            raise ConnectionError("upstream down")
+        return {"merchant_id": merchant_id, "status": next(results)}
+
+    async def calls():
+        first = await status("m-1")
+        second = await status(merchant_id="m-1", detailed=False)
+        with pytest.raises(ConnectionError):
+            await status("bad")
+        return first, second
+
+    path = tmp_path / "probe.jsonl"
+    with recording(path):
+        recorded = runtime.run(calls())
+    with replay.replaying(path, on_miss="error"):
+        assert runtime.run(calls()) == recorded
+        assert runtime.run(status("m-1"))["status"] == "busy"
+        with pytest.raises(ReplayMiss):
+            runtime.run(status("m-2"))
+    with pytest.raises(ValueError):
+        Replayer(path, on_miss="skip")
+    assert runtime.run(get_merchant_status_async("merchant-1"), virtual=True)["merchant_id"] == "merchant-1"
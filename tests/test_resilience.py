@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from src.agent.coordinator import TOOL_SPECS, resilient_specs
+from src.telemetry.tracing import prometheus_text
+from src.tools import runtime
+from src.tools.resilience import CLOSED, HALF_OPEN, OPEN, Policy, ResilientTool
+
+def test_idempotent_reads_are_retried_within_budget():
+    """Tests that a flaky read is retried with back-off until it succeeds."""
+    calls = []
+
+    async def lookup(merchant_id):
+        calls.append(merchant_id)
+        if len(calls) < 3:
+            raise ConnectionError("upstream reset")
+        return {"merchant_id": merchant_id, "status": "open"}
+
+    tool = ResilientTool("lookup", lookup, Policy(timeout_s=1, budget_s=5, idempotent=True, retries=2))
+    result = runtime.run(tool("merchant-1"), virtual=True)
+    assert result == {"merchant_id": "merchant-1", "status": "open"}
+    stats = tool.stats()
+    assert (stats["retries"], stats["successes"], stats["failures"], stats["state"]) == (2, 1, 0, CLOSED)
+
+def test_breaker_opens_and_serves_the_last_good_answer():
+    """Tests timeouts tripping the breaker, fast degraded answers, and recovery via a probe."""
+    slow = {"on": False}
+
+    async def flight_status(flight_number):
+        await asyncio.sleep(10 if slow["on"] else 0.5)
+        return {"flight_number": flight_number, "flight_status": "On time"}
+
+    tool = ResilientTool("flight", flight_status, Policy(timeout_s=1, budget_s=1, idempotent=True, failure_threshold=2, reset_s=30))
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        assert (await tool("SQ1"))["flight_status"] == "On time"
+        slow["on"] = True
+        start = loop.time()
+        first, second = await tool("SQ1"), await tool("SQ2")
+        assert loop.time() - start == 2.0
+        assert first["degraded"] and first["flight_status"] == "On time"
+        assert second["status"] == "unavailable"
+        assert tool.breaker.state == OPEN
+        start = loop.time()
+        short = await tool("SQ1")
+        assert loop.time() == start and short["degraded"]
+        await asyncio.sleep(30)
+        assert tool.breaker.state == HALF_OPEN
+        slow["on"] = False
+        assert "degraded" not in await tool("SQ1")
+        assert tool.breaker.state == CLOSED
+
+    runtime.run(scenario(), virtual=True)
+    stats = tool.stats()
+    assert (stats["timeouts"], stats["short_circuits"], stats["fallbacks"], stats["breaker_opened"]) == (2, 1, 2, 1)
+
+def test_writes_are_not_retried_or_answered_from_earlier_results():
+    """Tests that a failing write is called once and reported as failed, never as an earlier success."""
+    calls, down = [], {"on": False, "slow": False}
+
+    async def refund(customer_id, amount):
+        calls.append(customer_id)
+        if down["slow"]:
+            await asyncio.sleep(10)
+        if down["on"]:
+            raise KeyError("gateway lost the session")
+        return {"status": "success", "refund_id": "rf-1"}
+
+    tool = ResilientTool("refund", refund, Policy(timeout_s=1, budget_s=5, retries=3, failure_threshold=2))
+
+    async def scenario():
+        assert (await tool("cust-1", 10.0))["status"] == "success"
+        down["on"] = True
+        failed = await tool("cust-1", 10.0)
+        assert calls == ["cust-1", "cust-1"]
+        assert failed["status"] == "failed" and "refund_id" not in failed and not failed["may_have_applied"]
+        assert "gateway lost the session" in failed["reason"]
+        down.update(on=False, slow=True)
+        timed_out = await tool("cust-1", 10.0)
+        assert timed_out["status"] == "failed" and timed_out["may_have_applied"]
+        # Errors raised by the dependency count towards the breaker; bad arguments never reach it.
+        assert tool.breaker.state == OPEN
+        assert (await tool("cust-1", 10.0))["status"] == "unavailable"
+        with pytest.raises(TypeError):
+            await tool("cust-1")
+
+    runtime.run(scenario(), virtual=True)
+
+def test_agent_tools_are_wrapped_and_exported():
+    """Tests that the agent's tool registry keeps names and signatures and reports breaker metrics."""
+    specs = resilient_specs()
+    assert [spec[0] for spec in specs] == [spec[0] for spec in TOOL_SPECS]
+    name, func, coroutine, _ = specs[[spec[0] for spec in specs].index("Check Flight Status")]
+    assert func.__name__ == "check_flight_status" and coroutine.tool.policy.idempotent
+    assert func("SQ123")["flight_number"] == "SQ123"
+    metrics = prometheus_text()
+    assert 'coordinator_tool_breaker_state{tool="check_flight_status"} 0' in metrics
+    assert 'coordinator_tool_latency_budget_seconds{tool="check_flight_status"} 6.0' in metrics
@@ -0,0 +1,98 @@
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.tools.logistics import calculate_alternative_route, set_router
+from src.tools.routing import RoadGraph, Router, _haversine_km
+
+def small_city(tmp_path):
+    """
+    A 3x3 grid; the middle column is a fast road.
+        0 - 1 - 2
+        |   |   |
+        3 - 4 - 5
+        |   |   |
+        6 - 7 - 8
+    """
+    nodes = tmp_path / "nodes.csv"
+    nodes.write_text("node_id,latitude,longitude\n" + "\n".join(
+        f"{100 + i},{3.0 + (i // 3) * 0.001},{101.0 + (i % 3) * 0.001}" for i in range(9)
+    ) + "\n")
+    edges = tmp_path / "edges.csv"
+    roads = [(0, 1, 30), (1, 2, 30), (3, 4, 30), (4, 5, 30), (6, 7, 30), (7, 8, 30),
+             (0, 3, 30), (3, 6, 30), (1, 4, 60), (4, 7, 60), (2, 5, 30), (5, 8, 30)]
+    edges.write_text("source,target,length_m,speed_kmh\n" + "\n".join(
+        f"{100 + u},{100 + v},111,{speed}" for u, v, speed in roads
+    ) + "\n")
+    return RoadGraph.from_csv(nodes, edges)
+
+def test_route_takes_fast_road_and_avoids_closures(tmp_path):
+    """Tests A* routing, closures and reuse of unaffected routes."""
+    router = Router(small_city(tmp_path))
+    seconds, path = router.route(1, 7)
+    assert path == [1, 4, 7]
+    router.close_edge(4, 7)
+    seconds_after, path_after = router.route(1, 7)
+    assert seconds_after > seconds
+    assert path_after[0] == 1 and path_after[-1] == 7 and 4 not in path_after[2:]
+    assert router.route(0, 2)[1] == [0, 1, 2]
+    router.close_edge(3, 6)
+    router.route(0, 2)
+    assert router.reused == 1
+    router.clear_obstructions()
+    assert router.route(1, 7)[1] == [1, 4, 7]
+
+def test_route_unreachable(tmp_path):
+    """Tests that a fully closed-off node has no route."""
+    router = Router(small_city(tmp_path))
+    router.close_edge(0, 1)
+    router.close_edge(0, 3)
+    assert router.route(0, 8) == (math.inf, [])
+
+def test_route_cache_is_bounded_and_thread_safe(tmp_path):
+    """Tests LRU eviction of cached routes and closures racing with lookups on other threads."""
+    router = Router(small_city(tmp_path), max_routes=2)
+    router.route(0, 8), router.route(1, 7), router.route(0, 8), router.route(2, 6)
+    assert set(router._routes) == {(0, 8), (2, 6)}
+
+    def churn(i):
+        router.close_edge(4, 7, duration_s=0 if i % 2 else None)
+        return router.route(i % 9, 8)
+
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(churn, range(200)))
+    assert all(path[-1] == 8 for _, path in results) and len(router._routes) <= 2
+
+def test_save_and_mmap_load(tmp_path):
+    """Tests that a saved graph loads memory-mapped and routes identically."""
+    graph = small_city(tmp_path)
+    graph.save(tmp_path / "graph")
+    loaded = RoadGraph.load(tmp_path / "graph", mmap=True)
+    assert loaded.num_nodes == 9 and loaded.num_edges == graph.num_edges
+    assert loaded._min_seconds_per_km == graph.min_seconds_per_km()  # read from graph.json, not scanned
+    assert Router(loaded).route(0, 8) == Router(graph).route(0, 8)
+
+def test_nearest_node_uses_the_grid(tmp_path):
+    """Tests nearest-node lookups on the node grid, built or loaded, against a full scan."""
+    rng = np.random.default_rng(4)
+    lat, lon = rng.uniform(3.0, 3.1, 2000), rng.uniform(101.6, 101.7, 2000)
+    graph = RoadGraph.from_edges([0], [1], [1.0], lat, lon)
+    graph.save(tmp_path / "graph")
+    loaded = RoadGraph.load(tmp_path / "graph")
+    assert loaded._grid is not None and loaded.node_grid().cell_km == graph.node_grid().cell_km
+    for latitude, longitude in rng.uniform([2.95, 101.55], [3.15, 101.75], (50, 2)):
+        expected = int(np.argmin(_haversine_km(latitude, longitude, lat, lon)))
+        assert Router(graph).nearest_node(latitude, longitude) == Router(loaded).nearest_node(latitude, longitude) == expected
+
+def test_calculate_alternative_route_uses_router(tmp_path):
+    """Tests the logistics tool on top of the router, with an obstruction."""
+    set_router(Router(small_city(tmp_path)))
+    try:
+        route = {"start": "A", "end": "B", "original_eta": 1, "start_node": 101, "end_node": 107, "obstructed_edges": [[104, 107]]}
+        result = calculate_alternative_route(route, "accident")
+        assert result["status"] == "success"
+        assert result["new_route"]["path"][0] == 101 and result["new_route"]["path"][-1] == 107
+        assert [104, 107] not in [result["new_route"]["path"][i:i + 2] for i in range(len(result["new_route"]["path"]) - 1)]
+    finally:
+        set_router(None)
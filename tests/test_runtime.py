@@ -0,0 +1,49 @@
+import asyncio
+import time
+
+from src.tools import runtime
+from src.tools.cache import cached
+from src.tools.logistics import check_flight_status, check_traffic_async
+
+def test_virtual_time_skips_sleeps_but_keeps_concurrency():
+    """Tests that simulated latencies cost virtual, not wall-clock, time."""
+    async def plan():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await asyncio.gather(asyncio.sleep(1), check_traffic_async("A", "B"))
+        await asyncio.sleep(2)
+        return loop.time() - start
+
+    wall = time.perf_counter()
+    assert runtime.run(plan(), virtual=True) == 3.0
+    assert time.perf_counter() - wall < 0.5
+
+def test_cache_ttl_follows_virtual_time():
+    """Tests that cached entries expire on the virtual clock."""
+    calls = []
+
+    @cached("virtual_ttl_probe", ttl=60)
+    async def probe(key):
+        calls.append(key)
+        return key
+
+    async def scenario():
+        await probe("a")
+        await asyncio.sleep(59)
+        await probe("a")
+        await asyncio.sleep(2)
+        await probe("a")
+
+    runtime.run(scenario(), virtual=True)
+    assert calls == ["a", "a"]
+
+def test_blocking_tools_in_virtual_time():
+    """Tests that the blocking tool wrappers honour use_virtual_time()."""
+    runtime.use_virtual_time(True)
+    try:
+        start = time.perf_counter()
+        result = check_flight_status("SQ999")
+        assert time.perf_counter() - start < 0.5
+        assert result["flight_number"] == "SQ999"
+    finally:
+        runtime.use_virtual_time(False)
@@ -0,0 +1,123 @@
+import asyncio
+import io
+import json
+import os
+
+from src.agent.service import CoordinatorService, ServiceClosed, priority_for, serve_stdin, start_http
+from src.tools import runtime
+
+class FakeCoordinator:
+    """Resolves each scenario after a delay named in the scenario, recording the order."""
+    def __init__(self):
+        self.order = []
+
+    async def handle_disruption_async(self, scenario):
+        self.order.append(scenario)
+        await asyncio.sleep(float(scenario.rsplit(" ", 1)[1]))
+        return {"input": scenario, "output": f"resolved {scenario}"}
+
+def test_priority_for_disruption_types():
+    """Tests that airport and traffic cases outrank merchant issues."""
+    assert priority_for("Traffic jam on the way to the airport for flight SQ1.") == 0
+    assert priority_for("Recipient recip-1 is not home.") < priority_for("merchant-1 is overloaded.")
+
+def test_priority_queue_deadlines_and_drain():
+    """Tests priority ordering, deadline outcomes and graceful drain."""
+    coordinator = FakeCoordinator()
+
+    async def scenario():
+        service = CoordinatorService(coordinator, concurrency=1).start()
+        first = service.submit("blocker 1")
+        await asyncio.sleep(0)
+        merchant = service.submit("merchant 1", priority=3)
+        traffic = service.submit("traffic 1", priority=0)
+        slow = service.submit("slow 5", priority=1, deadline_s=4)
+        stale = service.submit("stale 1", priority=2, deadline_s=0.5)
+        await service.drain()
+        try:
+            service.submit("late 1")
+        except ServiceClosed:
+            rejected = True
+        results = [await f for f in (first, merchant, traffic, slow, stale)]
+        return results, rejected, service.stats()
+
+    results, rejected, stats = runtime.run(scenario(), virtual=True)
+    assert coordinator.order == ["blocker 1", "traffic 1", "slow 5", "merchant 1"]
+    assert [r["status"] for r in results] == ["ok", "ok", "ok", "timeout", "expired"]
+    assert rejected
+    assert stats["ok"] == 3 and stats["rejected"] == 1 and stats["queued"] == 0
+
+def test_stdin_and_http_front_ends():
+    """Tests the JSONL daemon and the HTTP endpoint against a warm service."""
+    async def scenario():
+        service = CoordinatorService(FakeCoordinator(), concurrency=2).start()
+        server = await start_http(service, port=0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        body = json.dumps({"id": "h1", "scenario": "http 0.1"}).encode()
+        writer.write(b"POST /disruptions HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % len(body) + body)
+        response = await reader.read()
+        writer.close()
+        server.close()
+        output = io.StringIO()
+        await serve_stdin(service, io.StringIO('"line 0.2"\n{"id": 7, "scenario": "json 0.1"}\n[1]\n'), output)
+        return response, output.getvalue()
+
+    response, output = runtime.run(scenario())
+    head, _, payload = response.decode().partition("\r\n\r\n")
+    assert head.startswith("HTTP/1.1 200")
+    assert json.loads(payload)["output"] == "resolved http 0.1"
+    records = [json.loads(line) for line in output.splitlines()]
+    assert records[0]["status"] == "rejected"
+    assert [(r["id"], r["status"]) for r in records[1:]] == [(7, "ok"), (1, "ok")]
+
+def test_bad_request_fields_are_rejected_without_stopping_the_service():
+    """Tests that a request with a non-numeric deadline or priority is rejected and the service keeps going."""
+    async def scenario():
+        service = CoordinatorService(FakeCoordinator(), concurrency=2).start()
+        lines = ['{"id": 1, "scenario": "a 0.1"}', '{"id": 2, "scenario": "b 0.1", "deadline_s": "5"}',
+                 '{"id": 3, "scenario": "c 0.1", "priority": "high"}', '{"id": 4, "scenario": "d 0.1", "deadline_s": 1}']
+        output = io.StringIO()
+        await serve_stdin(service, io.StringIO("\n".join(lines) + "\n"), output)
+        return [json.loads(line) for line in output.getvalue().splitlines()], service.stats()
+
+    records, stats = runtime.run(scenario(), virtual=True)
+    rejected = [r["error"] for r in records if r["status"] == "rejected"]
+    assert len(rejected) == 2 and "deadline_s" in rejected[0] and "priority" in rejected[1]
+    assert sorted(r["id"] for r in records if r["status"] == "ok") == [1, 4]
+    assert stats["ok"] == 2 and stats["error"] == 0
+
+def test_bad_content_length_gets_a_400():
+    """Tests that an unparsable Content-Length header is answered with 400 and the connection closed."""
+    async def scenario():
+        service = CoordinatorService(FakeCoordinator()).start()
+        server = await start_http(service, port=0)
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.sockets[0].getsockname()[1])
+        writer.write(b"POST /disruptions HTTP/1.1\r\nContent-Length: abc\r\n\r\n")
+        response = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+        server.close()
+        await service.drain()
+        return response
+
+    head, _, payload = runtime.run(scenario()).decode().partition("\r\n\r\n")
+    assert head.startswith("HTTP/1.1 400") and "Content-Length" in json.loads(payload)["error"]
+
+def test_stop_drains_the_stdin_queue():
+    """Tests that a stop signal ends stdin mode while input is still open, after finishing the queued requests."""
+    read_end, write_end = os.pipe()
+    os.write(write_end, b'{"id": 1, "scenario": "a 0.2"}\n')
+
+    async def scenario():
+        service = CoordinatorService(FakeCoordinator()).start()
+        stop, output = asyncio.Event(), io.StringIO()
+        asyncio.get_running_loop().call_later(0.1, stop.set)
+        await asyncio.wait_for(serve_stdin(service, os.fdopen(read_end), output, stop=stop), 5)
+        return [json.loads(line) for line in output.getvalue().splitlines()], service.stats()
+
+    try:
+        records, stats = runtime.run(scenario())
+    finally:
+        os.close(write_end)
+    assert [(r["id"], r["status"]) for r in records] == [(1, "ok")]
+    assert stats["accepting"] is False
@@ -0,0 +1,38 @@
+from src.sim.simulator import DISRUPTION_RATES, SimConfig, simulate
+
+def _config(**overrides):
+    busy = {kind: rate * 5 for kind, rate in DISRUPTION_RATES.items()}
+    return SimConfig(**{"drivers": 60, "merchants": 12, "hours": 2, "start_hour": 12, "disruption_rates": busy, **overrides})
+
+def test_day_delivers_every_order_through_the_coordinator():
+    """Tests that every order is delivered and every disruption resolved by the fast path or the agent."""
+    report = simulate(_config())
+    orders, disruptions = report["orders"], report["disruptions"]
+    assert orders["created"] == orders["delivered"] > 0
+    assert sum(disruptions["by_kind"].values()) == disruptions["resolved"] > 0
+    assert set(disruptions["by_path"]) == {"fast_path", "agent"} and disruptions["failed"] == 0
+    assert disruptions["by_path"]["agent"] == disruptions["by_kind"]["merchant"]
+    assert 0 < report["driver_utilization"]["mean"] <= report["driver_utilization"]["peak_hour"] <= 1
+    assert report["virtual_s"] >= 2 * 3600 and report["wall_s"] < 60
+
+def test_scarce_coordinators_make_disruptions_queue():
+    """Tests that too few coordinator workers show up as queue waits and a lower sustainable rate."""
+    scarce = simulate(_config(drivers=300, hours=1, coordinators=1, orders_per_driver=80))
+    plenty = simulate(_config(drivers=300, hours=1, coordinators=32, orders_per_driver=80))
+    assert scarce["disruptions"]["queue_wait_s"]["p99"] > plenty["disruptions"]["queue_wait_s"]["p99"] == 0
+    assert scarce["coordinator"]["utilization"] > plenty["coordinator"]["utilization"]
+    assert scarce["coordinator"]["sustainable_per_min"] < plenty["coordinator"]["sustainable_per_min"]
+
+def test_zones_give_the_same_result_in_or_out_of_process():
+    """Tests that a zoned city simulates identically in this process and on worker processes."""
+    config = _config(drivers=61, zones=2)
+    local, pooled = simulate(config, processes=0), simulate(config, processes=2)
+    local.pop("wall_s"), pooled.pop("wall_s")
+    assert local == pooled and local["drivers"] == 61
+
+def test_tool_output_is_shown_unless_quiet(capsys):
+    """Tests that quiet=False leaves stdout working and shows the tools' progress."""
+    simulate(_config(drivers=20, hours=0.25), quiet=False)
+    assert capsys.readouterr().out
+    simulate(_config(drivers=20, hours=0.25))
+    assert capsys.readouterr().out == ""
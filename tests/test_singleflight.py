@@ -0,0 +1,88 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.tools import runtime
+from src.tools.cache import clear_caches
+from src.tools.logistics import check_flight_status, get_merchant_status_async
+from src.tools.singleflight import SingleFlight, single_flight_stats
+
+def test_concurrent_identical_calls_share_one_request():
+    """Tests that concurrent cache misses for the same merchant make a single request."""
+    clear_caches()
+    before = get_merchant_status_async.flight.stats()
+
+    async def burst():
+        return await asyncio.gather(*(get_merchant_status_async("merchant-sf") for _ in range(50)),
+                                    get_merchant_status_async("merchant-other"))
+
+    results = runtime.run(burst(), virtual=True)
+    after = get_merchant_status_async.flight.stats()
+    assert len({result["status"] for result in results[:50]}) == 1
+    assert results[0] is not results[1]
+    assert after["executed"] - before["executed"] == 2
+    assert after["saved"] - before["saved"] == 49
+
+def test_threads_join_the_same_flight():
+    """Tests coalescing across the per-thread event loops of blocking callers."""
+    clear_caches()
+    before = check_flight_status.flight.stats()
+    barrier = threading.Barrier(6)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(check_flight_status("SF123")["flight_status"])
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    after = check_flight_status.flight.stats()
+    assert len(results) == 6 and len(set(results)) == 1
+    assert after["executed"] - before["executed"] == 1
+    assert after["saved"] - before["saved"] == 5
+
+def test_errors_are_shared_and_writes_are_never_coalesced():
+    """Tests that a failure reaches every waiter and mutating tools are not registered."""
+    flight = SingleFlight("test")
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(1)
+        raise ConnectionError("down")
+
+    async def burst():
+        return await asyncio.gather(*(flight.do("key", failing) for _ in range(3)), return_exceptions=True)
+
+    results = runtime.run(burst(), virtual=True)
+    assert all(isinstance(result, ConnectionError) for result in results)
+    assert len(calls) == 1
+    assert flight.stats() == {"calls": 3, "executed": 1, "saved": 2, "errors": 1, "in_flight": 0}
+    stats = single_flight_stats()
+    assert "check_flight_status" in stats
+    assert "issue_instant_refund" not in stats and "notify_customer" not in stats
+
+def test_waiters_retry_when_the_leading_call_is_cancelled():
+    """Tests that cancelling the caller doing the work does not cancel the others."""
+    flight = SingleFlight("test")
+
+    async def lookup():
+        await asyncio.sleep(1)
+        return "ok"
+
+    async def scenario():
+        leader = asyncio.create_task(flight.do("key", lookup))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("key", lookup))
+        await asyncio.sleep(0.5)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert runtime.run(scenario(), virtual=True) == "ok"
+    assert flight.stats()["executed"] == 2
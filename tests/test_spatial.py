@@ -0,0 +1,65 @@
+import random
+
+from src.tools.logistics import find_nearby_locker, get_nearby_merchants, set_locker_index, set_merchant_index
+from src.tools.spatial import SpatialIndex, haversine_km
+
+def build_index(n=2000, seed=7):
+    rng = random.Random(seed)
+    points = [(f"m-{i}", 3.0 + rng.random() * 0.3, 101.5 + rng.random() * 0.3, rng.choice(["pizza", "burger"])) for i in range(n)]
+    index = SpatialIndex()
+    for item_id, lat, lon, category in points:
+        index.insert(item_id, lat, lon, {"category": category})
+    return index, points
+
+def test_query_radius_matches_brute_force():
+    """Tests radius queries with a category filter against a linear scan."""
+    index, points = build_index()
+    expected = sorted(
+        (haversine_km(3.15, 101.65, lat, lon), item_id)
+        for item_id, lat, lon, category in points
+        if category == "pizza" and haversine_km(3.15, 101.65, lat, lon) <= 2.0
+    )
+    results = index.query_radius(3.15, 101.65, 2.0, category="pizza")
+    assert [r["id"] for r in results] == [item_id for _, item_id in expected]
+
+def test_nearest_matches_brute_force():
+    """Tests k-nearest queries against a linear scan."""
+    index, points = build_index()
+    expected = sorted((haversine_km(3.01, 101.51, lat, lon), item_id) for item_id, lat, lon, _ in points)[:5]
+    results = index.nearest(3.01, 101.51, k=5)
+    assert [r["id"] for r in results] == [item_id for _, item_id in expected]
+
+def test_insert_and_remove():
+    """Tests incremental updates."""
+    index = SpatialIndex()
+    index.insert("a", 3.1, 101.6, {"category": "pizza"})
+    index.insert("b", 3.1001, 101.6001, {"category": "pizza"})
+    index.remove("a")
+    assert "a" not in index and len(index) == 1
+    assert [r["id"] for r in index.query_radius(3.1, 101.6, 1)] == ["b"]
+    index.insert("b", 3.5, 101.9)
+    assert index.query_radius(3.1, 101.6, 1) == []
+
+def test_from_csv_keeps_ids_and_fields_as_strings(tmp_path):
+    """Tests that CSV loading parses only the coordinates."""
+    path = tmp_path / "lockers.csv"
+    path.write_text("locker_id,code,availability,latitude,longitude\n00123,nan,inf,3.1390,101.6869\n")
+    match = SpatialIndex.from_csv(path, "locker_id").nearest(3.139, 101.687)[0]
+    assert (match["id"], match["code"], match["availability"]) == ("00123", "nan", "inf")
+
+def test_from_csv_and_logistics_integration(tmp_path):
+    """Tests loading an index from CSV and serving the logistics lookups from it."""
+    merchants = tmp_path / "merchants.csv"
+    merchants.write_text("merchant_id,name,category,latitude,longitude\nm-1,Near Pizza,pizza,3.1390,101.6869\nm-2,Far Pizza,pizza,3.3,101.9\n")
+    lockers = tmp_path / "lockers.csv"
+    lockers.write_text("locker_id,availability,latitude,longitude\nl-1,none,3.1390,101.6869\nl-2,high,3.1400,101.6870\n")
+    set_merchant_index(SpatialIndex.from_csv(merchants, "merchant_id"))
+    set_locker_index(SpatialIndex.from_csv(lockers, "locker_id"))
+    try:
+        result = get_nearby_merchants(3.139, 101.687, "pizza", radius_km=2)
+        assert [m["merchant_id"] for m in result["merchants"]] == ["m-1"]
+        lockers_found = find_nearby_locker(3.139, 101.687)["lockers"]
+        assert [l["locker_id"] for l in lockers_found] == ["l-2"]
+    finally:
+        set_merchant_index(None)
+        set_locker_index(None)
@@ -0,0 +1,101 @@
+import asyncio
+
+import numpy as np
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from src.agent.coordinator import Coordinator
+from src.agent.specialist import Specialist, SpecialistPool
+from src.tools import mediation, runtime
+from src.tools.cache import clear_caches
+from src.tools.eta import eta_matrix
+
+SCENARIO = ("Dispute over a damaged order-77: customer-5 blames driver-9. "
+            "Driver-9 is also stuck in a traffic jam on the way to the airport for flight MH370, 40 min out.")
+
+def _timed(coro):
+    async def timed():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        result = await coro
+        return result, loop.time() - start
+    return runtime.run(timed(), virtual=True)
+
+def test_specialists_are_consulted_in_parallel():
+    """Tests that the relevant specialists run concurrently and return structured findings."""
+    clear_caches()
+    pool = SpecialistPool(deadline_s=10)
+    assert pool.domains_for(SCENARIO)[:2] == ["dispute", "traffic"]
+    result, elapsed = _timed(pool.consult(SCENARIO, domains=["dispute", "traffic"]))
+    assert result["complete"] == ["dispute", "traffic"] and result["partial"] == []
+    dispute, traffic = result["findings"]
+    assert dispute["facts"]["verdict"]["fault"] in ("merchant", "driver", "customer", "unclear")
+    assert dispute["facts"]["source"] == "report" and dispute["facts"]["parties"] == ["customer-5", "driver-9"]
+    assert set(traffic["facts"]) == {"travel_time_minutes", "alternative_route", "flight_status"}
+    # Traffic takes 1.5 s, analyzing the report 0.3 s: they overlap.
+    assert elapsed == 1.5
+    assert result["summary"].startswith("[dispute] Likely fault for order-77")
+
+def test_deadline_returns_partial_findings():
+    """Tests that a specialist still working at the deadline is cut off with what it found so far."""
+    clear_caches()
+    pool = SpecialistPool(deadline_s=1.2)
+    result, elapsed = _timed(pool.consult(SCENARIO, domains=["traffic"]))
+    assert elapsed == 1.2
+    traffic = result["findings"][0]
+    assert traffic["status"] == "partial" and result["partial"] == ["traffic"]
+    assert set(traffic["facts"]) == {"travel_time_minutes", "flight_status"}
+    assert pool.stats() == {"consultations": 1, "complete": 0, "partial": 1, "error": 0}
+    assert Specialist("Traffic").provide_analysis("Road closure") == "Analysis for Road closure."
+
+def test_missing_entities_are_reported_as_unknown():
+    """Tests that specialists do not make up entities the scenario does not name, and never contact the parties."""
+    clear_caches()
+    pool = SpecialistPool(deadline_s=10)
+    result, _ = _timed(pool.consult("A customer disputes a refund. The merchant is overloaded, traffic jam ahead.",
+                                    domains=["dispute", "merchant", "traffic"]))
+    dispute, merchant, traffic = result["findings"]
+    assert dispute["facts"] == {"verdict": "unknown"} and "No order was named" in dispute["summary"]
+    assert merchant["facts"]["merchant_status"] == {"status": "unknown"} and "No merchant was named" in merchant["summary"]
+    assert traffic["facts"]["alternative_route"] == "unknown"
+    mediation.mediations.open("med-order-88")
+    try:
+        mediation.mediations.add_evidence("med-order-88", "The rider dropped the bag.")
+        result, elapsed = _timed(pool.consult("Dispute over order-88.", domains=["dispute"]))
+    finally:
+        mediation.mediations.close("med-order-88")
+    facts = result["findings"][0]["facts"]
+    assert facts["source"] == "mediation" and facts["verdict"]["items_analyzed"] == 1 and elapsed == 0
+
+def test_cpu_work_runs_on_worker_processes():
+    """Tests that CPU-heavy analysis steps can run on the pool's processes."""
+    pool = SpecialistPool(processes=1)
+    try:
+        origins, destinations = [(3.14, 101.69)], [(3.15, 101.70), (3.10, 101.60)]
+        etas = runtime.run(pool.run_cpu(eta_matrix, origins, destinations))
+        assert np.allclose(etas, eta_matrix(origins, destinations))
+    finally:
+        pool.close()
+
+class ScriptedModel(GenericFakeChatModel):
+    """A chat model that answers at once and records the prompts it was sent."""
+    seen: list = []
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    async def ainvoke(self, messages, config=None, **kwargs):
+        self.seen.append(list(messages))
+        return await super().ainvoke(messages, config, **kwargs)
+
+def test_coordinator_passes_findings_to_the_agent(monkeypatch):
+    """Tests that the Coordinator consults specialists before the LLM and gives it their findings."""
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    coordinator = Coordinator(use_fast_path=False, plan_cache=False, agent_mode="tool_calling",
+                              specialists=SpecialistPool(deadline_s=5))
+    model = ScriptedModel(messages=iter([AIMessage(content="Handled.")]), seen=[])
+    coordinator.agent_executor.llm = model
+    result = coordinator.handle_disruption("Traffic jam on the way to the airport for flight MH370.")
+    assert result["output"] == "Handled."
+    assert result["specialist_findings"]["complete"] == ["traffic"]
+    assert "Specialist findings:\n[traffic] Current travel time" in model.seen[0][1].content
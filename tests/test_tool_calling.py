@@ -0,0 +1,80 @@
+import asyncio
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, SystemMessage, ToolMessage
+
+from src.agent.coordinator import PROMPT_INTRODUCTION, PROTOCOLS, TOOL_SPECS, Coordinator
+from src.agent.tool_calling import ToolCallingAgent
+from src.tools import runtime
+
+TRAFFIC = "Accident and road closure: driver-7 is taking pass-3 to the airport for flight MH123."
+
+class FakeToolModel(GenericFakeChatModel):
+    """A scripted chat model that accepts bind_tools and records what it was sent."""
+    bound: list = []
+    seen: list = []
+
+    def bind_tools(self, tools, **kwargs):
+        self.bound.append([tool.name for tool in tools])
+        return self
+
+    async def ainvoke(self, messages, config=None, **kwargs):
+        self.seen.append(list(messages))
+        return await super().ainvoke(messages, config, **kwargs)
+
+def turn(*calls, content="", tokens=100):
+    tool_calls = [{"name": name, "args": args, "id": f"call-{i}"} for i, (name, args) in enumerate(calls)]
+    usage = {"input_tokens": tokens - 20, "output_tokens": 20, "total_tokens": tokens}
+    return AIMessage(content=content, tool_calls=tool_calls, usage_metadata=usage)
+
+def traffic_script():
+    return FakeToolModel(messages=iter([
+        turn(("calculate_alternative_route", {"current_route": {"start": "Current location", "end": "Airport", "original_eta": 40},
+                                              "obstruction": "accident"}),
+             ("check_flight_status", {"flight_number": "MH123"})),
+        turn(("notify_passenger_and_driver", {"passenger_id": "pass-3", "driver_id": "driver-7", "message": "New route."}),
+             ("no_such_tool", {})),
+        turn(content="Re-routed and notified.", tokens=50),
+    ]), bound=[], seen=[])
+
+def test_parallel_tool_calls_with_compact_prompt():
+    """Tests that one turn's tool calls run concurrently and only the traffic protocol and tools are sent."""
+    model = traffic_script()
+    agent = ToolCallingAgent(model, TOOL_SPECS, PROTOCOLS, PROMPT_INTRODUCTION)
+
+    async def resolve():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        result = await agent.ainvoke({"input": TRAFFIC})
+        return result, loop.time() - start
+
+    result, elapsed = runtime.run(resolve(), virtual=True)
+    assert result["output"] == "Re-routed and notified."
+    assert result["turns"] == 3
+    assert [action.tool for action, _ in result["intermediate_steps"]][:3] == [
+        "Calculate Alternative Route", "Check Flight Status", "Notify Passenger and Driver"]
+    route, flight = (observation for _, observation in result["intermediate_steps"][:2])
+    assert route["status"] == "success" and route["new_route"]["updated_eta_minutes"] > 40
+    assert flight["flight_status"]
+    # Run one after the other, the route (1.5 s) and flight status (1 s) alone take 2.5 s.
+    assert elapsed < 2.2
+    assert result["intermediate_steps"][3][1].startswith("Error: there is no tool")
+    system = model.seen[0][0]
+    assert isinstance(system, SystemMessage)
+    assert "Traffic Obstruction" in system.content and "Dispute Resolution" not in system.content
+    assert "check_flight_status" in model.bound[0] and "issue_instant_refund" not in model.bound[0]
+    assert sum(isinstance(message, ToolMessage) for message in model.seen[-1]) == 4
+    stats = agent.stats()
+    assert stats["tokens_per_resolution"] == 250
+    assert stats["turns_per_resolution"] == 3
+    assert stats["tool_calls_per_turn"] == 1.333
+
+def test_coordinator_tool_calling_mode(monkeypatch):
+    """Tests that the Coordinator resolves through the tool-calling agent and reports its stats."""
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    coordinator = Coordinator(use_fast_path=False, plan_cache=False, agent_mode="tool_calling")
+    coordinator.agent_executor.llm = traffic_script()
+    result = coordinator.handle_disruption(TRAFFIC)
+    assert result["output"] == "Re-routed and notified."
+    assert coordinator.agent_stats()["resolutions"] == 1
+    assert Coordinator(use_mock_llm=True).agent_stats() is None
@@ -1,4 +1,5 @@
-from src.tools.logistics import check_traffic, get_merchant_status, get_driver_location
+from src.tools.logistics import check_traffic, get_merchant_status, get_driver_location, get_merchant_status_async
+import asyncio
 import time
 
 def test_check_traffic():
@@ -23,3 +24,14 @@ def test_get_driver_location():
     assert "location" in result
     assert "latitude" in result["location"]
     assert "longitude" in result["location"]
+
+def test_async_tools_run_concurrently():
+    """Tests that independent async tool calls overlap instead of adding up."""
+    async def fan_out():
+        return await asyncio.gather(*(get_merchant_status_async(f"merchant-{i}") for i in range(3)))
+
+    start = time.perf_counter()
+    results = asyncio.run(fan_out())
+    elapsed = time.perf_counter() - start
+    assert [r["merchant_id"] for r in results] == ["merchant-0", "merchant-1", "merchant-2"]
+    assert elapsed < 1.0
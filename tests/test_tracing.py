@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+
+from src.telemetry import tracing
+from src.tools.logistics import check_traffic_async, notify_customer_async
+
+@pytest.fixture
+def enabled_tracing():
+    tracing.tracer.clear()
+    tracing.enable()
+    yield tracing.tracer
+    tracing.disable()
+    tracing.tracer.clear()
+
+def test_tools_are_registered():
+    """Tests that every logistics tool is registered with the tracing layer."""
+    names = tracing.registered()
+    assert "check_traffic" in names
+    assert "calculate_alternative_route" in names
+    assert "notify_passenger_and_driver" in names
+
+def test_disabled_tracing_records_nothing():
+    """Tests that no spans are recorded while tracing is off."""
+    tracing.tracer.clear()
+    asyncio.run(notify_customer_async("customer-1", "Hello"))
+    assert len(tracing.tracer.spans) == 0
+
+def test_spans_nest_and_export(enabled_tracing):
+    """Tests span parenting, error outcomes and the OTLP and Prometheus exports."""
+    async def scenario():
+        with tracing.span("handle_disruption", kind="disruption"):
+            await asyncio.gather(check_traffic_async("A", "B"), notify_customer_async("customer-1", "Hi"))
+
+    asyncio.run(scenario())
+    with pytest.raises(TypeError):
+        asyncio.run(notify_customer_async("customer-1"))
+    spans = {span.name: span for span in enabled_tracing.spans}
+    assert spans["check_traffic"].parent_id == spans["handle_disruption"].span_id
+    assert spans["notify_customer"].error.startswith("TypeError")
+    exported = tracing.export_otlp()["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert {span["name"] for span in exported} == {"handle_disruption", "check_traffic", "notify_customer"}
+    assert tracing.percentiles("notify_customer")["count"] == 2
+    text = tracing.prometheus_text()
+    assert 'coordinator_span_latency_seconds{name="check_traffic",kind="tool",quantile="0.99"}' in text
+    assert 'coordinator_span_errors_total{name="notify_customer",kind="tool"} 1' in text
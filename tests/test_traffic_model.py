@@ -0,0 +1,78 @@
+import asyncio
+
+import numpy as np
+
+from src.tools import logistics, runtime
+from src.tools.traffic_model import TrafficModel, hour_of_week
+
+# Monday 2024-01-01 00:00 UTC.
+MONDAY = 1704067200
+
+
+def _trips(count=20_000, seed=0):
+    rng = np.random.default_rng(seed)
+    starts = rng.choice(["Depot", "Mall", "Airport"], count)
+    ends = rng.choice(["Airport", "Hospital"], count)
+    started_at = MONDAY + rng.uniform(0, 7 * 86400, count)
+    rush = (hour_of_week(started_at) % 24 >= 7) & (hour_of_week(started_at) % 24 < 10)
+    minutes = np.where(starts == "Depot", 30.0, 20.0) + np.where(rush, 20.0, 0.0) + rng.normal(0, 1, count)
+    return starts, ends, started_at, minutes
+
+def test_learns_hourly_profiles_per_segment():
+    """Tests per-segment rush-hour ETAs, the hourly fallback for unknown segments, and batch queries."""
+    model = TrafficModel().fit(*_trips(100_000))
+    assert hour_of_week(MONDAY + 8 * 3600) == 8
+    assert abs(model.eta("depot", "Airport", at=MONDAY + 8 * 3600) - 50) < 1.5
+    assert abs(model.eta("Depot", "Airport", at=MONDAY + 2 * 3600) - 30) < 1.5
+    assert 35 < model.eta("Nowhere", "Airport", at=MONDAY + 8 * 3600) < 50
+    batch = model.etas(["Depot", "Mall", "Nowhere"], ["Airport", "Hospital", "Airport"], at=MONDAY + 2 * 3600)
+    assert np.allclose(batch, [model.eta(s, e, at=MONDAY + 2 * 3600) for s, e in
+                               zip(["Depot", "Mall", "Nowhere"], ["Airport", "Hospital", "Airport"])])
+
+def test_csv_training_in_parallel_matches_in_memory(tmp_path):
+    """Tests that chunked multi-process CSV training adds up to the same profile, and save/load."""
+    starts, ends, started_at, minutes = _trips(5000)
+    path = tmp_path / "trips.csv"
+    with open(path, "w") as f:
+        f.write("start_point,end_point,started_at,duration_min\n")
+        for row in zip(starts, ends, started_at, minutes):
+            f.write("%s,%s,%.3f,%.4f\n" % row)
+    expected = TrafficModel().fit(starts, ends, started_at, minutes)
+    model = TrafficModel.from_csv(path, workers=2, chunk_bytes=20_000)
+    assert model.trips == 5000
+    at = MONDAY + np.arange(0, 7 * 86400, 3600)
+    for start, end in [("Depot", "Airport"), ("Airport", "Hospital")]:
+        assert np.allclose(model.etas([start] * len(at), [end] * len(at), at=at),
+                           expected.etas([start] * len(at), [end] * len(at), at=at), atol=1e-3)
+    model.save(tmp_path / "model")
+    loaded = TrafficModel.load(tmp_path / "model")
+    assert loaded.eta("Mall", "Hospital", at=MONDAY) == model.eta("Mall", "Hospital", at=MONDAY)
+
+def test_incidents_and_observations_update_without_retraining():
+    """Tests that incidents scale a segment until they expire, and trips are added incrementally."""
+    now = [MONDAY + 2 * 3600]
+    model = TrafficModel(clock=lambda: now[0]).fit(*_trips())
+    base = model.eta("Depot", "Hospital")
+    model.report_incident("Depot", "Hospital", factor=2.0, duration_s=600)
+    assert model.eta("Depot", "Hospital") == 2 * base
+    assert model.eta("Mall", "Hospital") < base
+    now[0] += 601
+    assert model.eta("Depot", "Hospital") == base
+    for _ in range(50):
+        model.observe("Depot", "Park", 12.0)
+    assert abs(model.eta("Depot", "Park") - 12.0) < 1.5
+
+def test_check_traffic_answers_from_the_model():
+    """Tests that check_traffic uses an installed model without the simulated API delay."""
+    logistics.set_traffic_model(TrafficModel().fit(*_trips(2000)))
+    try:
+        async def timed():
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            result = await logistics.check_traffic_async("Depot", "Airport")
+            return result, loop.time() - start
+
+        result, elapsed = runtime.run(timed(), virtual=True)
+        assert result["source"] == "traffic_model" and elapsed == 0
+    finally:
+        logistics.set_traffic_model(None)